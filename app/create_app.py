@@ -24,6 +24,10 @@ def create_app(config_name=None):
         from config import config
         app.config.from_object(config[config_name])
     
+    # SocketIO 이벤트 등록 (socketio.init_app 전에 import해야 핸들러가 목록에 저장되어
+    # 같은 프로세스에서 만드는 모든 앱 인스턴스의 서버에 등록됨)
+    register_socketio_events(app)
+    
     # 확장 모듈 초기화
     init_extensions(app)
     
@@ -39,8 +43,9 @@ def create_app(config_name=None):
     # 블루프린트 등록
     register_blueprints(app)
     
-    # SocketIO 이벤트 등록
-    register_socketio_events(app)
+    # Socket.IO 핸드셰이크용 사용자 스냅샷 저장
+    from app.services.socket_handshake import init_socket_handshake
+    init_socket_handshake(app)
     
     # 성능 최적화 기능 초기화 (프로덕션 환경에서만)
     if config_name == 'production' or (isinstance(config_name, dict) and not config_name.get('DEBUG', True)):
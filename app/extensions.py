@@ -36,9 +36,16 @@ def init_extensions(app):
     # from app.utils.security import SecurityMiddleware
     # SecurityMiddleware(app)
     
-    # SocketIO 초기화
+    # SocketIO 초기화 (SOCKETIO_MESSAGE_QUEUE가 있으면 워커 간 이벤트 전달)
+    from app.utils.message_queue import get_message_queue_options
+    
+    # 같은 프로세스에서 앱을 다시 만들 때 이전 앱의 큐 설정이 남지 않도록 제거
+    for option in ('client_manager', 'message_queue', 'channel'):
+        socketio.server_options.pop(option, None)
+    
     socketio.init_app(app, 
                      async_mode=app.config.get('SOCKETIO_ASYNC_MODE', 'threading'),
-                     cors_allowed_origins="*")
+                     cors_allowed_origins="*",
+                     **get_message_queue_options(app))
     
     return app
\ No newline at end of file
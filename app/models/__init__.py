@@ -8,6 +8,13 @@ from app.models.question import Question, DailyQuestion, Answer
 from app.models.memory import Memory
 from app.models.mood import MoodEntry
 from app.models.notification import Notification
+from app.models.calendar_feed import CalendarFeed
+from app.models.upload_blob import UploadBlob
+from app.models.couple_counter import CoupleCounter
+from app.models.notification_counter import NotificationCounter
+from app.models.notification_outbox import NotificationOutbox
+from app.models.socket_presence import SocketPresence
+from app.models.dashboard_state import DashboardState
 
 # 모든 모델을 한 번에 import할 수 있도록 __all__ 정의
 __all__ = [
@@ -20,5 +27,12 @@ __all__ = [
     'Answer',
     'Memory',
     'MoodEntry',
-    'Notification'
+    'Notification',
+    'CalendarFeed',
+    'UploadBlob',
+    'CoupleCounter',
+    'NotificationCounter',
+    'NotificationOutbox',
+    'SocketPresence',
+    'DashboardState'
 ]
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""캘린더 구독 피드 모델"""
+
+from datetime import datetime
+import secrets
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+
+class CalendarFeed(db.Model):
+    """커플별 iCalendar 구독 피드 모델 클래스
+
+    구독 토큰과 캘린더(일정, D-Day)의 마지막 변경 시각을 저장합니다.
+    피드 요청은 이 행 하나만 읽어 ETag를 계산하므로, 변경이 없으면
+    일정/D-Day 테이블을 조회하지 않고 304로 응답할 수 있습니다.
+    """
+
+    __tablename__ = 'calendar_feeds'
+
+    id = db.Column(db.Integer, primary_key=True)
+    couple_id = db.Column(db.Integer, db.ForeignKey('couple_connections.id'), nullable=False, unique=True)
+    token = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def generate_token():
+        """URL에 안전한 구독 토큰 생성"""
+        return secrets.token_urlsafe(32)
+
+    @staticmethod
+    def get_or_create(couple_id):
+        """커플의 피드 정보 반환 (없으면 생성)"""
+        feed = CalendarFeed.query.filter_by(couple_id=couple_id).first()
+        if not feed:
+            feed = CalendarFeed(
+                couple_id=couple_id,
+                token=CalendarFeed.generate_token()
+            )
+            db.session.add(feed)
+            db.session.commit()
+        return feed
+
+    @staticmethod
+    def touch(couple_id):
+        """캘린더 변경 시각 갱신
+
+        호출한 쪽의 트랜잭션 안에서 실행하며 커밋하지 않습니다. 대부분은 행이
+        있으므로 UPDATE 한 문장으로 끝나고, 행이 없을 때만 토큰을 만들어
+        UPSERT합니다. 변경 시각은 피드 ETag뿐 아니라 워커 간 D-Day 상태 캐시
+        버전으로도 쓰이므로, 피드를 만든 적이 없는 커플도 행을 기록합니다.
+        """
+        now = datetime.utcnow()
+        result = db.session.execute(
+            db.update(CalendarFeed).where(CalendarFeed.couple_id == couple_id).values(updated_at=now)
+        )
+        if result.rowcount:
+            return
+
+        stmt = sqlite_insert(CalendarFeed.__table__).values(
+            couple_id=couple_id,
+            token=CalendarFeed.generate_token(),
+            updated_at=now,
+            created_at=now
+        ).on_conflict_do_update(
+            index_elements=['couple_id'],
+            set_={'updated_at': now}
+        )
+        db.session.execute(stmt)
+
+    @staticmethod
+    def get_version(couple_id):
+        """커플 캘린더의 마지막 변경 시각 반환 (기록이 없으면 None)"""
+        return db.session.query(CalendarFeed.updated_at)\
+                         .filter_by(couple_id=couple_id).scalar()
+
+    def regenerate_token(self):
+        """구독 토큰 재발급 (기존 구독 URL 무효화)"""
+        self.token = CalendarFeed.generate_token()
+        self.updated_at = datetime.utcnow()
+        db.session.commit()
+        return self.token
+
+    def get_etag(self):
+        """마지막 캘린더 변경 시각 기반 ETag 값 반환"""
+        return f'{self.couple_id}-{int(self.updated_at.timestamp() * 1000000)}'
+
+    def __repr__(self):
+        return f'<CalendarFeed couple={self.couple_id}>'
@@ -0,0 +1,217 @@
+"""커플별 콘텐츠 카운터 모델"""
+
+from datetime import date
+from sqlalchemy import event, DDL
+from app.extensions import db
+
+# 한 커플의 카운터 행 전체를 원본 테이블에서 계산하는 SELECT
+# {where}에는 couple_connections(c)에 대한 조건이 들어갑니다.
+COUNTER_SELECT = (
+    "SELECT c.id, "
+    "(SELECT count(*) FROM memories WHERE couple_id = c.id), "
+    "(SELECT count(*) FROM memories WHERE couple_id = c.id AND COALESCE(image_path, '') != ''), "
+    "strftime('%Y-%m', 'now', 'localtime'), "
+    "(SELECT count(*) FROM memories WHERE couple_id = c.id "
+    "AND strftime('%Y-%m', memory_date) = strftime('%Y-%m', 'now', 'localtime')), "
+    "(SELECT count(*) FROM events WHERE couple_id = c.id), "
+    "(SELECT count(*) FROM ddays WHERE couple_id = c.id), "
+    "(SELECT count(*) FROM answers WHERE user_id = c.user1_id), "
+    "(SELECT count(*) FROM answers WHERE user_id = c.user2_id), "
+    "(SELECT count(*) FROM mood_entries WHERE user_id = c.user1_id), "
+    "(SELECT count(*) FROM mood_entries WHERE user_id = c.user2_id) "
+    "FROM couple_connections c WHERE {where}"
+)
+
+COUNTER_COLUMNS = ('memories', 'memories_with_images', 'month_key', 'month_memories', 'events',
+                   'ddays', 'user1_answers', 'user2_answers', 'user1_moods', 'user2_moods')
+
+# 달이 바뀐 행의 이번 달 추억 수 다시 계산
+MONTH_REFRESH = (
+    "UPDATE couple_counters SET month_key = strftime('%Y-%m', 'now', 'localtime'), "
+    "month_memories = (SELECT count(*) FROM memories WHERE couple_id = couple_counters.couple_id "
+    "AND strftime('%Y-%m', memory_date) = strftime('%Y-%m', 'now', 'localtime')) "
+    "WHERE month_key IS NOT strftime('%Y-%m', 'now', 'localtime')"
+)
+
+COUNTER_UPSERT = f"INSERT OR REPLACE INTO couple_counters (couple_id, {', '.join(COUNTER_COLUMNS)}) "
+
+def _partner_update(column, delta, user_id):
+    """사용자가 user1/user2인 커플 행의 파트너별 카운터 증감 문장"""
+    return (
+        f"UPDATE couple_counters SET user1_{column} = user1_{column} + ({delta}) "
+        f"WHERE couple_id IN (SELECT id FROM couple_connections WHERE user1_id = {user_id}); "
+        f"UPDATE couple_counters SET user2_{column} = user2_{column} + ({delta}) "
+        f"WHERE couple_id IN (SELECT id FROM couple_connections WHERE user2_id = {user_id}); "
+    )
+
+def _memory_update(sign, row):
+    """추억 한 건의 추가(+)/제거(-)를 해당 커플 행에 반영하는 문장"""
+    return (
+        f"UPDATE couple_counters SET memories = memories {sign} 1, "
+        f"memories_with_images = memories_with_images {sign} (COALESCE({row}.image_path, '') != ''), "
+        f"month_memories = month_memories {sign} (month_key = strftime('%Y-%m', {row}.memory_date)) "
+        f"WHERE couple_id = {row}.couple_id; "
+    )
+
+# 원본 테이블의 쓰기와 같은 트랜잭션에서 카운터를 갱신하는 트리거
+COUPLE_COUNTER_DDL = [
+    # 커플 연결 생성/파트너 변경 시 행 전체 계산, 삭제 시 행 삭제
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_couple_ai AFTER INSERT ON couple_connections BEGIN "
+    + COUNTER_UPSERT + COUNTER_SELECT.format(where='c.id = NEW.id') + "; END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_couple_au AFTER UPDATE OF user1_id, user2_id "
+    "ON couple_connections BEGIN "
+    + COUNTER_UPSERT + COUNTER_SELECT.format(where='c.id = NEW.id') + "; END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_couple_ad AFTER DELETE ON couple_connections BEGIN "
+    "DELETE FROM couple_counters WHERE couple_id = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_memory_ai AFTER INSERT ON memories BEGIN "
+    + _memory_update('+', 'NEW') + "END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_memory_ad AFTER DELETE ON memories BEGIN "
+    + _memory_update('-', 'OLD') + "END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_memory_au AFTER UPDATE OF couple_id, image_path, memory_date "
+    "ON memories BEGIN " + _memory_update('-', 'OLD') + _memory_update('+', 'NEW') + "END",
+
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_event_ai AFTER INSERT ON events BEGIN "
+    "UPDATE couple_counters SET events = events + 1 WHERE couple_id = NEW.couple_id; END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_event_ad AFTER DELETE ON events BEGIN "
+    "UPDATE couple_counters SET events = events - 1 WHERE couple_id = OLD.couple_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_dday_ai AFTER INSERT ON ddays BEGIN "
+    "UPDATE couple_counters SET ddays = ddays + 1 WHERE couple_id = NEW.couple_id; END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_dday_ad AFTER DELETE ON ddays BEGIN "
+    "UPDATE couple_counters SET ddays = ddays - 1 WHERE couple_id = OLD.couple_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_answer_ai AFTER INSERT ON answers BEGIN "
+    + _partner_update('answers', 1, 'NEW.user_id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_answer_ad AFTER DELETE ON answers BEGIN "
+    + _partner_update('answers', -1, 'OLD.user_id') + "END",
+
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_mood_ai AFTER INSERT ON mood_entries BEGIN "
+    + _partner_update('moods', 1, 'NEW.user_id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS couple_counters_mood_ad AFTER DELETE ON mood_entries BEGIN "
+    + _partner_update('moods', -1, 'OLD.user_id') + "END",
+]
+
+class CoupleCounter(db.Model):
+    """커플별 콘텐츠 카운터 모델 클래스
+
+    통계 API가 매번 COUNT를 실행하지 않도록 커플 콘텐츠 수를 한 행에
+    보관합니다. 값은 트리거가 원본 테이블 쓰기와 같은 트랜잭션에서 갱신하므로
+    어떤 경로로 데이터를 바꿔도 어긋나지 않습니다. 파트너별 값은
+    couple_connections의 user1/user2 순서를 따릅니다.
+    """
+
+    __tablename__ = 'couple_counters'
+
+    couple_id = db.Column(db.Integer, db.ForeignKey('couple_connections.id'), primary_key=True)
+    memories = db.Column(db.Integer, nullable=False, default=0)
+    memories_with_images = db.Column(db.Integer, nullable=False, default=0)
+    month_key = db.Column(db.String(7))  # month_memories가 가리키는 달 (YYYY-MM)
+    month_memories = db.Column(db.Integer, nullable=False, default=0)
+    events = db.Column(db.Integer, nullable=False, default=0)
+    ddays = db.Column(db.Integer, nullable=False, default=0)
+    user1_answers = db.Column(db.Integer, nullable=False, default=0)
+    user2_answers = db.Column(db.Integer, nullable=False, default=0)
+    user1_moods = db.Column(db.Integer, nullable=False, default=0)
+    user2_moods = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def get_for_couple(couple_id):
+        """커플 카운터 반환 (기본 키 조회 한 번)
+
+        조회 경로에서 쓰지 않도록 DB는 바꾸지 않습니다. 행이 없으면(기능 도입 전
+        커플) 원본 테이블로 계산한 세션 밖 객체를, 달이 바뀌었으면 이번 달 추억
+        수만 다시 계산한 세션 밖 객체를 돌려주며, 저장된 행은 유지보수 작업
+        (refresh_month, verify --fix)이 고칩니다.
+        """
+        counter = db.session.get(CoupleCounter, couple_id)
+        if counter is None:
+            row = db.session.execute(db.text(COUNTER_SELECT.format(where='c.id = :couple_id')),
+                                     {'couple_id': couple_id}).first()
+            if row is None:
+                return None
+            return CoupleCounter(couple_id=row[0], **dict(zip(COUNTER_COLUMNS, row[1:])))
+
+        current_month = date.today().strftime('%Y-%m')
+        if counter.month_key != current_month:
+            from app.models.memory import Memory
+            db.session.expunge(counter)
+            counter.month_key = current_month
+            counter.month_memories = Memory.query.filter(
+                Memory.couple_id == couple_id,
+                db.func.strftime('%Y-%m', Memory.memory_date) == current_month
+            ).count()
+        return counter
+
+    @staticmethod
+    def refresh_month():
+        """지난달 기준으로 남은 행의 이번 달 추억 수를 다시 계산 후 커밋, 갱신한 행 수 반환"""
+        result = db.session.execute(db.text(MONTH_REFRESH))
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def rebuild(couple_id=None):
+        """원본 테이블로 카운터 다시 계산 (couple_id가 없으면 전체) 후 커밋"""
+        if couple_id is None:
+            db.session.execute(db.text("DELETE FROM couple_counters"))
+            where = '1'
+        else:
+            where = 'c.id = :couple_id'
+        db.session.execute(db.text(COUNTER_UPSERT + COUNTER_SELECT.format(where=where)),
+                           {'couple_id': couple_id})
+        db.session.commit()
+
+    @staticmethod
+    def verify(fix=False):
+        """저장된 카운터와 원본 테이블 계산값 비교
+
+        (couple_id, 컬럼, 저장값, 실제값) 목록을 반환하며, fix=True이면
+        어긋난 커플의 행을 다시 계산합니다.
+        """
+        actual_rows = db.session.execute(db.text(COUNTER_SELECT.format(where='1'))).all()
+        stored = {counter.couple_id: counter for counter in CoupleCounter.query.all()}
+
+        mismatches = []
+        for row in actual_rows:
+            couple_id, values = row[0], row[1:]
+            counter = stored.get(couple_id)
+            for column, actual in zip(COUNTER_COLUMNS, values):
+                if column == 'month_key':
+                    continue
+                if column == 'month_memories' and counter is not None \
+                        and counter.month_key != values[COUNTER_COLUMNS.index('month_key')]:
+                    # 달이 바뀐 행은 refresh_month가 갱신하므로 비교하지 않음
+                    continue
+                stored_value = getattr(counter, column) if counter is not None else None
+                if stored_value != actual:
+                    mismatches.append((couple_id, column, stored_value, actual))
+
+        if fix:
+            for couple_id in sorted({mismatch[0] for mismatch in mismatches}):
+                CoupleCounter.rebuild(couple_id)
+        return mismatches
+
+    def for_user(self, connection, user_id):
+        """사용자 기준 (나, 파트너) 카운터 딕셔너리 반환"""
+        is_user1 = connection.user1_id == user_id
+        return {
+            'memories': self.memories,
+            'memories_with_images': self.memories_with_images,
+            'this_month_memories': self.month_memories,
+            'events': self.events,
+            'ddays': self.ddays,
+            'my_answers': self.user1_answers if is_user1 else self.user2_answers,
+            'partner_answers': self.user2_answers if is_user1 else self.user1_answers,
+            'my_moods': self.user1_moods if is_user1 else self.user2_moods,
+            'partner_moods': self.user2_moods if is_user1 else self.user1_moods
+        }
+
+    def __repr__(self):
+        return f'<CoupleCounter couple={self.couple_id}>'
+
+# 카운터 트리거는 여러 테이블을 참조하므로 모든 테이블이 만들어진 뒤 생성
+for statement in COUPLE_COUNTER_DDL:
+    # DDL()은 문장을 % 포맷으로 처리하므로 strftime 서식 문자를 이스케이프
+    event.listen(db.metadata, 'after_create',
+                 DDL(statement.replace('%', '%%')).execute_if(dialect='sqlite'))
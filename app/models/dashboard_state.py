@@ -0,0 +1,52 @@
+"""커플 대시보드 상태 모델"""
+
+import json
+from datetime import datetime
+from app.extensions import db
+
+class DashboardState(db.Model):
+    """커플 대시보드 상태 모델 클래스
+
+    커플 대시보드에 보이는 데이터(D-Day, 오늘 일정, 오늘 기분, 질문 답변 여부,
+    카운터)의 마지막 스냅샷과 버전을 보관합니다. 버전은 스냅샷이 바뀔 때마다
+    1씩 올라가며, 클라이언트는 받은 변경분의 기준 버전이 자기 버전과 다르면
+    전체 상태를 다시 받습니다. 모든 워커가 같은 행을 쓰므로 버전이 워커마다
+    따로 증가하지 않습니다.
+    """
+
+    __tablename__ = 'dashboard_states'
+
+    couple_id = db.Column(db.Integer, db.ForeignKey('couple_connections.id', ondelete='CASCADE'),
+                          primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    day = db.Column(db.Date)  # 스냅샷을 계산한 날짜 (날짜가 바뀌면 다시 계산)
+    data = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def lock(couple_id):
+        """버전을 올려 쓰기 잠금을 잡은 뒤 행 반환 (없으면 버전 1인 새 행)
+
+        먼저 UPDATE로 쓰기 트랜잭션을 시작하므로 이후 읽는 이전 스냅샷은
+        다른 워커의 갱신과 겹치지 않습니다.
+        """
+        updated = DashboardState.query.filter_by(couple_id=couple_id).update(
+            {DashboardState.version: DashboardState.version + 1}, synchronize_session=False)
+        if not updated:
+            state = DashboardState(couple_id=couple_id, version=1)
+            db.session.add(state)
+            db.session.flush()
+            return state
+        return DashboardState.query.filter_by(couple_id=couple_id)\
+                                   .execution_options(populate_existing=True).one()
+
+    def get_data(self):
+        """스냅샷 반환 (없으면 None)"""
+        return json.loads(self.data) if self.data else None
+
+    def set_data(self, data, day):
+        self.data = json.dumps(data, ensure_ascii=False, sort_keys=True)
+        self.day = day
+
+    def __repr__(self):
+        return f'<DashboardState couple={self.couple_id} v{self.version}>'
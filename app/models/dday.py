@@ -16,23 +16,28 @@ class DDay(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def days_remaining(self):
+    def days_remaining(self, today=None):
         """남은 일수 계산 (음수면 지난 일수)"""
-        today = date.today()
+        if today is None:
+            today = date.today()
         delta = self.target_date - today
         return delta.days
     
-    def is_past(self):
+    def is_past(self, today=None):
         """지난 날짜인지 확인"""
-        return self.days_remaining() < 0
+        return self.days_remaining(today) < 0
     
-    def is_today(self):
+    def is_today(self, today=None):
         """오늘인지 확인"""
-        return self.days_remaining() == 0
+        return self.days_remaining(today) == 0
     
-    def get_status_text(self):
+    def get_status_text(self, today=None):
         """상태 텍스트 반환"""
-        days = self.days_remaining()
+        return DDay.format_status_text(self.days_remaining(today))
+    
+    @staticmethod
+    def format_status_text(days):
+        """남은 일수를 D-Day 표기로 변환"""
         if days > 0:
             return f"D-{days}"
         elif days == 0:
@@ -2,7 +2,10 @@
 
 from datetime import datetime
 import os
+import json
+from sqlalchemy import event, DDL
 from app.extensions import db
+from app.services.image_hash import BAND_COUNT, band_expression
 
 class Memory(db.Model):
     """메모리(추억) 모델 클래스"""
@@ -14,20 +17,81 @@ class Memory(db.Model):
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
     memory_date = db.Column(db.Date, nullable=False)
-    image_path = db.Column(db.String(255))
+    image_path = db.Column(db.String(255), index=True)
+    image_status = db.Column(db.String(20))  # 'processing', 'ready', 'failed'
+    image_variants = db.Column(db.Text)  # 너비별 파생 이미지 목록 (JSON)
+    image_hash = db.Column(db.BigInteger)  # 유사 사진 검출용 64비트 dHash (부호 있는 값)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # 메모리 북 피드 키셋 페이지네이션 (memory_date, id 역순)
+    __table_args__ = (
+        db.Index('ix_memories_couple_date_id', 'couple_id', 'memory_date', 'id'),
+    )
+    
     def has_image(self):
         """이미지가 있는지 확인"""
         return self.image_path is not None and self.image_path.strip() != ''
     
+    def is_image_processing(self):
+        """이미지가 백그라운드에서 처리 중인지 확인"""
+        return self.has_image() and self.image_status == 'processing'
+    
     def get_image_url(self):
         """이미지 URL 반환"""
         if self.has_image():
             return f'/uploads/{self.image_path}'
         return None
     
+    @staticmethod
+    def serialize_variants(variants):
+        """파생 이미지 목록을 저장용 JSON 문자열로 변환"""
+        return json.dumps(variants, separators=(',', ':')) if variants else None
+    
+    def set_variants(self, variants):
+        """파생 이미지 목록 저장"""
+        self.image_variants = Memory.serialize_variants(variants)
+    
+    @staticmethod
+    def parse_variants(image_variants):
+        """저장된 JSON 문자열을 파생 이미지 목록으로 변환 (너비 오름차순)"""
+        if not image_variants:
+            return []
+        try:
+            return json.loads(image_variants)
+        except ValueError:
+            return []
+    
+    @staticmethod
+    def build_srcset(variants, image_format='jpeg'):
+        """파생 이미지 목록으로 srcset 속성 값 생성"""
+        return ', '.join(f"/uploads/{variant[image_format]} {variant['width']}w"
+                         for variant in variants)
+    
+    @staticmethod
+    def build_thumbnail_url(image_path, variants, min_width=640):
+        """min_width 이상인 가장 작은 JPEG 파생 이미지 URL (없으면 원본, 사진이 없으면 None)"""
+        if not image_path:
+            return None
+        for variant in variants:
+            if variant['width'] >= min_width:
+                return f"/uploads/{variant['jpeg']}"
+        return f'/uploads/{image_path}'
+    
+    def get_variants(self):
+        """파생 이미지 목록 반환 (너비 오름차순)"""
+        return Memory.parse_variants(self.image_variants)
+    
+    def get_srcset(self, image_format='jpeg'):
+        """<img>/<source>의 srcset 속성 값 반환 ('webp' 또는 'jpeg')"""
+        return Memory.build_srcset(self.get_variants(), image_format)
+    
+    def get_thumbnail_url(self, min_width=640):
+        """min_width 이상인 가장 작은 JPEG 파생 이미지 URL (없으면 원본)"""
+        if not self.has_image():
+            return None
+        return Memory.build_thumbnail_url(self.image_path, self.get_variants(), min_width)
+    
     def get_image_full_path(self):
         """이미지 전체 경로 반환"""
         if self.has_image():
@@ -36,20 +100,71 @@ class Memory(db.Model):
         return None
     
     def delete_image(self):
-        """이미지 파일 삭제"""
+        """이미지 파일 참조 해제 (다른 추억이 같은 사진을 쓰지 않으면 커밋 후 파생 이미지와 함께 삭제)"""
         if self.has_image():
-            image_path = self.get_image_full_path()
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                    return True
-                except OSError:
-                    return False
+            from flask import current_app
+            from app.services.upload_storage import release_upload
+            from app.services.image_pipeline import get_variant_filename
+            # 처리 중에 해제되는 경우도 있으므로 설정된 너비의 파일명도 함께 정리
+            variant_paths = {variant[key] for variant in self.get_variants() for key in ('webp', 'jpeg')}
+            for width in current_app.config.get('IMAGE_VARIANT_WIDTHS', (320, 640, 1280)):
+                variant_paths.add(get_variant_filename(self.image_path, width, 'webp'))
+                variant_paths.add(get_variant_filename(self.image_path, width, 'jpg'))
+            release_upload(current_app.config['UPLOAD_FOLDER'], self.image_path, variant_paths)
         return True
     
+    @staticmethod
+    def get_ready_image(image_path):
+        """같은 사진으로 처리가 끝난 추억의 (파생 이미지 정보, 유사 검출 해시) 반환 (없으면 (None, None))"""
+        row = db.session.query(Memory.image_variants, Memory.image_hash)\
+                        .filter(Memory.image_path == image_path, Memory.image_status == 'ready')\
+                        .limit(1).first()
+        return (row.image_variants, row.image_hash) if row else (None, None)
+    
+    @staticmethod
+    def get_ready_variants(image_path):
+        """같은 사진으로 처리가 끝난 추억의 파생 이미지 정보 반환 (중복 업로드 재사용)"""
+        return db.session.query(Memory.image_variants)\
+                         .filter(Memory.image_path == image_path, Memory.image_status == 'ready')\
+                         .limit(1).scalar()
+    
     def get_formatted_date(self):
         """포맷된 날짜 문자열 반환"""
         return self.memory_date.strftime('%Y년 %m월 %d일')
     
     def __repr__(self):
-        return f'<Memory {self.title}>'
\ No newline at end of file
+        return f'<Memory {self.title}>'
+
+# 유사 사진 검색용 밴드 식 인덱스 (멀티 인덱스 해싱, 해시가 있는 행만)
+for _band in range(BAND_COUNT):
+    db.Index(f'ix_memories_hash_b{_band}', Memory.couple_id, db.text(band_expression(_band)),
+             sqlite_where=Memory.image_hash.isnot(None))
+
+# 제목/내용 전문 검색 인덱스 (FTS5 trigram)
+# 외부 콘텐츠로 memories를 감싼 뷰를 사용해 커플 키('#000001#')를 함께 색인하므로
+# 커플 조건을 MATCH 안에서 처리합니다. 트리거가 추가/수정/삭제를 같은
+# 트랜잭션에서 인덱스에 반영합니다.
+MEMORY_SEARCH_DDL = [
+    "CREATE VIEW IF NOT EXISTS memories_fts_source AS "
+    "SELECT id, printf('#%06d#', couple_id) AS couple_key, title, content FROM memories",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5("
+    "couple_key, title, content, content='memories_fts_source', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN "
+    "INSERT INTO memories_fts(rowid, couple_key, title, content) "
+    "VALUES (new.id, printf('#%06d#', new.couple_id), new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN "
+    "INSERT INTO memories_fts(memories_fts, rowid, couple_key, title, content) "
+    "VALUES ('delete', old.id, printf('#%06d#', old.couple_id), old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS memories_fts_au AFTER UPDATE OF couple_id, title, content ON memories BEGIN "
+    "INSERT INTO memories_fts(memories_fts, rowid, couple_key, title, content) "
+    "VALUES ('delete', old.id, printf('#%06d#', old.couple_id), old.title, old.content); "
+    "INSERT INTO memories_fts(rowid, couple_key, title, content) "
+    "VALUES (new.id, printf('#%06d#', new.couple_id), new.title, new.content); END",
+]
+
+for statement in MEMORY_SEARCH_DDL:
+    # DDL()은 문장을 % 포맷으로 처리하므로 printf 서식 문자를 이스케이프
+    event.listen(Memory.__table__, 'after_create',
+                 DDL(statement.replace('%', '%%')).execute_if(dialect='sqlite'))
+for statement in ("DROP TABLE IF EXISTS memories_fts", "DROP VIEW IF EXISTS memories_fts_source"):
+    event.listen(Memory.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
@@ -1,8 +1,14 @@
 """알림 모델"""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.extensions import db
 
+# 읽은 알림 일괄 삭제 시 한 번에 지우는 행 수
+BULK_DELETE_CHUNK_SIZE = 1000
+
+# 한 번에 읽음 처리할 수 있는 알림 ID 수 (HTTP, Socket.IO 요청)
+MAX_BULK_IDS = 500
+
 class Notification(db.Model):
     """알림 모델 클래스"""
     
@@ -15,6 +21,20 @@ class Notification(db.Model):
     content = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    subject = db.Column(db.String(100))  # 합칠 수 있는 알림의 대상 (예: 'user_3'), 없으면 합치지 않음
+    merge_count = db.Column(db.Integer, nullable=False, default=1)  # 이 알림에 합쳐진 이벤트 수
+    read_version = db.Column(db.Integer, nullable=False, default=0)  # 읽음 처리된 시점의 사용자 읽음 상태 버전 (트리거가 기록)
+    
+    __table_args__ = (
+        # 사용자별 읽음 상태 일괄 처리와 "ID N 이하 읽음" 범위 조건용
+        db.Index('ix_notifications_user_read_id', 'user_id', 'is_read', 'id'),
+        # 합칠 알림 찾기용
+        db.Index('ix_notifications_user_type_subject', 'user_id', 'type', 'subject'),
+        # 타입별 보존 기간이 지난 알림 찾기용
+        db.Index('ix_notifications_type_created', 'type', 'created_at'),
+        # 증분 동기화에서 특정 버전 이후 읽음 처리된 알림 찾기용
+        db.Index('ix_notifications_user_read_version', 'user_id', 'read_version'),
+    )
     
     def mark_as_read(self):
         """알림을 읽음으로 표시"""
@@ -47,8 +67,12 @@ class Notification(db.Model):
     
     def get_formatted_time(self):
         """포맷된 시간 문자열 반환"""
-        now = datetime.utcnow()
-        diff = now - self.created_at
+        return Notification.format_time(self.created_at)
+    
+    @staticmethod
+    def format_time(created_at, now=None):
+        """생성 시각을 "n분 전" 형식의 상대 시간으로 변환"""
+        diff = (now or datetime.utcnow()) - created_at
         
         if diff.days > 0:
             return f"{diff.days}일 전"
@@ -74,10 +98,106 @@ class Notification(db.Model):
         db.session.commit()
         return notification
     
+    @staticmethod
+    def create_or_coalesce(user_id, notification_type, title, content, subject=None, window=0):
+        """새 알림 생성, 같은 대상의 최근 알림이 있으면 하나로 합침
+
+        window초 안에 만들어진 읽지 않은 알림 중 (사용자, 타입, 대상)이 같은 것이
+        있으면 그 행을 지우고 개수를 이어받은 새 행을 만듭니다. 새 ID를 받으므로
+        "ID N 이하 읽음"과 최근 목록 순서가 그대로 맞고, 읽지 않은 카운터는
+        트리거가 같은 트랜잭션에서 -1, +1 하므로 변하지 않습니다.
+        ID를 받기 위해 flush만 하며 커밋은 호출한 쪽 트랜잭션에서 합니다.
+        (알림, 대체된 알림 ID 또는 None)을 반환합니다.
+        """
+        previous = None
+        if subject is not None and window > 0:
+            previous = Notification.query.filter(
+                Notification.user_id == user_id,
+                Notification.type == notification_type,
+                Notification.subject == subject,
+                Notification.is_read == False,
+                Notification.created_at >= datetime.utcnow() - timedelta(seconds=window)
+            ).order_by(Notification.id.desc()).first()
+
+        notification = Notification(
+            user_id=user_id,
+            type=notification_type,
+            title=title,
+            content=content,
+            subject=subject,
+            merge_count=(previous.merge_count or 1) + 1 if previous else 1
+        )
+        replaced_id = None
+        if previous is not None:
+            replaced_id = previous.id
+            db.session.delete(previous)
+        db.session.add(notification)
+        db.session.flush()
+        return notification, replaced_id
+    
+    def to_dict(self):
+        """실시간 전송용 딕셔너리"""
+        return {
+            'id': self.id,
+            'type': self.type,
+            'title': self.title,
+            'content': self.content,
+            'count': self.merge_count or 1,
+            'subject': self.subject,
+            'icon': self.get_type_icon(),
+            'color': self.get_type_color(),
+            'is_read': self.is_read,
+            'formatted_time': self.get_formatted_time(),
+            'created_at': self.created_at.isoformat()
+        }
+    
+    @staticmethod
+    def mark_read_bulk(user_id, notification_ids=None, up_to_id=None):
+        """읽지 않은 알림을 UPDATE 한 문장으로 읽음 처리 후 처리한 수 반환
+
+        notification_ids가 있으면 그 알림만, up_to_id가 있으면 그 ID 이하만
+        처리합니다(화면을 연 뒤 도착한 알림은 읽음 처리하지 않기 위해 사용).
+        둘 다 없으면 모든 알림을 처리합니다. 카운터는 트리거가 갱신합니다.
+        """
+        query = Notification.query.filter(Notification.user_id == user_id, Notification.is_read == False)
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            query = query.filter(Notification.id.in_(notification_ids))
+        if up_to_id is not None:
+            query = query.filter(Notification.id <= up_to_id)
+
+        count = query.update({Notification.is_read: True}, synchronize_session=False)
+        db.session.commit()
+        return count
+    
+    @staticmethod
+    def delete_read_bulk(user_id, chunk_size=BULK_DELETE_CHUNK_SIZE):
+        """읽은 알림을 chunk_size개씩 나누어 삭제 후 삭제한 수 반환
+
+        묶음마다 커밋해 쓰기 잠금을 오래 잡지 않습니다.
+        """
+        deleted = 0
+        while True:
+            chunk = db.select(Notification.id).where(
+                Notification.user_id == user_id, Notification.is_read == True
+            ).limit(chunk_size)
+            count = Notification.query.filter(Notification.id.in_(chunk)).delete(synchronize_session=False)
+            db.session.commit()
+            deleted += count
+            if count < chunk_size:
+                return deleted
+    
+    @staticmethod
+    def get_latest_id(user_id):
+        """사용자의 가장 최근 알림 ID (없으면 0)"""
+        return db.session.query(db.func.max(Notification.id)).filter(Notification.user_id == user_id).scalar() or 0
+    
     @staticmethod
     def get_unread_count(user_id):
-        """읽지 않은 알림 개수 반환"""
-        return Notification.query.filter_by(user_id=user_id, is_read=False).count()
+        """읽지 않은 알림 개수 반환 (트리거로 유지되는 카운터 조회)"""
+        from app.models.notification_counter import NotificationCounter
+        return NotificationCounter.get_unread(user_id)
     
     def __repr__(self):
         return f'<Notification {self.title}>'
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""사용자별 읽지 않은 알림 카운터 모델"""
+
+from sqlalchemy import event, DDL
+from app.extensions import db
+
+# 사용자별 읽지 않은 알림 수를 원본 테이블에서 계산하는 SELECT
+# {where}에는 users(u)에 대한 조건이 들어갑니다.
+UNREAD_SELECT = (
+    "SELECT u.id, "
+    "(SELECT count(*) FROM notifications WHERE user_id = u.id AND NOT COALESCE(is_read, 0)) "
+    "FROM users u WHERE {where}"
+)
+
+# 읽음 상태 버전(read_version)은 유지한 채 읽지 않은 수만 다시 계산
+UNREAD_UPSERT = "INSERT INTO notification_counters (user_id, unread) "
+UNREAD_UPSERT_CONFLICT = " ON CONFLICT(user_id) DO UPDATE SET unread = excluded.unread"
+
+def _unread_update(sign, row):
+    """알림 한 건의 추가(+)/제거(-)를 받는 사람의 카운터에 반영하는 문장"""
+    return (
+        f"UPDATE notification_counters SET unread = unread {sign} (NOT COALESCE({row}.is_read, 0)) "
+        f"WHERE user_id = {row}.user_id; "
+    )
+
+# 알림 쓰기와 같은 트랜잭션에서 카운터를 갱신하는 트리거
+NOTIFICATION_COUNTER_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS notification_counters_user_ai AFTER INSERT ON users BEGIN "
+    "INSERT OR IGNORE INTO notification_counters (user_id, unread) VALUES (NEW.id, 0); END",
+    "CREATE TRIGGER IF NOT EXISTS notification_counters_user_ad AFTER DELETE ON users BEGIN "
+    "DELETE FROM notification_counters WHERE user_id = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS notification_counters_ai AFTER INSERT ON notifications BEGIN "
+    + _unread_update('+', 'NEW') + "END",
+    "CREATE TRIGGER IF NOT EXISTS notification_counters_ad AFTER DELETE ON notifications BEGIN "
+    + _unread_update('-', 'OLD') + "END",
+    "CREATE TRIGGER IF NOT EXISTS notification_counters_au AFTER UPDATE OF user_id, is_read ON notifications "
+    "WHEN OLD.user_id IS NOT NEW.user_id OR COALESCE(OLD.is_read, 0) != COALESCE(NEW.is_read, 0) BEGIN "
+    + _unread_update('-', 'OLD') + _unread_update('+', 'NEW') + "END",
+
+    # 읽음 상태가 바뀔 때마다 사용자의 읽음 상태 버전을 올리고 알림에 기록 (증분 동기화용)
+    "CREATE TRIGGER IF NOT EXISTS notification_read_version_au AFTER UPDATE OF is_read ON notifications "
+    "WHEN COALESCE(OLD.is_read, 0) != COALESCE(NEW.is_read, 0) BEGIN "
+    "UPDATE notification_counters SET read_version = read_version + 1 WHERE user_id = NEW.user_id; "
+    "UPDATE notifications SET read_version = "
+    "(SELECT read_version FROM notification_counters WHERE user_id = NEW.user_id) WHERE id = NEW.id; END",
+
+    # 알림이 지워질 때(합치기, 읽은 알림 삭제, 보관 정책)도 버전을 올리고 삭제 시점의 버전을 기록
+    # (그 이전 버전으로 증분 동기화하는 클라이언트는 지워진 알림을 알 수 없으므로 전체 동기화)
+    "CREATE TRIGGER IF NOT EXISTS notification_deleted_version_ad AFTER DELETE ON notifications BEGIN "
+    "UPDATE notification_counters SET read_version = read_version + 1, deleted_version = read_version + 1 "
+    "WHERE user_id = OLD.user_id; END",
+
+    # 사용자의 최신 알림 ID (최근 알림 캐시와 변경 없는 동기화 판단용)
+    "CREATE TRIGGER IF NOT EXISTS notification_counters_latest_ai AFTER INSERT ON notifications BEGIN "
+    "UPDATE notification_counters SET latest_id = NEW.id WHERE user_id = NEW.user_id AND latest_id < NEW.id; END",
+]
+
+# 최신 알림 ID 다시 계산
+LATEST_ID_UPDATE = (
+    "UPDATE notification_counters SET latest_id = "
+    "(SELECT COALESCE(max(id), 0) FROM notifications WHERE user_id = notification_counters.user_id)"
+)
+
+class NotificationCounter(db.Model):
+    """사용자별 읽지 않은 알림 카운터 모델 클래스
+
+    알림 배지를 그릴 때마다 COUNT(*)를 실행하지 않도록 읽지 않은 알림 수를
+    한 행에 보관합니다. 값은 트리거가 알림 추가, 읽음 처리, 삭제와 같은
+    트랜잭션에서 갱신하므로 일괄 UPDATE/DELETE로 바꿔도 어긋나지 않습니다.
+    read_version은 읽음 상태가 바뀔 때마다 1씩 올라가는 값으로, 클라이언트가
+    마지막으로 본 버전 이후에 읽음 처리된 알림만 받아가는 데 씁니다. 알림이
+    지워질 때도 올라가며, deleted_version은 마지막으로 알림이 지워진 시점의
+    버전입니다.
+    latest_id는 사용자가 받은 가장 최근 알림 ID입니다(최신 알림이 지워지면
+    그보다 클 수 있음).
+    """
+
+    __tablename__ = 'notification_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+    # 트리거의 INSERT에서도 채워지도록 DB 기본값 사용
+    read_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    latest_id = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    deleted_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    @staticmethod
+    def get_unread(user_id):
+        """읽지 않은 알림 수 반환 (기본 키 조회 한 번)
+
+        세션에 캐시된 객체 대신 항상 DB 값을 읽습니다. 행이 없으면(기능 도입
+        전 사용자) 원본 테이블에서 계산만 하고, 행은 verify --fix가 만듭니다.
+        """
+        unread = db.session.execute(
+            db.select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+        ).scalar()
+        if unread is None:
+            unread, _ = NotificationCounter.compute(user_id)
+        return unread or 0
+
+    @staticmethod
+    def get_state(user_id):
+        """(읽지 않은 알림 수, 읽음 상태 버전, 최신 알림 ID) 반환 (기본 키 조회 한 번)
+
+        행이 없으면 원본 테이블에서 계산하고 버전은 0으로 봅니다.
+        """
+        row = db.session.execute(
+            db.select(NotificationCounter.unread, NotificationCounter.read_version,
+                      NotificationCounter.latest_id).where(NotificationCounter.user_id == user_id)
+        ).first()
+        if row is None:
+            unread, latest_id = NotificationCounter.compute(user_id)
+            return unread, 0, latest_id
+        return row.unread or 0, row.read_version or 0, row.latest_id or 0
+
+    @staticmethod
+    def compute(user_id):
+        """원본 테이블에서 (읽지 않은 알림 수, 최신 알림 ID) 계산 (읽기 전용)"""
+        row = db.session.execute(db.text(
+            "SELECT COALESCE(sum(NOT COALESCE(is_read, 0)), 0), COALESCE(max(id), 0) "
+            "FROM notifications WHERE user_id = :user_id"
+        ), {'user_id': user_id}).first()
+        return row[0], row[1]
+
+    @staticmethod
+    def get_deleted_version(user_id):
+        """마지막으로 알림이 지워진 시점의 버전 반환 (없으면 0)"""
+        return db.session.execute(
+            db.select(NotificationCounter.deleted_version).where(NotificationCounter.user_id == user_id)
+        ).scalar() or 0
+
+    @staticmethod
+    def rebuild(user_id=None):
+        """원본 테이블로 카운터 다시 계산 (user_id가 없으면 전체) 후 커밋
+
+        읽음 상태 버전은 그대로 둡니다.
+        """
+        if user_id is None:
+            db.session.execute(db.text(
+                "DELETE FROM notification_counters WHERE user_id NOT IN (SELECT id FROM users)"
+            ))
+            where = '1'
+        else:
+            where = 'u.id = :user_id'
+        db.session.execute(db.text(UNREAD_UPSERT + UNREAD_SELECT.format(where=where) + UNREAD_UPSERT_CONFLICT),
+                           {'user_id': user_id})
+        db.session.execute(db.text(LATEST_ID_UPDATE + (" WHERE user_id = :user_id" if user_id is not None else "")),
+                           {'user_id': user_id})
+        db.session.commit()
+
+    @staticmethod
+    def verify(fix=False):
+        """저장된 카운터와 원본 테이블 계산값 비교
+
+        (user_id, 저장값, 실제값) 목록을 반환하며, fix=True이면 어긋난
+        사용자의 행을 다시 계산합니다.
+        """
+        actual_rows = db.session.execute(db.text(UNREAD_SELECT.format(where='1'))).all()
+        stored = dict(db.session.execute(
+            db.select(NotificationCounter.user_id, NotificationCounter.unread)
+        ).all())
+
+        mismatches = [(user_id, stored.get(user_id), actual)
+                      for user_id, actual in actual_rows if stored.get(user_id) != actual]
+
+        if fix:
+            for user_id, _, _ in mismatches:
+                NotificationCounter.rebuild(user_id)
+        return mismatches
+
+    def __repr__(self):
+        return f'<NotificationCounter user={self.user_id} unread={self.unread}>'
+
+# 카운터 트리거는 users, notifications 테이블이 모두 만들어진 뒤 생성
+for statement in NOTIFICATION_COUNTER_DDL:
+    event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
@@ -0,0 +1,84 @@
+"""알림 전송 대기열(아웃박스) 모델"""
+
+import json
+import uuid
+from datetime import datetime, timedelta
+from app.extensions import db
+
+class NotificationOutbox(db.Model):
+    """알림 전송 대기열 모델 클래스
+
+    알림 행과 같은 트랜잭션에 한 행씩 추가되고, 커밋된 뒤 전송 워커가 묶음으로
+    가져가 Socket.IO로 보낸 후 지웁니다. 도메인 변경이 롤백되면 알림과 전송
+    요청도 함께 사라지고, 커밋된 요청은 워커가 중간에 죽어도 임대 시간이 지나면
+    다시 전송됩니다(최소 한 번 전송, 클라이언트는 알림 ID로 중복을 걸러냄).
+    """
+
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    notification_id = db.Column(db.Integer, nullable=False)
+    replaced_id = db.Column(db.Integer)  # 이 알림으로 합쳐져 사라진 이전 알림 ID
+    data = db.Column(db.Text)  # 전송 데이터에 덧붙일 JSON
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)  # NULL이면 재시도 포기
+    claimed_by = db.Column(db.String(32))  # 마지막으로 가져간 워커의 임대 토큰
+    last_error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_due', 'next_attempt_at', 'id'),
+        db.Index('ix_notification_outbox_claimed_by', 'claimed_by'),
+    )
+
+    @staticmethod
+    def enqueue(notification, replaced_id=None, data=None):
+        """알림 전송 요청 추가 (커밋은 호출한 쪽 트랜잭션에서)"""
+        entry = NotificationOutbox(
+            user_id=notification.user_id,
+            notification_id=notification.id,
+            replaced_id=replaced_id,
+            data=json.dumps(data, ensure_ascii=False) if data else None
+        )
+        db.session.add(entry)
+        # 커밋 후 전송 워커를 깨우기 위한 표시 (app.services.notification_delivery)
+        db.session.info['notification_outbox'] = True
+        return entry
+
+    @staticmethod
+    def claim(limit, lease_seconds):
+        """전송할 요청을 최대 limit개 임대 후 커밋하고 반환
+
+        UPDATE 한 문장으로 가져가므로 여러 워커 프로세스가 같은 요청을 동시에
+        가져가지 않습니다. 임대 시간 안에 지우지 못하면 다시 전송 대상이 됩니다.
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        due = db.select(NotificationOutbox.id).where(
+            NotificationOutbox.next_attempt_at <= now
+        ).order_by(NotificationOutbox.id).limit(limit)
+
+        NotificationOutbox.query.filter(NotificationOutbox.id.in_(due)).update({
+            NotificationOutbox.claimed_by: token,
+            NotificationOutbox.attempts: NotificationOutbox.attempts + 1,
+            NotificationOutbox.next_attempt_at: now + timedelta(seconds=lease_seconds)
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return NotificationOutbox.query.filter_by(claimed_by=token).order_by(NotificationOutbox.id).all()
+
+    @staticmethod
+    def seconds_until_due():
+        """다음 전송 요청까지 남은 시간 (초, 대기 중인 요청이 없으면 None)"""
+        next_at = db.session.query(db.func.min(NotificationOutbox.next_attempt_at)).scalar()
+        if next_at is None:
+            return None
+        return max(0.0, (next_at - datetime.utcnow()).total_seconds())
+
+    def get_data(self):
+        """덧붙일 전송 데이터 반환"""
+        return json.loads(self.data) if self.data else {}
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} notification={self.notification_id}>'
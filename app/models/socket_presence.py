@@ -0,0 +1,77 @@
+"""Socket.IO 접속 상태 모델"""
+
+from datetime import datetime, timedelta
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+
+class SocketPresence(db.Model):
+    """Socket.IO 연결 모델 클래스
+
+    연결(sid)마다 한 행을 두어 다른 워커 프로세스가 접속 상태를 봅니다.
+    각 워커는 하트비트마다 그동안의 연결 추가/해제를 한 트랜잭션으로 반영하며
+    자기 연결의 heartbeat_at을 갱신하고, 갱신이 TTL보다 오래 멈춘 행(죽은 워커의
+    연결)은 온라인으로 세지 않고 다른 워커가 지웁니다.
+    """
+
+    __tablename__ = 'socket_presence'
+
+    sid = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    worker_id = db.Column(db.String(64), nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_socket_presence_user_heartbeat', 'user_id', 'heartbeat_at'),
+        db.Index('ix_socket_presence_worker', 'worker_id'),
+        db.Index('ix_socket_presence_heartbeat', 'heartbeat_at'),
+    )
+
+    @staticmethod
+    def live_condition(ttl, now=None):
+        """TTL 안에 갱신된 연결 조건"""
+        return SocketPresence.heartbeat_at >= (now or datetime.utcnow()) - timedelta(seconds=ttl)
+
+    @staticmethod
+    def is_online(user_id, ttl, exclude_worker_id=None):
+        """사용자에게 살아 있는 연결이 하나라도 있는지 (exclude_worker_id 워커의 연결은 제외, 읽기 전용)"""
+        query = SocketPresence.query.filter(SocketPresence.user_id == user_id, SocketPresence.live_condition(ttl))
+        if exclude_worker_id is not None:
+            query = query.filter(SocketPresence.worker_id != exclude_worker_id)
+        return db.session.query(query.exists()).scalar()
+
+    @staticmethod
+    def sync(worker_id, added, removed, ttl):
+        """워커의 연결 변경을 한 트랜잭션으로 반영 후 만료된 연결로 연결이 모두 사라진 사용자 ID 목록 반환
+
+        added({sid: user_id})를 넣고 removed(sid 집합)를 지운 뒤 워커의 연결을
+        갱신하고, 만료된 연결(죽은 워커)을 정리합니다.
+        """
+        now = datetime.utcnow()
+        table = SocketPresence.__table__
+        if removed:
+            db.session.execute(table.delete().where(table.c.sid.in_(list(removed))))
+        if added:
+            db.session.execute(sqlite_insert(table).prefix_with('OR REPLACE'), [
+                {'sid': sid, 'user_id': user_id, 'worker_id': worker_id, 'heartbeat_at': now}
+                for sid, user_id in added.items()
+            ])
+        SocketPresence.query.filter_by(worker_id=worker_id).update(
+            {SocketPresence.heartbeat_at: now}, synchronize_session=False)
+
+        expired = ~SocketPresence.live_condition(ttl, now)
+        user_ids = db.session.execute(
+            db.select(SocketPresence.user_id).where(expired).distinct()
+        ).scalars().all()
+        if not user_ids:
+            db.session.commit()
+            return []
+
+        SocketPresence.query.filter(expired).delete(synchronize_session=False)
+        still_online = set(db.session.execute(
+            db.select(SocketPresence.user_id).where(SocketPresence.user_id.in_(user_ids)).distinct()
+        ).scalars().all())
+        db.session.commit()
+        return [user_id for user_id in user_ids if user_id not in still_online]
+
+    def __repr__(self):
+        return f'<SocketPresence {self.sid} user={self.user_id}>'
@@ -0,0 +1,64 @@
+"""업로드 파일(콘텐츠 주소) 모델"""
+
+from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+
+class UploadBlob(db.Model):
+    """콘텐츠 주소 방식으로 저장된 업로드 파일 모델 클래스
+
+    파일은 SHA-256 해시로 이름 지어지며, 같은 사진을 여러 번 올려도
+    디스크에는 한 번만 저장됩니다. ref_count는 이 파일을 가리키는
+    추억 수이며 0이 되면 파일을 삭제합니다.
+    """
+
+    __tablename__ = 'upload_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    path = db.Column(db.String(255), unique=True, nullable=False)
+    size = db.Column(db.Integer, nullable=False, default=0)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def acquire(sha256, path, size):
+        """파일 참조 추가 후 (저장 경로, 참조 수) 반환
+
+        호출한 쪽의 트랜잭션 안에서 UPSERT 한 문장만 실행하며 커밋하지 않습니다.
+        이미 같은 내용의 파일이 있으면 기존 경로를 반환합니다.
+        """
+        stmt = sqlite_insert(UploadBlob.__table__).values(
+            sha256=sha256,
+            path=path,
+            size=size,
+            ref_count=1,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=['sha256'],
+            set_={'ref_count': UploadBlob.__table__.c.ref_count + 1}
+        ).returning(UploadBlob.__table__.c.path, UploadBlob.__table__.c.ref_count)
+        row = db.session.execute(stmt).one()
+        return row.path, row.ref_count
+
+    @staticmethod
+    def release(path):
+        """파일 참조 해제 후 남은 참조 수 반환 (관리 대상이 아니면 None)
+
+        참조가 0이 되면 행을 삭제합니다. 커밋하지 않습니다.
+        """
+        table = UploadBlob.__table__
+        row = db.session.execute(
+            table.update()
+                 .where(table.c.path == path, table.c.ref_count > 0)
+                 .values(ref_count=table.c.ref_count - 1)
+                 .returning(table.c.ref_count)
+        ).first()
+        if row is None:
+            return None
+
+        if row.ref_count == 0:
+            db.session.execute(table.delete().where(table.c.path == path, table.c.ref_count == 0))
+        return row.ref_count
+
+    def __repr__(self):
+        return f'<UploadBlob {self.path} refs={self.ref_count}>'
@@ -1,11 +1,13 @@
 """캘린더 및 일정 관련 라우트"""
 
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, Response, stream_with_context, abort
 from flask_login import login_required, current_user
 from datetime import datetime, date, timedelta
 from calendar import monthrange
 from app.extensions import db
 from app.models.event import Event
+from app.models.calendar_feed import CalendarFeed
+from app.services.ical_feed import iter_calendar_feed
 
 # 블루프린트 생성
 calendar_bp = Blueprint('calendar', __name__, url_prefix='/calendar')
@@ -96,6 +98,7 @@ def create():
             )
             
             db.session.add(event)
+            CalendarFeed.touch(connection.id)
             db.session.commit()
             
             flash('일정이 등록되었습니다.', 'success')
@@ -175,6 +178,7 @@ def edit(event_id):
             event.start_datetime = start_datetime
             event.end_datetime = end_datetime
             event.participant_type = participant_type
+            CalendarFeed.touch(connection.id)
             
             db.session.commit()
             
@@ -204,6 +208,7 @@ def delete(event_id):
     
     try:
         db.session.delete(event)
+        CalendarFeed.touch(connection.id)
         db.session.commit()
         
         return jsonify({'success': True, 'message': '일정이 삭제되었습니다.'})
@@ -297,4 +302,71 @@ def api_events_by_date(date):
             'created_by': event.created_by
         })
     
-    return jsonify({'success': True, 'events': event_list, 'date': date})
\ No newline at end of file
+    return jsonify({'success': True, 'events': event_list, 'date': date})
+
+@calendar_bp.route('/api/feed-url')
+@login_required
+def api_feed_url():
+    """캘린더 구독 URL 조회 API"""
+    connection = current_user.get_couple_connection()
+    if not connection:
+        return jsonify({'success': False, 'message': '커플 연결이 필요합니다.'})
+    
+    feed = CalendarFeed.get_or_create(connection.id)
+    feed_url = url_for('calendar.feed', token=feed.token, _external=True)
+    
+    return jsonify({
+        'success': True,
+        'url': feed_url,
+        'webcal_url': 'webcal://' + feed_url.split('://', 1)[1]
+    })
+
+@calendar_bp.route('/api/feed-url/reset', methods=['POST'])
+@login_required
+def api_reset_feed_url():
+    """캘린더 구독 URL 재발급 API (기존 URL은 더 이상 동작하지 않음)"""
+    connection = current_user.get_couple_connection()
+    if not connection:
+        return jsonify({'success': False, 'message': '커플 연결이 필요합니다.'})
+    
+    try:
+        feed = CalendarFeed.get_or_create(connection.id)
+        feed.regenerate_token()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': '구독 URL 재발급 중 오류가 발생했습니다.'})
+    
+    return jsonify({
+        'success': True,
+        'url': url_for('calendar.feed', token=feed.token, _external=True)
+    })
+
+@calendar_bp.route('/feed/<token>.ics')
+def feed(token):
+    """iCalendar 구독 피드 (토큰 인증)
+    
+    캘린더 앱은 자주 폴링하므로 마지막 변경 시각으로 ETag를 만들고,
+    If-None-Match가 일치하면 일정/D-Day를 조회하지 않고 304를 반환합니다.
+    """
+    feed_info = CalendarFeed.query.filter_by(token=token).first()
+    if not feed_info:
+        abort(404)
+    
+    etag = feed_info.get_etag()
+    couple_id = feed_info.couple_id
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    response = Response(
+        stream_with_context(iter_calendar_feed(couple_id)),
+        mimetype='text/calendar'
+    )
+    response.charset = 'utf-8'
+    response.set_etag(etag)
+    response.last_modified = feed_info.updated_at
+    response.headers['Cache-Control'] = 'private, max-age=300'
+    response.headers['Content-Disposition'] = 'inline; filename="couple-calendar.ics"'
+    return response
@@ -5,7 +5,8 @@ from flask_login import login_required, current_user
 from app.models.user import User
 from app.models.couple import CoupleConnection
 from app.models.notification import Notification
-from app.extensions import db
+from app.extensions import db, socketio
+from app.services.socket_handshake import store_identity
 import string
 import secrets
 
@@ -122,6 +123,9 @@ def join_with_code():
         connection.user2_id = current_user.id
         db.session.commit()
         
+        # Socket.IO 핸드셰이크용 세션 스냅샷 갱신 (다음 연결부터 커플 룸 참여)
+        store_identity(current_user)
+        
         # 파트너 정보 가져오기
         partner = User.query.get(connection.user1_id)
         
@@ -181,9 +185,14 @@ def disconnect():
             )
             
             # 연결 삭제
+            couple_room = f'couple_{connection.id}'
             db.session.delete(connection)
             db.session.commit()
             
+            # 커플 룸을 닫고 세션 스냅샷 갱신 (파트너의 스냅샷은 다음 HTTP 요청에서 갱신)
+            socketio.close_room(couple_room)
+            store_identity(current_user)
+            
             return jsonify({
                 'success': True,
                 'message': '파트너 연결이 해제되었습니다.'
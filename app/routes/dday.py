@@ -5,6 +5,8 @@ from flask_login import login_required, current_user
 from datetime import datetime, date
 from app.extensions import db
 from app.models.dday import DDay
+from app.models.calendar_feed import CalendarFeed
+from app.services.dday_service import dday_status_cache, status_to_json
 
 # 블루프린트 생성
 dday_bp = Blueprint('dday', __name__, url_prefix='/dday')
@@ -19,11 +21,12 @@ def index():
         flash('파트너와 연결된 후 D-Day 기능을 사용할 수 있습니다.', 'warning')
         return redirect(url_for('couple.connect'))
     
-    # D-Day 목록 조회
-    ddays = DDay.query.filter_by(couple_id=connection.id)\
-                     .order_by(DDay.target_date.asc()).all()
+    # D-Day 상태 조회 (일 단위 캐시)
+    status = dday_status_cache.get(connection)
     
-    return render_template('dday/index.html', ddays=ddays)
+    return render_template('dday/index.html',
+                         ddays=status['ddays'],
+                         milestones=status['milestones'])
 
 @dday_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -67,7 +70,9 @@ def create():
             )
             
             db.session.add(dday)
+            CalendarFeed.touch(connection.id)
             db.session.commit()
+            dday_status_cache.invalidate(connection.id)
             
             flash('D-Day가 등록되었습니다.', 'success')
             return redirect(url_for('dday.index'))
@@ -121,8 +126,10 @@ def edit(dday_id):
             dday.title = title
             dday.target_date = target_date
             dday.description = description
+            CalendarFeed.touch(connection.id)
             
             db.session.commit()
+            dday_status_cache.invalidate(connection.id)
             
             flash('D-Day가 수정되었습니다.', 'success')
             return redirect(url_for('dday.index'))
@@ -150,7 +157,9 @@ def delete(dday_id):
     
     try:
         db.session.delete(dday)
+        CalendarFeed.touch(connection.id)
         db.session.commit()
+        dday_status_cache.invalidate(connection.id)
         
         return jsonify({'success': True, 'message': 'D-Day가 삭제되었습니다.'})
         
@@ -167,22 +176,11 @@ def api_list():
     if not connection:
         return jsonify({'success': False, 'message': '커플 연결이 필요합니다.'})
     
-    # D-Day 목록 조회
-    ddays = DDay.query.filter_by(couple_id=connection.id)\
-                     .order_by(DDay.target_date.asc()).all()
+    # D-Day 상태 조회 (일 단위 캐시)
+    status = dday_status_cache.get(connection)
     
-    dday_list = []
-    for dday in ddays:
-        dday_list.append({
-            'id': dday.id,
-            'title': dday.title,
-            'target_date': dday.target_date.isoformat(),
-            'description': dday.description,
-            'days_remaining': dday.days_remaining(),
-            'status_text': dday.get_status_text(),
-            'is_past': dday.is_past(),
-            'created_by': dday.created_by,
-            'created_at': dday.created_at.isoformat()
-        })
-    
-    return jsonify({'success': True, 'ddays': dday_list})
\ No newline at end of file
+    return jsonify({
+        'success': True,
+        'ddays': [status_to_json(dday) for dday in status['ddays']],
+        'milestones': [status_to_json(milestone) for milestone in status['milestones']]
+    })
\ No newline at end of file
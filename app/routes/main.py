@@ -1,7 +1,6 @@
 """메인 페이지 라우트"""
 
-import os
-from flask import Blueprint, render_template, request, jsonify, send_from_directory, current_app, abort
+from flask import Blueprint, render_template, request, jsonify, current_app, abort
 from flask_login import login_required, current_user
 from app.extensions import db
 from datetime import datetime
@@ -40,10 +39,11 @@ def about():
 @login_required
 def dashboard_data():
     """대시보드 데이터 API"""
-    from app.models.dday import DDay
     from app.models.event import Event
     from app.models.mood import MoodEntry
     from app.models.notification import Notification
+    from app.models.couple_counter import CoupleCounter
+    from app.services.dday_service import dday_status_cache, status_to_json
     from datetime import date, datetime, timedelta
     
     # 커플 연결 정보
@@ -65,19 +65,22 @@ def dashboard_data():
     }
     
     if connection:
-        # D-Day 정보 (최근 3개)
-        ddays = DDay.query.filter_by(couple_id=connection.id)\
-                         .order_by(DDay.target_date.asc())\
-                         .limit(3).all()
+        # D-Day 정보 (최근 3개, 일 단위 캐시 공유)
+        dday_status = dday_status_cache.get(connection)
         
         data['ddays'] = [{
-            'id': dday.id,
-            'title': dday.title,
-            'target_date': dday.target_date.isoformat(),
-            'days_remaining': dday.days_remaining(),
-            'status_text': dday.get_status_text(),
-            'is_past': dday.is_past()
-        } for dday in ddays]
+            'id': dday['id'],
+            'title': dday['title'],
+            'target_date': dday['target_date'].isoformat(),
+            'days_remaining': dday['days_remaining'],
+            'status_text': dday['status_text'],
+            'is_past': dday['is_past']
+        } for dday in dday_status['ddays'][:3]]
+        
+        data['milestones'] = [status_to_json(milestone) for milestone in dday_status['milestones']]
+        
+        # 콘텐츠 개수 (커플 카운터 한 행)
+        data['counters'] = CoupleCounter.get_for_couple(connection.id).for_user(connection, current_user.id)
         
         # 오늘의 이벤트
         today = date.today()
@@ -125,6 +128,24 @@ def dashboard_data():
     
     return jsonify(data)
 
+@main_bp.route('/api/dashboard-state')
+@login_required
+def dashboard_state():
+    """커플 대시보드 상태 API (버전과 전체 스냅샷, 이후 변경분은 Socket.IO로 전송)"""
+    from app.services.dashboard_state import get_dashboard_state
+    
+    connection = current_user.get_couple_connection()
+    if not connection:
+        return jsonify({'success': False, 'message': '커플 연결이 필요합니다.'}), 404
+    
+    version, state = get_dashboard_state(connection)
+    return jsonify({
+        'success': True,
+        'user_id': current_user.id,
+        'version': version,
+        'state': state
+    })
+
 @main_bp.route('/api/mood/record', methods=['POST'])
 @login_required
 def record_mood():
@@ -188,18 +209,24 @@ def record_mood():
             'message': f'기분 기록 중 오류가 발생했습니다: {str(e)}'
         })
 
-@main_bp.route('/uploads/<filename>')
+@main_bp.route('/uploads/<path:filename>')
+@login_required
 def uploaded_file(filename):
-    """업로드된 파일 서빙"""
-    upload_folder = current_app.config['UPLOAD_FOLDER']
+    """업로드된 파일 서빙 (커플 소유 확인 후 전송)"""
+    from app.services.upload_serving import find_upload_owner, send_upload
+    from app.services.upload_storage import is_content_addressed
+    from app.services.image_pipeline import STATUS_PROCESSING
     
-    # 파일 존재 여부 확인
-    file_path = os.path.join(upload_folder, filename)
-    if not os.path.exists(file_path):
+    connection = current_user.get_couple_connection()
+    if not connection:
         abort(404)
     
-    # 보안을 위해 파일명 검증
-    if '..' in filename or filename.startswith('/'):
+    memory, is_variant = find_upload_owner(filename, connection.id)
+    if memory is None:
         abort(404)
     
-    return send_from_directory(upload_folder, filename)
\ No newline at end of file
+    # 콘텐츠 주소 파일은 처리가 끝난 뒤에는 바뀌지 않음
+    immutable = is_content_addressed(memory.image_path) and \
+                (is_variant or memory.image_status != STATUS_PROCESSING)
+    
+    return send_upload(current_app.config['UPLOAD_FOLDER'], filename, immutable)
\ No newline at end of file
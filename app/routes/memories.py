@@ -1,12 +1,16 @@
 """메모리 북 관련 라우트"""
 
 import os
+import zipfile
+import tempfile
 from datetime import datetime, date
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app,
+                   Response, stream_with_context, send_file, abort)
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models.memory import Memory
 from app.models.couple import CoupleConnection
+from app.models.couple_counter import CoupleCounter
 from app.utils.security import (
     couple_relationship_required, 
     validate_couple_access, 
@@ -14,9 +18,20 @@ from app.utils.security import (
     FileUploadValidator,
     validate_form_data
 )
+from app.services.image_pipeline import image_pipeline, STATUS_PROCESSING, STATUS_READY
+from app.services.memory_search import search_memories
+from app.services.memory_feed import get_feed_memories, get_feed_page, decode_cursor
+from app.services.memory_export import (
+    generate_export_archive, start_export_job, get_export_job, STATUS_READY as EXPORT_READY
+)
+from app.services.memory_import import start_import_job
+from app.services.image_hash import find_duplicate_groups
 
 memories_bp = Blueprint('memories', __name__, url_prefix='/memories')
 
+# 중복 사진 정리 페이지에 보여 줄 최대 묶음 수
+DUPLICATE_GROUPS_PER_PAGE = 50
+
 @memories_bp.route('/')
 @login_required
 @couple_relationship_required
@@ -24,16 +39,18 @@ def index():
     """메모리 북 메인 페이지"""
     connection = current_user.get_couple_connection()
     
-    # 페이지네이션을 위한 페이지 번호
-    page = request.args.get('page', 1, type=int)
-    per_page = 12  # 페이지당 메모리 수
+    # 메모리 목록 조회 (최신순, 이후 페이지는 피드 API로 무한 스크롤)
+    try:
+        memories, next_cursor = get_feed_memories(connection.id, request.args.get('cursor'))
+    except ValueError:
+        return redirect(url_for('memories.index'))
     
-    # 메모리 목록 조회 (최신순)
-    memories = Memory.query.filter_by(couple_id=connection.id)\
-                          .order_by(Memory.memory_date.desc(), Memory.created_at.desc())\
-                          .paginate(page=page, per_page=per_page, error_out=False)
+    # 추억이 많으면 내보내기를 백그라운드 작업으로 실행
+    counter = CoupleCounter.get_for_couple(connection.id)
+    export_in_background = counter.memories > current_app.config.get('EXPORT_STREAM_MAX_MEMORIES', 300)
     
-    return render_template('memories/index.html', memories=memories)
+    return render_template('memories/index.html', memories=memories, next_cursor=next_cursor,
+                           export_in_background=export_in_background)
 
 @memories_bp.route('/add', methods=['GET', 'POST'])
 @login_required
@@ -84,13 +101,17 @@ def add():
             flash('미래 날짜는 선택할 수 없습니다.', 'error')
             return render_template('memories/add.html')
         
-        # 이미지 파일 처리 (보안 강화)
+        # 이미지 파일 처리 (보안 강화, 최적화는 백그라운드 파이프라인에서 수행)
         image_filename = None
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename:
+                if image_pipeline.is_busy(current_app):
+                    flash('사진 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.', 'error')
+                    return render_template('memories/add.html')
+                
                 upload_folder = current_app.config['UPLOAD_FOLDER']
-                filename, errors = FileUploadValidator.secure_save_file(file, upload_folder)
+                filename, errors = FileUploadValidator.secure_save_file(file, upload_folder, optimize=False)
                 
                 if errors:
                     for error in errors:
@@ -99,6 +120,10 @@ def add():
                 
                 image_filename = filename
         
+        # 이미 처리된 같은 사진이면 파생 이미지와 유사 검출 해시를 재사용
+        # (새 사진의 해시는 파이프라인이 정규화하며 함께 계산)
+        ready_variants, image_hash = Memory.get_ready_image(image_filename) if image_filename else (None, None)
+        
         # 메모리 생성
         connection = current_user.get_couple_connection()
         memory = Memory(
@@ -107,16 +132,26 @@ def add():
             content=content,
             memory_date=memory_date,
             image_path=image_filename,
+            image_status=(STATUS_READY if ready_variants else STATUS_PROCESSING) if image_filename else None,
+            image_variants=ready_variants,
+            image_hash=image_hash,
             created_by=current_user.id
         )
         
         try:
             db.session.add(memory)
-            db.session.commit()
+            db.session.flush()
             
-            # 실시간 알림 전송
+            # 실시간 알림 (추억과 같은 트랜잭션에 저장, 커밋 후 전송)
             from app.socketio_events import notify_new_memory
-            notify_new_memory(current_user.id, title)
+            notify_new_memory(current_user.id, memory.id, title)
+            
+            db.session.commit()
+            
+            # 이미지 처리 작업 제출 (응답은 기다리지 않음)
+            if image_filename and not ready_variants:
+                image_pipeline.submit(current_app._get_current_object(),
+                                      memory.id, connection.id, image_filename)
             
             flash('추억이 성공적으로 저장되었습니다!', 'success')
             return redirect(url_for('memories.index'))
@@ -200,26 +235,40 @@ def edit(memory_id):
             flash('미래 날짜는 선택할 수 없습니다.', 'error')
             return render_template('memories/edit.html', memory=memory)
         
-        # 이미지 파일 처리 (보안 강화)
+        # 이미지 파일 처리 (보안 강화, 최적화는 백그라운드 파이프라인에서 수행)
+        new_image_filename = None
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename:
+                if image_pipeline.is_busy(current_app):
+                    flash('사진 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.', 'error')
+                    return render_template('memories/edit.html', memory=memory)
+                
                 upload_folder = current_app.config['UPLOAD_FOLDER']
-                filename, errors = FileUploadValidator.secure_save_file(file, upload_folder)
+                filename, errors = FileUploadValidator.secure_save_file(file, upload_folder, optimize=False)
                 
                 if errors:
                     for error in errors:
                         flash(error, 'error')
                     return render_template('memories/edit.html', memory=memory)
                 
-                # 기존 이미지 삭제
+                # 기존 이미지 참조 해제 (같은 사진이면 처리 결과를 그대로 사용)
+                ready_variants, image_hash = Memory.get_ready_image(filename)
                 memory.delete_image()
                 memory.image_path = filename
+                memory.image_variants = ready_variants
+                memory.image_status = STATUS_READY if ready_variants else STATUS_PROCESSING
+                memory.image_hash = image_hash
+                new_image_filename = None if ready_variants else filename
         
         # 이미지 삭제 요청 처리
         if request.form.get('remove_image') == 'true':
             memory.delete_image()
             memory.image_path = None
+            memory.image_variants = None
+            memory.image_status = None
+            memory.image_hash = None
+            new_image_filename = None
         
         # 메모리 업데이트
         memory.title = title
@@ -228,6 +277,11 @@ def edit(memory_id):
         
         try:
             db.session.commit()
+            
+            if new_image_filename:
+                image_pipeline.submit(current_app._get_current_object(),
+                                      memory.id, connection.id, new_image_filename)
+            
             flash('추억이 성공적으로 수정되었습니다!', 'success')
             return redirect(url_for('memories.detail', memory_id=memory_id))
         except Exception as e:
@@ -260,6 +314,8 @@ def delete(memory_id):
         db.session.commit()
         
         flash('추억이 성공적으로 삭제되었습니다.', 'success')
+        if request.form.get('next') == 'duplicates':
+            return redirect(url_for('memories.duplicates'))
         return redirect(url_for('memories.index'))
     except Exception as e:
         db.session.rollback()
@@ -267,6 +323,21 @@ def delete(memory_id):
         current_app.logger.error(f"Memory deletion error: {e}")
         return redirect(url_for('memories.detail', memory_id=memory_id))
 
+@memories_bp.route('/duplicates')
+@login_required
+@couple_relationship_required
+def duplicates():
+    """비슷한 사진 정리 페이지"""
+    connection = current_user.get_couple_connection()
+    max_distance = current_app.config.get('DUPLICATE_MAX_DISTANCE', 6)
+    
+    groups = find_duplicate_groups(connection.id, max_distance)[:DUPLICATE_GROUPS_PER_PAGE]
+    memory_ids = [memory_id for group in groups for memory_id in group]
+    memories = {memory.id: memory for memory in Memory.query.filter(Memory.id.in_(memory_ids))} if memory_ids else {}
+    
+    return render_template('memories/duplicates.html',
+                           groups=[[memories[memory_id] for memory_id in group] for group in groups])
+
 @memories_bp.route('/search')
 @login_required
 @couple_relationship_required
@@ -284,14 +355,8 @@ def search():
     connection = current_user.get_couple_connection()
     
     if query and len(query) >= 2:  # 최소 2글자 이상 검색
-        # 제목과 내용에서 검색
-        memories = Memory.query.filter_by(couple_id=connection.id)\
-                              .filter(db.or_(
-                                  Memory.title.contains(query),
-                                  Memory.content.contains(query)
-                              ))\
-                              .order_by(Memory.memory_date.desc(), Memory.created_at.desc())\
-                              .paginate(page=page, per_page=per_page, error_out=False)
+        # 제목과 내용에서 관련도 순으로 검색
+        memories = search_memories(connection.id, query, page=page, per_page=per_page)
     else:
         memories = Memory.query.filter_by(couple_id=connection.id)\
                               .order_by(Memory.memory_date.desc(), Memory.created_at.desc())\
@@ -299,6 +364,146 @@ def search():
     
     return render_template('memories/search.html', memories=memories, query=query)
 
+@memories_bp.route('/api/feed')
+@login_required
+@couple_relationship_required
+def api_feed():
+    """메모리 북 무한 스크롤 피드 API (키셋 페이지네이션)"""
+    connection = current_user.get_couple_connection()
+    cursor = request.args.get('cursor')
+    
+    try:
+        items, next_cursor = get_feed_page(connection.id, cursor)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    response = jsonify({
+        'success': True,
+        'memories': items,
+        'next_cursor': next_cursor
+    })
+    
+    # 다음 페이지를 미리 가져올 수 있도록 안내
+    if next_cursor:
+        response.headers['Link'] = f'<{url_for("memories.api_feed", cursor=next_cursor)}>; rel="next"'
+    
+    # 첫 페이지는 자주 다시 요청되므로 내용 기반 ETag로 304 응답
+    if not cursor:
+        response.add_etag()
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response = response.make_conditional(request)
+    
+    return response
+
+@memories_bp.route('/export.zip')
+@login_required
+@couple_relationship_required
+def export():
+    """메모리 북 ZIP 스트리밍 다운로드 (after 커서로 이어받기)"""
+    connection = current_user.get_couple_connection()
+    after = request.args.get('after')
+    
+    if after:
+        try:
+            decode_cursor(after)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+    
+    archive = generate_export_archive(connection.id, current_app.config['UPLOAD_FOLDER'], after)
+    response = Response(stream_with_context(archive), mimetype='application/zip')
+    response.headers['Content-Disposition'] = 'attachment; filename="memory-book.zip"'
+    response.headers['Cache-Control'] = 'private, no-store'
+    # 프록시가 응답을 모아 두지 않고 바로 흘려보내도록 함 (nginx)
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@memories_bp.route('/api/export', methods=['POST'])
+@login_required
+@couple_relationship_required
+def api_export_start():
+    """메모리 북 내보내기 백그라운드 작업 시작"""
+    connection = current_user.get_couple_connection()
+    
+    download_url = url_for('memories.export_download', job_id='JOB_ID').replace('JOB_ID', '{job_id}')
+    job_id = start_export_job(current_app._get_current_object(), connection.id, download_url)
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('memories.api_export_status', job_id=job_id),
+        'download_url': download_url.format(job_id=job_id)
+    }), 202
+
+@memories_bp.route('/api/export/<job_id>')
+@login_required
+@couple_relationship_required
+def api_export_status(job_id):
+    """메모리 북 내보내기 작업 상태"""
+    connection = current_user.get_couple_connection()
+    job = get_export_job(current_app, connection.id, job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '내보내기 작업을 찾을 수 없습니다.'}), 404
+    
+    return jsonify({
+        'success': True,
+        'status': job['status'],
+        'size': job.get('size'),
+        'download_url': url_for('memories.export_download', job_id=job_id) if job['status'] == EXPORT_READY else None
+    })
+
+@memories_bp.route('/export/<job_id>.zip')
+@login_required
+@couple_relationship_required
+def export_download(job_id):
+    """완성된 메모리 북 내보내기 파일 다운로드 (Range 이어받기 지원)"""
+    connection = current_user.get_couple_connection()
+    job = get_export_job(current_app, connection.id, job_id)
+    if job is None or job['status'] != EXPORT_READY:
+        abort(404)
+    
+    response = send_file(job['path'], mimetype='application/zip', as_attachment=True,
+                         download_name='memory-book.zip', conditional=True, max_age=0)
+    response.cache_control.private = True
+    return response
+
+@memories_bp.route('/api/import', methods=['POST'])
+@login_required
+@couple_relationship_required
+def api_import():
+    """ZIP 파일로 추억 일괄 가져오기 (요청 본문이 ZIP, 진행 상황은 Socket.IO로 전송)"""
+    connection = current_user.get_couple_connection()
+    
+    # 사진 묶음은 일반 업로드 한도(MAX_CONTENT_LENGTH)보다 크므로 본문을 직접 읽음
+    content_length = request.content_length
+    if not content_length:
+        return jsonify({'success': False, 'message': 'ZIP 파일 크기를 알 수 없습니다.'}), 411
+    if content_length > current_app.config.get('IMPORT_MAX_ARCHIVE_SIZE', 500 * 1024 * 1024):
+        return jsonify({'success': False, 'message': 'ZIP 파일이 너무 큽니다.'}), 413
+    
+    fd, zip_path = tempfile.mkstemp(prefix='memory-import-', suffix='.zip')
+    try:
+        stream = request.environ['wsgi.input']
+        remaining = content_length
+        with os.fdopen(fd, 'wb') as f:
+            while remaining > 0:
+                chunk = stream.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        
+        if remaining > 0 or not zipfile.is_zipfile(zip_path):
+            os.remove(zip_path)
+            return jsonify({'success': False, 'message': '올바른 ZIP 파일이 아닙니다.'}), 400
+    except OSError:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
+    
+    job_id = start_import_job(current_app._get_current_object(), connection.id, current_user.id, zip_path)
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
 @memories_bp.route('/api/stats')
 @login_required
 @couple_relationship_required
@@ -306,24 +511,11 @@ def api_stats():
     """메모리 통계 API"""
     connection = current_user.get_couple_connection()
     
-    # 총 메모리 수
-    total_memories = Memory.query.filter_by(couple_id=connection.id).count()
-    
-    # 이번 달 메모리 수
-    today = date.today()
-    this_month_start = date(today.year, today.month, 1)
-    this_month_memories = Memory.query.filter_by(couple_id=connection.id)\
-                                     .filter(Memory.memory_date >= this_month_start)\
-                                     .count()
-    
-    # 이미지가 있는 메모리 수
-    memories_with_images = Memory.query.filter_by(couple_id=connection.id)\
-                                      .filter(Memory.image_path.isnot(None))\
-                                      .filter(Memory.image_path != '')\
-                                      .count()
+    # 커플 카운터 한 행으로 통계 제공 (COUNT 쿼리 없음)
+    counter = CoupleCounter.get_for_couple(connection.id)
     
     return jsonify({
-        'total_memories': total_memories,
-        'this_month_memories': this_month_memories,
-        'memories_with_images': memories_with_images
+        'total_memories': counter.memories,
+        'this_month_memories': counter.month_memories,
+        'memories_with_images': counter.memories_with_images
     })
\ No newline at end of file
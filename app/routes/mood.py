@@ -114,11 +114,8 @@ def record():
                 )
                 db.session.add(new_mood)
                 flash('기분이 기록되었습니다.', 'success')
-            
-            db.session.commit()
-            
-            # 실시간 알림 전송 (새로 기록한 경우에만)
-            if not existing_mood:
+                
+                # 실시간 알림 (기록과 같은 트랜잭션에 저장, 커밋 후 전송)
                 from app.socketio_events import notify_mood_update
                 notify_mood_update(
                     current_user.id,
@@ -127,6 +124,8 @@ def record():
                     new_mood.get_mood_text()
                 )
             
+            db.session.commit()
+            
             return redirect(url_for('mood.index'))
             
         except Exception as e:
@@ -307,11 +306,8 @@ def api_record():
             )
             db.session.add(new_mood)
             message = '기분이 기록되었습니다.'
-        
-        db.session.commit()
-        
-        # 실시간 알림 전송 (새로 기록한 경우에만)
-        if not existing_mood:
+            
+            # 실시간 알림 (기록과 같은 트랜잭션에 저장, 커밋 후 전송)
             from app.socketio_events import notify_mood_update
             notify_mood_update(
                 current_user.id,
@@ -320,6 +316,8 @@ def api_record():
                 new_mood.get_mood_text()
             )
         
+        db.session.commit()
+        
         return jsonify({
             'success': True,
             'message': message
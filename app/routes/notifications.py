@@ -3,7 +3,8 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models.notification import Notification
+from app.models.notification import Notification, MAX_BULK_IDS
+from app.services.notification_sync import build_sync, parse_sync_args, notification_type_cache
 
 # 블루프린트 생성
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/notifications')
@@ -29,17 +30,21 @@ def index():
     if not show_read:
         query = query.filter(Notification.is_read == False)
     
+    # 기본 화면(읽지 않은 알림 전체)은 카운터 값을 전체 개수로 사용해 COUNT 생략
+    count_from_counter = not filter_type and not show_read
     notifications = query.order_by(Notification.created_at.desc())\
-                         .paginate(page=page, per_page=per_page, error_out=False)
+                         .paginate(page=page, per_page=per_page, error_out=False,
+                                   count=not count_from_counter)
+    if count_from_counter:
+        notifications.total = Notification.get_unread_count(current_user.id)
     
-    # 알림 타입 목록
-    notification_types = db.session.query(Notification.type)\
-                                  .filter_by(user_id=current_user.id)\
-                                  .distinct().all()
-    notification_types = [t[0] for t in notification_types]
+    # 알림 타입 목록 (최신 알림 ID로 검증하는 캐시)
+    latest_id = Notification.get_latest_id(current_user.id)
+    notification_types = notification_type_cache.get(current_user.id, latest_id)
     
     return render_template('notifications/index.html',
                          notifications=notifications,
+                         latest_id=latest_id,
                          notification_types=notification_types,
                          current_filter=filter_type,
                          show_read=show_read)
@@ -48,31 +53,43 @@ def index():
 @login_required
 def mark_read(notification_id):
     """알림을 읽음으로 표시"""
-    notification = Notification.query.filter_by(
+    Notification.query.filter_by(
         id=notification_id,
         user_id=current_user.id
     ).first_or_404()
     
-    if not notification.is_read:
-        notification.mark_as_read()
+    Notification.mark_read_bulk(current_user.id, notification_ids=[notification_id])
+    unread_count = broadcast_unread_count(current_user.id)
     
-    return jsonify({'success': True})
+    return jsonify({'success': True, 'unread_count': unread_count})
+
+@notifications_bp.route('/mark-read', methods=['POST'])
+@login_required
+def mark_read_many():
+    """여러 알림을 한 번에 읽음으로 표시 (ids 목록 또는 up_to_id)"""
+    notification_ids, up_to_id, error = parse_read_target(request.get_json(silent=True) or request.form)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    if notification_ids is None and up_to_id is None:
+        return jsonify({'success': False, 'message': 'ids 또는 up_to_id가 필요합니다.'}), 400
+    
+    count = Notification.mark_read_bulk(current_user.id, notification_ids, up_to_id)
+    unread_count = broadcast_unread_count(current_user.id)
+    
+    return jsonify({'success': True, 'count': count, 'unread_count': unread_count})
 
 @notifications_bp.route('/mark-all-read', methods=['POST'])
 @login_required
 def mark_all_read():
-    """모든 알림을 읽음으로 표시"""
-    notifications = Notification.query.filter_by(
-        user_id=current_user.id,
-        is_read=False
-    ).all()
+    """모든 알림을 읽음으로 표시 (up_to_id가 있으면 그 ID 이하만)"""
+    _, up_to_id, error = parse_read_target(request.get_json(silent=True) or request.form)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
     
-    for notification in notifications:
-        notification.is_read = True
+    count = Notification.mark_read_bulk(current_user.id, up_to_id=up_to_id)
+    unread_count = broadcast_unread_count(current_user.id)
     
-    db.session.commit()
-    
-    return jsonify({'success': True, 'count': len(notifications)})
+    return jsonify({'success': True, 'count': count, 'unread_count': unread_count})
 
 @notifications_bp.route('/delete/<int:notification_id>', methods=['POST'])
 @login_required
@@ -83,30 +100,59 @@ def delete(notification_id):
         user_id=current_user.id
     ).first_or_404()
     
+    was_unread = not notification.is_read
     db.session.delete(notification)
     db.session.commit()
     
+    if was_unread:
+        broadcast_unread_count(current_user.id)
+    
     return jsonify({'success': True})
 
 @notifications_bp.route('/clear-read', methods=['POST'])
 @login_required
 def clear_read():
-    """읽은 알림 모두 삭제"""
-    notifications = Notification.query.filter_by(
-        user_id=current_user.id,
-        is_read=True
-    ).all()
+    """읽은 알림 모두 삭제 (묶음 단위 DELETE)"""
+    count = Notification.delete_read_bulk(current_user.id)
     
-    for notification in notifications:
-        db.session.delete(notification)
-    
-    db.session.commit()
-    
-    return jsonify({'success': True, 'count': len(notifications)})
+    return jsonify({'success': True, 'count': count})
+
+def parse_read_target(data):
+    """요청의 ids 목록과 up_to_id를 (ids, up_to_id, 오류 메시지)로 변환"""
+    notification_ids = data.get('ids')
+    up_to_id = data.get('up_to_id')
+    
+    try:
+        if notification_ids is not None:
+            if isinstance(notification_ids, str):
+                notification_ids = [part for part in notification_ids.split(',') if part.strip()]
+            notification_ids = [int(notification_id) for notification_id in notification_ids]
+            if len(notification_ids) > MAX_BULK_IDS:
+                return None, None, f'한 번에 {MAX_BULK_IDS}개까지 처리할 수 있습니다.'
+        if up_to_id is not None and up_to_id != '':
+            up_to_id = int(up_to_id)
+        else:
+            up_to_id = None
+    except (TypeError, ValueError):
+        return None, None, '잘못된 알림 ID입니다.'
+    
+    return notification_ids, up_to_id, None
+
+def broadcast_unread_count(user_id):
+    """읽지 않은 알림 수를 사용자의 모든 연결에 전송 후 반환"""
+    from app.socketio_events import emit_notification_count
+    return emit_notification_count(user_id)
 
 @notifications_bp.route('/api/unread-count')
 @login_required
 def api_unread_count():
     """읽지 않은 알림 개수 API"""
     count = Notification.get_unread_count(current_user.id)
-    return jsonify({'count': count})
\ No newline at end of file
+    return jsonify({'count': count})
+
+@notifications_bp.route('/api/sync')
+@login_required
+def api_sync():
+    """알림 증분 동기화 API (since_id 이후 새 알림과 version 이후 읽음 처리된 알림)"""
+    since_id, version = parse_sync_args(request.args)
+    return jsonify(build_sync(current_user.id, since_id, version))
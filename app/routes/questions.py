@@ -6,6 +6,7 @@ from datetime import datetime, date
 from sqlalchemy import func, and_
 from app.extensions import db
 from app.models.question import Question, DailyQuestion, Answer
+from app.models.couple_counter import CoupleCounter
 from app.data.questions import CATEGORIES, DIFFICULTIES
 from app.utils.security import (
     couple_relationship_required, 
@@ -131,14 +132,13 @@ def answer():
             )
             db.session.add(new_answer)
             is_update = False
+            
+            # 실시간 알림 (답변과 같은 트랜잭션에 저장, 커밋 후 전송)
+            from app.socketio_events import notify_new_answer
+            notify_new_answer(current_user.id, question.id, question.text)
         
         db.session.commit()
         
-        # 실시간 알림 전송 (새 답변인 경우에만)
-        if not is_update:
-            from app.socketio_events import notify_new_answer
-            notify_new_answer(current_user.id, question.text)
-        
         # 파트너 답변 조회 가능 여부 확인
         partner_answer = None
         if not is_update:  # 새 답변인 경우에만 파트너 답변 확인
@@ -406,11 +406,10 @@ def api_history_stats():
     # 통계 계산
     from sqlalchemy import func
     
-    # 내가 답변한 총 질문 수
-    my_total_answers = Answer.query.filter_by(user_id=current_user.id).count()
-    
-    # 파트너가 답변한 총 질문 수
-    partner_total_answers = Answer.query.filter_by(user_id=partner.id).count()
+    # 나와 파트너의 총 답변 수 (커플 카운터)
+    counters = CoupleCounter.get_for_couple(connection.id).for_user(connection, current_user.id)
+    my_total_answers = counters['my_answers']
+    partner_total_answers = counters['partner_answers']
     
     # 둘 다 답변한 질문 수 (같은 날짜, 같은 질문)
     both_answered = db.session.query(Answer.question_id, Answer.date).filter_by(user_id=current_user.id)\
@@ -0,0 +1,267 @@
+"""커플 대시보드 상태 채널
+
+커플마다 대시보드 스냅샷과 버전을 DashboardState에 보관하고, 기분, 답변,
+D-Day, 일정이 바뀐 트랜잭션이 커밋되면 백그라운드 태스크에서 스냅샷을 다시
+계산해 이전 스냅샷과의 JSON Patch 변경분을 'dashboard_delta' 이벤트로
+couple_<id> 룸에 보냅니다(요청 응답은 재계산을 기다리지 않음).
+클라이언트는 변경분의 base_version이 자기 버전과 같을 때만 적용하고, 다르면
+(놓친 변경분이 있으면) dashboard_sync 이벤트나 /api/dashboard-state로 전체 상태를
+다시 받습니다.
+"""
+
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.utils.json_patch import make_patch
+
+def build_dashboard_snapshot(connection, today=None):
+    """커플 대시보드 스냅샷 계산
+
+    두 사람이 같은 스냅샷을 받으므로 사용자별 값은 사용자 ID(문자열) 키로
+    담고, 클라이언트가 나/파트너로 나누어 그립니다.
+    """
+    from app.extensions import db
+    from app.models.event import Event
+    from app.models.mood import MoodEntry
+    from app.models.question import Answer
+    from app.models.couple_counter import CoupleCounter
+    from app.services.dday_service import dday_status_cache, status_to_json
+
+    today = today or date.today()
+    user_ids = [user_id for user_id in (connection.user1_id, connection.user2_id) if user_id]
+
+    # D-Day 정보 (최근 3개, 일 단위 캐시 공유)
+    dday_status = dday_status_cache.get(connection, today)
+    ddays = [{
+        'id': dday['id'],
+        'title': dday['title'],
+        'target_date': dday['target_date'].isoformat(),
+        'days_remaining': dday['days_remaining'],
+        'status_text': dday['status_text'],
+        'is_past': dday['is_past']
+    } for dday in dday_status['ddays'][:3]]
+
+    # 오늘의 이벤트
+    day_start = datetime.combine(today, datetime.min.time())
+    today_events = Event.query.filter_by(couple_id=connection.id)\
+                             .filter(Event.start_datetime >= day_start)\
+                             .filter(Event.start_datetime < day_start + timedelta(days=1))\
+                             .order_by(Event.start_datetime.asc()).all()
+
+    # 오늘의 기분과 질문 답변 여부
+    moods = MoodEntry.query.filter(MoodEntry.date == today, MoodEntry.user_id.in_(user_ids)).all()
+    answered = set(db.session.execute(
+        db.select(Answer.user_id).where(Answer.date == today, Answer.user_id.in_(user_ids)).distinct()
+    ).scalars().all())
+
+    counter = CoupleCounter.get_for_couple(connection.id)
+    per_user = {str(connection.user1_id): 'user1'}
+    if connection.user2_id:
+        per_user[str(connection.user2_id)] = 'user2'
+
+    return {
+        'day': today.isoformat(),
+        'ddays': ddays,
+        'milestones': [status_to_json(milestone) for milestone in dday_status['milestones']],
+        'today_events': [{
+            'id': event.id,
+            'title': event.title,
+            'start_time': event.start_datetime.strftime('%H:%M'),
+            'participant_type': event.participant_type,
+            'participant_text': event.get_participant_text(),
+            'participant_color': event.get_participant_color()
+        } for event in today_events],
+        'moods': {str(mood.user_id): {
+            'level': mood.mood_level,
+            'emoji': mood.get_mood_emoji(),
+            'text': mood.get_mood_text(),
+            'note': mood.note
+        } for mood in moods},
+        'answered_today': {str(user_id): user_id in answered for user_id in user_ids},
+        'counters': {
+            'memories': counter.memories,
+            'events': counter.events,
+            'ddays': counter.ddays,
+            'answers': {user_id: getattr(counter, f'{column}_answers') for user_id, column in per_user.items()},
+            'moods': {user_id: getattr(counter, f'{column}_moods') for user_id, column in per_user.items()}
+        } if counter else None
+    }
+
+def publish_dashboard_change(couple_id, today=None):
+    """커플 스냅샷을 다시 계산하고 바뀌었으면 버전을 올려 변경분 전송
+
+    (버전, 연산 목록)을 반환하며 바뀐 것이 없으면 버전을 올리지 않고 None을 반환합니다.
+    처음 계산하거나 날짜가 바뀐 스냅샷은 전체 교체 연산으로 보내므로, 조회 API가
+    저장하지 않고 돌려준 스냅샷을 가진 클라이언트도 그대로 적용할 수 있습니다.
+    """
+    from app.extensions import db, socketio
+    from app.models.couple import CoupleConnection
+    from app.models.dashboard_state import DashboardState
+
+    connection = db.session.get(CoupleConnection, couple_id)
+    if connection is None:
+        return None
+
+    today = today or date.today()
+    state = DashboardState.lock(couple_id)
+    snapshot = build_dashboard_snapshot(connection, today)
+    previous = state.get_data()
+    ops = make_patch(previous, snapshot) if previous is not None and state.day == today else \
+        [{'op': 'replace', 'path': '', 'value': snapshot}]
+    if not ops:
+        db.session.rollback()
+        return None
+
+    state.set_data(snapshot, today)
+    version = state.version
+    db.session.commit()
+
+    socketio.emit('dashboard_delta', {
+        'version': version,
+        'base_version': version - 1,
+        'ops': ops
+    }, room=f'couple_{couple_id}')
+    return version, ops
+
+def get_dashboard_state(connection, today=None):
+    """커플 대시보드 (버전, 스냅샷) 반환 (조회 경로이므로 DB를 바꾸거나 보내지 않음)
+
+    스냅샷이 없거나 다른 날짜에 계산되었으면(자정이 지나 D-Day 남은 일수와 오늘
+    일정이 바뀐 경우) 메모리에서만 다시 계산해 저장된 버전(없으면 0)과 함께
+    돌려주고, 저장과 변경분 전송은 전송 태스크에 맡깁니다.
+    """
+    from flask import current_app
+    from app.extensions import db
+    from app.models.dashboard_state import DashboardState
+
+    today = today or date.today()
+    state = db.session.get(DashboardState, connection.id)
+    if state is not None and state.day == today and state.data is not None:
+        return state.version, state.get_data()
+
+    dashboard_publisher.queue(current_app._get_current_object(), couple_ids=[connection.id])
+    return (state.version if state is not None else 0), build_dashboard_snapshot(connection, today)
+
+# 대시보드에 보이는 모델 (변경되면 커플 스냅샷을 다시 계산)
+COUPLE_MODELS = ('DDay', 'Event')
+USER_MODELS = ('MoodEntry', 'Answer')
+
+@event.listens_for(Session, 'after_flush')
+def _collect_dashboard_changes(session, flush_context):
+    """트랜잭션에서 바뀐 대시보드 데이터의 커플/사용자 기록"""
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = type(instance).__name__
+        if name not in COUPLE_MODELS and name not in USER_MODELS:
+            continue
+        changes = session.info.setdefault('dashboard_changes', {'couples': set(), 'users': set(), 'ddays': set()})
+        if name in COUPLE_MODELS:
+            changes['couples'].add(instance.couple_id)
+            if name == 'DDay':
+                changes['ddays'].add(instance.couple_id)
+        else:
+            changes['users'].add(instance.user_id)
+
+class DashboardPublisher:
+    """커밋된 대시보드 변경의 변경분을 요청 밖에서 보내는 백그라운드 태스크
+
+    after_commit 훅은 바뀐 커플/사용자 ID만 모아 두고 태스크를 깨웁니다.
+    태스크는 DASHBOARD_PUSH_DELAY초 동안 모인 변경을 커플마다 한 번씩 다시
+    계산해 보내므로, 연달아 커밋해도 커플당 변경분은 하나입니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._couples = set()
+        self._users = set()
+        self._running = False
+        self._app = None
+
+    def queue(self, app, couple_ids=(), user_ids=()):
+        """바뀐 커플/사용자 기록 후 태스크가 없으면 시작"""
+        with self._lock:
+            self._couples.update(couple_id for couple_id in couple_ids if couple_id)
+            self._users.update(user_id for user_id in user_ids if user_id)
+            self._app = app
+            if self._running:
+                return
+            self._running = True
+
+        from app.extensions import socketio
+        socketio.start_background_task(self._run)
+
+    def clear(self):
+        with self._lock:
+            self._couples.clear()
+            self._users.clear()
+
+    def drain(self, app):
+        """모인 변경의 커플마다 변경분을 보내고 보낸 커플 수 반환 (앱 컨텍스트 안에서 호출)"""
+        from app.extensions import db
+        from app.models.couple import CoupleConnection
+
+        with self._lock:
+            couple_ids, user_ids = self._couples, self._users
+            self._couples, self._users = set(), set()
+
+        if user_ids:
+            couple_ids.update(db.session.execute(
+                db.select(CoupleConnection.id).where(
+                    CoupleConnection.user1_id.in_(user_ids) | CoupleConnection.user2_id.in_(user_ids)
+                )
+            ).scalars().all())
+
+        published = 0
+        for couple_id in sorted(couple_ids):
+            try:
+                if publish_dashboard_change(couple_id):
+                    published += 1
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f'Dashboard delta publish failed for couple {couple_id}: {str(e)}')
+        return published
+
+    def _run(self):
+        """모인 변경을 보내는 백그라운드 태스크 (더 모인 변경이 없으면 종료)"""
+        from app.extensions import socketio
+
+        while True:
+            with self._lock:
+                app = self._app
+            socketio.sleep(app.config.get('DASHBOARD_PUSH_DELAY', 0.2))
+            try:
+                with app.app_context():
+                    self.drain(app)
+            except Exception as e:
+                logging.error(f'Dashboard delta publish failed: {str(e)}')
+
+            with self._lock:
+                if not self._couples and not self._users:
+                    self._running = False
+                    return
+
+dashboard_publisher = DashboardPublisher()
+
+@event.listens_for(Session, 'after_commit')
+def _queue_after_commit(session):
+    """대시보드 데이터가 바뀐 트랜잭션이 커밋되면 커플/사용자를 전송 태스크에 넘김"""
+    changes = session.info.pop('dashboard_changes', None)
+    if not changes:
+        return
+
+    from flask import current_app, has_app_context
+    if not has_app_context():
+        return
+
+    # 캘린더 버전을 갱신하지 않은 D-Day 변경도 이 워커의 캐시에는 바로 반영 (메모리만 지움)
+    from app.services.dday_service import dday_status_cache
+    for couple_id in changes['ddays']:
+        dday_status_cache.invalidate(couple_id)
+
+    dashboard_publisher.queue(current_app._get_current_object(), changes['couples'], changes['users'])
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_dashboard_changes(session):
+    """롤백된 트랜잭션의 변경 기록 제거"""
+    session.info.pop('dashboard_changes', None)
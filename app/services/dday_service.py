@@ -0,0 +1,160 @@
+"""D-Day 상태 캐시 및 기념일 마일스톤 서비스"""
+
+import heapq
+import threading
+from datetime import date, timedelta
+from itertools import islice
+from app.models.dday import DDay
+from app.models.calendar_feed import CalendarFeed
+
+# 100일 단위 기념일 간격
+MILESTONE_DAY_STEP = 100
+
+# 캐시에 보관할 최대 커플 수 (초과 시 지난 날짜의 항목부터 정리)
+MAX_CACHE_ENTRIES = 10000
+
+def _add_years(start_date, years):
+    """연 단위 날짜 계산 (2월 29일은 평년에 2월 28일로 처리)"""
+    try:
+        return start_date.replace(year=start_date.year + years)
+    except ValueError:
+        return start_date.replace(year=start_date.year + years, day=28)
+
+def _iter_day_milestones(start_date, from_date):
+    """100일, 200일, ... 기념일 (사귄 날을 1일로 계산)"""
+    days_since = (from_date - start_date).days
+    count = max(1, -(-(days_since + 1) // MILESTONE_DAY_STEP))
+    while True:
+        days = count * MILESTONE_DAY_STEP
+        yield {
+            'date': start_date + timedelta(days=days - 1),
+            'title': f'{days}일',
+            'type': 'days',
+            'count': days
+        }
+        count += 1
+
+def _iter_anniversaries(start_date, from_date):
+    """1주년, 2주년, ... 기념일"""
+    years = max(1, from_date.year - start_date.year)
+    if _add_years(start_date, years) < from_date:
+        years += 1
+    while True:
+        yield {
+            'date': _add_years(start_date, years),
+            'title': f'{years}주년',
+            'type': 'anniversary',
+            'count': years
+        }
+        years += 1
+
+def iter_milestones(start_date, from_date=None):
+    """start_date 기준 기념일을 날짜순으로 끝없이 생성하는 제너레이터
+
+    행을 저장하지 않고 필요한 만큼만 계산합니다. from_date 이전의
+    기념일은 건너뜁니다.
+    """
+    if from_date is None or from_date < start_date:
+        from_date = start_date
+    return heapq.merge(
+        _iter_day_milestones(start_date, from_date),
+        _iter_anniversaries(start_date, from_date),
+        key=lambda milestone: milestone['date']
+    )
+
+def get_upcoming_milestones(start_date, today=None, limit=3):
+    """오늘 이후 다가오는 기념일 limit개 반환"""
+    if today is None:
+        today = date.today()
+    milestones = []
+    for milestone in islice(iter_milestones(start_date, today), limit):
+        days = (milestone['date'] - today).days
+        milestone['days_remaining'] = days
+        milestone['status_text'] = DDay.format_status_text(days)
+        milestones.append(milestone)
+    return milestones
+
+def _build_status(dday, today):
+    """D-Day 한 건의 표시용 상태 계산"""
+    days = dday.days_remaining(today)
+    return {
+        'id': dday.id,
+        'title': dday.title,
+        'target_date': dday.target_date,
+        'description': dday.description,
+        'days_remaining': days,
+        'status_text': DDay.format_status_text(days),
+        'is_past': days < 0,
+        'is_today': days == 0,
+        'created_by': dday.created_by,
+        'created_at': dday.created_at
+    }
+
+def status_to_json(status):
+    """캐시된 상태를 JSON 직렬화 가능한 딕셔너리로 변환"""
+    data = dict(status)
+    for key in ('target_date', 'date', 'created_at'):
+        if data.get(key) is not None:
+            data[key] = data[key].isoformat()
+    return data
+
+class DDayStatusCache:
+    """커플별 D-Day 상태 일 단위 캐시
+
+    D-Day 목록, 대시보드, API가 같은 계산 결과를 공유합니다. 항목은
+    (날짜, 캘린더 버전)으로 검증되어 로컬 자정이 지나거나 어느 워커에서든
+    D-Day가 변경되면 다시 계산됩니다.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, connection, today=None):
+        """커플의 D-Day 상태와 다가오는 기념일 반환"""
+        if today is None:
+            today = date.today()
+        version = CalendarFeed.get_version(connection.id)
+
+        entry = self._entries.get(connection.id)
+        if entry and entry['day'] == today and entry['version'] == version:
+            return entry['data']
+
+        ddays = DDay.query.filter_by(couple_id=connection.id)\
+                          .order_by(DDay.target_date.asc()).all()
+        data = {
+            'ddays': [_build_status(dday, today) for dday in ddays],
+            'milestones': get_upcoming_milestones(connection.connected_at.date(), today)
+                          if connection.connected_at else []
+        }
+
+        with self._lock:
+            if len(self._entries) >= MAX_CACHE_ENTRIES:
+                self._prune(today)
+            self._entries[connection.id] = {
+                'day': today,
+                'version': version,
+                'data': data
+            }
+        return data
+
+    def invalidate(self, couple_id):
+        """커플의 캐시 항목 제거"""
+        with self._lock:
+            self._entries.pop(couple_id, None)
+
+    def clear(self):
+        """전체 캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+    def _prune(self, today):
+        """오늘 계산되지 않은 항목 정리 (그래도 가득 차면 전부 비움)"""
+        stale = [key for key, entry in self._entries.items() if entry['day'] != today]
+        for key in stale:
+            del self._entries[key]
+        if len(self._entries) >= MAX_CACHE_ENTRIES:
+            self._entries.clear()
+
+# 전역 D-Day 상태 캐시
+dday_status_cache = DDayStatusCache()
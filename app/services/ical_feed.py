@@ -0,0 +1,123 @@
+"""iCalendar(RFC 5545) 피드 생성 서비스"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.event import Event
+from app.models.dday import DDay
+
+# 서버 측 커서에서 한 번에 가져올 행 수
+FEED_FETCH_SIZE = 200
+
+PRODID = '-//Couple Web App//Calendar Feed//KO'
+
+def escape_text(value):
+    """TEXT 값 이스케이프 (RFC 5545 3.3.11)"""
+    if not value:
+        return ''
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace(';', '\\;')
+            .replace(',', '\\,')
+            .replace('\r\n', '\\n')
+            .replace('\n', '\\n'))
+
+def fold_line(line):
+    """75 옥텟 단위로 긴 줄 접기 (멀티바이트 문자는 쪼개지 않음)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    current = ''
+    current_size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if current_size + char_size > limit:
+            parts.append(current)
+            current = char
+            current_size = char_size
+            limit = 74  # 이어지는 줄은 앞의 공백 1옥텟 포함
+        else:
+            current += char
+            current_size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+def format_datetime(value):
+    """floating 로컬 시간 형식 (저장된 일정 시간이 타임존 없는 로컬 시간)"""
+    return value.strftime('%Y%m%dT%H%M%S')
+
+def format_date(value):
+    """종일 일정용 DATE 형식"""
+    return value.strftime('%Y%m%d')
+
+def _event_lines(row, dtstamp):
+    """일정 한 건을 VEVENT 줄 목록으로 변환"""
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{row.id}@couple-app',
+        f'DTSTAMP:{dtstamp}',
+        f'DTSTART:{format_datetime(row.start_datetime)}',
+        f'DTEND:{format_datetime(row.end_datetime)}',
+        f'SUMMARY:{escape_text(row.title)}',
+    ]
+    if row.description:
+        lines.append(f'DESCRIPTION:{escape_text(row.description)}')
+    lines.append('END:VEVENT')
+    return lines
+
+def _dday_lines(row, dtstamp):
+    """D-Day 한 건을 종일 VEVENT 줄 목록으로 변환"""
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:dday-{row.id}@couple-app',
+        f'DTSTAMP:{dtstamp}',
+        f'DTSTART;VALUE=DATE:{format_date(row.target_date)}',
+        f'DTEND;VALUE=DATE:{format_date(row.target_date + timedelta(days=1))}',
+        f'SUMMARY:{escape_text(row.title)}',
+        'TRANSP:TRANSPARENT',
+    ]
+    if row.description:
+        lines.append(f'DESCRIPTION:{escape_text(row.description)}')
+    lines.append('END:VEVENT')
+    return lines
+
+def iter_calendar_feed(couple_id, calendar_name='우리의 캘린더'):
+    """커플 캘린더를 iCalendar 문자열 조각으로 스트리밍하는 제너레이터
+
+    ORM 객체 대신 필요한 컬럼만 서버 측 커서(yield_per)로 읽어
+    문서 전체를 메모리에 만들지 않습니다.
+    """
+    dtstamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(calendar_name)}',
+    ]
+    yield ''.join(fold_line(line) for line in header)
+
+    events = db.session.execute(
+        db.select(Event.id, Event.title, Event.description,
+                  Event.start_datetime, Event.end_datetime)
+        .where(Event.couple_id == couple_id)
+        .order_by(Event.start_datetime.asc())
+        .execution_options(yield_per=FEED_FETCH_SIZE)
+    )
+    for row in events:
+        yield ''.join(fold_line(line) for line in _event_lines(row, dtstamp))
+
+    ddays = db.session.execute(
+        db.select(DDay.id, DDay.title, DDay.description, DDay.target_date)
+        .where(DDay.couple_id == couple_id)
+        .order_by(DDay.target_date.asc())
+        .execution_options(yield_per=FEED_FETCH_SIZE)
+    )
+    for row in ddays:
+        yield ''.join(fold_line(line) for line in _dday_lines(row, dtstamp))
+
+    yield fold_line('END:VCALENDAR')
@@ -0,0 +1,207 @@
+"""추억 사진 유사 중복 검출 (지각 해시)
+
+사진마다 64비트 dHash(인접 픽셀 밝기 차이 해시)를 계산해 memories.image_hash에
+저장합니다. 같은 사진을 두 휴대폰에서 각각 올리면 재압축이나 크기 변경이
+있어도 해밍 거리가 작게 나옵니다.
+
+비슷한 해시 검색은 멀티 인덱스 해싱을 사용합니다. 해시를 16비트 밴드 4개로
+나누면 거리가 d 이하인 두 해시는 적어도 한 밴드에서 d // 4 비트 이하로만
+다르므로(비둘기집 원리), 각 밴드 값과 그 주변 값만 인덱스로 찾은 뒤 후보의
+실제 거리를 계산합니다. 수만 장 중에서도 인덱스 탐색 몇십 번으로 끝납니다.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+# NumPy가 있으면 벡터 연산으로 비트를 계산 (없어도 같은 결과)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# dHash 격자 크기 (8x8 = 64비트)
+HASH_SIZE = 8
+
+# 멀티 인덱스 해싱 밴드 (16비트 x 4)
+BAND_BITS = 16
+BAND_COUNT = 4
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# 기본 유사 판정 거리 (64비트 중 다른 비트 수)
+DEFAULT_MAX_DISTANCE = 6
+
+def band_expression(band):
+    """밴드 값 SQL 식 (인덱스 식과 글자 그대로 같아야 인덱스를 사용)"""
+    return f'(image_hash >> {band * BAND_BITS}) & {BAND_MASK}'
+
+def compute_dhash(image):
+    """이미지의 64비트 dHash (부호 없는 정수)"""
+    small = image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+
+    if HAS_NUMPY:
+        pixels = np.asarray(small, dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col + 1] > pixels[offset + col])
+    return value
+
+def compute_image_hash(file_path):
+    """이미지 파일의 dHash를 DB 저장용(부호 있는 64비트) 값으로 반환
+
+    JPEG는 DCT 단계에서 축소해 디코딩하므로 큰 사진도 몇 밀리초면 됩니다.
+    파이프라인이 정규화한 사진과 같은 해시가 나오도록 EXIF 방향을 적용합니다.
+    """
+    with Image.open(file_path) as image:
+        image.draft('RGB', (HASH_SIZE * 8, HASH_SIZE * 8))
+        return to_signed(compute_dhash(ImageOps.exif_transpose(image)))
+
+def to_signed(value):
+    """부호 없는 64비트 값을 SQLite INTEGER 범위로 변환"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def to_unsigned(value):
+    return value & ((1 << 64) - 1)
+
+def hamming_distance(a, b):
+    """두 해시의 해밍 거리"""
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+def band_values(image_hash):
+    """해시의 밴드별 값 목록"""
+    value = to_unsigned(image_hash)
+    return [(value >> (band * BAND_BITS)) & BAND_MASK for band in range(BAND_COUNT)]
+
+def probe_masks(radius):
+    """밴드 값에서 radius 비트 이하를 뒤집는 XOR 마스크 목록"""
+    masks = {0}
+    for _ in range(radius):
+        masks |= {mask ^ (1 << bit) for mask in masks for bit in range(BAND_BITS)}
+    return sorted(masks)
+
+def probe_values(value, radius):
+    """밴드 값과 radius 비트 이하로 다른 값 목록"""
+    return [value ^ mask for mask in probe_masks(radius)]
+
+def find_similar_memories(couple_id, image_hash, max_distance=DEFAULT_MAX_DISTANCE, exclude_id=None, limit=5):
+    """비슷한 사진이 있는 커플의 추억 목록 (거리순, (Memory, 거리))"""
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    if image_hash is None:
+        return []
+
+    # 밴드마다 따로 조회해 합침 (OR로 묶으면 SQLite가 밴드 인덱스를 쓰지 않음)
+    radius = max_distance // BAND_COUNT
+    candidates = db.union(*[
+        db.select(Memory.id).where(
+            Memory.couple_id == couple_id,
+            Memory.image_hash.isnot(None),
+            db.literal_column(band_expression(band)).in_(probe_values(value, radius))
+        )
+        for band, value in enumerate(band_values(image_hash))
+    ]).subquery()
+
+    query = Memory.query.filter(Memory.id.in_(db.select(candidates.c.id)))
+    if exclude_id is not None:
+        query = query.filter(Memory.id != exclude_id)
+
+    matches = []
+    for memory in query:
+        distance = hamming_distance(memory.image_hash, image_hash)
+        if distance <= max_distance:
+            matches.append((memory, distance))
+    matches.sort(key=lambda match: (match[1], -match[0].id))
+    return matches[:limit]
+
+def find_duplicate_groups(couple_id, max_distance=DEFAULT_MAX_DISTANCE):
+    """커플의 비슷한 사진 묶음 목록 (각 묶음은 추억 ID 목록, 오래된 순)
+
+    해시 목록을 한 번 읽어 메모리 안에서 같은 멀티 인덱스 탐색을 합니다.
+    """
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    rows = db.session.execute(
+        db.select(Memory.id, Memory.image_hash)
+          .where(Memory.couple_id == couple_id, Memory.image_hash.isnot(None))
+          .order_by(Memory.id)
+    ).all()
+
+    hashes = {row.id: to_unsigned(row.image_hash) for row in rows}
+    bands = {memory_id: band_values(value) for memory_id, value in hashes.items()}
+    buckets = [{} for _ in range(BAND_COUNT)]
+    for memory_id, values in bands.items():
+        for band, value in enumerate(values):
+            buckets[band].setdefault(value, []).append(memory_id)
+
+    parent = {memory_id: memory_id for memory_id in hashes}
+
+    def find(memory_id):
+        while parent[memory_id] != memory_id:
+            parent[memory_id] = parent[parent[memory_id]]
+            memory_id = parent[memory_id]
+        return memory_id
+
+    masks = probe_masks(max_distance // BAND_COUNT)
+    for memory_id, values in bands.items():
+        value = hashes[memory_id]
+        for band, band_value in enumerate(values):
+            bucket = buckets[band]
+            for mask in masks:
+                for other_id in bucket.get(band_value ^ mask, ()):
+                    if other_id > memory_id and (value ^ hashes[other_id]).bit_count() <= max_distance:
+                        parent[find(other_id)] = find(memory_id)
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(find(row.id), []).append(row.id)
+    return [ids for ids in groups.values() if len(ids) > 1]
+
+def _backfill_hash_job(job):
+    """기존 이미지 해시 계산 작업 (프로세스 풀에서 실행)"""
+    try:
+        return job['memory_id'], compute_image_hash(job['file_path']), None
+    except Exception as e:
+        return job['memory_id'], None, str(e)
+
+def backfill_image_hashes(app, workers=None, batch_size=500):
+    """해시가 없는 기존 추억 사진의 해시를 병렬 계산 후 (처리 수, 실패 수) 반환"""
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    upload_folder = app.config['UPLOAD_FOLDER']
+    query = db.select(Memory.id, Memory.image_path)\
+              .where(Memory.image_path.isnot(None), Memory.image_path != '', Memory.image_hash.is_(None))
+
+    jobs = [{
+        'memory_id': row.id,
+        'file_path': os.path.join(upload_folder, row.image_path)
+    } for row in db.session.execute(query.execution_options(yield_per=500))
+      if os.path.exists(os.path.join(upload_folder, row.image_path))]
+
+    processed = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for memory_id, image_hash, error in executor.map(_backfill_hash_job, jobs, chunksize=16):
+            if error:
+                logging.warning(f"Image hash backfill failed for memory {memory_id}: {error}")
+                failed += 1
+                continue
+
+            Memory.query.filter_by(id=memory_id).update({Memory.image_hash: image_hash},
+                                                        synchronize_session=False)
+            processed += 1
+            if processed % batch_size == 0:
+                db.session.commit()
+
+    db.session.commit()
+    return processed, failed
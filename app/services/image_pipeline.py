@@ -0,0 +1,450 @@
+"""메모리 이미지 백그라운드 처리 파이프라인
+
+업로드 요청은 헤더만 검사한 원본 파일을 저장하고 즉시 응답합니다.
+디코딩, 방향 보정, 리사이즈, 재인코딩 같은 무거운 작업은 사진마다 한 번
+디코딩한 이미지로 모든 출력을 만들며, 프로세스 풀에서 실행되어 eventlet 워커의
+다른 연결을 막지 않습니다. 처리가 끝나면 커플 룸으로 Socket.IO 이벤트를
+보내 화면의 이미지를 갱신합니다.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.services.image_hash import compute_dhash, to_signed, find_similar_memories
+
+# 처리할 수 있는 이미지 형식 (헤더로 판별, 확장자와 무관)
+SUPPORTED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# 디코딩하지 않고 거부하는 최대 픽셀 수 (압축 폭탄 방지)
+DEFAULT_MAX_PIXELS = 40_000_000
+
+# 정규화 후 남기는 이미지 정보 (EXIF, XMP 등은 제거)
+KEEP_INFO = ('icc_profile', 'transparency')
+
+# 이미지 처리 상태
+STATUS_PROCESSING = 'processing'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
+# 완료된 작업을 확인하는 간격 (초)
+DISPATCH_INTERVAL = 0.2
+
+def _save_atomic(image, file_path, image_format, **params):
+    """임시 파일에 저장한 뒤 교체 (같은 파일을 동시에 처리해도 깨지지 않도록)"""
+    temp_path = f'{file_path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    try:
+        image.save(temp_path, image_format, **params)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+class ImageRejected(ValueError):
+    """디코딩 전에 거부된 이미지 (메시지는 사용자에게 그대로 표시)"""
+
+def open_image(source, max_pixels=DEFAULT_MAX_PIXELS):
+    """헤더만 읽어 이미지를 열고 형식과 픽셀 수 검사
+
+    Image.open은 픽셀을 디코딩하지 않으므로 압축 폭탄도 메모리를 쓰기 전에
+    거부됩니다. 검사를 통과한 열린 이미지를 반환합니다. 파일 객체를 넘긴
+    경우 이미지를 닫으면 그 파일도 닫힙니다.
+    """
+    try:
+        image = Image.open(source, formats=SUPPORTED_FORMATS)
+    except Image.DecompressionBombError as e:
+        raise ImageRejected('이미지 해상도가 너무 큽니다.') from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise ImageRejected('유효하지 않은 이미지 파일입니다.') from e
+
+    width, height = image.size
+    if width * height > max_pixels:
+        if isinstance(source, (str, os.PathLike)):
+            image.close()
+        raise ImageRejected('이미지 해상도가 너무 큽니다.')
+    return image
+
+def normalize_image(image, max_dimension=None):
+    """한 번 디코딩해 방향 보정, 메타데이터 제거, 크기 제한을 적용한 이미지 반환
+
+    JPEG는 목표 크기에 맞는 배율로 디코딩(draft)해 큰 사진도 빠르게
+    처리합니다. 반환된 이미지로 필요한 모든 출력을 만들면 됩니다.
+    """
+    if max_dimension and max(image.size) > max_dimension:
+        scale = max_dimension / max(image.size)
+        image.draft(image.mode, (round(image.size[0] * scale), round(image.size[1] * scale)))
+
+    image.load()
+    ImageOps.exif_transpose(image, in_place=True)
+
+    # EXIF, XMP 등 메타데이터 제거 (보안상 이유)
+    image.info = {key: image.info[key] for key in KEEP_INFO if key in image.info}
+
+    if max_dimension and max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    return image
+
+def _flatten(image):
+    """투명도를 흰 배경에 합성한 RGB 이미지 (JPEG 저장용)"""
+    if image.mode in ('RGB', 'L'):
+        return image
+    image = image.convert('RGBA')
+    flattened = Image.new('RGB', image.size, (255, 255, 255))
+    flattened.paste(image, mask=image.split()[-1])
+    return flattened
+
+def save_image(image, file_path, image_format, quality=85, **params):
+    """정규화된 이미지를 형식에 맞는 모드로 변환해 저장"""
+    if image_format == 'JPEG':
+        image = _flatten(image)
+    elif image_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB')
+    _save_atomic(image, file_path, image_format, optimize=True, quality=quality, **params)
+
+def write_variants(image, upload_folder, filename, widths, quality=80, webp_method=4):
+    """정규화된 이미지에서 너비별 WebP/JPEG 파생 이미지 생성
+
+    원본보다 작은 너비만 만들며, 큰 너비부터 차례로 줄여 나가 매번
+    원본 전체를 다시 리샘플링하지 않습니다. 파생 파일은 원본과 같은
+    디렉토리에 저장되고, 업로드 폴더 기준 경로가 너비 오름차순으로 반환됩니다.
+    webp_method는 WebP 인코딩 속도/압축 단계(0-6)로, 낮을수록 빠릅니다.
+    """
+    variants = []
+    current = image.convert('RGBA') if image.mode in ('RGBA', 'LA', 'P', 'PA') else image.convert('RGB')
+
+    for width in sorted(widths, reverse=True):
+        if width >= current.size[0]:
+            continue
+
+        height = max(1, round(current.size[1] * width / current.size[0]))
+        current = current.resize((width, height), Image.Resampling.LANCZOS)
+
+        webp_name = get_variant_filename(filename, width, 'webp')
+        _save_atomic(current, os.path.join(upload_folder, webp_name), 'WEBP',
+                     quality=quality, method=webp_method)
+
+        # JPEG는 투명도를 지원하지 않으므로 흰 배경에 합성
+        jpeg_name = get_variant_filename(filename, width, 'jpg')
+        _save_atomic(_flatten(current), os.path.join(upload_folder, jpeg_name), 'JPEG',
+                     quality=quality, optimize=True, progressive=True)
+
+        variants.append({
+            'width': width,
+            'height': height,
+            'webp': webp_name,
+            'jpeg': jpeg_name
+        })
+
+    variants.sort(key=lambda variant: variant['width'])
+    return variants
+
+def process_image(image, target_path, upload_folder, filename, max_dimension, widths,
+                  quality=80, webp_method=4):
+    """열린 이미지를 한 번 디코딩해 정규화한 원본과 파생 이미지를 모두 저장
+
+    원본은 target_path에, 파생 이미지는 filename 기준 이름으로 upload_folder에
+    저장합니다. 크기, 파생 이미지 목록, 유사 검출 해시를 반환합니다.
+    """
+    image_format = image.format
+    image = normalize_image(image, max_dimension)
+    save_image(image, target_path, image_format)
+
+    return {
+        'width': image.size[0],
+        'height': image.size[1],
+        'variants': write_variants(image, upload_folder, filename, widths, quality, webp_method),
+        'image_hash': to_signed(compute_dhash(image))
+    }
+
+def optimize_image_file(file_path, max_dimension, max_pixels=DEFAULT_MAX_PIXELS):
+    """이미지 최적화 (방향 보정, EXIF 제거, 최대 크기 제한 후 재저장)
+
+    Flask 컨텍스트에 의존하지 않으므로 별도 프로세스에서 실행할 수 있습니다.
+    """
+    with open_image(file_path, max_pixels) as image:
+        image_format = image.format
+        image = normalize_image(image, max_dimension)
+
+        # 최적화된 이미지 저장
+        save_image(image, file_path, image_format)
+        return {'width': image.size[0], 'height': image.size[1]}
+
+def get_variant_filename(filename, width, extension):
+    """파생 이미지 파일명 (원본 이름_w너비.확장자)"""
+    base_name = os.path.splitext(filename)[0]
+    return f'{base_name}_w{width}.{extension}'
+
+def generate_variants(upload_folder, filename, widths, quality=80, source_path=None, webp_method=4,
+                      max_pixels=DEFAULT_MAX_PIXELS):
+    """저장된 이미지 파일의 반응형 파생 이미지 생성 (write_variants 참고)
+
+    source_path를 주면 아직 제자리에 놓이지 않은 파일(임시 파일)에서 만듭니다.
+    """
+    with open_image(source_path or os.path.join(upload_folder, filename), max_pixels) as image:
+        return write_variants(normalize_image(image), upload_folder, filename, widths, quality, webp_method)
+
+def process_memory_image(job):
+    """메모리 이미지 처리 작업 (프로세스 풀에서 실행)"""
+    with open_image(job['file_path'], job['max_pixels']) as image:
+        return process_image(image, job['file_path'], job['upload_folder'], job['filename'],
+                             job['max_dimension'], job['variant_widths'], job['variant_quality'])
+
+class ImagePipeline:
+    """메모리 이미지 처리 작업 큐
+
+    작업은 크기가 제한된 풀에서 실행되며, 대기 중인 작업이 IMAGE_QUEUE_SIZE에
+    도달하면 라우트가 새 업로드를 받지 않습니다(is_busy). 풀은 워커 프로세스마다
+    처음 사용할 때 만들어지므로 gunicorn preload 환경에서도 fork 이후에 생성됩니다.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._executor_pid = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._dispatcher_running = False
+        self._app = None
+
+    def is_busy(self, app):
+        """대기 중인 작업이 한도에 도달했는지 확인 (업로드 받기 전에 호출)"""
+        return len(self._pending) >= app.config.get('IMAGE_QUEUE_SIZE', 32)
+
+    @staticmethod
+    def build_job(app, memory_id, couple_id, filename):
+        """추억 이미지 처리 작업 정보"""
+        return {
+            'memory_id': memory_id,
+            'couple_id': couple_id,
+            'filename': filename,
+            'upload_folder': app.config['UPLOAD_FOLDER'],
+            'file_path': os.path.join(app.config['UPLOAD_FOLDER'], filename),
+            'max_dimension': app.config.get('IMAGE_MAX_DIMENSION', 2048),
+            'max_pixels': app.config.get('IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS),
+            'variant_widths': app.config.get('IMAGE_VARIANT_WIDTHS', (320, 640, 1280)),
+            'variant_quality': app.config.get('IMAGE_VARIANT_QUALITY', 80)
+        }
+
+    def submit(self, app, memory_id, couple_id, filename):
+        """이미지 처리 작업 제출 (처리 모드가 'sync'이면 즉시 처리)"""
+        job = self.build_job(app, memory_id, couple_id, filename)
+        if app.config.get('IMAGE_PROCESSING_MODE', 'process') == 'sync':
+            self.run_now(app, job)
+            return
+
+        with self._lock:
+            future = self._get_executor(app).submit(process_memory_image, job)
+            self._pending[future] = job
+            self._app = app
+
+            if not self._dispatcher_running:
+                self._dispatcher_running = True
+                from app.extensions import socketio
+                socketio.start_background_task(self._dispatch_loop)
+
+    def run_now(self, app, job):
+        """작업을 현재 프로세스에서 바로 처리하고 결과 반영"""
+        try:
+            result = process_memory_image(job)
+        except Exception as e:
+            self._complete(app, job, None, e)
+        else:
+            self._complete(app, job, result, None)
+
+    def pending_count(self):
+        """대기 중인 작업 수"""
+        return len(self._pending)
+
+    def _get_executor(self, app):
+        """현재 프로세스의 작업 풀 반환 (fork 후 새로 생성)"""
+        if self._executor is None or self._executor_pid != os.getpid():
+            workers = app.config.get('IMAGE_WORKERS') or max(1, (os.cpu_count() or 2) // 2)
+            if app.config.get('IMAGE_PROCESSING_MODE', 'process') == 'thread':
+                self._executor = ThreadPoolExecutor(max_workers=workers)
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _dispatch_loop(self):
+        """완료된 작업을 협조적으로 수거하는 백그라운드 태스크"""
+        from app.extensions import socketio
+
+        while True:
+            with self._lock:
+                done = [future for future in self._pending if future.done()]
+                jobs = [(future, self._pending.pop(future)) for future in done]
+                if not jobs and not self._pending:
+                    self._dispatcher_running = False
+                    return
+
+            for future, job in jobs:
+                error = future.exception()
+                self._complete(self._app, job, None if error else future.result(), error)
+
+            socketio.sleep(DISPATCH_INTERVAL)
+
+    def _complete(self, app, job, result, error):
+        """작업 결과를 DB에 반영하고 커플에게 알림"""
+        from app.extensions import db, socketio
+        from app.models.memory import Memory
+
+        with app.app_context():
+            try:
+                memory = db.session.get(Memory, job['memory_id'])
+                if memory is None or memory.image_path != job['filename']:
+                    # 처리 중 삭제되었거나 이미지가 교체된 경우
+                    return
+
+                if error is None:
+                    memory.set_variants(result['variants'])
+                    # 정규화한 사진을 디코딩한 김에 계산한 해시로 유사 검출
+                    if result.get('image_hash') is not None:
+                        memory.image_hash = result['image_hash']
+                    memory.image_status = STATUS_READY
+                else:
+                    logging.warning(f"Memory image processing failed ({job['filename']}): {error}")
+                    memory.delete_image()
+                    memory.image_path = None
+                    memory.image_variants = None
+                    memory.image_hash = None
+                    memory.image_status = STATUS_FAILED
+
+                db.session.commit()
+
+                # 이미 비슷한 사진의 추억이 있으면 처리 완료 이벤트에 함께 보냄 (추가는 그대로 유지)
+                similar = []
+                if memory.image_status == STATUS_READY:
+                    similar = [
+                        {'id': match.id, 'title': match.title}
+                        for match, _ in find_similar_memories(memory.couple_id, memory.image_hash,
+                                                              app.config.get('DUPLICATE_MAX_DISTANCE', 6),
+                                                              exclude_id=memory.id, limit=3)
+                    ]
+
+                socketio.emit('memory_image_status', {
+                    'memory_id': memory.id,
+                    'status': memory.image_status,
+                    'image_url': memory.get_image_url(),
+                    'thumbnail_url': memory.get_thumbnail_url(),
+                    'similar': similar
+                }, room=f"couple_{job['couple_id']}")
+
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Failed to finalize memory image {job['memory_id']}: {e}")
+
+def recover_stuck_images(app, stale_minutes=None):
+    """처리 중 상태로 남은 추억 이미지를 다시 처리하고 (처리한 수, 실패한 수) 반환
+
+    대기 중인 작업은 워커 프로세스 메모리에만 있으므로 재시작이나 배포로
+    사라지면 추억이 'processing'에 머물고 EXIF가 남은 원본이 계속 제공됩니다.
+    업로드 파일이 stale_minutes(기본: IMAGE_STUCK_MINUTES)분 넘게 바뀌지 않은
+    행을 현재 프로세스에서 바로 처리해 준비 완료 또는 실패(원본 삭제)로 만듭니다.
+    """
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    upload_folder = app.config['UPLOAD_FOLDER']
+    if stale_minutes is None:
+        stale_minutes = app.config.get('IMAGE_STUCK_MINUTES', 30)
+    cutoff = time.time() - stale_minutes * 60
+
+    rows = db.session.execute(
+        db.select(Memory.id, Memory.couple_id, Memory.image_path)
+          .where(Memory.image_status == STATUS_PROCESSING)
+    ).all()
+
+    processed = failed = 0
+    for row in rows:
+        if not row.image_path:
+            Memory.query.filter_by(id=row.id).update({Memory.image_status: STATUS_FAILED},
+                                                     synchronize_session=False)
+            db.session.commit()
+            failed += 1
+            continue
+
+        file_path = os.path.join(upload_folder, row.image_path)
+        try:
+            if os.path.getmtime(file_path) > cutoff:
+                # 아직 워커가 처리 중일 수 있는 최근 업로드
+                continue
+        except OSError:
+            pass
+
+        image_pipeline.run_now(app, image_pipeline.build_job(app, row.id, row.couple_id, row.image_path))
+        if db.session.get(Memory, row.id).image_status == STATUS_READY:
+            processed += 1
+        else:
+            failed += 1
+    return processed, failed
+
+def _backfill_variants_job(job):
+    """기존 이미지 파생본 생성 작업 (프로세스 풀에서 실행)"""
+    try:
+        variants = generate_variants(job['upload_folder'], job['filename'],
+                                     job['variant_widths'], job['variant_quality'])
+        return job['memory_id'], variants, None
+    except Exception as e:
+        return job['memory_id'], None, str(e)
+
+def backfill_image_variants(app, workers=None, force=False, batch_size=100):
+    """업로드 폴더의 기존 메모리 이미지에 대해 파생 이미지를 병렬 생성
+
+    대상 행은 필요한 컬럼만 스트리밍으로 읽고, 결과는 batch_size 단위로
+    커밋합니다. 원본이 아직 정규화되지 않은 'processing' 행은 파생본만 만들고
+    준비 완료로 바꾸지 않고, recover_stuck_images로 전체 처리를 다시 거칩니다.
+    처리한 수와 실패한 수를 반환합니다.
+    """
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    upload_folder = app.config['UPLOAD_FOLDER']
+    widths = app.config.get('IMAGE_VARIANT_WIDTHS', (320, 640, 1280))
+    quality = app.config.get('IMAGE_VARIANT_QUALITY', 80)
+
+    query = db.select(Memory.id, Memory.image_path)\
+              .where(Memory.image_path.isnot(None), Memory.image_path != '',
+                     db.or_(Memory.image_status.is_(None), Memory.image_status != STATUS_PROCESSING))
+    if not force:
+        query = query.where(Memory.image_variants.is_(None))
+
+    # 쓰기 트랜잭션과 겹치지 않도록 대상 목록을 먼저 확정
+    jobs = [{
+        'memory_id': row.id,
+        'upload_folder': upload_folder,
+        'filename': row.image_path,
+        'variant_widths': widths,
+        'variant_quality': quality
+    } for row in db.session.execute(query.execution_options(yield_per=500))
+      if os.path.exists(os.path.join(upload_folder, row.image_path))]
+
+    processed = 0
+    failed = 0
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for memory_id, variants, error in executor.map(_backfill_variants_job, jobs, chunksize=4):
+            if error:
+                logging.warning(f"Variant backfill failed for memory {memory_id}: {error}")
+                failed += 1
+                continue
+
+            Memory.query.filter_by(id=memory_id).update(
+                {Memory.image_variants: Memory.serialize_variants(variants),
+                 Memory.image_status: STATUS_READY},
+                synchronize_session=False
+            )
+            processed += 1
+            if processed % batch_size == 0:
+                db.session.commit()
+
+    db.session.commit()
+
+    # 리사이즈, EXIF 제거가 끝나지 않은 원본은 파이프라인으로 처리
+    recovered, recover_failed = recover_stuck_images(app)
+    return processed + recovered, failed + recover_failed
+
+# 전역 이미지 처리 파이프라인
+image_pipeline = ImagePipeline()
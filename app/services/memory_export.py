@@ -0,0 +1,325 @@
+"""메모리 북 내보내기 서비스 (스트리밍 ZIP)
+
+추억을 서버 측 커서로 조금씩 읽으며 ZIP을 생성기로 흘려보내므로 사진이
+수천 장이어도 워커 메모리 사용량이 일정합니다. 이미 압축된 이미지는
+STORED로, 색인 파일은 DEFLATED로 저장합니다.
+
+아카이브 구성:
+    images/<날짜>_<id>.<확장자>   추억 사진 원본
+    memories.json                 추억 데이터
+    index.html                    브라우저로 열어 보는 메모리 북
+    manifest.json                 파일별 크기, SHA-256, 추억 커서 (이어받기/검증용)
+
+사진이 많은 커플은 백그라운드 작업으로 내보내기 파일을 만든 뒤 다운로드
+링크를 제공합니다. 완성된 파일은 Range 요청을 지원하므로 끊긴 다운로드를
+이어받을 수 있습니다.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import logging
+import zipfile
+import tempfile
+from datetime import datetime
+from markupsafe import escape
+from app.extensions import db
+from app.models.memory import Memory
+from app.models.user import User
+from app.services.memory_feed import apply_keyset, encode_cursor
+
+# 서버 측 커서가 한 번에 가져오는 행 수
+EXPORT_BATCH_SIZE = 100
+
+# 이미지 파일을 읽는 단위
+READ_CHUNK_SIZE = 64 * 1024
+
+# 아카이브 형식 버전 (manifest.json)
+EXPORT_FORMAT_VERSION = 1
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+STATUS_PROCESSING = 'processing'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
+class _ZipStream:
+    """ZipFile이 쓴 바이트를 모아 두었다가 꺼내 주는 쓰기 전용 스트림
+
+    seek/tell이 없으므로 ZipFile은 데이터 디스크립터를 사용하는 스트리밍
+    모드로 동작합니다.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """지금까지 쓰인 바이트를 꺼내고 비움"""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_export_rows(couple_id, after=None):
+    """내보낼 추억을 서버 측 커서로 최신순 순회 (after는 피드 커서)"""
+    statement = apply_keyset(
+        db.select(
+            Memory.id,
+            Memory.title,
+            Memory.content,
+            Memory.memory_date,
+            Memory.image_path,
+            Memory.created_at,
+            User.name.label('creator_name')
+        ).join(User, User.id == Memory.created_by)
+         .where(Memory.couple_id == couple_id),
+        after
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    yield from db.session.execute(statement)
+
+def get_archive_image_name(row):
+    """아카이브 안의 사진 경로"""
+    ext = os.path.splitext(row.image_path)[1].lower()
+    return f'images/{row.memory_date.isoformat()}_{row.id}{ext}'
+
+def _iter_file(path):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def _iter_memories_json(couple_id, after, exported_at, image_names):
+    """memories.json 내용을 추억 하나씩 생성"""
+    yield ('{"exported_at": %s, "memories": [' % json.dumps(exported_at)).encode()
+    separator = '\n'
+    for row in iter_export_rows(couple_id, after):
+        item = {
+            'id': row.id,
+            'title': row.title,
+            'content': row.content,
+            'memory_date': row.memory_date.isoformat(),
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'creator_name': row.creator_name,
+            'image': get_archive_image_name(row) if row.id in image_names else None
+        }
+        yield (separator + json.dumps(item, ensure_ascii=False)).encode()
+        separator = ',\n'
+    yield b'\n]}\n'
+
+def _iter_index_html(couple_id, after, image_names):
+    """index.html 내용을 추억 하나씩 생성"""
+    yield ('<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n'
+           '<title>메모리 북</title>\n<style>\n'
+           'body{font-family:sans-serif;max-width:720px;margin:2rem auto;padding:0 1rem;color:#333}\n'
+           'article{border-bottom:1px solid #eee;padding:1.5rem 0}\n'
+           'img{max-width:100%;border-radius:8px}\ntime{color:#888}\n'
+           '</style>\n</head>\n<body>\n<h1>📖 메모리 북</h1>\n').encode()
+    for row in iter_export_rows(couple_id, after):
+        parts = [f'<article>\n<h2>{escape(row.title)}</h2>\n',
+                 f'<time datetime="{row.memory_date.isoformat()}">'
+                 f'{row.memory_date.strftime("%Y년 %m월 %d일")}</time>\n']
+        if row.id in image_names:
+            parts.append(f'<p><img src="{get_archive_image_name(row)}" loading="lazy" '
+                         f'alt="{escape(row.title)}"></p>\n')
+        content = escape(row.content or '').replace('\n', '<br>\n')
+        parts.append(f'<p>{content}</p>\n</article>\n')
+        yield ''.join(parts).encode()
+    yield b'</body>\n</html>\n'
+
+def generate_export_archive(couple_id, upload_folder, after=None):
+    """메모리 북 ZIP 바이트를 조각 단위로 생성
+
+    after에 피드 커서를 주면 그보다 오래된 추억만 내보냅니다 (이어받기).
+    파일 목록은 임시 파일에 모아 두었다가 마지막에 manifest.json으로 씁니다.
+    """
+    stream = _ZipStream()
+    exported_at = datetime.now().isoformat(timespec='seconds')
+    image_names = set()
+    memory_count = 0
+
+    with tempfile.TemporaryFile() as manifest_lines:
+        archive = zipfile.ZipFile(stream, 'w', allowZip64=True)
+
+        def write_member(name, chunks, compress_type, memory_id=None, cursor=None):
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = compress_type
+            info.external_attr = 0o644 << 16
+            digest = hashlib.sha256()
+            size = 0
+            with archive.open(info, 'w') as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    data = stream.drain()
+                    if data:
+                        yield data
+            # 닫을 때 쓰인 데이터 디스크립터
+            yield stream.drain()
+
+            entry = {'path': name, 'size': size, 'sha256': digest.hexdigest()}
+            if memory_id is not None:
+                entry.update({'memory_id': memory_id, 'cursor': cursor})
+            manifest_lines.write(json.dumps(entry, ensure_ascii=False).encode() + b'\n')
+
+        # 1. 사진 (이미 압축된 형식이므로 STORED)
+        for row in iter_export_rows(couple_id, after):
+            memory_count += 1
+            if not row.image_path:
+                continue
+            path = os.path.join(upload_folder, row.image_path)
+            if not os.path.isfile(path):
+                logging.warning(f"Export skipped missing image: {row.image_path}")
+                continue
+            image_names.add(row.id)
+            yield from write_member(get_archive_image_name(row), _iter_file(path), zipfile.ZIP_STORED,
+                                    memory_id=row.id, cursor=encode_cursor(row.memory_date, row.id))
+
+        # 2. 색인 파일 (다시 커서로 순회하므로 추억을 메모리에 모아 두지 않음)
+        yield from write_member('memories.json', _iter_memories_json(couple_id, after, exported_at, image_names),
+                                zipfile.ZIP_DEFLATED)
+        yield from write_member('index.html', _iter_index_html(couple_id, after, image_names),
+                                zipfile.ZIP_DEFLATED)
+
+        # 3. 매니페스트
+        def iter_manifest():
+            yield json.dumps({
+                'format': EXPORT_FORMAT_VERSION,
+                'exported_at': exported_at,
+                'memory_count': memory_count,
+                'after': after
+            }, ensure_ascii=False)[:-1].encode() + b', "files": ['
+            manifest_lines.seek(0)
+            separator = b'\n'
+            for line in manifest_lines:
+                yield separator + line.rstrip(b'\n')
+                separator = b',\n'
+            yield b'\n]}\n'
+
+        yield from write_member('manifest.json', iter_manifest(), zipfile.ZIP_DEFLATED)
+
+        archive.close()
+        yield stream.drain()
+
+def get_export_folder(app, couple_id):
+    """커플의 내보내기 파일 폴더"""
+    base = app.config.get('EXPORT_FOLDER') or os.path.join(app.instance_path, 'exports')
+    return os.path.join(base, str(couple_id))
+
+def _is_stale_part(app, path):
+    """EXPORT_STALE_SECONDS 넘게 쓰이지 않은 .zip.part인지 여부 (작업이 죽은 경우)"""
+    try:
+        return os.path.getmtime(path) < time.time() - app.config.get('EXPORT_STALE_SECONDS', 300)
+    except OSError:
+        return False
+
+def get_export_job(app, couple_id, job_id):
+    """내보내기 작업 상태 반환 (없으면 None)
+
+    상태는 파일로 판단하므로 여러 워커 프로세스에서 같은 결과를 봅니다.
+    """
+    if not JOB_ID_PATTERN.match(job_id or ''):
+        return None
+    base = os.path.join(get_export_folder(app, couple_id), job_id)
+    if os.path.exists(base + '.zip'):
+        return {'status': STATUS_READY, 'path': base + '.zip', 'size': os.path.getsize(base + '.zip')}
+    if os.path.exists(base + '.zip.part') and not _is_stale_part(app, base + '.zip.part'):
+        return {'status': STATUS_PROCESSING}
+    if os.path.exists(base + '.failed') or os.path.exists(base + '.zip.part'):
+        return {'status': STATUS_FAILED}
+    return None
+
+def cleanup_exports(app, couple_id):
+    """보관 기간이 지난 내보내기 파일과 멈춘 작업의 임시 파일 삭제
+
+    멈춘 작업(프로세스가 죽어 더 쓰이지 않는 .zip.part)은 실패로 기록합니다.
+    """
+    folder = get_export_folder(app, couple_id)
+    cutoff = time.time() - app.config.get('EXPORT_RETENTION_HOURS', 24) * 3600
+    try:
+        entries = list(os.scandir(folder))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+            elif entry.name.endswith('.zip.part') and _is_stale_part(app, entry.path):
+                open(entry.path[:-len('.zip.part')] + '.failed', 'wb').close()
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+def find_running_job(app, couple_id):
+    """진행 중인 내보내기 작업 ID (없으면 None)"""
+    try:
+        entries = list(os.scandir(get_export_folder(app, couple_id)))
+    except FileNotFoundError:
+        return None
+    for entry in entries:
+        if entry.name.endswith('.zip.part') and not _is_stale_part(app, entry.path):
+            return entry.name[:-len('.zip.part')]
+    return None
+
+def start_export_job(app, couple_id, download_url):
+    """백그라운드 내보내기 작업 시작 후 작업 ID 반환
+
+    커플당 하나만 실행하며, 이미 진행 중이면 그 작업 ID를 반환합니다.
+    download_url은 완료 알림에 담을 다운로드 주소 형식('{job_id}' 포함)입니다.
+    """
+    from app.extensions import socketio
+
+    cleanup_exports(app, couple_id)
+    running = find_running_job(app, couple_id)
+    if running:
+        return running
+
+    folder = get_export_folder(app, couple_id)
+    os.makedirs(folder, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    part_path = os.path.join(folder, job_id + '.zip.part')
+    open(part_path, 'wb').close()
+
+    socketio.start_background_task(_run_export_job, app, couple_id, job_id, part_path,
+                                   download_url.format(job_id=job_id))
+    return job_id
+
+def _run_export_job(app, couple_id, job_id, part_path, download_url):
+    """내보내기 파일을 만들고 커플에게 완료 알림"""
+    from app.extensions import socketio
+
+    base = part_path[:-len('.zip.part')]
+    with app.app_context():
+        try:
+            with open(part_path, 'wb') as f:
+                for chunk in generate_export_archive(couple_id, app.config['UPLOAD_FOLDER']):
+                    f.write(chunk)
+                    # 읽기/해시/압축이 길어져도 같은 워커의 다른 요청이 멈추지 않도록 양보
+                    socketio.sleep(0)
+            os.replace(part_path, base + '.zip')
+            status = STATUS_READY
+        except Exception as e:
+            logging.error(f"Memory export failed (couple {couple_id}): {e}")
+            open(base + '.failed', 'wb').close()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            status = STATUS_FAILED
+        finally:
+            db.session.remove()
+
+        socketio.emit('memory_export_status', {
+            'job_id': job_id,
+            'status': status,
+            'download_url': download_url if status == STATUS_READY else None
+        }, room=f'couple_{couple_id}')
@@ -0,0 +1,94 @@
+"""메모리 북 피드 서비스 (키셋 페이지네이션)
+
+(memory_date, id) 역순 키셋으로 다음 페이지를 가져오므로 깊은 페이지에서도
+건너뛴 행을 다시 읽지 않고, 전체 개수(COUNT)도 계산하지 않습니다.
+커서는 마지막 항목의 (날짜, id)를 URL에 안전한 문자열로 인코딩한 값입니다.
+"""
+
+import base64
+import binascii
+from datetime import date
+from sqlalchemy import func, tuple_
+from app.extensions import db
+from app.models.memory import Memory
+from app.models.user import User
+
+# 페이지당 추억 수
+FEED_PAGE_SIZE = 12
+
+# 피드 항목의 내용 미리보기 길이
+PREVIEW_LENGTH = 100
+
+def encode_cursor(memory_date, memory_id):
+    """(날짜, id)를 커서 문자열로 인코딩"""
+    raw = f'{memory_date.isoformat()}:{memory_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """커서 문자열을 (날짜, id)로 디코딩 (잘못된 커서는 ValueError)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded).decode().split(':')
+        return date.fromisoformat(date_part), int(id_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError('잘못된 커서입니다.') from e
+
+def apply_keyset(statement, cursor):
+    """커서 이후(더 오래된) 항목만 남기고 키셋 순서로 정렬"""
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Memory.memory_date, Memory.id) < (cursor_date, cursor_id))
+    return statement.order_by(Memory.memory_date.desc(), Memory.id.desc())
+
+def _split_page(rows, limit):
+    """limit+1개 조회 결과를 (현재 페이지, 다음 커서)로 분리"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].memory_date, rows[-1].id)
+
+def get_feed_memories(couple_id, cursor=None, limit=FEED_PAGE_SIZE):
+    """템플릿 렌더링용 Memory 목록과 다음 커서 반환"""
+    statement = apply_keyset(db.select(Memory).where(Memory.couple_id == couple_id), cursor)
+    memories = db.session.execute(statement.limit(limit + 1)).scalars().all()
+    return _split_page(memories, limit)
+
+def get_feed_page(couple_id, cursor=None, limit=FEED_PAGE_SIZE):
+    """피드 API용 항목 목록과 다음 커서 반환
+
+    작성자 이름까지 조인한 쿼리 한 번으로 필요한 컬럼만 읽습니다.
+    """
+    statement = apply_keyset(
+        db.select(
+            Memory.id,
+            Memory.title,
+            func.substr(Memory.content, 1, PREVIEW_LENGTH + 1).label('preview'),
+            Memory.memory_date,
+            Memory.image_path,
+            Memory.image_status,
+            Memory.image_variants,
+            User.name.label('creator_name')
+        ).join(User, User.id == Memory.created_by)
+         .where(Memory.couple_id == couple_id),
+        cursor
+    )
+    rows, next_cursor = _split_page(db.session.execute(statement.limit(limit + 1)).all(), limit)
+
+    items = []
+    for row in rows:
+        variants = Memory.parse_variants(row.image_variants) if row.image_path else []
+        preview = row.preview or ''
+        items.append({
+            'id': row.id,
+            'title': row.title,
+            'preview': preview[:PREVIEW_LENGTH],
+            'truncated': len(preview) > PREVIEW_LENGTH,
+            'memory_date': row.memory_date.isoformat(),
+            'formatted_date': row.memory_date.strftime('%Y년 %m월 %d일'),
+            'creator_name': row.creator_name,
+            'thumbnail_url': Memory.build_thumbnail_url(row.image_path, variants),
+            'srcset_webp': Memory.build_srcset(variants, 'webp') or None,
+            'srcset_jpeg': Memory.build_srcset(variants, 'jpeg') or None,
+            'image_processing': bool(row.image_path) and row.image_status == 'processing'
+        })
+    return items, next_cursor
@@ -0,0 +1,382 @@
+"""추억 일괄 가져오기 서비스 (ZIP)
+
+다른 앱에서 옮겨 오는 커플이 사진을 한 장씩 올리지 않도록 ZIP 안의 사진을
+한 번에 추억으로 만듭니다. 사진 검증, EXIF 날짜 추출, 최적화와 파생 이미지
+생성은 프로세스 풀에서 병렬로 실행하고, Memory 행은 배치 단위 트랜잭션으로
+추가합니다.
+
+ZIP에 memories.json(메모리 북 내보내기 형식)이 있으면 각 항목의 image 경로로
+사진과 짝지어 제목, 내용, 날짜를 가져옵니다. 없으면 파일명을 제목으로,
+EXIF 촬영일(없으면 ZIP 항목 날짜)을 추억 날짜로 사용합니다.
+"""
+
+import io
+import os
+import html
+import json
+import uuid
+import logging
+import zipfile
+import hashlib
+import tempfile
+from collections import deque
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import ImageOps
+from app.services.image_pipeline import (
+    open_image, process_image, ImageRejected, DEFAULT_MAX_PIXELS,
+    STATUS_PROCESSING, STATUS_READY, DISPATCH_INTERVAL
+)
+from app.services.upload_storage import shard_path, TEMP_PREFIX
+from app.services.image_hash import compute_dhash, to_signed, HASH_SIZE
+from app.utils.security import sanitize_input
+
+# 가져올 수 있는 사진 확장자 (실제 형식은 이미지 헤더로 검사)
+IMPORT_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+# 메타데이터 파일 (메모리 북 내보내기와 같은 형식)
+METADATA_NAME = 'memories.json'
+
+# EXIF 태그
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME = 0x0132
+
+# 워커 하나당 동시에 제출해 두는 작업 수
+JOBS_PER_WORKER = 4
+
+TITLE_MAX_LENGTH = 100
+CONTENT_MAX_LENGTH = 2000
+
+def list_import_images(archive, max_image_size):
+    """ZIP에서 가져올 사진 항목 목록 (폴더, 숨김 파일, 너무 큰 파일 제외)"""
+    images = []
+    for info in archive.infolist():
+        name = info.filename
+        basename = os.path.basename(name)
+        if info.is_dir() or name.startswith('__MACOSX/') or basename.startswith('.'):
+            continue
+        if basename.rsplit('.', 1)[-1].lower() not in IMPORT_EXTENSIONS or '.' not in basename:
+            continue
+        if max_image_size and info.file_size > max_image_size:
+            raise ValueError(f'사진 파일이 너무 큽니다: {name}')
+        images.append(info)
+    return images
+
+def read_metadata(archive):
+    """memories.json을 (사진 경로별 항목, 사진 없는 항목 목록)으로 반환"""
+    try:
+        raw = archive.read(METADATA_NAME)
+    except KeyError:
+        return {}, []
+
+    try:
+        items = json.loads(raw)['memories']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f'{METADATA_NAME} 파일을 읽을 수 없습니다.') from e
+
+    by_image = {}
+    without_image = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if item.get('image'):
+            by_image[item['image']] = item
+        else:
+            without_image.append(item)
+    return by_image, without_image
+
+def parse_exif_date(image):
+    """EXIF 촬영일(없으면 수정일) 반환"""
+    exif = image.getexif()
+    raw = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(str(raw).strip('\x00 ')[:19], '%Y:%m:%d %H:%M:%S').date()
+    except ValueError:
+        return None
+
+def process_import_image(job):
+    """ZIP 안의 사진 한 장 검증과 처리 (프로세스 풀에서 실행)
+
+    헤더만 읽어 형식과 해상도를 검사한 뒤 원본 해시로 저장 경로를 정하고,
+    처음 보는 사진이면 한 번 디코딩해 최적화한 임시 파일과 파생 이미지를
+    만듭니다. 잘린 파일은 디코딩 중에 오류가 납니다. 임시 파일을 제자리에 놓고 참조를 기록하는
+    일은 DB를 다루는 부모 프로세스가 합니다.
+    """
+    with zipfile.ZipFile(job['zip_path']) as archive:
+        data = archive.read(job['member'])
+
+    try:
+        with open_image(io.BytesIO(data), job['max_pixels']) as image:
+            return _process_opened_image(job, image, data)
+    except ImageRejected as e:
+        raise ValueError(str(e)) from e
+
+def _process_opened_image(job, image, data):
+    """헤더 검사를 통과한 사진을 한 번 디코딩해 임시 파일과 파생 이미지로 저장"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = shard_path(digest, job['ext'])
+    result = {
+        'digest': digest,
+        'path': path,
+        'size': len(data),
+        'exif_date': parse_exif_date(image),
+        'image_hash': None,
+        'temp_path': None,
+        'variants': None
+    }
+
+    upload_folder = job['upload_folder']
+    full_path = os.path.join(upload_folder, path)
+    if os.path.exists(full_path):
+        # 이미 저장된 사진 (부모 프로세스가 기존 파생 이미지를 재사용, 해시만 축소 디코딩으로 계산)
+        image.draft('RGB', (HASH_SIZE * 8, HASH_SIZE * 8))
+        result['image_hash'] = to_signed(compute_dhash(ImageOps.exif_transpose(image)))
+        return result
+
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=upload_folder, prefix=TEMP_PREFIX, suffix='.tmp')
+    os.close(fd)
+    try:
+        processed = process_image(image, temp_path, upload_folder, path, job['max_dimension'],
+                                  job['variant_widths'], job['variant_quality'],
+                                  webp_method=job['webp_method'])
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+    result.update(temp_path=temp_path, variants=processed['variants'], image_hash=processed['image_hash'])
+    return result
+
+def _discard_result(result):
+    """사용하지 않은 처리 결과의 임시 파일 삭제"""
+    if result and result.get('temp_path') and os.path.exists(result['temp_path']):
+        os.remove(result['temp_path'])
+
+def _run_jobs(app, jobs, workers):
+    """작업을 풀에서 실행하고 제출 순서대로 (작업, 결과, 오류) 반환
+
+    한 번에 제출하는 작업 수를 제한해 결과가 메모리에 쌓이지 않게 하며,
+    완료를 기다리는 동안 socketio.sleep으로 다른 연결에 양보합니다.
+    """
+    from app.extensions import socketio
+
+    mode = app.config.get('IMAGE_PROCESSING_MODE', 'process')
+    if mode == 'sync':
+        for job in jobs:
+            try:
+                yield job, process_import_image(job), None
+            except Exception as e:
+                yield job, None, e
+        return
+
+    workers = workers or app.config.get('IMPORT_WORKERS') or os.cpu_count() or 2
+    executor_class = ThreadPoolExecutor if mode == 'thread' else ProcessPoolExecutor
+    window = workers * JOBS_PER_WORKER
+    pending = deque()
+
+    with executor_class(max_workers=workers) as executor:
+        try:
+            for job in jobs:
+                pending.append((job, executor.submit(process_import_image, job)))
+                while len(pending) >= window or (pending and pending[0][1].done()):
+                    yield _collect(pending.popleft(), socketio)
+
+            while pending:
+                yield _collect(pending.popleft(), socketio)
+        finally:
+            # 중단된 경우 남은 작업 취소 후 임시 파일 정리
+            for job, future in pending:
+                future.cancel()
+            for job, future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    _discard_result(future.result())
+
+def _collect(entry, socketio):
+    job, future = entry
+    while not future.done():
+        socketio.sleep(DISPATCH_INTERVAL / 10)
+    error = future.exception()
+    return job, None if error else future.result(), error
+
+def _place_image(upload_folder, result):
+    """처리된 사진의 참조를 기록하고 제자리에 배치한 뒤 (경로, 파생 이미지) 반환
+
+    파생 이미지가 None이면 새로 처리해야 하는 사진입니다.
+    """
+    from app.models.memory import Memory
+    from app.models.upload_blob import UploadBlob
+
+    path, _ = UploadBlob.acquire(result['digest'], result['path'], result['size'])
+    full_path = os.path.join(upload_folder, path)
+
+    temp_path = result['temp_path']
+    if temp_path:
+        if os.path.exists(full_path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(temp_path, full_path)
+
+    if temp_path and path == result['path']:
+        return path, result['variants']
+    return path, Memory.get_ready_variants(path)
+
+def _memory_date(value, fallback, today):
+    """메타데이터 날짜 문자열 또는 대체 날짜 (미래 날짜는 오늘로)"""
+    memory_date = fallback
+    if value:
+        try:
+            memory_date = date.fromisoformat(str(value)[:10])
+        except ValueError:
+            pass
+    return min(memory_date or today, today)
+
+def _clean_text(value, max_length):
+    """직접 등록할 때와 같이 HTML 제거/이스케이프 후 길이 제한
+
+    내보내기의 memories.json에는 저장된(이미 이스케이프된) 값이 들어 있으므로
+    먼저 되돌려 두 번 이스케이프되지 않게 합니다.
+    """
+    return sanitize_input(html.unescape(str(value or '')).strip(), max_length=max_length)
+
+def _memory_fields(meta, default_title, fallback_date, today):
+    title = _clean_text(meta.get('title') or default_title, TITLE_MAX_LENGTH)
+    content = _clean_text(meta.get('content'), CONTENT_MAX_LENGTH)
+    return {
+        'title': title or '가져온 추억',
+        'content': content,
+        'memory_date': _memory_date(meta.get('memory_date'), fallback_date, today)
+    }
+
+def import_memories_from_zip(app, couple_id, user_id, zip_path, progress=None, workers=None, batch_size=None):
+    """ZIP의 사진(과 메타데이터)으로 추억을 일괄 생성하고 통계 반환
+
+    progress(stats)는 배치를 커밋할 때마다 호출됩니다. 잘못된 ZIP이나 한도를
+    넘는 ZIP은 ValueError를 발생시키며, 개별 사진 오류는 stats['errors']에
+    기록하고 계속 진행합니다.
+    """
+    from app.extensions import db
+    from app.models.memory import Memory
+    from app.services.image_pipeline import image_pipeline
+
+    upload_folder = app.config['UPLOAD_FOLDER']
+    batch_size = batch_size or app.config.get('IMPORT_BATCH_SIZE', 100)
+
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            images = list_import_images(archive, app.config.get('IMPORT_MAX_IMAGE_SIZE'))
+            by_image, without_image = read_metadata(archive)
+    except zipfile.BadZipFile as e:
+        raise ValueError('올바른 ZIP 파일이 아닙니다.') from e
+
+    total = len(images) + len(without_image)
+    if total > app.config.get('IMPORT_MAX_FILES', 2000):
+        raise ValueError(f"한 번에 가져올 수 있는 추억은 {app.config.get('IMPORT_MAX_FILES', 2000)}개까지입니다.")
+
+    stats = {'total': total, 'processed': 0, 'imported': 0, 'failed': 0, 'errors': []}
+    jobs = [{
+        'zip_path': zip_path,
+        'member': info.filename,
+        'ext': info.filename.rsplit('.', 1)[1].lower(),
+        'zip_date': date(*info.date_time[:3]),
+        'upload_folder': upload_folder,
+        'max_dimension': app.config.get('IMAGE_MAX_DIMENSION', 2048),
+        'max_pixels': app.config.get('IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS),
+        'variant_widths': app.config.get('IMAGE_VARIANT_WIDTHS', (320, 640, 1280)),
+        'variant_quality': app.config.get('IMAGE_VARIANT_QUALITY', 80),
+        'webp_method': app.config.get('IMPORT_WEBP_METHOD', 1)
+    } for info in images]
+
+    today = date.today()
+    unprocessed = []  # 이미 있던 파일이지만 파생 이미지가 없는 추억
+    batch = []
+
+    def flush():
+        db.session.flush()
+        unprocessed.extend((memory.id, memory.image_path) for memory in batch
+                           if memory.image_status == STATUS_PROCESSING)
+        db.session.commit()
+        batch.clear()
+        if progress:
+            progress(stats)
+
+    for job, result, error in _run_jobs(app, jobs, workers):
+        stats['processed'] += 1
+        if error is not None:
+            stats['failed'] += 1
+            stats['errors'].append({'file': job['member'], 'message': str(error)})
+            logging.warning(f"Memory import skipped {job['member']}: {error}")
+        else:
+            try:
+                path, variants = _place_image(upload_folder, result)
+            except Exception:
+                _discard_result(result)
+                raise
+
+            meta = by_image.get(job['member'], {})
+            default_title = os.path.splitext(os.path.basename(job['member']))[0]
+            memory = Memory(couple_id=couple_id, created_by=user_id, image_path=path,
+                            image_hash=result['image_hash'],
+                            image_status=STATUS_PROCESSING if variants is None else STATUS_READY,
+                            **_memory_fields(meta, default_title, result['exif_date'] or job['zip_date'], today))
+            if variants is not None:
+                memory.set_variants(variants)
+            db.session.add(memory)
+            batch.append(memory)
+            stats['imported'] += 1
+
+        if stats['processed'] % batch_size == 0:
+            flush()
+
+    for meta in without_image:
+        db.session.add(Memory(couple_id=couple_id, created_by=user_id,
+                              **_memory_fields(meta, None, today, today)))
+        stats['processed'] += 1
+        stats['imported'] += 1
+    flush()
+
+    for memory_id, path in unprocessed:
+        image_pipeline.submit(app, memory_id, couple_id, path)
+    return stats
+
+def start_import_job(app, couple_id, user_id, zip_path):
+    """백그라운드 가져오기 작업 시작 후 작업 ID 반환 (ZIP 파일은 작업 후 삭제)"""
+    from app.extensions import socketio
+
+    job_id = uuid.uuid4().hex
+    socketio.start_background_task(_run_import_job, app, couple_id, user_id, zip_path, job_id)
+    return job_id
+
+def _run_import_job(app, couple_id, user_id, zip_path, job_id):
+    """가져오기를 실행하며 커플 룸으로 진행 상황 전송"""
+    from app.extensions import db, socketio
+
+    room = f'couple_{couple_id}'
+
+    def report(stats, status='processing', message=None):
+        socketio.emit('memory_import_progress', {
+            'job_id': job_id,
+            'status': status,
+            'message': message,
+            'total': stats.get('total', 0),
+            'processed': stats.get('processed', 0),
+            'imported': stats.get('imported', 0),
+            'failed': stats.get('failed', 0),
+            'errors': stats.get('errors', [])[:20] if status != 'processing' else []
+        }, room=room)
+
+    with app.app_context():
+        try:
+            stats = import_memories_from_zip(app, couple_id, user_id, zip_path, progress=report)
+            report(stats, 'done')
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Memory import failed (couple {couple_id}): {e}")
+            report({}, 'failed', str(e) if isinstance(e, ValueError) else '가져오기 중 오류가 발생했습니다.')
+        finally:
+            db.session.remove()
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
@@ -0,0 +1,96 @@
+"""추억 전문 검색 서비스 (SQLite FTS5)
+
+memories_fts 가상 테이블은 trigram 토크나이저를 사용하므로 띄어쓰기나
+조사와 관계없이 한국어 부분 문자열을 찾을 수 있습니다. trigram은 세 글자
+단위로 색인되므로 두 글자 검색어는 기존 LIKE 검색으로 처리합니다.
+"""
+
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import func, literal_column
+from app.extensions import db
+from app.models.memory import Memory, MEMORY_SEARCH_DDL
+from app.utils.filters import SNIPPET_OPEN, SNIPPET_CLOSE
+
+# trigram 색인을 사용할 수 있는 최소 검색어 길이
+MIN_FTS_QUERY_LENGTH = 3
+
+# 제목 일치를 내용 일치보다 우선하는 bm25 가중치 (커플 키, 제목, 내용)
+BM25_WEIGHTS = (0.0, 10.0, 1.0)
+
+# 내용 스니펫 길이 (trigram 토큰 수 ≒ 글자 수)
+SNIPPET_TOKENS = 48
+
+memories_fts = literal_column('memories_fts')
+
+def build_match_query(couple_id, query):
+    """커플 키와 검색어 구문을 FTS5 검색식으로 변환 (검색어의 연산자 해석 방지)
+
+    검색어는 제목과 내용 열에서만 찾습니다. 커플 키 열까지 찾으면 "000001"처럼
+    키에 들어 있는 숫자를 검색할 때 커플의 모든 추억이 걸립니다.
+    """
+    phrase = '"' + query.replace('"', '""') + '"'
+    return f'couple_key:"#{couple_id:06d}#" AND {{title content}}: {phrase}'
+
+class SearchPagination(Pagination):
+    """순위와 스니펫을 포함한 검색 결과 페이지
+
+    각 항목은 Memory이며 search_title, search_snippet 속성에 하이라이트
+    표시가 들어간 제목과 내용 일부가 담깁니다.
+    """
+
+    def _query_items(self):
+        select = self._query_args['select']
+        rows = db.session.execute(select.limit(self.per_page).offset(self._query_offset)).all()
+        items = []
+        for memory, search_title, search_snippet in rows:
+            memory.search_title = search_title
+            memory.search_snippet = search_snippet
+            items.append(memory)
+        return items
+
+    def _query_count(self):
+        return db.session.execute(self._query_args['count_select']).scalar()
+
+def search_memories(couple_id, query, page=1, per_page=12):
+    """커플의 추억을 관련도 순으로 검색 (FTS5)"""
+    if len(query) < MIN_FTS_QUERY_LENGTH:
+        return search_memories_like(couple_id, query, page, per_page)
+
+    match = memories_fts.op('MATCH')(build_match_query(couple_id, query))
+
+    select = db.select(
+        Memory,
+        func.highlight(memories_fts, 1, SNIPPET_OPEN, SNIPPET_CLOSE),
+        func.snippet(memories_fts, 2, SNIPPET_OPEN, SNIPPET_CLOSE, '…', SNIPPET_TOKENS)
+    ).select_from(db.table('memories_fts'))\
+     .join(Memory, Memory.id == literal_column('memories_fts.rowid'))\
+     .where(match)\
+     .order_by(func.bm25(memories_fts, *BM25_WEIGHTS), Memory.memory_date.desc())
+
+    # 개수는 인덱스만으로 계산 (memories 조인 없음)
+    count_select = db.select(func.count()).select_from(db.table('memories_fts')).where(match)
+
+    return SearchPagination(page=page, per_page=per_page, error_out=False,
+                            select=select, count_select=count_select)
+
+def search_memories_like(couple_id, query, page=1, per_page=12):
+    """LIKE 부분 문자열 검색 (짧은 검색어용, 날짜순)"""
+    return Memory.query.filter_by(couple_id=couple_id)\
+                       .filter(db.or_(
+                           Memory.title.contains(query),
+                           Memory.content.contains(query)
+                       ))\
+                       .order_by(Memory.memory_date.desc(), Memory.created_at.desc())\
+                       .paginate(page=page, per_page=per_page, error_out=False)
+
+def rebuild_search_index():
+    """검색 인덱스와 동기화 트리거를 만들고 memories 전체로 다시 색인
+
+    인덱스 도입 전 데이터베이스나 인덱스가 어긋난 경우에 사용합니다.
+    색인된 추억 수를 반환합니다.
+    """
+    for statement in MEMORY_SEARCH_DDL:
+        db.session.execute(db.text(statement))
+    db.session.execute(db.text("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    return db.session.query(func.count(Memory.id)).scalar()
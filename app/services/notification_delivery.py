@@ -0,0 +1,196 @@
+"""실시간 알림 전송 워커"""
+
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+class NotificationOutboxWorker:
+    """알림 아웃박스 전송 워커
+
+    요청 처리 중에는 알림과 전송 요청(NotificationOutbox)을 도메인 변경과 같은
+    트랜잭션에 쓰기만 하고, 커밋되면 이 워커를 깨웁니다. 워커는 백그라운드
+    태스크에서 NOTIFICATION_PUSH_DELAY초 동안 요청을 모은 뒤 임대해 가져가,
+    수신자별로 'notifications_batch' 이벤트 하나(읽지 않은 개수 포함)로 보내고
+    요청을 지웁니다. 전송에 실패하면 지수 백오프로 다시 시도하고,
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS번 실패하면 재시도를 멈춥니다.
+    지연이 0이면 커밋 직후 별도 세션에서 바로 보냅니다.
+
+    전송 보장은 "Socket.IO 서버(또는 메시지 큐)에 발행할 때까지"입니다.
+    발행에 성공하면 클라이언트 수신 확인 없이 요청을 지우므로, 그 순간 접속하지
+    않았거나 연결이 끊긴 기기는 이벤트를 받지 못하고 다시 연결할 때 알림
+    동기화(notifications_sync)로 빠진 알림을 받습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = False
+        self._woken = False
+        self._app = None
+        self.stats = {
+            'created': 0,      # 새로 만든 알림
+            'coalesced': 0,    # 기존 알림에 합친 알림
+            'superseded': 0,   # 보내기 전에 대체/삭제되어 전송하지 않은 알림
+            'delivered': 0,    # 실제로 전송한 알림
+            'batches': 0,      # 전송한 이벤트 수
+            'retried': 0,      # 전송 실패 후 재시도 예약
+            'failed': 0,       # 재시도를 포기한 요청
+        }
+
+    def record(self, coalesced):
+        """알림 저장 결과 집계"""
+        with self._lock:
+            self.stats['coalesced' if coalesced else 'created'] += 1
+
+    def get_stats(self):
+        """집계 복사본 반환"""
+        with self._lock:
+            return dict(self.stats)
+
+    def wake(self, app):
+        """전송 요청이 커밋되었음을 알림 (워커가 없으면 시작)"""
+        if app.config.get('NOTIFICATION_PUSH_DELAY', 0.5) <= 0:
+            try:
+                # 커밋 직후의 세션에서는 SQL을 실행할 수 없으므로 새 앱 컨텍스트(새 세션)에서 처리
+                with app.app_context():
+                    self.drain(app)
+            except Exception as e:
+                logging.error(f'Notification outbox delivery failed: {str(e)}')
+            return
+
+        with self._lock:
+            self._app = app
+            self._woken = True
+            if self._running:
+                return
+            self._running = True
+
+        from app.extensions import socketio
+        socketio.start_background_task(self._run)
+
+    def drain(self, app):
+        """전송할 요청을 모두 보내고 전송한 알림 수 반환"""
+        delivered = 0
+        limit = app.config.get('NOTIFICATION_OUTBOX_BATCH_SIZE', 200)
+        while True:
+            count, claimed = self._deliver_batch(app, limit)
+            delivered += count
+            if claimed < limit:
+                return delivered
+
+    def _deliver_batch(self, app, limit):
+        """요청 한 묶음을 임대해 수신자별로 전송 후 (전송한 알림 수, 임대한 요청 수) 반환"""
+        from app.extensions import db, socketio
+        from app.models.notification import Notification
+        from app.models.notification_outbox import NotificationOutbox
+
+        entries = NotificationOutbox.claim(limit, app.config.get('NOTIFICATION_OUTBOX_LEASE', 60))
+        if not entries:
+            return 0, 0
+
+        notifications = {
+            notification.id: notification
+            for notification in Notification.query.filter(
+                Notification.id.in_([entry.notification_id for entry in entries])
+            )
+        }
+
+        by_user = {}
+        superseded = []
+        for entry in entries:
+            notification = notifications.get(entry.notification_id)
+            if notification is None:
+                # 합쳐지거나 삭제된 알림 (대체한 알림의 요청이 따로 있음)
+                superseded.append(entry)
+                continue
+            payload = notification.to_dict()
+            payload['replaces'] = entry.replaced_id
+            payload.update(entry.get_data())
+            by_user.setdefault(entry.user_id, []).append((entry, payload))
+
+        done = list(superseded)
+        failed = []
+        delivered = batches = 0
+        for user_id, items in by_user.items():
+            try:
+                socketio.emit('notifications_batch', {
+                    'notifications': [payload for _, payload in items],
+                    'count': Notification.get_unread_count(user_id)
+                }, room=f'user_{user_id}')
+            except Exception as e:
+                logging.warning(f'Failed to push notifications to user {user_id}: {str(e)}')
+                failed.extend((entry, str(e)) for entry, _ in items)
+                continue
+            done.extend(entry for entry, _ in items)
+            delivered += len(items)
+            batches += 1
+
+        retried = gave_up = 0
+        max_attempts = app.config.get('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+        for entry, error in failed:
+            entry.last_error = error[:255]
+            if entry.attempts >= max_attempts:
+                entry.next_attempt_at = None
+                gave_up += 1
+            else:
+                entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=2 ** entry.attempts)
+                retried += 1
+
+        if done:
+            NotificationOutbox.query.filter(
+                NotificationOutbox.id.in_([entry.id for entry in done])
+            ).delete(synchronize_session=False)
+        db.session.commit()
+
+        with self._lock:
+            self.stats['superseded'] += len(superseded)
+            self.stats['delivered'] += delivered
+            self.stats['batches'] += batches
+            self.stats['retried'] += retried
+            self.stats['failed'] += gave_up
+        return delivered, len(entries)
+
+    def _run(self):
+        """요청을 모아 보내는 백그라운드 태스크 (재시도 대기 중인 요청이 없으면 종료)"""
+        from app.extensions import socketio
+        from app.models.notification_outbox import NotificationOutbox
+
+        due_at = None
+        while True:
+            socketio.sleep(self._app.config.get('NOTIFICATION_PUSH_DELAY', 0.5))
+            with self._lock:
+                woken, self._woken = self._woken, False
+                app = self._app
+            if not woken and due_at is not None and time.monotonic() < due_at:
+                # 재시도 시각 전에는 새 요청이 들어올 때만 전송
+                continue
+
+            next_due = None
+            try:
+                with app.app_context():
+                    self.drain(app)
+                    next_due = NotificationOutbox.seconds_until_due()
+            except Exception as e:
+                logging.error(f'Notification outbox delivery failed: {str(e)}')
+
+            with self._lock:
+                if next_due is None and not self._woken:
+                    self._running = False
+                    return
+            due_at = time.monotonic() + next_due if next_due is not None else None
+
+notification_worker = NotificationOutboxWorker()
+
+@event.listens_for(Session, 'after_commit')
+def _wake_after_commit(session):
+    """알림 전송 요청이 든 트랜잭션이 커밋되면 워커를 깨움"""
+    if session.info.pop('notification_outbox', False):
+        from flask import current_app
+        notification_worker.wake(current_app._get_current_object())
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    """롤백된 트랜잭션의 전송 요청 표시 제거"""
+    session.info.pop('notification_outbox', None)
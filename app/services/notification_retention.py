@@ -0,0 +1,176 @@
+"""알림 보존 정책 서비스
+
+오래된 알림을 타입별 보존 기간에 따라 작은 묶음으로 나누어 (선택적으로 별도
+보관 DB로 옮긴 뒤) 삭제합니다. 묶음마다 짧은 트랜잭션으로 커밋하고 잠시 쉬므로
+정리 중에도 요청 처리의 쓰기가 쓰기 잠금을 오래 기다리지 않습니다.
+"""
+
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, or_
+from app.extensions import db
+from app.models.notification import Notification
+
+# 보관 DB에 옮기는 컬럼 (archived_at은 보관 시각)
+ARCHIVE_COLUMNS = ('id', 'user_id', 'type', 'title', 'content', 'is_read', 'created_at', 'subject', 'merge_count')
+
+ARCHIVE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS archive.notifications ("
+    "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, type VARCHAR(50) NOT NULL, "
+    "title VARCHAR(100) NOT NULL, content TEXT NOT NULL, is_read BOOLEAN, created_at DATETIME, "
+    "subject VARCHAR(100), merge_count INTEGER, archived_at DATETIME)"
+)
+
+DEFAULT_POLICY = {'read_days': 30, 'unread_days': 180, 'archive': True}
+
+def get_policy(notification_type, policies=None, default=None):
+    """알림 타입의 보존 정책 반환
+
+    read_days/unread_days는 읽은/읽지 않은 알림을 남겨두는 일수(None이면 지우지
+    않음), archive는 보관 DB가 설정된 경우 지우기 전에 옮길지 여부입니다.
+    """
+    policy = dict(DEFAULT_POLICY)
+    policy.update(default or {})
+    policy.update((policies or {}).get(notification_type, {}))
+    return policy
+
+def apply_notification_retention(app, policies=None, default=None, archive_path=None, now=None,
+                                 chunk_size=None, pause=None, vacuum_pages=None):
+    """보존 기간이 지난 알림을 묶음 단위로 보관/삭제하고 증분 VACUUM 실행
+
+    인수를 생략하면 NOTIFICATION_RETENTION_* 설정을 사용합니다. 보관 DB는 같은
+    연결에 ATTACH해서 묶음마다 복사와 삭제를 한 트랜잭션으로 처리합니다
+    (WAL 모드에서는 두 파일에 걸친 커밋이 원자적이지 않으므로 복사는
+    INSERT OR IGNORE로 다시 실행해도 안전하게 합니다). 읽지 않은 알림이
+    지워지면 카운터는 트리거가 갱신합니다.
+    """
+    config = app.config
+    policies = config.get('NOTIFICATION_RETENTION_POLICIES', {}) if policies is None else policies
+    default = config.get('NOTIFICATION_RETENTION_DEFAULT', {}) if default is None else default
+    archive_path = config.get('NOTIFICATION_ARCHIVE_PATH') if archive_path is None else archive_path
+    chunk_size = chunk_size or config.get('NOTIFICATION_RETENTION_CHUNK_SIZE', 500)
+    pause = config.get('NOTIFICATION_RETENTION_PAUSE', 0.05) if pause is None else pause
+    vacuum_pages = config.get('NOTIFICATION_VACUUM_PAGES', 2000) if vacuum_pages is None else vacuum_pages
+    now = now or datetime.utcnow()
+
+    stats = {'archived': 0, 'deleted': 0, 'by_type': {}, 'chunks': 0, 'max_chunk_ms': 0.0,
+             'vacuumed_pages': 0}
+    table = Notification.__table__
+
+    with db.engine.connect() as conn:
+        if archive_path:
+            os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+            # ATTACH는 트랜잭션 밖에서만 가능
+            conn.exec_driver_sql("ATTACH DATABASE ? AS archive", (archive_path,))
+            conn.exec_driver_sql(ARCHIVE_SCHEMA)
+            conn.commit()
+
+        try:
+            types = conn.execute(select(table.c.type).distinct()).scalars().all()
+            conn.commit()
+
+            for notification_type in types:
+                policy = get_policy(notification_type, policies, default)
+                archive = bool(archive_path) and policy.get('archive', True)
+
+                for is_read, days in ((True, policy.get('read_days')), (False, policy.get('unread_days'))):
+                    if days is None:
+                        continue
+                    read_condition = table.c.is_read == True if is_read else or_(
+                        table.c.is_read == False, table.c.is_read.is_(None))
+                    due = select(table.c.id).where(
+                        table.c.type == notification_type,
+                        table.c.created_at < now - timedelta(days=days),
+                        read_condition
+                    ).limit(chunk_size)
+
+                    while True:
+                        started = time.perf_counter()
+                        ids = conn.execute(due).scalars().all()
+                        if not ids:
+                            conn.commit()
+                            break
+
+                        if archive:
+                            id_list = ','.join(str(int(notification_id)) for notification_id in ids)
+                            columns = ', '.join(ARCHIVE_COLUMNS)
+                            conn.exec_driver_sql(
+                                f"INSERT OR IGNORE INTO archive.notifications ({columns}, archived_at) "
+                                f"SELECT {columns}, ? FROM main.notifications WHERE id IN ({id_list})",
+                                (now.strftime('%Y-%m-%d %H:%M:%S.%f'),)
+                            )
+                            stats['archived'] += len(ids)
+
+                        conn.execute(table.delete().where(table.c.id.in_(ids)))
+                        conn.commit()
+
+                        stats['chunks'] += 1
+                        stats['deleted'] += len(ids)
+                        stats['by_type'][notification_type] = stats['by_type'].get(notification_type, 0) + len(ids)
+                        stats['max_chunk_ms'] = max(stats['max_chunk_ms'], (time.perf_counter() - started) * 1000)
+
+                        if len(ids) < chunk_size:
+                            break
+                        if pause:
+                            # 대기 중인 요청 처리 쓰기가 잠금을 가져가도록 양보
+                            time.sleep(pause)
+        finally:
+            if archive_path:
+                conn.rollback()
+                conn.exec_driver_sql("DETACH DATABASE archive")
+
+        if vacuum_pages:
+            stats['vacuumed_pages'] = incremental_vacuum(conn, vacuum_pages, pause=pause)
+
+    logging.info(f"Notification retention: {stats['deleted']} deleted, {stats['archived']} archived, "
+                 f"{stats['chunks']} chunks (max {stats['max_chunk_ms']:.1f} ms)")
+    return stats
+
+def incremental_vacuum(conn, max_pages, step=200, pause=0.05):
+    """빈 페이지를 step개씩 나누어 반환하고 반환한 페이지 수를 돌려줌
+
+    auto_vacuum이 INCREMENTAL인 DB에서만 동작합니다(전체 VACUUM은 DB 전체를
+    잠그므로 여기서는 실행하지 않음).
+    """
+    if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+        return 0
+
+    freed = 0
+    while freed < max_pages:
+        free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if not free_pages:
+            break
+        pages = min(step, free_pages, max_pages - freed)
+        conn.commit()
+        # sqlite3의 execute는 이 PRAGMA를 한 단계(한 페이지)만 실행하므로 executescript로 끝까지 실행
+        conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        freed += pages
+        if pause:
+            time.sleep(pause)
+    return freed
+
+def count_expired_notifications(app, policies=None, default=None, now=None):
+    """정책상 지울 알림 수를 타입별로 반환 (dry-run 보고용)"""
+    config = app.config
+    policies = config.get('NOTIFICATION_RETENTION_POLICIES', {}) if policies is None else policies
+    default = config.get('NOTIFICATION_RETENTION_DEFAULT', {}) if default is None else default
+    now = now or datetime.utcnow()
+
+    counts = {}
+    types = db.session.execute(select(Notification.type).distinct()).scalars().all()
+    for notification_type in types:
+        policy = get_policy(notification_type, policies, default)
+        for is_read, days in ((True, policy.get('read_days')), (False, policy.get('unread_days'))):
+            if days is None:
+                continue
+            count = db.session.execute(select(func.count(Notification.id)).where(
+                Notification.type == notification_type,
+                Notification.created_at < now - timedelta(days=days),
+                Notification.is_read == True if is_read else or_(
+                    Notification.is_read == False, Notification.is_read.is_(None))
+            )).scalar()
+            if count:
+                counts[notification_type] = counts.get(notification_type, 0) + count
+    return counts
@@ -0,0 +1,158 @@
+"""알림 증분 동기화 서비스
+
+클라이언트는 마지막으로 받은 알림 ID(since_id)와 읽음 상태 버전(version)을
+보내고, 서버는 그 이후 새로 생긴 알림과 읽음 처리된 알림 ID만 돌려줍니다.
+재연결이나 알림 패널을 다시 열 때 전체 목록 대신 변경분만 전송합니다.
+"""
+
+import time
+import threading
+from datetime import datetime
+from app.extensions import db
+from app.models.notification import Notification, MAX_BULK_IDS
+from app.models.notification_counter import NotificationCounter
+
+# 처음 동기화하거나 다시 받아야 할 때 보내는 최근 알림 수
+SYNC_LIMIT = 10
+
+# 알림 타입 캐시 최대 사용자 수와 유효 시간 (초)
+MAX_TYPE_CACHE_ENTRIES = 1000
+TYPE_CACHE_TTL = 600
+
+# 최근 알림 캐시 최대 사용자 수와 유효 시간 (초)
+MAX_RECENT_CACHE_ENTRIES = 5000
+RECENT_CACHE_TTL = 300
+
+def build_sync(user_id, since_id=None, version=None, limit=SYNC_LIMIT):
+    """since_id, version 이후의 변경분 반환
+
+    reset이 True이면 클라이언트는 가진 목록을 버리고 notifications로 바꿉니다
+    (처음 동기화, 카운터 재계산으로 버전이 되돌아간 경우, 변경분이 너무 많은 경우,
+    클라이언트의 버전 이후에 알림이 합쳐지거나 지워진 경우).
+    변경이 없으면 카운터 조회 한 번으로 끝나고, 전체 목록은 최근 알림 캐시에서 꺼냅니다.
+    """
+    state = NotificationCounter.get_state(user_id)
+    unread, current_version, latest_id = state
+    payload = {'count': unread, 'version': current_version, 'reset': False, 'read_ids': []}
+
+    if since_id and version is not None and version <= current_version:
+        if version == current_version and since_id >= latest_id:
+            # 새 알림도 읽음 상태 변경도 없음
+            payload['notifications'] = []
+            payload['latest_id'] = since_id
+            return payload
+
+        # 클라이언트 버전 이후에 알림이 합쳐지거나 지워졌으면 지워진 ID를 알 수 없으므로 전체 동기화
+        if version >= NotificationCounter.get_deleted_version(user_id):
+            notifications = Notification.query.filter(
+                Notification.user_id == user_id, Notification.id > since_id
+            ).order_by(Notification.id.desc()).limit(limit + 1).all()
+
+            read_ids = []
+            if version < current_version:
+                read_ids = db.session.execute(
+                    db.select(Notification.id).where(
+                        Notification.user_id == user_id,
+                        Notification.read_version > version,
+                        Notification.id <= since_id,
+                        Notification.is_read == True
+                    ).limit(MAX_BULK_IDS + 1)
+                ).scalars().all()
+
+            if len(notifications) <= limit and len(read_ids) <= MAX_BULK_IDS:
+                payload['notifications'] = [notification.to_dict() for notification in notifications]
+                payload['read_ids'] = sorted(read_ids)
+                payload['latest_id'] = notifications[0].id if notifications else since_id
+                return payload
+
+    payload['reset'] = True
+    payload['notifications'] = recent_notification_cache.get(user_id, state, limit)
+    payload['latest_id'] = payload['notifications'][0]['id'] if payload['notifications'] else 0
+    return payload
+
+def parse_sync_args(data):
+    """요청의 since_id, version을 정수로 변환 (잘못된 값은 None → 전체 동기화)"""
+    def to_int(value):
+        try:
+            return int(value) if value not in (None, '') else None
+        except (TypeError, ValueError):
+            return None
+    return to_int(data.get('since_id')), to_int(data.get('version'))
+
+class NotificationTypeCache:
+    """사용자별 알림 타입 목록 캐시
+
+    알림 목록 페이지의 타입 필터가 매번 DISTINCT 쿼리를 실행하지 않도록 합니다.
+    항목은 사용자의 최신 알림 ID로 검증되어 새 알림이 생기면 다시 계산되고,
+    알림이 지워져 사라진 타입은 TYPE_CACHE_TTL 안에 정리됩니다.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, latest_id):
+        """사용자가 받은 알림 타입 목록 반환"""
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry and entry['latest_id'] == latest_id and now - entry['at'] < TYPE_CACHE_TTL:
+            return entry['types']
+
+        types = sorted(db.session.execute(
+            db.select(Notification.type).where(Notification.user_id == user_id).distinct()
+        ).scalars().all())
+
+        with self._lock:
+            if len(self._entries) >= MAX_TYPE_CACHE_ENTRIES:
+                self._entries.clear()
+            self._entries[user_id] = {'latest_id': latest_id, 'at': now, 'types': types}
+        return types
+
+    def clear(self):
+        """전체 캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+# 전역 알림 타입 캐시
+notification_type_cache = NotificationTypeCache()
+
+class RecentNotificationCache:
+    """사용자별 최근 알림 목록 캐시
+
+    재연결할 때마다 최근 알림을 다시 읽지 않도록 to_dict() 결과를 보관합니다.
+    상대 시간("방금 전")은 시간이 지나면 바뀌므로 생성 시각만 보관하고 꺼낼 때
+    다시 계산합니다.
+    항목은 카운터 상태(읽지 않은 수, 읽음 상태 버전, 최신 알림 ID)로 검증되어
+    어느 워커에서든 알림이 추가, 읽음 처리, 합쳐지거나 지워지면 다시 읽습니다.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, state, limit=SYNC_LIMIT):
+        """사용자의 최근 알림 limit개 (최신순) 반환"""
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if not (entry and entry['state'] == state and entry['limit'] == limit and now - entry['at'] < RECENT_CACHE_TTL):
+            notifications = [
+                (notification.to_dict(), notification.created_at) for notification in
+                Notification.query.filter_by(user_id=user_id).order_by(Notification.id.desc()).limit(limit)
+            ]
+            entry = {'state': state, 'limit': limit, 'at': now, 'notifications': notifications}
+            with self._lock:
+                if len(self._entries) >= MAX_RECENT_CACHE_ENTRIES:
+                    self._entries.clear()
+                self._entries[user_id] = entry
+
+        current = datetime.utcnow()
+        return [dict(payload, formatted_time=Notification.format_time(created_at, current))
+                for payload, created_at in entry['notifications']]
+
+    def clear(self):
+        """전체 캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+# 전역 최근 알림 캐시
+recent_notification_cache = RecentNotificationCache()
@@ -0,0 +1,168 @@
+"""접속 상태(프레즌스) 서비스"""
+
+import os
+import uuid
+import socket
+import logging
+import threading
+
+class PresenceRegistry:
+    """사용자 접속 상태 레지스트리
+
+    이 프로세스의 연결은 메모리(user_id → sid 집합 역색인)에만 두므로 연결과
+    해제는 DB에 쓰지 않습니다. 사용자의 이 워커 첫 연결/마지막 연결 해제 때만
+    다른 워커의 연결을 읽기 전용으로 확인해 온라인/오프라인 전환을 판단하므로,
+    탭을 여러 개 열어도 파트너에게 상태 알림이 한 번만 갑니다.
+    다른 워커가 볼 수 있도록 PRESENCE_HEARTBEAT_INTERVAL초마다 그동안의 연결
+    추가/해제를 SocketPresence에 한 트랜잭션으로 반영하며(그만큼 늦게 보일 수
+    있음), PRESENCE_TTL초 넘게 갱신되지 않은 연결(죽은 워커)은 정리하면서
+    오프라인 전환을 보냅니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._user_sids = {}
+        self._sid_users = {}
+        self._added = {}      # 아직 DB에 반영하지 않은 연결 (sid → user_id)
+        self._removed = set()  # 아직 DB에서 지우지 않은 연결 sid
+        self._worker_id = None
+        self._worker_pid = None
+        self._app = None
+        self._running = False
+
+    @property
+    def worker_id(self):
+        """이 워커 프로세스의 ID (fork된 워커는 새 ID)"""
+        if self._worker_pid != os.getpid():
+            self._worker_pid = os.getpid()
+            self._worker_id = f'{socket.gethostname()[:30]}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        return self._worker_id
+
+    def connect(self, app, user_id, sid):
+        """연결 등록 후 사용자의 첫 연결(온라인 전환)인지 반환"""
+        with self._lock:
+            first_local = not self._user_sids.get(user_id)
+            self._sid_users[sid] = user_id
+            self._user_sids.setdefault(user_id, set()).add(sid)
+            self._added[sid] = user_id
+            self._removed.discard(sid)
+        self._start_heartbeat(app)
+        return first_local and not self._online_elsewhere(app, user_id)
+
+    def disconnect(self, app, sid):
+        """연결 해제 후 (user_id, 마지막 연결이었는지) 반환 (모르는 연결이면 (None, False))"""
+        with self._lock:
+            user_id = self._sid_users.pop(sid, None)
+            if user_id is None:
+                return None, False
+            if self._added.pop(sid, None) is None:
+                self._removed.add(sid)
+            sids = self._user_sids.get(user_id, set())
+            sids.discard(sid)
+            if sids:
+                return user_id, False
+            self._user_sids.pop(user_id, None)
+        return user_id, not self._online_elsewhere(app, user_id)
+
+    def is_online(self, app, user_id):
+        """사용자가 어느 워커에든 연결되어 있는지"""
+        return bool(self._user_sids.get(user_id)) or self._online_elsewhere(app, user_id)
+
+    def _online_elsewhere(self, app, user_id):
+        """다른 워커에 살아 있는 연결이 있는지 (이 워커의 행은 메모리가 기준이므로 제외)"""
+        from app.models.socket_presence import SocketPresence
+        return SocketPresence.is_online(user_id, self._ttl(app), exclude_worker_id=self.worker_id)
+
+    def local_sids(self, user_id):
+        """이 워커에 연결된 사용자의 sid 목록"""
+        with self._lock:
+            return set(self._user_sids.get(user_id, ()))
+
+    def get_user_id(self, sid):
+        """이 워커에 연결된 sid의 사용자 ID"""
+        return self._sid_users.get(sid)
+
+    def heartbeat(self, app):
+        """이 워커의 연결 변경을 반영, 갱신하고 만료된 연결을 정리한 뒤 오프라인이 된 사용자 ID 목록 반환"""
+        from app.models.socket_presence import SocketPresence
+
+        with self._lock:
+            added, self._added = self._added, {}
+            removed, self._removed = self._removed, set()
+        try:
+            offline = SocketPresence.sync(self.worker_id, added, removed, self._ttl(app))
+        except Exception:
+            # 반영하지 못한 변경은 다음 하트비트에서 다시 시도
+            from app.extensions import db
+            db.session.rollback()
+            with self._lock:
+                for sid, user_id in added.items():
+                    if sid in self._sid_users:
+                        self._added.setdefault(sid, user_id)
+                self._removed.update(sid for sid in removed if sid not in self._sid_users)
+            raise
+        # 다른 워커의 만료된 연결만 지워지므로 이 워커에 연결된 사용자는 제외
+        return [user_id for user_id in offline if not self._user_sids.get(user_id)]
+
+    def clear(self):
+        """이 워커의 연결 목록 비우기"""
+        with self._lock:
+            self._user_sids.clear()
+            self._sid_users.clear()
+            self._added.clear()
+            self._removed.clear()
+
+    def _ttl(self, app):
+        return app.config.get('PRESENCE_TTL', 90)
+
+    def _start_heartbeat(self, app):
+        """하트비트 백그라운드 태스크 시작 (프로세스마다 한 번)"""
+        interval = app.config.get('PRESENCE_HEARTBEAT_INTERVAL', 30)
+        with self._lock:
+            self._app = app
+            if self._running or interval <= 0:
+                return
+            self._running = True
+
+        from app.extensions import socketio
+        socketio.start_background_task(self._run)
+
+    def _run(self):
+        """하트비트 루프 (만료된 연결로 오프라인이 된 사용자의 파트너에게 알림)"""
+        from app.extensions import socketio
+
+        while True:
+            app = self._app
+            socketio.sleep(app.config.get('PRESENCE_HEARTBEAT_INTERVAL', 30))
+            try:
+                with app.app_context():
+                    for user_id in self.heartbeat(app):
+                        emit_presence(user_id, 'offline')
+            except Exception as e:
+                logging.error(f'Presence heartbeat failed: {str(e)}')
+
+def emit_presence(user_id, status, identity=None):
+    """사용자의 온라인/오프라인 전환을 파트너의 개인 룸으로 전송
+
+    identity(핸드셰이크 스냅샷)가 있으면 사용자와 파트너를 DB에서 읽지 않습니다.
+    """
+    from app.extensions import socketio
+    from app.models.user import User
+
+    if identity is None:
+        user = User.query.get(user_id)
+        partner = user.get_partner() if user else None
+        if not partner:
+            return None
+        identity = {'name': user.name, 'partner_id': partner.id}
+
+    if identity.get('partner_id'):
+        socketio.emit('partner_status', {
+            'partner_id': user_id,
+            'partner_name': identity['name'],
+            'status': status
+        }, room=f"user_{identity['partner_id']}")
+    return identity.get('partner_id')
+
+# 전역 접속 상태 레지스트리
+presence_registry = PresenceRegistry()
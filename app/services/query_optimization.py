@@ -211,18 +211,15 @@ class OptimizedQueryService:
     
     @staticmethod
     def cleanup_old_notifications(days_old=30):
-        """오래된 알림 정리 (배치 작업용)"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+        """오래된 읽은 알림 정리 (배치 작업용, 묶음 단위로 삭제)"""
+        from flask import current_app
+        from app.services.notification_retention import apply_notification_retention
         
-        deleted_count = Notification.query.filter(
-            and_(
-                Notification.created_at < cutoff_date,
-                Notification.is_read == True
-            )
-        ).delete(synchronize_session=False)
-        
-        db.session.commit()
-        return deleted_count
+        stats = apply_notification_retention(
+            current_app, policies={}, default={'read_days': days_old, 'unread_days': None},
+            archive_path='', vacuum_pages=0
+        )
+        return stats['deleted']
     
     @staticmethod
     def get_database_statistics():
@@ -0,0 +1,112 @@
+"""Socket.IO 연결 핸드셰이크 서비스
+
+연결할 때마다 사용자, 커플, 파트너를 DB에서 읽지 않도록 HTTP 요청 중에
+세션(서명된 쿠키)에 사용자 정보 스냅샷을 저장해 두고, 연결 시에는 그 스냅샷으로
+인증과 룸 참여를 처리한 뒤 'bootstrap' 이벤트 하나로 파트너 접속 상태,
+읽지 않은 알림 수, 최근 알림을 보냅니다. 스냅샷은 쿠키에 있으므로 배포 직후
+재연결이 몰려도 워커의 캐시가 비어 있는 것과 관계없이 사용됩니다.
+"""
+
+import time
+from flask import session, request, current_app
+from flask_login import current_user, user_logged_in
+
+SNAPSHOT_KEY = 'socket_identity'
+
+def build_identity(user):
+    """사용자의 핸드셰이크 스냅샷 생성 (커플 연결, 파트너 조회)"""
+    from app.models.user import User
+
+    connection = user.get_couple_connection()
+    partner = None
+    if connection:
+        partner_id = connection.user2_id if connection.user1_id == user.id else connection.user1_id
+        partner = User.query.get(partner_id) if partner_id else None
+    return {
+        'user_id': user.id,
+        'name': user.name,
+        'couple_id': connection.id if connection else None,
+        'partner_id': partner.id if partner else None,
+        'partner_name': partner.name if partner else None,
+        'at': int(time.time())
+    }
+
+def store_identity(user):
+    """현재 세션에 사용자 스냅샷 저장 (로그인, 커플 연결/해제 직후)"""
+    identity = build_identity(user)
+    session[SNAPSHOT_KEY] = identity
+    return identity
+
+def get_session_identity():
+    """세션의 로그인 사용자와 일치하는 스냅샷 반환 (없으면 None)"""
+    identity = session.get(SNAPSHOT_KEY)
+    user_id = session.get('_user_id')
+    if not identity or user_id is None or str(identity.get('user_id')) != str(user_id):
+        return None
+    return identity
+
+def is_fresh(identity):
+    """스냅샷이 SOCKET_IDENTITY_REFRESH초 안에 만들어졌는지 여부 (시각이 없으면 오래된 것으로 봄)"""
+    max_age = current_app.config.get('SOCKET_IDENTITY_REFRESH', 300)
+    return identity.get('at') is not None and time.time() - identity['at'] < max_age
+
+def load_identity():
+    """연결한 사용자의 스냅샷 반환 (로그인하지 않았으면 None)
+
+    세션의 스냅샷이 없거나 오래되었으면 DB에서 다시 만들어 이 연결의 세션에
+    저장합니다. HTTP 요청 없이 재연결만 반복하는 탭도 파트너가 커플 연결을
+    해제하면 SOCKET_IDENTITY_REFRESH초 안에 예전 커플 룸에 다시 들어가지 않습니다.
+    """
+    identity = get_session_identity()
+    if identity is not None and is_fresh(identity):
+        return identity
+    if not current_user.is_authenticated:
+        return None
+    return store_identity(current_user)
+
+def refresh_identity():
+    """HTTP 요청 전에 스냅샷이 없거나 오래되었으면 다시 저장
+
+    파트너가 커플 연결을 해제하거나 초대를 수락한 경우처럼 다른 사용자의
+    요청으로 바뀐 정보는 SOCKET_IDENTITY_REFRESH초 안에 반영됩니다. 파트너가
+    아직 없는 사용자는 연결되는 즉시 반영되도록 요청마다 다시 저장합니다.
+    """
+    if request.endpoint == 'static' or '_user_id' not in session:
+        return
+    identity = get_session_identity()
+    if identity is not None and identity.get('partner_id') and is_fresh(identity):
+        return
+    if current_user.is_authenticated:
+        store_identity(current_user)
+
+def init_socket_handshake(app):
+    """스냅샷 저장 훅 등록"""
+    app.before_request(refresh_identity)
+    user_logged_in.connect(_store_on_login, app)
+
+def _store_on_login(sender, user, **kwargs):
+    store_identity(user)
+
+def build_bootstrap(app, identity, auth=None):
+    """연결 직후 보내는 'bootstrap' 이벤트 데이터
+
+    auth에 클라이언트가 가진 since_id, version이 있으면 알림은 변경분만 보냅니다.
+    """
+    from app.services.notification_sync import build_sync, parse_sync_args
+    from app.services.presence import presence_registry
+
+    since_id, version = parse_sync_args(auth if isinstance(auth, dict) else {})
+    partner = None
+    if identity['partner_id']:
+        partner = {
+            'partner_id': identity['partner_id'],
+            'partner_name': identity['partner_name'],
+            'status': 'online' if presence_registry.is_online(app, identity['partner_id']) else 'offline'
+        }
+
+    return {
+        'user': {'id': identity['user_id'], 'name': identity['name']},
+        'couple_room': f"couple_{identity['couple_id']}" if identity['couple_id'] else None,
+        'partner': partner,
+        'notifications': build_sync(identity['user_id'], since_id, version)
+    }
@@ -0,0 +1,108 @@
+"""업로드 파일 제공 서비스
+
+권한 확인(커플 소유)은 Flask에서 하고, 파일 전송은 설정에 따라
+프런트 서버(nginx X-Accel-Redirect, Apache/lighttpd X-Sendfile)에 넘기거나
+WSGI 서버의 file_wrapper(sendfile)로 직접 보냅니다. 콘텐츠 주소 파일은
+이름이 내용을 가리키므로 immutable로 오래 캐시하게 합니다.
+"""
+
+import os
+import re
+import mimetypes
+from urllib.parse import quote
+from flask import current_app, request, abort
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+from app.models.memory import Memory
+
+# 파생 이미지 파일명 (원본 이름_w너비.확장자)
+VARIANT_PATTERN = re.compile(r'^(?P<base>.+)_w\d+\.(?:webp|jpg)$')
+
+# immutable 파일 캐시 기간 (1년)
+IMMUTABLE_MAX_AGE = 31536000
+
+def find_upload_owner(filename, couple_id):
+    """커플의 추억이 사용하는 파일인지 확인 후 (추억, 파생 이미지 여부) 반환
+
+    파생 이미지는 원본 이름의 접두사 범위 조건으로 찾으므로 image_path
+    인덱스를 그대로 사용합니다. 접근할 수 없으면 (None, False)를 반환합니다.
+    """
+    memory = Memory.query.filter_by(couple_id=couple_id, image_path=filename).first()
+    if memory:
+        return memory, False
+
+    match = VARIANT_PATTERN.match(filename)
+    if match:
+        base = match.group('base')
+        memory = Memory.query.filter(Memory.couple_id == couple_id,
+                                     Memory.image_path >= base + '.',
+                                     Memory.image_path < base + '/').first()
+        if memory:
+            return memory, True
+
+    return None, False
+
+def get_upload_etag(filename, stat):
+    """콘텐츠 해시 이름 기반 강한 ETag
+
+    백그라운드 최적화가 같은 이름의 파일을 한 번 다시 쓰므로 수정 시각을 덧붙여
+    바이트가 바뀌면 ETag도 바뀌게 합니다.
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return f'{stem}-{stat.st_mtime_ns:x}'
+
+def _apply_cache_headers(response, immutable):
+    """업로드 파일 캐시 헤더 설정 (커플 전용 파일이므로 항상 private)"""
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+
+def send_upload(upload_folder, filename, immutable=False):
+    """업로드 파일 응답 생성 (조건부 요청과 Range 요청 지원)
+
+    UPLOAD_SERVE_MODE
+        'python'     - send_file로 직접 전송 (WSGI file_wrapper가 있으면 sendfile 사용)
+        'x-accel'    - nginx 내부 location으로 X-Accel-Redirect
+        'x-sendfile' - 프런트 서버에 X-Sendfile 헤더로 위임
+    """
+    full_path = safe_join(os.path.abspath(upload_folder), filename)
+    if full_path is None or not os.path.isfile(full_path):
+        abort(404)
+
+    stat = os.stat(full_path)
+    etag = get_upload_etag(filename, stat)
+    mode = current_app.config.get('UPLOAD_SERVE_MODE', 'python')
+
+    if mode == 'x-accel':
+        # 304는 여기서 처리하고, 본문과 Range는 nginx가 처리
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = current_app.response_class(mimetype=mimetype)
+        response.set_etag(etag)
+        response.last_modified = stat.st_mtime
+        _apply_cache_headers(response, immutable)
+        response = response.make_conditional(request)
+        if response.status_code == 200:
+            prefix = current_app.config.get('UPLOAD_ACCEL_PREFIX', '/_uploads/')
+            response.headers['X-Accel-Redirect'] = prefix + quote(filename)
+        return response
+
+    environ = request.environ
+    if mode == 'x-sendfile':
+        # Range는 프런트 서버가 처리하므로 전체 파일 기준으로 응답
+        environ = {key: value for key, value in environ.items() if key != 'HTTP_RANGE'}
+
+    response = send_file(
+        full_path,
+        environ,
+        etag=etag,
+        conditional=True,
+        use_x_sendfile=mode == 'x-sendfile',
+        response_class=current_app.response_class
+    )
+    _apply_cache_headers(response, immutable)
+    return response
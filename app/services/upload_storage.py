@@ -0,0 +1,405 @@
+"""콘텐츠 주소 기반 업로드 저장소
+
+업로드 파일은 내용의 SHA-256 해시로 이름 지어져 `ab/cd/<hash>.<ext>`
+형태의 하위 디렉토리에 저장됩니다. 해시는 업로드를 임시 파일로 복사하는
+동안 함께 계산하므로 파일을 다시 읽지 않으며, 파일명 충돌 검사 루프도
+필요 없습니다. 같은 사진은 UploadBlob의 참조 수로 공유됩니다.
+"""
+
+import os
+import re
+import time
+import bisect
+import hashlib
+import logging
+import tempfile
+from array import array
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.upload_blob import UploadBlob
+
+# 업로드 스트림을 읽는 단위 (바이트)
+HASH_CHUNK_SIZE = 64 * 1024
+
+# 저장 중인 임시 파일 접두사 (정리 작업에서 건너뛰기 위해 사용)
+TEMP_PREFIX = '.upload-'
+
+CONTENT_PATH_PATTERN = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$')
+
+def shard_path(digest, ext):
+    """해시와 확장자로 저장 경로 생성 (업로드 폴더 기준 상대 경로)"""
+    return f'{digest[:2]}/{digest[2:4]}/{digest}.{ext.lower().lstrip(".")}'
+
+def is_content_addressed(path):
+    """콘텐츠 주소 방식 경로인지 확인 (기존 평면 구조 파일과 구분)"""
+    return bool(path) and CONTENT_PATH_PATTERN.match(path) is not None
+
+def hash_file(file_path):
+    """파일의 SHA-256 해시와 크기 계산"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+def store_upload(file, upload_folder, ext):
+    """업로드 파일 저장 후 (상대 경로, 새로 저장했는지 여부) 반환
+
+    호출한 쪽의 트랜잭션에 참조를 추가하며 커밋하지 않습니다. 같은 내용의
+    파일이 이미 있으면 새로 쓰지 않고 기존 파일을 공유합니다.
+    """
+    stream = getattr(file, 'stream', file)
+    stream.seek(0)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=upload_folder, prefix=TEMP_PREFIX, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+                temp_file.write(chunk)
+
+        # 참조를 먼저 기록해 쓰기 잠금을 잡은 뒤 파일을 배치합니다.
+        # 다른 워커가 마지막 참조를 해제하며 파일을 지우는 작업과 겹치지 않습니다.
+        path, _ = UploadBlob.acquire(digest.hexdigest(), shard_path(digest.hexdigest(), ext), size)
+        full_path = os.path.join(upload_folder, path)
+        if os.path.exists(full_path):
+            return path, False
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.replace(temp_path, full_path)
+        return path, True
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def release_upload(upload_folder, path, extra_paths=()):
+    """업로드 파일 참조 해제 (마지막 참조면 커밋 후 파생 파일과 함께 삭제)
+
+    호출한 쪽의 트랜잭션에서 참조 수만 줄이고, 파일은 트랜잭션이 커밋된 뒤
+    지웁니다. 롤백되면 파일은 그대로 남습니다. 콘텐츠 주소 방식이 아닌 기존
+    파일은 참조 수 없이 커밋 후 삭제합니다. 파일 삭제가 예약되었으면 True를
+    반환합니다.
+    """
+    from app.extensions import db
+
+    if is_content_addressed(path):
+        remaining = UploadBlob.release(path)
+        if remaining:
+            return False
+
+    db.session.info.setdefault('released_uploads', []).append((upload_folder, path, tuple(extra_paths)))
+    return True
+
+def remove_released_uploads(released):
+    """참조가 사라진 업로드 파일 삭제 후 삭제한 원본 수 반환
+
+    쓰기 잠금을 잡은 상태에서 그 사이 같은 내용이 다시 올라와 참조되지
+    않았는지 확인합니다. store_upload도 참조를 먼저 기록한 뒤 파일을 확인하므로
+    두 작업이 겹치지 않습니다.
+    """
+    from app.extensions import db
+
+    table = UploadBlob.__table__
+    removed = 0
+    for upload_folder, path, extra_paths in released:
+        if is_content_addressed(path):
+            db.session.execute(table.delete().where(table.c.path == path, table.c.ref_count == 0))
+            if db.session.execute(db.select(table.c.sha256).where(table.c.path == path)).first():
+                continue
+
+        for relative_path in (path, *extra_paths):
+            full_path = os.path.join(upload_folder, relative_path)
+            if os.path.exists(full_path):
+                try:
+                    os.remove(full_path)
+                    removed += relative_path == path
+                except OSError:
+                    pass
+    db.session.commit()
+    return removed
+
+@event.listens_for(Session, 'after_commit')
+def _remove_after_commit(session):
+    """참조를 해제한 트랜잭션이 커밋되면 파일 삭제"""
+    released = session.info.pop('released_uploads', None)
+    if released:
+        from flask import current_app
+        app = current_app._get_current_object()
+        try:
+            # 커밋 직후의 세션에서는 SQL을 실행할 수 없으므로 새 앱 컨텍스트(새 세션)에서 처리
+            with app.app_context():
+                remove_released_uploads(released)
+        except Exception as e:
+            logging.error(f'Failed to remove released uploads: {str(e)}')
+
+@event.listens_for(Session, 'after_rollback')
+def _keep_after_rollback(session):
+    """롤백된 트랜잭션의 파일 삭제 예약 제거 (참조가 되돌아가므로 파일 유지)"""
+    session.info.pop('released_uploads', None)
+
+def _move_or_discard(upload_folder, source, target):
+    """파일을 대상 경로로 이동 (대상이 이미 있으면 원본은 중복이므로 삭제)"""
+    source_path = os.path.join(upload_folder, source)
+    target_path = os.path.join(upload_folder, target)
+    if os.path.exists(target_path):
+        os.remove(source_path)
+    else:
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(source_path, target_path)
+
+def migrate_legacy_uploads(upload_folder, dry_run=False, batch_size=100):
+    """평면 구조 업로드 파일을 콘텐츠 주소 저장소로 이전
+
+    추억이 가리키는 기존 파일을 해시해 샤드 경로로 옮기고(같은 내용은 하나로
+    합침) image_path, 파생 이미지 경로, 참조 수를 갱신합니다. 여러 번 실행해도
+    안전하며 통계 딕셔너리를 반환합니다.
+    """
+    from app.extensions import db
+    from app.models.memory import Memory
+    from app.services.image_pipeline import get_variant_filename
+
+    stats = {'migrated': 0, 'deduplicated': 0, 'missing': 0, 'skipped': 0}
+    moved = {}  # 기존 경로 -> 새 경로 (같은 파일을 가리키는 추억이 여럿인 경우)
+
+    memory_ids = [row.id for row in db.session.execute(
+        db.select(Memory.id).where(Memory.image_path.isnot(None), Memory.image_path != '')
+    )]
+
+    for index, memory_id in enumerate(memory_ids, 1):
+        memory = db.session.get(Memory, memory_id)
+        legacy_path = memory.image_path
+        if is_content_addressed(legacy_path):
+            stats['skipped'] += 1
+            continue
+
+        if legacy_path in moved:
+            new_path, digest, size = moved[legacy_path]
+        else:
+            full_path = os.path.join(upload_folder, legacy_path)
+            if not os.path.isfile(full_path):
+                stats['missing'] += 1
+                continue
+
+            digest, size = hash_file(full_path)
+            ext = os.path.splitext(legacy_path)[1] or '.bin'
+            new_path = shard_path(digest, ext)
+            if os.path.exists(os.path.join(upload_folder, new_path)):
+                stats['deduplicated'] += 1
+            moved[legacy_path] = (new_path, digest, size)
+
+            if not dry_run:
+                _move_or_discard(upload_folder, legacy_path, new_path)
+
+        if dry_run:
+            stats['migrated'] += 1
+            continue
+
+        # 파생 이미지도 새 경로 규칙으로 이동
+        variants = memory.get_variants()
+        for variant in variants:
+            for key, extension in (('webp', 'webp'), ('jpeg', 'jpg')):
+                target = get_variant_filename(new_path, variant['width'], extension)
+                if os.path.exists(os.path.join(upload_folder, variant[key])):
+                    _move_or_discard(upload_folder, variant[key], target)
+                variant[key] = target
+
+        path, _ = UploadBlob.acquire(digest, new_path, size)
+        memory.image_path = path
+        memory.set_variants(variants)
+        stats['migrated'] += 1
+
+        if index % batch_size == 0:
+            db.session.commit()
+
+    if not dry_run:
+        db.session.commit()
+    return stats
+
+# 파생 이미지 파일명 (원본 이름_w너비.확장자)
+VARIANT_SUFFIX_PATTERN = re.compile(r'_w\d+$')
+
+# 격리 폴더 기본 이름 (업로드 폴더 안, 점으로 시작해 정리 대상에서 제외)
+QUARANTINE_DIRNAME = '.quarantine'
+
+class ReferencedUploads:
+    """추억과 업로드 파일이 참조하는 파일 이름(확장자 제외) 집합
+
+    콘텐츠 주소 경로는 해시 앞 64비트만 정렬된 array('Q')에 담아 사진 한 장당
+    8바이트로 수백만 장도 적은 메모리로 표시합니다. 같은 앞 64비트를 가진
+    다른 파일은 살아 있는 것으로 보여 지워지지 않을 뿐이므로 안전합니다.
+    평면 구조 기존 파일 이름은 일반 집합에 담습니다.
+    """
+
+    def __init__(self):
+        self.keys = array('Q')
+        self.legacy = set()
+        self._sorted = True
+
+    @staticmethod
+    def split_name(relative_path):
+        """파일 경로를 파생 이미지 접미사와 확장자를 뺀 원본 이름 후보 목록으로 변환"""
+        stem = os.path.splitext(relative_path)[0]
+        base = VARIANT_SUFFIX_PATTERN.sub('', stem)
+        return (stem, base) if base != stem else (stem,)
+
+    @staticmethod
+    def digest_key(stem):
+        """콘텐츠 주소 경로 이름의 64비트 키 (해당하지 않으면 None)"""
+        digest = stem.rsplit('/', 1)[-1]
+        if len(digest) == 64 and CONTENT_PATH_PATTERN.match(f'{stem}.x'):
+            return int(digest[:16], 16)
+        return None
+
+    def add(self, path):
+        stem = os.path.splitext(path)[0]
+        key = self.digest_key(stem)
+        if key is None:
+            self.legacy.add(stem)
+            return
+        if self.keys and key <= self.keys[-1]:
+            if key == self.keys[-1]:
+                return
+            self._sorted = False
+        self.keys.append(key)
+
+    def finish(self):
+        """경로 순서로 추가되지 않았으면 정렬"""
+        if not self._sorted:
+            self.keys = array('Q', sorted(set(self.keys)))
+            self._sorted = True
+
+    def __contains__(self, relative_path):
+        for stem in self.split_name(relative_path):
+            key = self.digest_key(stem)
+            if key is None:
+                if stem in self.legacy:
+                    return True
+                continue
+            index = bisect.bisect_left(self.keys, key)
+            if index < len(self.keys) and self.keys[index] == key:
+                return True
+        return False
+
+def collect_referenced_uploads(batch_size=5000):
+    """추억 이미지와 업로드 파일 참조를 스트리밍으로 읽어 ReferencedUploads 생성 (표시 단계)"""
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    referenced = ReferencedUploads()
+    paths = db.union(
+        db.select(Memory.image_path.label('path')).where(Memory.image_path.isnot(None), Memory.image_path != ''),
+        db.select(UploadBlob.path.label('path'))
+    ).order_by('path')
+    for row in db.session.execute(paths.execution_options(yield_per=batch_size)):
+        referenced.add(row.path)
+    referenced.finish()
+    return referenced
+
+def is_upload_referenced(relative_path):
+    """파일 하나가 지금 참조되는지 DB에서 다시 확인 (격리 직전 경쟁 조건 방지)"""
+    from app.extensions import db
+    from app.models.memory import Memory
+
+    for stem in ReferencedUploads.split_name(relative_path):
+        memory = db.session.execute(
+            db.select(Memory.id).where(Memory.image_path >= stem + '.', Memory.image_path < stem + '/').limit(1)
+        ).first()
+        blob = db.session.execute(
+            db.select(UploadBlob.sha256).where(UploadBlob.path >= stem + '.', UploadBlob.path < stem + '/').limit(1)
+        ).first()
+        if memory or blob:
+            return True
+    return False
+
+def iter_upload_files(folder):
+    """폴더 아래 파일을 os.scandir로 순회하며 (상대 경로, stat) 생성
+
+    점으로 시작하는 파일과 폴더(임시 업로드, 격리 폴더), 처리 중 임시
+    파일(*.tmp)은 건너뜁니다. 디렉토리 목록만 스택에 두므로 메모리를 적게 씁니다.
+    """
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(folder, relative_dir))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.') or entry.name.endswith('.tmp'):
+                    continue
+                relative_path = f'{relative_dir}/{entry.name}' if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(relative_path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield relative_path, entry.stat(follow_symlinks=False)
+
+def collect_orphan_uploads(upload_folder, quarantine_folder=None, grace_hours=24, retention_days=7,
+                           dry_run=False):
+    """참조되지 않는 업로드 파일 정리 (표시 후 쓸기)
+
+    1. DB의 참조 경로를 스트리밍으로 읽어 표시합니다.
+    2. 업로드 폴더를 순회하며 참조되지 않고 grace_hours보다 오래된 파일을
+       격리 폴더로 옮깁니다. 막 저장되어 아직 커밋되지 않은 파일은 유예 기간
+       덕분에 건드리지 않고, 옮기기 직전에 DB에서 한 번 더 확인합니다.
+    3. 격리된 지 retention_days가 지난 파일을 삭제합니다. 그 사이 다시
+       참조되면 제자리로 되돌립니다.
+
+    통계 딕셔너리(회수한 바이트 포함)를 반환합니다.
+    """
+    quarantine_folder = quarantine_folder or os.path.join(upload_folder, QUARANTINE_DIRNAME)
+    now = time.time()
+    stats = {
+        'scanned': 0, 'scanned_bytes': 0, 'referenced': 0, 'recent': 0,
+        'quarantined': 0, 'quarantined_bytes': 0,
+        'restored': 0, 'deleted': 0, 'reclaimed_bytes': 0
+    }
+
+    referenced = collect_referenced_uploads()
+
+    for relative_path, stat in iter_upload_files(upload_folder):
+        stats['scanned'] += 1
+        stats['scanned_bytes'] += stat.st_size
+        if relative_path in referenced:
+            stats['referenced'] += 1
+            continue
+        if stat.st_mtime > now - grace_hours * 3600:
+            stats['recent'] += 1
+            continue
+        if is_upload_referenced(relative_path):
+            stats['referenced'] += 1
+            continue
+
+        stats['quarantined'] += 1
+        stats['quarantined_bytes'] += stat.st_size
+        if not dry_run:
+            target = os.path.join(quarantine_folder, relative_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(os.path.join(upload_folder, relative_path), target)
+            # 격리 시각을 수정 시각으로 기록
+            os.utime(target, (now, now))
+
+    for relative_path, stat in iter_upload_files(quarantine_folder):
+        if stat.st_mtime > now - retention_days * 86400:
+            continue
+
+        path = os.path.join(quarantine_folder, relative_path)
+        if is_upload_referenced(relative_path):
+            stats['restored'] += 1
+            if not dry_run:
+                target = os.path.join(upload_folder, relative_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+            continue
+
+        stats['deleted'] += 1
+        stats['reclaimed_bytes'] += stat.st_size
+        if not dry_run:
+            os.remove(path)
+
+    return stats
@@ -1,86 +1,62 @@
 """SocketIO 이벤트 핸들러"""
 
-from flask import request
+from flask import request, current_app
 from flask_login import current_user
 from flask_socketio import emit, join_room, leave_room, disconnect
 from app.extensions import socketio, db
-from app.models.notification import Notification
+from app.models.notification import Notification, MAX_BULK_IDS
+from app.models.notification_outbox import NotificationOutbox
+from app.services.notification_delivery import notification_worker
+from app.services.dashboard_state import get_dashboard_state
+from app.services.presence import presence_registry, emit_presence
+from app.services.socket_handshake import load_identity, get_session_identity, build_bootstrap
 import logging
 
-# 연결된 사용자들을 추적하기 위한 딕셔너리
-connected_users = {}
-
 @socketio.on('connect')
-def handle_connect():
-    """클라이언트 연결 시 처리"""
-    if current_user.is_authenticated:
-        user_id = current_user.id
-        session_id = request.sid
-        
-        # 사용자를 개인 룸에 추가
-        join_room(f'user_{user_id}')
-        
-        # 연결된 사용자 추적
-        connected_users[session_id] = user_id
-        
-        # 파트너가 온라인인지 확인
-        partner = current_user.get_partner()
-        if partner:
-            partner_online = any(uid == partner.id for uid in connected_users.values())
-            
-            # 파트너에게 온라인 상태 알림
-            emit('partner_status', {
-                'partner_id': current_user.id,
-                'partner_name': current_user.name,
-                'status': 'online'
-            }, room=f'user_{partner.id}')
-            
-            # 현재 사용자에게 파트너 상태 알림
-            emit('partner_status', {
-                'partner_id': partner.id,
-                'partner_name': partner.name,
-                'status': 'online' if partner_online else 'offline'
-            })
-        
-        # 읽지 않은 알림 개수 전송
-        unread_count = Notification.get_unread_count(user_id)
-        emit('notification_count', {'count': unread_count})
-        
-        logging.info(f'User {current_user.name} (ID: {user_id}) connected')
-        
-    else:
+def handle_connect(auth=None):
+    """클라이언트 연결 시 처리
+
+    세션의 사용자 스냅샷으로 인증하고 개인 룸과 커플 룸에 함께 참여시킨 뒤,
+    'bootstrap' 이벤트 하나로 파트너 상태, 읽지 않은 알림 수, 최근 알림(auth에
+    since_id, version이 있으면 변경분)을 보냅니다.
+    """
+    identity = load_identity()
+    if identity is None:
         # 인증되지 않은 사용자는 연결 해제
         disconnect()
+        return
+    
+    user_id = identity['user_id']
+    app = current_app._get_current_object()
+    
+    # 개인 룸과 커플 룸에 참여
+    join_room(f'user_{user_id}')
+    if identity['couple_id']:
+        join_room(f"couple_{identity['couple_id']}")
+    
+    # 연결 등록 (첫 연결일 때만 파트너에게 온라인 전환 알림)
+    if presence_registry.connect(app, user_id, request.sid):
+        emit_presence(user_id, 'online', identity)
+    
+    emit('bootstrap', build_bootstrap(app, identity, auth))
+    
+    logging.info(f"User {identity['name']} (ID: {user_id}) connected")
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """클라이언트 연결 해제 시 처리"""
-    session_id = request.sid
+    user_id, last_connection = presence_registry.disconnect(current_app._get_current_object(), request.sid)
+    if user_id is None:
+        return
     
-    if session_id in connected_users:
-        user_id = connected_users[session_id]
-        
-        # 사용자 정보 가져오기
-        from app.models.user import User
-        user = User.query.get(user_id)
-        
-        if user:
-            # 개인 룸에서 제거
-            leave_room(f'user_{user_id}')
-            
-            # 파트너에게 오프라인 상태 알림
-            partner = user.get_partner()
-            if partner:
-                emit('partner_status', {
-                    'partner_id': user_id,
-                    'partner_name': user.name,
-                    'status': 'offline'
-                }, room=f'user_{partner.id}')
-            
-            logging.info(f'User {user.name} (ID: {user_id}) disconnected')
-        
-        # 연결된 사용자 목록에서 제거
-        del connected_users[session_id]
+    # 개인 룸에서 제거
+    leave_room(f'user_{user_id}')
+    
+    # 마지막 연결이 끊겼을 때만 파트너에게 오프라인 전환 알림
+    if last_connection:
+        emit_presence(user_id, 'offline', get_session_identity())
+    
+    logging.info(f'User {user_id} disconnected')
 
 @socketio.on('join_couple_room')
 def handle_join_couple_room():
@@ -104,26 +80,46 @@ def handle_leave_couple_room():
 
 @socketio.on('mark_notification_read')
 def handle_mark_notification_read(data):
-    """알림을 읽음으로 표시"""
+    """알림을 읽음으로 표시
+
+    notification_id(하나), notification_ids(목록), up_to_id(그 ID 이하 전부),
+    all(전부) 중 하나를 받아 UPDATE 한 문장으로 처리합니다.
+    """
     if current_user.is_authenticated:
-        notification_id = data.get('notification_id')
-        if notification_id:
-            notification = Notification.query.filter_by(
-                id=notification_id,
-                user_id=current_user.id
-            ).first()
-            
-            if notification and not notification.is_read:
-                notification.mark_as_read()
-                
-                # 업데이트된 읽지 않은 알림 개수 전송
-                unread_count = Notification.get_unread_count(current_user.id)
-                emit('notification_count', {'count': unread_count})
-                
-                emit('notification_marked_read', {
-                    'notification_id': notification_id,
-                    'success': True
-                })
+        data = data or {}
+        try:
+            if data.get('notification_id'):
+                notification_ids = [int(data['notification_id'])]
+            elif data.get('notification_ids') is not None:
+                notification_ids = [int(notification_id) for notification_id in data['notification_ids']][:MAX_BULK_IDS]
+            else:
+                notification_ids = None
+            up_to_id = int(data['up_to_id']) if data.get('up_to_id') is not None else None
+        except (TypeError, ValueError):
+            emit('notification_marked_read', {'success': False, 'message': '잘못된 알림 ID입니다.'})
+            return
+        
+        if notification_ids is None and up_to_id is None and not data.get('all'):
+            return
+        
+        count = Notification.mark_read_bulk(current_user.id, notification_ids, up_to_id)
+        if count:
+            # 업데이트된 읽지 않은 알림 개수를 모든 탭에 전송
+            emit_notification_count(current_user.id)
+        
+        emit('notification_marked_read', {
+            'notification_id': notification_ids[0] if notification_ids and len(notification_ids) == 1 else None,
+            'notification_ids': notification_ids,
+            'up_to_id': up_to_id,
+            'count': count,
+            'success': True
+        })
+
+def emit_notification_count(user_id):
+    """읽지 않은 알림 개수를 사용자의 개인 룸으로 전송 후 반환"""
+    unread_count = Notification.get_unread_count(user_id)
+    socketio.emit('notification_count', {'count': unread_count}, room=f'user_{user_id}')
+    return unread_count
 
 @socketio.on('get_notifications')
 def handle_get_notifications():
@@ -133,63 +129,57 @@ def handle_get_notifications():
                                         .order_by(Notification.created_at.desc())\
                                         .limit(10).all()
         
-        notification_data = [{
-            'id': notif.id,
-            'type': notif.type,
-            'title': notif.title,
-            'content': notif.content,
-            'icon': notif.get_type_icon(),
-            'color': notif.get_type_color(),
-            'is_read': notif.is_read,
-            'formatted_time': notif.get_formatted_time(),
-            'created_at': notif.created_at.isoformat()
-        } for notif in notifications]
+        notification_data = [notif.to_dict() for notif in notifications]
         
         emit('notifications_list', {'notifications': notification_data})
 
-def send_notification_to_user(user_id, notification_type, title, content, data=None):
-    """특정 사용자에게 실시간 알림 전송"""
-    try:
-        # 데이터베이스에 알림 저장
-        notification = Notification.create_notification(
-            user_id=user_id,
-            notification_type=notification_type,
-            title=title,
-            content=content
-        )
-        
-        # 실시간 알림 전송
-        notification_data = {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'content': notification.content,
-            'icon': notification.get_type_icon(),
-            'color': notification.get_type_color(),
-            'formatted_time': notification.get_formatted_time(),
-            'created_at': notification.created_at.isoformat()
-        }
-        
-        # 추가 데이터가 있으면 포함
-        if data:
-            notification_data.update(data)
-        
-        # 사용자의 개인 룸으로 알림 전송
-        socketio.emit('new_notification', notification_data, room=f'user_{user_id}')
-        
-        # 읽지 않은 알림 개수 업데이트
-        unread_count = Notification.get_unread_count(user_id)
-        socketio.emit('notification_count', {'count': unread_count}, room=f'user_{user_id}')
-        
-        logging.info(f'Notification sent to user {user_id}: {title}')
-        return notification
-        
-    except Exception as e:
-        logging.error(f'Failed to send notification to user {user_id}: {str(e)}')
-        return None
+@socketio.on('sync_notifications')
+def handle_sync_notifications(data=None):
+    """알림 증분 동기화 (since_id 이후 새 알림과 version 이후 읽음 처리된 알림)"""
+    if current_user.is_authenticated:
+        from app.services.notification_sync import build_sync, parse_sync_args
+        since_id, version = parse_sync_args(data or {})
+        emit('notifications_sync', build_sync(current_user.id, since_id, version))
+
+@socketio.on('dashboard_sync')
+def handle_dashboard_sync(data=None):
+    """대시보드 상태 재동기화 (클라이언트 버전이 다르면 전체 상태 전송)"""
+    if current_user.is_authenticated:
+        connection = current_user.get_couple_connection()
+        if not connection:
+            return
+        version, state = get_dashboard_state(connection)
+        if (data or {}).get('version') != version:
+            emit('dashboard_state', {'version': version, 'state': state})
+
+def send_notification_to_user(user_id, notification_type, title, content, data=None, subject=None):
+    """특정 사용자에게 실시간 알림 전송
+
+    알림과 전송 요청(아웃박스)을 현재 트랜잭션에 추가만 하므로, 호출한 쪽이
+    도메인 변경과 함께 커밋해야 합니다. 커밋되면 전송 워커가 수신자별로 모아
+    보냅니다. subject가 있으면 NOTIFICATION_COALESCE_WINDOW초 안의 같은
+    (사용자, 타입, 대상) 읽지 않은 알림과 하나로 합칩니다.
+    """
+    # 알림 저장 (최근 같은 알림이 있으면 합침)
+    notification, replaced_id = Notification.create_or_coalesce(
+        user_id=user_id,
+        notification_type=notification_type,
+        title=title,
+        content=content,
+        subject=subject,
+        window=current_app.config.get('NOTIFICATION_COALESCE_WINDOW', 300)
+    )
+    notification_worker.record(coalesced=replaced_id is not None)
+    
+    # 실시간 전송 요청 (추가 데이터가 있으면 전송 시 포함)
+    NotificationOutbox.enqueue(notification, replaced_id, data)
+    
+    logging.info(f'Notification queued for user {user_id}: {title}')
+    return notification
 
-def send_notification_to_couple(couple_id, notification_type, title, content, exclude_user_id=None, data=None):
-    """커플 모두에게 실시간 알림 전송"""
+def send_notification_to_couple(couple_id, notification_type, title, content, exclude_user_id=None, data=None,
+                                subject=None):
+    """커플 모두에게 실시간 알림 전송 (커밋은 호출한 쪽에서)"""
     try:
         from app.models.couple import CoupleConnection
         
@@ -204,7 +194,7 @@ def send_notification_to_couple(couple_id, notification_type, title, content, ex
             if exclude_user_id and user_id == exclude_user_id:
                 continue
             
-            send_notification_to_user(user_id, notification_type, title, content, data)
+            send_notification_to_user(user_id, notification_type, title, content, data, subject)
         
         logging.info(f'Notification sent to couple {couple_id}: {title}')
         
@@ -212,7 +202,7 @@ def send_notification_to_couple(couple_id, notification_type, title, content, ex
         logging.error(f'Failed to send notification to couple {couple_id}: {str(e)}')
 
 def notify_mood_update(user_id, mood_level, mood_emoji, mood_text):
-    """기분 업데이트 알림"""
+    """기분 업데이트 알림 (최신 기분이 이전 알림을 대체하도록 사용자 단위로 합침)"""
     from app.models.user import User
     
     user = User.query.get(user_id)
@@ -231,6 +221,7 @@ def notify_mood_update(user_id, mood_level, mood_emoji, mood_text):
         'mood_update',
         title,
         content,
+        subject=f'user_{user.id}',
         data={
             'mood_level': mood_level,
             'mood_emoji': mood_emoji,
@@ -239,8 +230,8 @@ def notify_mood_update(user_id, mood_level, mood_emoji, mood_text):
         }
     )
 
-def notify_new_answer(user_id, question_text):
-    """새로운 답변 알림"""
+def notify_new_answer(user_id, question_id, question_text):
+    """새로운 답변 알림 (같은 질문의 답변 알림만 합침)"""
     from app.models.user import User
     
     user = User.query.get(user_id)
@@ -259,14 +250,15 @@ def notify_new_answer(user_id, question_text):
         'new_answer',
         title,
         content,
+        subject=f'question_{question_id}',
         data={
             'question_text': question_text,
             'user_name': user.name
         }
     )
 
-def notify_new_memory(user_id, memory_title):
-    """새로운 추억 알림"""
+def notify_new_memory(user_id, memory_id, memory_title):
+    """새로운 추억 알림 (같은 추억의 알림만 합침)"""
     from app.models.user import User
     
     user = User.query.get(user_id)
@@ -285,6 +277,7 @@ def notify_new_memory(user_id, memory_title):
         'new_memory',
         title,
         content,
+        subject=f'memory_{memory_id}',
         data={
             'memory_title': memory_title,
             'user_name': user.name
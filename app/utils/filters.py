@@ -3,11 +3,20 @@
 import re
 from markupsafe import Markup
 
+# 전문 검색 스니펫의 일치 구간 표시 문자 (유니코드 사용자 정의 영역)
+SNIPPET_OPEN = '\ue000'
+SNIPPET_CLOSE = '\ue001'
+
 def highlight_search(text, query):
-    """검색어를 하이라이트 처리"""
+    """검색어를 하이라이트 처리 (검색 인덱스가 표시한 스니펫이면 표시 구간 사용)"""
     if not query or not text:
         return text
     
+    if SNIPPET_OPEN in str(text):
+        highlighted = str(text).replace(SNIPPET_OPEN, '<span class="highlight">')\
+                               .replace(SNIPPET_CLOSE, '</span>')
+        return Markup(highlighted)
+    
     # 특수 문자 이스케이프
     escaped_query = re.escape(query)
     
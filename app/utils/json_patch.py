@@ -0,0 +1,58 @@
+"""JSON Patch (RFC 6902) 생성/적용 유틸리티
+
+대시보드 상태처럼 작은 JSON 문서의 변경분을 보내기 위한 최소 구현입니다.
+객체는 키 단위로 비교해 add/remove/replace를 만들고, 배열은 통째로
+replace합니다(대시보드의 목록은 몇 개 항목뿐이라 위치별 비교보다 작음).
+"""
+
+def escape_pointer(key):
+    """JSON Pointer 경로 조각 이스케이프"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def unescape_pointer(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+def make_patch(old, new, path=''):
+    """old를 new로 바꾸는 연산 목록 반환 (같으면 빈 목록)"""
+    if old == new:
+        return []
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({'op': 'remove', 'path': f'{path}/{escape_pointer(key)}'})
+    for key, value in new.items():
+        child = f'{path}/{escape_pointer(key)}'
+        if key not in old:
+            ops.append({'op': 'add', 'path': child, 'value': value})
+        else:
+            ops.extend(make_patch(old[key], value, child))
+    return ops
+
+def apply_patch(document, ops):
+    """연산 목록을 적용한 새 문서 반환 (make_patch가 만드는 연산만 지원)"""
+    import copy
+
+    document = copy.deepcopy(document)
+    for op in ops:
+        if op['path'] == '':
+            document = copy.deepcopy(op['value'])
+            continue
+
+        tokens = [unescape_pointer(token) for token in op['path'].split('/')[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        key = tokens[-1]
+        if isinstance(parent, list):
+            key = int(key)
+
+        if op['op'] == 'remove':
+            del parent[key]
+        elif op['op'] in ('add', 'replace'):
+            parent[key] = copy.deepcopy(op['value'])
+        else:
+            raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return document
@@ -0,0 +1,119 @@
+"""Socket.IO 메시지 큐 (여러 워커 프로세스 간 이벤트 전달)
+
+gunicorn이 워커를 여러 개 띄우면 사용자가 접속한 워커와 이벤트를 보내는 워커가
+다를 수 있으므로, 모든 emit을 메시지 큐로 다른 워커에 전달해야 합니다.
+SOCKETIO_MESSAGE_QUEUE 설정에 따라 백엔드를 고릅니다.
+
+- 'redis://host:port/0': Redis pub/sub (redis 패키지 필요, Flask-SocketIO 기본 지원)
+- 'sqlite:///경로': 같은 서버의 워커끼리 SQLite 파일로 주고받는 로컬 백엔드
+  (별도 서비스 없이 한 대에서 운영할 때)
+- 없음: 단일 프로세스 (개발 서버, 테스트)
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+import socketio
+
+SQLITE_SCHEME = 'sqlite:///'
+
+MESSAGE_TABLE_DDL = (
+    "CREATE TABLE IF NOT EXISTS socketio_messages ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, "
+    "payload TEXT NOT NULL, created_at REAL NOT NULL)"
+)
+
+class SQLiteManager(socketio.PubSubManager):
+    """SQLite 파일을 이용한 로컬 pub/sub 클라이언트 관리자
+
+    발행은 메시지 한 행을 INSERT하고, 각 워커의 수신 스레드는 마지막으로 읽은
+    ID 이후의 행을 poll_interval마다 읽습니다. WAL 모드라 읽기와 쓰기가 서로
+    막지 않고, AUTOINCREMENT로 지운 행의 ID가 재사용되지 않습니다.
+    retention초보다 오래된 메시지는 발행하는 쪽에서 주기적으로 지웁니다.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, url=SQLITE_SCHEME + 'socketio-queue.db', channel='flask-socketio',
+                 write_only=False, logger=None, json=None, poll_interval=0.05, retention=60):
+        self.path = url[len(SQLITE_SCHEME):] if url.startswith(SQLITE_SCHEME) else url
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._publish_conn = None
+        self._publish_pid = None
+        self._publish_lock = threading.Lock()
+        self._published = 0
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+
+    def _connect(self):
+        """큐 파일 연결 (없으면 만듦)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(MESSAGE_TABLE_DDL)
+        return conn
+
+    def _publish(self, data):
+        with self._publish_lock:
+            # fork된 워커는 부모의 연결을 쓰지 않음
+            if self._publish_conn is None or self._publish_pid != os.getpid():
+                self._publish_conn = self._connect()
+                self._publish_pid = os.getpid()
+
+            now = time.time()
+            self._publish_conn.execute(
+                "INSERT INTO socketio_messages (channel, payload, created_at) VALUES (?, ?, ?)",
+                (self.channel, self.json.dumps(data), now)
+            )
+            self._published += 1
+            if self._published % 500 == 0:
+                self._publish_conn.execute("DELETE FROM socketio_messages WHERE created_at < ?",
+                                           (now - self.retention,))
+
+    def _listen(self):
+        conn = self._connect()
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM socketio_messages").fetchone()[0]
+        while True:
+            try:
+                rows = conn.execute(
+                    "SELECT id, payload FROM socketio_messages WHERE id > ? AND channel = ? ORDER BY id",
+                    (last_id, self.channel)
+                ).fetchall()
+            except sqlite3.Error as e:
+                self._get_logger().warning(f'SQLite message queue read failed: {e}')
+                rows = []
+
+            for message_id, payload in rows:
+                last_id = message_id
+                yield payload
+
+            if not rows:
+                self._sleep(self.poll_interval)
+
+    def _sleep(self, seconds):
+        """서버의 비동기 모드에 맞는 대기 (eventlet이면 그린 스레드 양보)"""
+        if self.server is not None:
+            self.server.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+def get_message_queue_options(app, write_only=False):
+    """SOCKETIO_MESSAGE_QUEUE 설정에 맞는 socketio.init_app 인수 반환"""
+    url = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    channel = app.config.get('SOCKETIO_CHANNEL', 'couple-app')
+    if not url:
+        return {}
+
+    if url.startswith(SQLITE_SCHEME):
+        logging.info(f'Socket.IO message queue: {url}')
+        return {'client_manager': SQLiteManager(
+            url, channel=channel, write_only=write_only,
+            poll_interval=app.config.get('SOCKETIO_QUEUE_POLL_INTERVAL', 0.05)
+        )}
+
+    # redis:// 등은 Flask-SocketIO가 백엔드를 고름
+    return {'message_queue': url, 'channel': channel}
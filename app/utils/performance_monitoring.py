@@ -210,10 +210,12 @@ def init_performance_monitoring(app):
         @app.route('/debug/performance')
         def performance_stats():
             from flask import jsonify
+            from app.services.notification_delivery import notification_worker
             
             return jsonify({
                 'system_stats': PerformanceMonitor.get_system_stats(),
                 'database_stats': PerformanceMonitor.get_database_stats(),
+                'notification_stats': notification_worker.get_stats(),
                 'recent_requests': request_profiler.get_recent_profiles(),
                 'slow_requests': request_profiler.get_slow_requests()
             })
@@ -6,7 +6,7 @@ from functools import wraps
 from flask import request, jsonify, current_app, abort, flash, redirect, url_for
 from flask_login import current_user
 from werkzeug.utils import secure_filename
-from PIL import Image
+from app.services.image_pipeline import open_image, ImageRejected, DEFAULT_MAX_PIXELS
 
 # python-magic을 선택적으로 import (시스템에 libmagic이 없을 수 있음)
 try:
@@ -156,11 +156,16 @@ class FileUploadValidator:
     
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-    MAX_IMAGE_DIMENSION = 2048  # 최대 이미지 크기 (픽셀)
+    MAX_IMAGE_DIMENSION = 2048  # 최적화할 때 긴 변의 최대 크기 (픽셀)
+    MAX_IMAGE_PIXELS = DEFAULT_MAX_PIXELS  # 헤더의 해상도가 이보다 크면 거부 (압축 폭탄 방지)
     
     @classmethod
     def validate_file(cls, file):
-        """파일 검증"""
+        """파일 검증
+
+        파일 내용은 앞부분(헤더)만 읽습니다. 픽셀 디코딩은 저장 후 이미지
+        파이프라인에서 한 번만 합니다.
+        """
         errors = []
         
         if not file or not file.filename:
@@ -179,8 +184,10 @@ class FileUploadValidator:
         if file_size > cls.MAX_FILE_SIZE:
             errors.append(f'파일 크기가 너무 큽니다. (최대 {cls.MAX_FILE_SIZE // (1024*1024)}MB)')
         
-        # MIME 타입 검증
-        if not cls._is_allowed_mime_type(file):
+        # MIME 타입 검증 (첫 1KB만 읽어서 검증)
+        header = file.read(1024)
+        file.seek(0)
+        if not cls._is_allowed_mime_type(header):
             errors.append('허용되지 않는 파일 타입입니다.')
         
         # 이미지 파일인 경우 추가 검증
@@ -197,18 +204,15 @@ class FileUploadValidator:
                filename.rsplit('.', 1)[1].lower() in cls.ALLOWED_EXTENSIONS
     
     @classmethod
-    def _is_allowed_mime_type(cls, file):
-        """MIME 타입 검증"""
+    def _is_allowed_mime_type(cls, header):
+        """MIME 타입 검증 (파일 앞부분 바이트)"""
         if not HAS_MAGIC:
             # python-magic이 없는 경우 기본 검증만 수행
             return True
         
         try:
             # python-magic을 사용하여 실제 파일 타입 검증
-            file_content = file.read(1024)  # 첫 1KB만 읽어서 검증
-            file.seek(0)  # 파일 포인터 리셋
-            
-            mime_type = magic.from_buffer(file_content, mime=True)
+            mime_type = magic.from_buffer(header, mime=True)
             allowed_mime_types = {
                 'image/png', 'image/jpeg', 'image/gif', 'image/webp'
             }
@@ -226,34 +230,29 @@ class FileUploadValidator:
     
     @classmethod
     def _validate_image(cls, file):
-        """이미지 파일 추가 검증"""
-        errors = []
-        
+        """이미지 헤더 검증 (형식, 해상도)"""
         try:
-            # PIL을 사용하여 이미지 검증
-            image = Image.open(file)
-            
-            # 이미지 크기 검증
-            width, height = image.size
-            if width > cls.MAX_IMAGE_DIMENSION or height > cls.MAX_IMAGE_DIMENSION:
-                errors.append(f'이미지 크기가 너무 큽니다. (최대 {cls.MAX_IMAGE_DIMENSION}x{cls.MAX_IMAGE_DIMENSION})')
-            
-            # 이미지 형식 검증
-            if image.format.lower() not in ['png', 'jpeg', 'gif', 'webp']:
-                errors.append('지원되지 않는 이미지 형식입니다.')
-            
+            # 헤더만 읽으므로 압축 폭탄도 메모리를 쓰기 전에 거부됨
+            # (닫으면 업로드 스트림도 닫히므로 열기만 함)
+            open_image(file, cls.MAX_IMAGE_PIXELS)
+            return []
+        except ImageRejected as e:
+            return [str(e)]
+        finally:
             # 파일 포인터 리셋
             file.seek(0)
-            
-        except Exception as e:
-            errors.append('유효하지 않은 이미지 파일입니다.')
-            file.seek(0)
-        
-        return errors
     
     @classmethod
-    def secure_save_file(cls, file, upload_folder):
-        """안전한 파일 저장"""
+    def secure_save_file(cls, file, upload_folder, optimize=True):
+        """안전한 파일 저장
+        
+        파일은 내용 해시 기반 경로(ab/cd/<hash>.<ext>)에 저장되며, 같은 파일이
+        이미 있으면 공유합니다. 참조는 호출한 쪽의 트랜잭션에 기록되므로
+        저장 후 커밋해야 합니다. optimize=False이면 원본만 저장하고 최적화는
+        호출한 쪽(백그라운드 이미지 파이프라인)에 맡깁니다.
+        """
+        from app.services.upload_storage import store_upload
+        
         if not file or not file.filename:
             return None, ['파일이 없습니다.']
         
@@ -262,24 +261,16 @@ class FileUploadValidator:
         if errors:
             return None, errors
         
-        # 안전한 파일명 생성
-        filename = secure_filename(file.filename)
-        
-        # 파일명 중복 방지
-        base_name, ext = os.path.splitext(filename)
-        counter = 1
-        while os.path.exists(os.path.join(upload_folder, filename)):
-            filename = f"{base_name}_{counter}{ext}"
-            counter += 1
+        # 확장자는 검증된 원본 파일명에서 가져옴
+        ext = secure_filename(file.filename).rsplit('.', 1)[1].lower()
         
         # 파일 저장
         try:
-            file_path = os.path.join(upload_folder, filename)
-            file.save(file_path)
+            filename, created = store_upload(file, upload_folder, ext)
             
-            # 이미지 파일인 경우 최적화
-            if cls._is_image_file(filename):
-                cls._optimize_image(file_path)
+            # 새로 저장된 이미지 파일인 경우 최적화
+            if optimize and created and cls._is_image_file(filename):
+                cls._optimize_image(os.path.join(upload_folder, filename))
             
             return filename, []
         
@@ -290,19 +281,9 @@ class FileUploadValidator:
     @classmethod
     def _optimize_image(cls, file_path):
         """이미지 최적화"""
+        from app.services.image_pipeline import optimize_image_file
         try:
-            with Image.open(file_path) as image:
-                # EXIF 데이터 제거 (보안상 이유)
-                if hasattr(image, '_getexif'):
-                    image = image.copy()
-                
-                # 이미지 크기 조정 (필요한 경우)
-                if image.size[0] > cls.MAX_IMAGE_DIMENSION or image.size[1] > cls.MAX_IMAGE_DIMENSION:
-                    image.thumbnail((cls.MAX_IMAGE_DIMENSION, cls.MAX_IMAGE_DIMENSION), Image.Resampling.LANCZOS)
-                
-                # 최적화된 이미지 저장
-                image.save(file_path, optimize=True, quality=85)
-        
+            optimize_image_file(file_path, cls.MAX_IMAGE_DIMENSION, cls.MAX_IMAGE_PIXELS)
         except Exception as e:
             current_app.logger.warning(f"Image optimization failed: {e}")
 
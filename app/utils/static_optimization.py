@@ -1,6 +1,7 @@
 """정적 파일 최적화 유틸리티"""
 
 import os
+import re
 import gzip
 import shutil
 from datetime import datetime, timedelta
@@ -150,76 +151,68 @@ def init_asset_versioning(app):
         # Jinja2 템플릿에서 사용할 수 있도록 함수 등록
         app.jinja_env.globals['versioned_url'] = asset_versioning.get_versioned_url
 
-def optimize_images():
-    """이미지 최적화 (기본적인 처리)"""
-    from PIL import Image
-    import os
-    
+def _is_original_upload(filename):
+    """최적화 대상 원본 업로드 파일인지 확인 (파생 이미지, 임시 파일 제외)"""
+    from app.services.upload_storage import TEMP_PREFIX
+
+    lower = filename.lower()
+    if filename.startswith(TEMP_PREFIX) or lower.endswith('.tmp'):
+        return False
+    if re.search(r'_w\d+\.(webp|jpg)$', lower):
+        return False
+    return lower.endswith(('.png', '.jpg', '.jpeg'))
+
+def optimize_images(resize=True, webp=True):
+    """업로드 이미지 최적화 (크기 제한과 WebP 버전 생성을 한 번의 디코딩으로 처리)
+
+    헤더만 읽어 할 일이 없는 파일은 디코딩하지 않고, 할 일이 있으면 한 번
+    디코딩한 이미지로 원본 재저장과 WebP 생성을 모두 합니다.
+    (재저장한 파일 수, 생성한 WebP 수)를 반환합니다.
+    """
+    from app.services.image_pipeline import open_image, normalize_image, save_image, DEFAULT_MAX_PIXELS
+
     upload_folder = current_app.config['UPLOAD_FOLDER']
+    max_dimension = current_app.config.get('IMAGE_MAX_DIMENSION', 2048)
+    max_pixels = current_app.config.get('IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS)
     optimized_count = 0
-    
+    webp_count = 0
+
     for root, dirs, files in os.walk(upload_folder):
         for file in files:
-            if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with Image.open(file_path) as img:
-                        # 이미지가 너무 큰 경우 리사이즈
-                        max_size = (1920, 1080)
-                        if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                            
-                            # 품질을 조정하여 저장
-                            if file.lower().endswith('.jpg') or file.lower().endswith('.jpeg'):
-                                img.save(file_path, 'JPEG', quality=85, optimize=True)
-                            else:
-                                img.save(file_path, 'PNG', optimize=True)
-                            
-                            optimized_count += 1
-                            print(f"이미지 최적화 완료: {file_path}")
-                
-                except Exception as e:
-                    print(f"이미지 최적화 실패 {file_path}: {e}")
-    
-    print(f"총 {optimized_count}개 이미지가 최적화되었습니다.")
-    return optimized_count
+            if not _is_original_upload(file):
+                continue
+
+            file_path = os.path.join(root, file)
+            webp_path = os.path.splitext(file_path)[0] + '.webp'
+
+            try:
+                with open_image(file_path, max_pixels) as image:
+                    # 헤더 정보로 필요한 작업 판단 (필요 없으면 디코딩하지 않음)
+                    needs_resize = resize and max(image.size) > max_dimension
+                    needs_webp = webp and (not os.path.exists(webp_path) or
+                                           os.path.getmtime(file_path) > os.path.getmtime(webp_path))
+                    if not needs_resize and not needs_webp:
+                        continue
+
+                    image_format = image.format
+                    image = normalize_image(image, max_dimension if needs_resize else None)
+
+                    if needs_resize:
+                        save_image(image, file_path, image_format)
+                        optimized_count += 1
+                        print(f"이미지 최적화 완료: {file_path}")
+
+                    if needs_webp:
+                        save_image(image, webp_path, 'WEBP', quality=80)
+                        webp_count += 1
+                        print(f"WebP 생성 완료: {webp_path}")
+
+            except Exception as e:
+                print(f"이미지 최적화 실패 {file_path}: {e}")
+
+    print(f"총 {optimized_count}개 이미지가 최적화되고 {webp_count}개 WebP 이미지가 생성되었습니다.")
+    return optimized_count, webp_count
 
 def create_webp_versions():
-    """업로드된 이미지의 WebP 버전 생성"""
-    from PIL import Image
-    import os
-    
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    webp_count = 0
-    
-    for root, dirs, files in os.walk(upload_folder):
-        for file in files:
-            if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                file_path = os.path.join(root, file)
-                webp_path = os.path.splitext(file_path)[0] + '.webp'
-                
-                # WebP 파일이 없거나 원본이 더 최신인 경우
-                if (not os.path.exists(webp_path) or 
-                    os.path.getmtime(file_path) > os.path.getmtime(webp_path)):
-                    
-                    try:
-                        with Image.open(file_path) as img:
-                            # RGB 모드로 변환 (WebP는 RGBA를 지원하지만 호환성을 위해)
-                            if img.mode in ('RGBA', 'LA'):
-                                background = Image.new('RGB', img.size, (255, 255, 255))
-                                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                                img = background
-                            elif img.mode != 'RGB':
-                                img = img.convert('RGB')
-                            
-                            # WebP로 저장 (품질 80)
-                            img.save(webp_path, 'WebP', quality=80, optimize=True)
-                            webp_count += 1
-                            print(f"WebP 생성 완료: {webp_path}")
-                    
-                    except Exception as e:
-                        print(f"WebP 생성 실패 {file_path}: {e}")
-    
-    print(f"총 {webp_count}개 WebP 이미지가 생성되었습니다.")
-    return webp_count
\ No newline at end of file
+    """업로드된 이미지의 WebP 버전 생성 (크기 제한 없이)"""
+    return optimize_images(resize=False)[1]
@@ -12,11 +12,72 @@ class Config:
     
     # 파일 업로드 설정
     UPLOAD_FOLDER = 'uploads'
+    UPLOAD_GC_GRACE_HOURS = 24  # 이보다 최근 파일은 참조가 없어도 정리하지 않음 (저장 중인 업로드 보호)
+    UPLOAD_QUARANTINE_DAYS = 7  # 격리한 파일을 삭제하기 전 보관 일수
+    UPLOAD_QUARANTINE_FOLDER = None  # None이면 업로드 폴더 안의 .quarantine
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB 최대 파일 크기 (보안 강화)
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    # 업로드 파일 전송 방식: 'python'(sendfile), 'x-accel'(nginx), 'x-sendfile'(Apache/lighttpd)
+    UPLOAD_SERVE_MODE = os.environ.get('UPLOAD_SERVE_MODE', 'python')
+    UPLOAD_ACCEL_PREFIX = '/_uploads/'  # nginx 내부 location 경로
+    
+    # 이미지 처리 파이프라인 설정
+    IMAGE_PROCESSING_MODE = 'process'  # 'process', 'thread', 'sync'
+    IMAGE_WORKERS = None  # None이면 CPU 코어 수의 절반
+    IMAGE_QUEUE_SIZE = 32  # 대기 작업이 이 수에 도달하면 새 업로드 거절
+    IMAGE_STUCK_MINUTES = 30  # 업로드 후 이 시간 넘게 처리 중인 이미지는 유지보수에서 다시 처리 (분)
+    IMAGE_MAX_DIMENSION = 2048
+    IMAGE_MAX_PIXELS = 40_000_000  # 헤더의 해상도가 이보다 크면 디코딩하지 않고 거부
+    IMAGE_VARIANT_WIDTHS = (320, 640, 1280)  # 반응형 파생 이미지 너비 (px)
+    IMAGE_VARIANT_QUALITY = 80
+    DUPLICATE_MAX_DISTANCE = 6  # 유사 사진으로 볼 dHash 해밍 거리 (64비트 중, 7 이하)
+    
+    # 메모리 북 내보내기 설정
+    EXPORT_FOLDER = None  # None이면 instance/exports
+    EXPORT_STREAM_MAX_MEMORIES = 300  # 이보다 많으면 백그라운드 작업으로 생성 후 다운로드 링크 제공
+    EXPORT_RETENTION_HOURS = 24  # 완성된 내보내기 파일 보관 시간
+    EXPORT_STALE_SECONDS = 300  # 이 시간 넘게 쓰이지 않은 작성 중 파일은 멈춘 작업으로 보고 실패 처리 (초)
+    
+    # 추억 일괄 가져오기 설정
+    IMPORT_WORKERS = None  # None이면 CPU 코어 수
+    IMPORT_BATCH_SIZE = 100  # 한 트랜잭션에 추가하는 추억 수
+    IMPORT_MAX_ARCHIVE_SIZE = 500 * 1024 * 1024  # 가져오기 ZIP 최대 크기 (MAX_CONTENT_LENGTH와 별도)
+    IMPORT_MAX_IMAGE_SIZE = 20 * 1024 * 1024  # ZIP 안의 사진 한 장 최대 크기
+    IMPORT_MAX_FILES = 2000
+    IMPORT_WEBP_METHOD = 1  # 가져오기 파생 이미지 WebP 인코딩 단계 (0-6, 처리량 우선으로 낮게)
     
     # SocketIO 설정
     SOCKETIO_ASYNC_MODE = 'threading'
+    # 워커 간 메시지 큐: redis://host:6379/0, sqlite:///instance/socketio-queue.db, 없으면 단일 프로세스
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = 'couple-app'
+    SOCKETIO_QUEUE_POLL_INTERVAL = 0.05  # sqlite 큐를 확인하는 간격 (초)
+    PRESENCE_HEARTBEAT_INTERVAL = 30  # 워커가 자기 연결의 접속 상태를 갱신하는 간격 (초)
+    PRESENCE_TTL = 90  # 이 시간 넘게 갱신되지 않은 연결(죽은 워커)은 오프라인으로 처리 (초)
+    SOCKET_IDENTITY_REFRESH = 300  # 세션의 사용자/커플 스냅샷을 HTTP 요청 때 다시 읽는 주기 (초)
+    DASHBOARD_PUSH_DELAY = 0.2  # 커밋된 대시보드 변경을 모아 변경분을 보내기까지 (초)
+    
+    # 실시간 알림 설정
+    NOTIFICATION_COALESCE_WINDOW = 300  # 같은 대상의 읽지 않은 알림을 하나로 합치는 시간 (초, 0이면 합치지 않음)
+    NOTIFICATION_PUSH_DELAY = 0.5  # 수신자별로 알림을 모아 보내는 지연 (초, 0이면 즉시 전송)
+    NOTIFICATION_OUTBOX_BATCH_SIZE = 200  # 전송 워커가 한 번에 가져가는 전송 요청 수
+    NOTIFICATION_OUTBOX_LEASE = 60  # 가져간 요청을 전송하지 못하고 멈췄을 때 다시 전송하기까지 (초)
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 5  # 전송 실패 시 재시도 횟수 (지수 백오프)
+    
+    # 알림 보존 정책 (scripts/maintenance.py에서 실행)
+    # read_days/unread_days: 읽은/읽지 않은 알림을 남겨두는 일수 (None이면 지우지 않음)
+    # archive: NOTIFICATION_ARCHIVE_PATH가 있을 때 지우기 전에 보관 DB로 옮길지 여부
+    NOTIFICATION_RETENTION_DEFAULT = {'read_days': 30, 'unread_days': 180, 'archive': True}
+    NOTIFICATION_RETENTION_POLICIES = {
+        'mood_update': {'read_days': 7, 'unread_days': 30, 'archive': False},
+        'event_reminder': {'read_days': 7, 'unread_days': 30, 'archive': False},
+        'dday_reminder': {'read_days': 7, 'unread_days': 30, 'archive': False},
+        'partner_connected': {'read_days': 365, 'unread_days': None},
+    }
+    NOTIFICATION_ARCHIVE_PATH = None  # 예: instance/notifications_archive.db (None이면 보관하지 않고 삭제)
+    NOTIFICATION_RETENTION_CHUNK_SIZE = 500  # 한 트랜잭션에서 지우는 알림 수
+    NOTIFICATION_RETENTION_PAUSE = 0.05  # 묶음 사이 쉬는 시간 (초)
+    NOTIFICATION_VACUUM_PAGES = 2000  # 한 번에 반환하는 빈 페이지 수 상한 (증분 VACUUM)
     
     # 보안 설정 (일시적으로 비활성화)
     WTF_CSRF_ENABLED = False
@@ -73,6 +134,9 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    IMAGE_PROCESSING_MODE = 'sync'
+    NOTIFICATION_PUSH_DELAY = 0
+    PRESENCE_HEARTBEAT_INTERVAL = 0  # 하트비트 태스크를 띄우지 않고 테스트에서 heartbeat()를 직접 호출
 
 # 환경별 설정 매핑
 config = {
@@ -10,6 +10,8 @@ backlog = 2048
 # 워커 프로세스
 workers = multiprocessing.cpu_count() * 2 + 1
 worker_class = "eventlet"  # SocketIO 지원을 위해 eventlet 사용
+# 워커가 여러 개이면 SOCKETIO_MESSAGE_QUEUE(redis:// 또는 sqlite:///)를 설정해야
+# 다른 워커에 연결된 클라이언트에게도 이벤트가 전달됨
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -50,5 +50,124 @@ def setup_db():
         else:
             click.echo("❌ 데이터베이스 설정에 실패했습니다.")
 
+@cli.command()
+@click.option('--workers', type=int, default=None, help='병렬 작업 프로세스 수 (기본: CPU 코어 수)')
+@click.option('--force', is_flag=True, help='이미 파생 이미지가 있는 추억도 다시 생성')
+def backfill_variants(workers, force):
+    """기존 추억 이미지의 반응형 파생 이미지 생성"""
+    from app.services.image_pipeline import backfill_image_variants
+    with app.app_context():
+        click.echo("파생 이미지를 생성합니다...")
+        processed, failed = backfill_image_variants(app, workers=workers, force=force)
+        click.echo(f"✅ {processed}개 처리, {failed}개 실패")
+
+@cli.command()
+@click.option('--workers', type=int, default=None, help='병렬 작업 프로세스 수 (기본: CPU 코어 수)')
+def backfill_hashes(workers):
+    """기존 추억 사진의 유사 검출 해시 계산"""
+    from app.services.image_hash import backfill_image_hashes
+    with app.app_context():
+        click.echo("사진 해시를 계산합니다...")
+        processed, failed = backfill_image_hashes(app, workers=workers)
+        click.echo(f"✅ {processed}개 처리, {failed}개 실패")
+
+@cli.command()
+def rebuild_search():
+    """추억 전문 검색 인덱스 재생성"""
+    from app.services.memory_search import rebuild_search_index
+    with app.app_context():
+        click.echo("검색 인덱스를 다시 만듭니다...")
+        count = rebuild_search_index()
+        click.echo(f"✅ 추억 {count}개를 색인했습니다.")
+
+@cli.command()
+@click.argument('zip_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--email', required=True, help='추억 작성자로 기록할 사용자 이메일')
+@click.option('--workers', type=int, default=None, help='병렬 작업 프로세스 수 (기본: CPU 코어 수)')
+def import_memories(zip_path, email, workers):
+    """ZIP 파일의 사진으로 추억 일괄 가져오기"""
+    import time
+    from app.models.user import User
+    from app.services.memory_import import import_memories_from_zip
+    with app.app_context():
+        user = User.query.filter_by(email=email).first()
+        connection = user.get_couple_connection() if user else None
+        if connection is None:
+            click.echo("❌ 커플로 연결된 사용자를 찾을 수 없습니다.")
+            return
+        
+        started = time.perf_counter()
+        try:
+            stats = import_memories_from_zip(
+                app, connection.id, user.id, zip_path, workers=workers,
+                progress=lambda stats: click.echo(f"   {stats['processed']}/{stats['total']} 처리")
+            )
+        except ValueError as e:
+            click.echo(f"❌ {e}")
+            return
+        
+        for error in stats['errors']:
+            click.echo(f"   건너뜀 {error['file']}: {error['message']}")
+        click.echo(f"✅ {stats['imported']}개 가져옴, {stats['failed']}개 실패 "
+                   f"({time.perf_counter() - started:.1f}초)")
+
+@cli.command()
+@click.option('--fix', is_flag=True, help='어긋난 카운터를 다시 계산')
+@click.option('--rebuild', is_flag=True, help='모든 카운터를 처음부터 다시 계산')
+def verify_counters(fix, rebuild):
+    """커플 콘텐츠 카운터와 읽지 않은 알림 카운터 검증"""
+    from app.models.couple_counter import CoupleCounter
+    from app.models.notification_counter import NotificationCounter
+    with app.app_context():
+        if rebuild:
+            CoupleCounter.rebuild()
+            NotificationCounter.rebuild()
+            click.echo("✅ 모든 커플 카운터와 알림 카운터를 다시 계산했습니다.")
+            return
+        mismatches = CoupleCounter.verify(fix=fix)
+        for couple_id, column, stored, actual in mismatches:
+            click.echo(f"   커플 {couple_id} {column}: 저장값 {stored}, 실제 {actual}")
+        unread_mismatches = NotificationCounter.verify(fix=fix)
+        for user_id, stored, actual in unread_mismatches:
+            click.echo(f"   사용자 {user_id} 읽지 않은 알림: 저장값 {stored}, 실제 {actual}")
+        mismatches += unread_mismatches
+        if not mismatches:
+            click.echo("✅ 모든 커플 카운터가 일치합니다.")
+        elif fix:
+            click.echo(f"✅ {len(mismatches)}개 불일치를 수정했습니다.")
+        else:
+            click.echo(f"❌ {len(mismatches)}개 불일치 (--fix로 수정)")
+
+@cli.command()
+@click.option('--retry-failed', is_flag=True, help='재시도를 포기한 전송 요청도 다시 전송')
+def deliver_notifications(retry_failed):
+    """알림 전송 대기열에 남은 요청 전송
+
+    이 명령은 웹 서버와 다른 프로세스이므로 SOCKETIO_MESSAGE_QUEUE로 이벤트를
+    서버에 넘길 때만 의미가 있습니다. 큐 없이 보내면 접속한 클라이언트가 없는
+    이 프로세스 안에서 이벤트가 사라지고 요청만 지워지므로 실행을 거부합니다.
+    전송은 메시지 큐에 발행한 시점에 완료로 보며, 그 순간 접속하지 않은 기기는
+    다시 연결할 때 알림 동기화(notifications_sync)로 따라잡습니다.
+    """
+    from datetime import datetime
+    from app.extensions import db
+    from app.models.notification_outbox import NotificationOutbox
+    from app.services.notification_delivery import notification_worker
+    if not app.config.get('SOCKETIO_MESSAGE_QUEUE'):
+        click.echo("❌ SOCKETIO_MESSAGE_QUEUE가 설정되지 않아 웹 서버로 알림을 보낼 수 없습니다. "
+                   "큐 없이 실행하는 서버는 자체 워커가 전송합니다.", err=True)
+        raise SystemExit(1)
+    with app.app_context():
+        if retry_failed:
+            reset = NotificationOutbox.query.filter(NotificationOutbox.next_attempt_at.is_(None)).update(
+                {NotificationOutbox.next_attempt_at: datetime.utcnow(), NotificationOutbox.attempts: 0},
+                synchronize_session=False
+            )
+            db.session.commit()
+            click.echo(f"   재시도를 포기한 요청 {reset}개를 다시 대기열에 넣었습니다.")
+        delivered = notification_worker.drain(app)
+        remaining = NotificationOutbox.query.count()
+        click.echo(f"✅ 알림 {delivered}개를 전송했습니다. (남은 요청 {remaining}개)")
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
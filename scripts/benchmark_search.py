@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+추억 검색 벤치마크 스크립트
+임시 데이터베이스에 추억을 생성한 뒤 기존 LIKE 검색과 FTS5 검색의
+페이지 조회(결과 + 전체 개수) 시간을 비교합니다.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import statistics
+from datetime import date, timedelta
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.create_app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.memory import Memory
+from app.services.memory_search import search_memories, search_memories_like
+
+WORDS = [
+    '바다', '여행', '산책', '카페', '영화', '저녁', '생일', '선물', '기념일', '벚꽃',
+    '제주도', '부산', '캠핑', '노을', '커피', '케이크', '공원', '드라이브', '사진', '추억',
+    '겨울', '눈사람', '크리스마스', '불꽃놀이', '한강', '자전거', '맛집', '떡볶이', '비빔밥', '전시회',
+    '콘서트', '놀이공원', '야경', '온천', '기차', '해돋이', '편지', '꽃다발', '우산', '소풍'
+]
+
+QUERIES = ['바다', '불꽃놀이', '크리스마스 선물', '제주도', '해돋이를', '없는검색어']
+
+def build_text(rng, word_count):
+    """임의의 한국어 문장 생성"""
+    return ' '.join(rng.choice(WORDS) + rng.choice(['에서', '와', '을', '를', '의', '']) for _ in range(word_count))
+
+def populate(count, couples, rng):
+    """추억 데이터 생성 (트리거가 검색 인덱스를 함께 채움)"""
+    user = User(email='bench@example.com', name='벤치마크')
+    user.set_password('benchmark')
+    db.session.add(user)
+    db.session.commit()
+
+    start = date(2015, 1, 1)
+    rows = [{
+        'couple_id': rng.randint(1, couples),
+        'title': build_text(rng, 3),
+        'content': build_text(rng, rng.randint(20, 80)),
+        'memory_date': start + timedelta(days=rng.randint(0, 3000)),
+        'created_by': user.id
+    } for _ in range(count)]
+    for offset in range(0, count, 5000):
+        db.session.execute(db.insert(Memory), rows[offset:offset + 5000])
+    db.session.commit()
+
+def measure(func, repeat):
+    """함수 실행 시간 중앙값 (밀리초)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='추억 검색 LIKE/FTS5 벤치마크')
+    parser.add_argument('--memories', type=int, default=50000, help='생성할 추억 수 (기본: 50000)')
+    parser.add_argument('--couples', type=int, default=100, help='커플 수 (기본: 100)')
+    parser.add_argument('--repeat', type=int, default=20, help='검색어별 반복 횟수 (기본: 20)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 시드')
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SECRET_KEY': 'benchmark',
+        'UPLOAD_FOLDER': tempfile.gettempdir()
+    })
+
+    try:
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            populate(args.memories, args.couples, random.Random(args.seed))
+            print(f"추억 {args.memories}개 생성 ({args.couples}커플): {time.perf_counter() - started:.1f}초")
+            print(f"{'검색어':<16}{'결과':>8}{'LIKE(ms)':>12}{'FTS5(ms)':>12}{'배율':>8}")
+
+            couple_id = 1
+            for query in QUERIES:
+                total = search_memories(couple_id, query).total
+                like_ms = measure(lambda: search_memories_like(couple_id, query).items, args.repeat)
+                fts_ms = measure(lambda: search_memories(couple_id, query).items, args.repeat)
+                print(f"{query:<16}{total:>8}{like_ms:>12.2f}{fts_ms:>12.2f}{like_ms / fts_ms:>7.1f}x")
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Socket.IO 부하 테스트 스크립트
+임시 데이터베이스에 커플 N쌍을 만들고 scripts/run_test_server.py로 로컬 서버를
+띄운 뒤, 사용자마다 python-socketio 클라이언트로 로그인/연결해 기분 기록, 질문 답변,
+알림 읽음 처리를 주고받으며 다음을 측정합니다.
+
+- 연결 지연: 연결 시작부터 bootstrap 이벤트를 받기까지
+- 전달 지연: 한쪽이 기록을 보낸 시점부터 파트너가 notifications_batch /
+  dashboard_delta를 받기까지, 알림 읽음 요청부터 응답까지 (p50/p95/p99)
+- 서버 프로세스의 RSS와 CPU 사용률
+
+모든 통신은 localhost에서만 이루어집니다. 클라이언트 패키지가 필요합니다:
+    pip install "python-socketio[client]" requests websocket-client psutil
+(psutil이 없으면 /proc에서 서버 사용량을 읽습니다.)
+"""
+
+import os
+import sys
+import time
+import random
+import resource
+import tempfile
+import argparse
+import threading
+import subprocess
+import statistics
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+# 프로젝트 루트를 Python 경로에 추가
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.create_app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.couple import CoupleConnection
+from app.models.question import Question
+
+PASSWORD = 'benchmark'
+MOOD_TYPE = 'mood_update'
+ANSWER_TYPE = 'new_answer'
+
+def populate(couples):
+    """벤치마크용 커플과 질문 생성 후 [(사용자 이메일, 파트너 이메일)] 반환
+
+    비밀번호 해시는 한 번만 계산해 모든 사용자가 같이 씁니다.
+    """
+    hasher = User(email='hash@example.com', name='hash')
+    hasher.set_password(PASSWORD)
+
+    db.session.add(Question(text='오늘 서로에게 가장 고마웠던 순간은 언제였나요?', category='daily'))
+    db.session.execute(db.insert(User), [{
+        'email': f'bench{i}-{side}@example.com',
+        'name': f'벤치{i}{side}',
+        'password_hash': hasher.password_hash
+    } for i in range(couples) for side in ('a', 'b')])
+    db.session.commit()
+
+    ids = dict(db.session.execute(db.select(User.email, User.id)).all())
+    pairs = [(f'bench{i}-a@example.com', f'bench{i}-b@example.com') for i in range(couples)]
+    db.session.execute(db.insert(CoupleConnection), [{
+        'user1_id': ids[a], 'user2_id': ids[b], 'invite_code': f'B{i:09d}'
+    } for i, (a, b) in enumerate(pairs)])
+    db.session.execute(db.update(User), [
+        {'id': ids[email], 'partner_id': ids[partner]}
+        for a, b in pairs for email, partner in ((a, b), (b, a))
+    ])
+    db.session.commit()
+    return pairs
+
+class ServerMonitor:
+    """서버 프로세스의 RSS와 CPU 사용률을 주기적으로 기록"""
+
+    def __init__(self, pid, interval=1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (rss 바이트, cpu %)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        try:
+            import psutil
+            self._process = psutil.Process(pid)
+        except ImportError:
+            self._process = None
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _read_proc(self):
+        """(RSS 바이트, 누적 CPU 초) 읽기 (psutil이 없을 때)"""
+        with open(f'/proc/{self.pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        rss = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+        return rss, cpu_seconds
+
+    def _run(self):
+        if self._process is not None:
+            self._process.cpu_percent()
+        else:
+            previous = (time.monotonic(), self._read_proc()[1])
+        while not self._stop.wait(self.interval):
+            try:
+                if self._process is not None:
+                    self.samples.append((self._process.memory_info().rss, self._process.cpu_percent()))
+                else:
+                    rss, cpu_seconds = self._read_proc()
+                    now = time.monotonic()
+                    self.samples.append((rss, (cpu_seconds - previous[1]) / (now - previous[0]) * 100))
+                    previous = (now, cpu_seconds)
+            except (OSError, IndexError, ValueError):
+                return
+
+    def summary(self):
+        if not self.samples:
+            return None
+        rss = [sample[0] for sample in self.samples]
+        cpu = [sample[1] for sample in self.samples]
+        return {
+            'rss_peak_mb': max(rss) / 1024 / 1024,
+            'rss_last_mb': rss[-1] / 1024 / 1024,
+            'cpu_avg': statistics.mean(cpu),
+            'cpu_peak': max(cpu)
+        }
+
+class Inbox:
+    """클라이언트가 받은 이벤트를 도착 시각과 함께 보관하고 기다리기"""
+
+    def __init__(self):
+        self.events = []  # (도착 시각, 이벤트 이름, 데이터)
+        self._condition = threading.Condition()
+
+    def push(self, name, data):
+        with self._condition:
+            self.events.append((time.perf_counter(), name, data))
+            self._condition.notify_all()
+
+    def mark(self):
+        with self._condition:
+            return len(self.events)
+
+    def wait(self, name, since, timeout, predicate=None):
+        """since 이후 도착한 name 이벤트의 도착 시각 반환 (시간 초과면 None)"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                for arrived, event_name, data in self.events[since:]:
+                    if event_name == name and (predicate is None or predicate(data)):
+                        return arrived
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+class SimulatedUser:
+    """HTTP 세션과 Socket.IO 연결 하나를 가진 가상 사용자"""
+
+    EVENTS = ('bootstrap', 'notifications_batch', 'dashboard_delta', 'notification_marked_read')
+
+    def __init__(self, base_url, email):
+        import requests
+        import socketio
+
+        self.base_url = base_url
+        self.email = email
+        self.http = requests.Session()
+        self.sio = socketio.Client(http_session=self.http, reconnection=False)
+        self.inbox = Inbox()
+        for name in self.EVENTS:
+            self.sio.on(name, self._handler(name))
+
+    def _handler(self, name):
+        return lambda data=None: self.inbox.push(name, data)
+
+    def login(self):
+        response = self.http.post(f'{self.base_url}/auth/login', json={'email': self.email, 'password': PASSWORD})
+        if not response.ok or not response.json().get('success'):
+            raise RuntimeError(f'{self.email} 로그인 실패: {response.status_code}')
+
+    def connect(self, timeout):
+        """연결 후 bootstrap을 받기까지 걸린 시간 (초) 반환"""
+        since = self.inbox.mark()
+        started = time.perf_counter()
+        self.sio.connect(self.base_url, transports=['websocket'], wait_timeout=timeout)
+        arrived = self.inbox.wait('bootstrap', since, timeout)
+        if arrived is None:
+            raise RuntimeError(f'{self.email} bootstrap 시간 초과')
+        return arrived - started
+
+    def post(self, path, payload):
+        response = self.http.post(f'{self.base_url}{path}', json=payload)
+        if not response.ok or not response.json().get('success'):
+            raise RuntimeError(f'{path} 실패: {response.status_code} {response.text[:200]}')
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        finally:
+            self.http.close()
+
+def has_notification(notification_type):
+    return lambda data: any(n.get('type') == notification_type for n in (data or {}).get('notifications', []))
+
+class Results:
+    """지표별 지연 시간 (밀리초)과 실패 수 모음"""
+
+    def __init__(self):
+        self.timings = {}
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def add(self, metric, seconds):
+        with self._lock:
+            if seconds is None:
+                self.failures[metric] = self.failures.get(metric, 0) + 1
+            else:
+                self.timings.setdefault(metric, []).append(seconds * 1000)
+
+    def report(self):
+        print(f"\n{'지표':<28}{'건수':>7}{'실패':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+        for metric in sorted(set(self.timings) | set(self.failures)):
+            values = sorted(self.timings.get(metric, []))
+            failures = self.failures.get(metric, 0)
+            if len(values) >= 2:
+                cuts = statistics.quantiles(values, n=100, method='inclusive')
+                p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+            elif values:
+                p50 = p95 = p99 = values[0]
+            else:
+                print(f"{metric:<28}{0:>7}{failures:>6}")
+                continue
+            print(f"{metric:<28}{len(values):>7}{failures:>6}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{values[-1]:>10.1f}")
+
+def run_couple(user, partner, question_id, rounds, timeout, think_time, results, rng):
+    """커플 한 쌍의 시나리오 실행
+
+    라운드마다 역할을 바꿔 한 사람이 기분을 기록하고(파트너가 알림과 대시보드
+    변경분을 받음), 다른 사람이 질문에 답한 뒤(상대가 알림을 받음), 각자 받은
+    알림을 모두 읽음 처리합니다. 새 기록이어야 알림이 가므로 라운드마다 날짜를
+    하루씩 앞당깁니다.
+    """
+    for round_no in range(rounds):
+        sender, receiver = (user, partner) if round_no % 2 == 0 else (partner, user)
+        day = (date.today() - timedelta(days=round_no)).isoformat()
+
+        since = receiver.inbox.mark()
+        started = time.perf_counter()
+        sender.post('/mood/api/record', {'mood_level': rng.randint(1, 5), 'note': '벤치마크', 'date': day})
+        arrived = receiver.inbox.wait('notifications_batch', since, timeout, has_notification(MOOD_TYPE))
+        results.add('mood -> notifications_batch', arrived and arrived - started)
+        arrived = receiver.inbox.wait('dashboard_delta', since, timeout)
+        results.add('mood -> dashboard_delta', arrived and arrived - started)
+
+        since = sender.inbox.mark()
+        started = time.perf_counter()
+        receiver.post('/questions/answer', {'question_id': question_id, 'answer': '벤치마크 답변입니다.', 'date': day})
+        arrived = sender.inbox.wait('notifications_batch', since, timeout, has_notification(ANSWER_TYPE))
+        results.add('answer -> notifications_batch', arrived and arrived - started)
+
+        for reader in (sender, receiver):
+            since = reader.inbox.mark()
+            started = time.perf_counter()
+            reader.sio.emit('mark_notification_read', {'all': True})
+            arrived = reader.inbox.wait('notification_marked_read', since, timeout)
+            results.add('read -> notification_marked_read', arrived and arrived - started)
+
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+def wait_for_server(base_url, process, timeout=30):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('서버가 시작 중에 종료되었습니다.')
+        try:
+            requests.get(f'{base_url}/auth/login', timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError('서버 시작 시간 초과')
+
+def raise_open_file_limit():
+    """연결 수만큼 소켓을 열 수 있도록 파일 디스크립터 한도를 최대로 올림"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Socket.IO 동시 접속 커플 부하 테스트 (localhost)')
+    parser.add_argument('--couples', type=int, default=100, help='가상 커플 수 (기본: 100)')
+    parser.add_argument('--rounds', type=int, default=5, help='커플별 기록/답변/읽음 라운드 수 (기본: 5)')
+    parser.add_argument('--port', type=int, default=5013, help='테스트 서버 포트 (기본: 5013)')
+    parser.add_argument('--config', default='development', help='테스트 서버 설정 이름 (기본: development)')
+    parser.add_argument('--connect-concurrency', type=int, default=50, help='동시에 로그인/연결하는 사용자 수 (기본: 50)')
+    parser.add_argument('--concurrency', type=int, default=None, help='동시에 시나리오를 실행하는 커플 수 (기본: 전체)')
+    parser.add_argument('--think-time', type=float, default=0.5, help='라운드 사이 최대 대기 (초, 기본: 0.5)')
+    parser.add_argument('--timeout', type=float, default=10, help='이벤트 대기 시간 초과 (초, 기본: 10)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 시드')
+    parser.add_argument('--server-log', help='테스트 서버 출력을 저장할 파일 (기본: 버림)')
+    args = parser.parse_args()
+
+    try:
+        import requests  # noqa: F401
+        import socketio  # noqa: F401
+        import websocket  # noqa: F401
+    except ImportError as e:
+        sys.exit(f'클라이언트 패키지가 필요합니다 ({e.name}): pip install "python-socketio[client]" requests websocket-client')
+
+    host = '127.0.0.1'
+    base_url = f'http://{host}:{args.port}'
+    file_limit = raise_open_file_limit()
+    if file_limit < args.couples * 4 + 100:
+        print(f"⚠️  파일 디스크립터 한도({file_limit})가 연결 수에 비해 작습니다. ulimit -n을 올리세요.")
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(db_fd)
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SECRET_KEY': 'benchmark',
+        'UPLOAD_FOLDER': tempfile.gettempdir()
+    })
+    with app.app_context():
+        db.create_all()
+        pairs = populate(args.couples)
+        question_id = db.session.execute(db.select(Question.id)).scalars().first()
+        db.engine.dispose()
+    print(f"커플 {args.couples}쌍 생성 ({db_path})")
+
+    server_log = open(args.server_log, 'w') if args.server_log else subprocess.DEVNULL
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_ROOT, 'scripts', 'run_test_server.py'),
+         '--host', host, '--port', str(args.port), '--config', args.config,
+         '--database', f'sqlite:///{db_path}', '--no-debug'],
+        cwd=PROJECT_ROOT, stdout=server_log, stderr=subprocess.STDOUT
+    )
+    monitor = ServerMonitor(server.pid)
+    results = Results()
+    users = []
+    try:
+        wait_for_server(base_url, server)
+        monitor.start()
+        time.sleep(monitor.interval * 2)
+        idle = monitor.summary()
+
+        couples = [(SimulatedUser(base_url, a), SimulatedUser(base_url, b)) for a, b in pairs]
+        users = [user for couple in couples for user in couple]
+
+        def connect_user(user):
+            try:
+                user.login()
+                results.add('connect -> bootstrap', user.connect(args.timeout))
+            except Exception as e:
+                results.add('connect -> bootstrap', None)
+                print(f"⚠️  {e}")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.connect_concurrency) as executor:
+            list(executor.map(connect_user, users))
+        connected = sum(1 for user in users if user.sio.connected)
+        print(f"연결 {connected}/{len(users)}명: {time.perf_counter() - started:.1f}초")
+        time.sleep(2)
+        connected_state = monitor.summary()
+
+        live = [(user, partner) for user, partner in couples if user.sio.connected and partner.sio.connected]
+
+        def play(index):
+            user, partner = live[index]
+            try:
+                run_couple(user, partner, question_id, args.rounds, args.timeout, args.think_time, results,
+                           random.Random(args.seed + index))
+            except Exception as e:
+                results.add('scenario', None)
+                print(f"⚠️  커플 {index}: {e}")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency or max(len(live), 1)) as executor:
+            list(executor.map(play, range(len(live))))
+        print(f"시나리오 {len(live)}커플 x {args.rounds}라운드: {time.perf_counter() - started:.1f}초")
+
+        results.report()
+        final = monitor.summary()
+        if final:
+            print(f"\n서버 RSS: 최대 {final['rss_peak_mb']:.1f}MB, 종료 시 {final['rss_last_mb']:.1f}MB"
+                  + (f" (전체 연결 직후 {connected_state['rss_last_mb']:.1f}MB)" if connected_state else ''))
+            print(f"서버 CPU: 평균 {final['cpu_avg']:.0f}%, 최대 {final['cpu_peak']:.0f}%")
+        if connected_state and connected:
+            baseline = idle['rss_last_mb'] if idle else final['rss_peak_mb']
+            print(f"연결당 메모리: 약 {(connected_state['rss_last_mb'] - baseline) * 1024 / connected:.1f}KB")
+    finally:
+        for user in users:
+            try:
+                user.close()
+            except Exception:
+                pass
+        monitor.stop()
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        if args.server_log:
+            server_log.close()
+        os.unlink(db_path)
+
+if __name__ == '__main__':
+    main()
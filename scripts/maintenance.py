@@ -15,6 +15,10 @@ from app.extensions import db
 from app.services.query_optimization import OptimizedQueryService
 from app.utils.db_optimization import vacuum_database, analyze_query_performance
 from app.models.notification import Notification
+from app.models.couple_counter import CoupleCounter
+from app.services.upload_storage import collect_orphan_uploads
+from app.services.image_pipeline import recover_stuck_images
+from app.services.notification_retention import apply_notification_retention, count_expired_notifications
 
 def setup_logging():
     """로깅 설정"""
@@ -28,14 +32,33 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
-def cleanup_old_notifications(app, days=30):
-    """오래된 알림 정리"""
+def cleanup_old_notifications(app, days=None, archive_path=None, dry_run=False):
+    """보존 정책에 따라 오래된 알림 보관/정리
+
+    days를 주면 기본 정책의 읽은 알림 보관 일수를 덮어씁니다.
+    """
     logger = logging.getLogger(__name__)
     
+    default = dict(app.config.get('NOTIFICATION_RETENTION_DEFAULT', {}))
+    if days is not None:
+        default['read_days'] = days
+    
     with app.app_context():
-        deleted_count = OptimizedQueryService.cleanup_old_notifications(days)
-        logger.info(f"{deleted_count}개의 오래된 알림을 정리했습니다.")
-        return deleted_count
+        if dry_run:
+            counts = count_expired_notifications(app, default=default)
+            for notification_type, count in sorted(counts.items()):
+                logger.info(f"[dry-run] {notification_type}: {count}개 정리 대상")
+            logger.info(f"[dry-run] {sum(counts.values())}개의 오래된 알림이 정리 대상입니다.")
+            return sum(counts.values())
+        
+        stats = apply_notification_retention(app, default=default, archive_path=archive_path)
+    
+    for notification_type, count in sorted(stats['by_type'].items()):
+        logger.info(f"   {notification_type}: {count}개")
+    logger.info(f"{stats['deleted']}개의 오래된 알림을 정리했습니다. "
+                f"(보관 {stats['archived']}개, {stats['chunks']}개 묶음, 최대 {stats['max_chunk_ms']:.1f} ms)")
+    logger.info(f"빈 페이지 {stats['vacuumed_pages']}개를 반환했습니다.")
+    return stats['deleted']
 
 def cleanup_old_logs(days=30):
     """오래된 로그 파일 정리"""
@@ -62,6 +85,47 @@ def cleanup_old_logs(days=30):
     logger.info(f"{deleted_count}개의 오래된 로그 파일을 정리했습니다.")
     return deleted_count
 
+def cleanup_orphan_uploads(app, grace_hours=None, retention_days=None, dry_run=False):
+    """참조되지 않는 업로드 파일 격리 및 삭제"""
+    logger = logging.getLogger(__name__)
+    
+    with app.app_context():
+        stats = collect_orphan_uploads(
+            app.config['UPLOAD_FOLDER'],
+            quarantine_folder=app.config.get('UPLOAD_QUARANTINE_FOLDER'),
+            grace_hours=grace_hours if grace_hours is not None else app.config.get('UPLOAD_GC_GRACE_HOURS', 24),
+            retention_days=retention_days if retention_days is not None else app.config.get('UPLOAD_QUARANTINE_DAYS', 7),
+            dry_run=dry_run
+        )
+    
+    prefix = "[dry-run] " if dry_run else ""
+    logger.info(f"{prefix}업로드 파일 {stats['scanned']}개 ({stats['scanned_bytes'] / 1024 / 1024:.2f} MB) 검사, "
+                f"참조 {stats['referenced']}개, 유예 기간 {stats['recent']}개")
+    logger.info(f"{prefix}{stats['quarantined']}개 파일 격리 ({stats['quarantined_bytes'] / 1024 / 1024:.2f} MB), "
+                f"{stats['restored']}개 복원")
+    logger.info(f"{prefix}{stats['deleted']}개 파일 삭제, {stats['reclaimed_bytes'] / 1024 / 1024:.2f} MB 회수")
+    return stats
+
+def recover_image_jobs(app, stale_minutes=None):
+    """재시작으로 사라진 이미지 처리 작업 복구 (처리 중으로 남은 추억 이미지 처리)"""
+    logger = logging.getLogger(__name__)
+    
+    with app.app_context():
+        processed, failed = recover_stuck_images(app, stale_minutes)
+    
+    logger.info(f"처리 중으로 남은 이미지 {processed}개 처리 완료, {failed}개 실패 처리")
+    return processed, failed
+
+def refresh_couple_counters(app):
+    """달이 바뀐 커플 카운터의 이번 달 추억 수 갱신"""
+    logger = logging.getLogger(__name__)
+    
+    with app.app_context():
+        refreshed = CoupleCounter.refresh_month()
+    
+    logger.info(f"커플 카운터 {refreshed}개의 이번 달 추억 수를 갱신했습니다.")
+    return refreshed
+
 def backup_database(app):
     """데이터베이스 백업"""
     logger = logging.getLogger(__name__)
@@ -192,12 +256,31 @@ def generate_maintenance_report(app):
 def main():
     """메인 함수"""
     parser = argparse.ArgumentParser(description='커플 웹 애플리케이션 유지보수 스크립트')
-    parser.add_argument('--cleanup-notifications', type=int, default=30, 
-                       help='지정된 일수보다 오래된 읽은 알림 정리 (기본: 30일)')
+    parser.add_argument('--cleanup-notifications', type=int, nargs='?', const=True, default=True,
+                       help='보존 정책에 따라 오래된 알림 정리 (값을 주면 기본 정책의 읽은 알림 보관 일수, '
+                            '기본: NOTIFICATION_RETENTION_*)')
+    parser.add_argument('--archive-notifications', default=None, metavar='PATH',
+                       help='지우기 전에 알림을 옮길 보관 DB 경로 (기본: NOTIFICATION_ARCHIVE_PATH)')
+    parser.add_argument('--notifications-dry-run', action='store_true',
+                       help='알림을 지우지 않고 정리 대상 수만 보고')
     parser.add_argument('--cleanup-logs', type=int, default=30,
                        help='지정된 일수보다 오래된 로그 파일 정리 (기본: 30일)')
     parser.add_argument('--cleanup-backups', type=int, default=90,
                        help='지정된 일수보다 오래된 백업 파일 정리 (기본: 90일)')
+    parser.add_argument('--gc-uploads', action='store_true',
+                       help='참조되지 않는 업로드 파일 격리 및 삭제')
+    parser.add_argument('--gc-grace-hours', type=int, default=None,
+                       help='이 시간보다 최근 파일은 격리하지 않음 (기본: UPLOAD_GC_GRACE_HOURS)')
+    parser.add_argument('--gc-retention-days', type=int, default=None,
+                       help='격리 후 삭제까지 보관 일수 (기본: UPLOAD_QUARANTINE_DAYS)')
+    parser.add_argument('--gc-dry-run', action='store_true',
+                       help='파일을 옮기거나 지우지 않고 결과만 보고')
+    parser.add_argument('--recover-images', action='store_true',
+                       help='처리 중으로 남은 추억 이미지 다시 처리 (재시작/배포로 작업이 사라진 경우)')
+    parser.add_argument('--recover-images-minutes', type=int, default=None,
+                       help='업로드 후 이 시간(분)이 지난 이미지만 처리 (기본: IMAGE_STUCK_MINUTES)')
+    parser.add_argument('--refresh-counters', action='store_true',
+                       help='달이 바뀐 커플 카운터의 이번 달 추억 수 갱신 (매월 초 실행)')
     parser.add_argument('--backup', action='store_true',
                        help='데이터베이스 백업 생성')
     parser.add_argument('--optimize', action='store_true',
@@ -222,7 +305,8 @@ def main():
             backup_database(app)
         
         if args.all or args.cleanup_notifications:
-            cleanup_old_notifications(app, args.cleanup_notifications)
+            days = None if args.cleanup_notifications is True else args.cleanup_notifications
+            cleanup_old_notifications(app, days, args.archive_notifications, args.notifications_dry_run)
         
         if args.all or args.cleanup_logs:
             cleanup_old_logs(args.cleanup_logs)
@@ -230,6 +314,15 @@ def main():
         if args.all or args.cleanup_backups:
             cleanup_old_backups(args.cleanup_backups)
         
+        if args.all or args.gc_uploads:
+            cleanup_orphan_uploads(app, args.gc_grace_hours, args.gc_retention_days, args.gc_dry_run)
+        
+        if args.all or args.recover_images:
+            recover_image_jobs(app, args.recover_images_minutes)
+        
+        if args.all or args.refresh_counters:
+            refresh_couple_counters(app)
+        
         if args.all or args.optimize:
             optimize_database(app)
         
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+스키마 마이그레이션 스크립트
+새 테이블을 생성하고, 기존 테이블에 추가된 컬럼을 ALTER TABLE로 반영합니다.
+여러 번 실행해도 안전합니다.
+"""
+
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.create_app import create_app
+from app.extensions import db
+from app.models import *  # 모든 모델 import
+from app.services.image_hash import BAND_COUNT, band_expression
+
+# (테이블, 컬럼, 컬럼 정의) - 모델에 컬럼을 추가하면 여기에도 추가합니다.
+COLUMN_CHANGES = [
+    ('memories', 'image_status', 'VARCHAR(20)'),
+    ('memories', 'image_variants', 'TEXT'),
+    ('memories', 'image_hash', 'BIGINT'),
+    ('notifications', 'subject', 'VARCHAR(100)'),
+    ('notifications', 'merge_count', 'INTEGER NOT NULL DEFAULT 1'),
+    ('notifications', 'read_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('notification_counters', 'read_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('notification_counters', 'latest_id', 'INTEGER NOT NULL DEFAULT 0'),
+    ('notification_counters', 'deleted_version', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+# (인덱스 이름, 테이블, 컬럼[, 부분 인덱스 조건]) - 기존 테이블의 컬럼에 인덱스를 추가하면 여기에도 추가합니다.
+INDEX_CHANGES = [
+    ('ix_memories_image_path', 'memories', 'image_path'),
+    ('ix_memories_couple_date_id', 'memories', 'couple_id, memory_date, id'),
+    ('ix_notifications_user_read_id', 'notifications', 'user_id, is_read, id'),
+    ('ix_notifications_user_type_subject', 'notifications', 'user_id, type, subject'),
+    ('ix_notifications_type_created', 'notifications', 'type, created_at'),
+    ('ix_notifications_user_read_version', 'notifications', 'user_id, read_version'),
+] + [
+    (f'ix_memories_hash_b{band}', 'memories', f'couple_id, {band_expression(band)}', 'image_hash IS NOT NULL')
+    for band in range(BAND_COUNT)
+]
+
+def get_existing_columns(table):
+    """테이블의 현재 컬럼 이름 집합 반환"""
+    rows = db.session.execute(db.text(f"PRAGMA table_info({table})")).fetchall()
+    return {row[1] for row in rows}
+
+def migrate_schema():
+    """스키마 마이그레이션 실행"""
+    app = create_app()
+
+    with app.app_context():
+        print("스키마 마이그레이션 시작...")
+
+        # 1. 새 테이블 생성 (기존 테이블은 건드리지 않음)
+        db.create_all()
+        print("1. 새 테이블 생성 완료")
+
+        # 2. 누락된 컬럼 추가
+        added = 0
+        for table, column, definition in COLUMN_CHANGES:
+            if column in get_existing_columns(table):
+                continue
+
+            db.session.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+            print(f"   + {table}.{column}")
+            added += 1
+
+        db.session.commit()
+        print(f"2. 컬럼 {added}개 추가 완료")
+
+        # 3. 누락된 인덱스 추가
+        for name, table, columns, *where in INDEX_CHANGES:
+            condition = f" WHERE {where[0]}" if where else ""
+            db.session.execute(db.text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns}){condition}"))
+
+        db.session.commit()
+        print(f"3. 인덱스 {len(INDEX_CHANGES)}개 확인 완료")
+
+        # 4. 추억 전문 검색 인덱스 (없으면 만들고 기존 추억 색인)
+        has_search_index = db.session.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+        )).first()
+        if not has_search_index:
+            from app.services.memory_search import rebuild_search_index
+            print(f"4. 검색 인덱스 생성 완료 (추억 {rebuild_search_index()}개 색인)")
+        else:
+            print("4. 검색 인덱스 확인 완료")
+
+        # 5. 커플 카운터 (트리거는 create_all에서 생성, 기존 데이터로 처음 한 번 계산)
+        if CoupleCounter.query.first() is None:
+            CoupleCounter.rebuild()
+            print(f"5. 커플 카운터 계산 완료 (커플 {CoupleCounter.query.count()}개)")
+        else:
+            print("5. 커플 카운터 확인 완료")
+
+        # 6. 읽지 않은 알림 카운터 (트리거는 create_all에서 생성, 기존 알림으로 처음 한 번 계산)
+        if NotificationCounter.query.first() is None:
+            NotificationCounter.rebuild()
+            print(f"6. 알림 카운터 계산 완료 (사용자 {NotificationCounter.query.count()}명)")
+        else:
+            # 최신 알림 ID 컬럼이 새로 추가된 경우 기존 알림으로 채움
+            from app.models.notification_counter import LATEST_ID_UPDATE
+            db.session.execute(db.text(LATEST_ID_UPDATE + " WHERE latest_id = 0"))
+            db.session.commit()
+            print("6. 알림 카운터 확인 완료")
+        print("스키마 마이그레이션 완료!")
+
+if __name__ == '__main__':
+    migrate_schema()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+업로드 파일 이전 스크립트
+평면 구조(uploads/<파일명>)로 저장된 기존 추억 사진을 콘텐츠 주소
+저장소(uploads/ab/cd/<hash>.<ext>)로 옮기고 중복 파일을 합칩니다.
+여러 번 실행해도 안전합니다. 먼저 scripts/migrate_schema.py를 실행하세요.
+"""
+
+import sys
+import os
+import argparse
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.create_app import create_app
+from app.services.upload_storage import migrate_legacy_uploads
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='업로드 파일 콘텐츠 주소 저장소 이전')
+    parser.add_argument('--dry-run', action='store_true', help='파일을 옮기지 않고 대상만 확인')
+    parser.add_argument('--batch-size', type=int, default=100, help='커밋 단위 (기본: 100)')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        print("업로드 파일 이전 시작..." + (" (dry run)" if args.dry_run else ""))
+        stats = migrate_legacy_uploads(app.config['UPLOAD_FOLDER'],
+                                       dry_run=args.dry_run, batch_size=args.batch_size)
+        print(f"이전: {stats['migrated']}개 (중복 합침: {stats['deduplicated']}개)")
+        print(f"이미 이전됨: {stats['skipped']}개, 파일 없음: {stats['missing']}개")
+        print("업로드 파일 이전 완료!")
+
+if __name__ == '__main__':
+    main()
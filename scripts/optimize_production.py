@@ -12,7 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.create_app import create_app
 from app.utils.db_optimization import create_database_indexes, optimize_database_settings, vacuum_database
 from app.extensions import db
-from app.utils.static_optimization import StaticFileOptimizer, optimize_images, create_webp_versions
+from app.utils.static_optimization import StaticFileOptimizer, optimize_images
 from app.services.query_optimization import OptimizedQueryService
 
 def setup_logging():
@@ -76,27 +76,16 @@ def optimize_static_files(app):
     except Exception as e:
         logger.error(f"정적 파일 압축 실패: {e}")
     
-    # 이미지 최적화 (애플리케이션 컨텍스트 필요)
-    logger.info("이미지 최적화 중...")
+    # 이미지 최적화와 WebP 버전 생성 (한 번의 디코딩으로 함께 처리)
+    logger.info("이미지 최적화 및 WebP 이미지 생성 중...")
     try:
         with app.app_context():
-            optimized_count = optimize_images()
-            logger.info(f"{optimized_count}개 이미지 최적화 완료")
+            optimized_count, webp_count = optimize_images()
+            logger.info(f"{optimized_count}개 이미지 최적화, {webp_count}개 WebP 이미지 생성 완료")
     except ImportError:
         logger.warning("PIL/Pillow가 설치되지 않아 이미지 최적화를 건너뜁니다.")
     except Exception as e:
         logger.error(f"이미지 최적화 실패: {e}")
-    
-    # WebP 버전 생성 (애플리케이션 컨텍스트 필요)
-    logger.info("WebP 이미지 생성 중...")
-    try:
-        with app.app_context():
-            webp_count = create_webp_versions()
-            logger.info(f"{webp_count}개 WebP 이미지 생성 완료")
-    except ImportError:
-        logger.warning("PIL/Pillow가 설치되지 않아 WebP 생성을 건너뜁니다.")
-    except Exception as e:
-        logger.error(f"WebP 생성 실패: {e}")
 
 def create_production_directories():
     """프로덕션 환경에 필요한 디렉토리 생성"""
@@ -1,26 +1,57 @@
 #!/usr/bin/env python3
 """
 테스트용 서버 실행 스크립트
+Socket.IO(WebSocket)까지 함께 띄우며, scripts/benchmark_socketio.py가
+포트와 데이터베이스를 지정해 부하 테스트 대상 서버로 실행합니다.
 """
 
 import sys
 import os
+import argparse
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.create_app import create_app
+from app.extensions import socketio
+
+def load_settings(config_name, database_url=None, echo=True):
+    """설정 클래스를 딕셔너리로 읽고 명령행 옵션 반영"""
+    from config import config
+
+    settings_class = config[config_name]
+    settings = {key: getattr(settings_class, key) for key in dir(settings_class) if key.isupper()}
+    if database_url:
+        settings['SQLALCHEMY_DATABASE_URI'] = database_url
+    if not echo:
+        settings['SQLALCHEMY_ECHO'] = False
+    return settings
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='테스트 서버 실행')
+    parser.add_argument('--host', default='127.0.0.1', help='바인드 주소 (기본: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=5003, help='포트 (기본: 5003)')
+    parser.add_argument('--config', default=os.environ.get('FLASK_ENV', 'default'),
+                        help='설정 이름 (development, production, testing, default)')
+    parser.add_argument('--database', help='데이터베이스 URL (예: sqlite:////tmp/bench.db)')
+    parser.add_argument('--no-debug', action='store_true', help='디버그 모드와 SQL 로그 끄기 (부하 테스트용)')
+    args = parser.parse_args()
+
+    app = create_app(load_settings(args.config, args.database, echo=not args.no_debug))
+    url = f'http://{args.host}:{args.port}'
 
-if __name__ == "__main__":
-    app = create_app()
-    
     print("🚀 테스트 서버 시작 중...")
-    print("📍 URL: http://127.0.0.1:5003")
-    print("🔗 Questions Daily: http://127.0.0.1:5003/questions/daily")
-    print("🔗 Questions API: http://127.0.0.1:5003/questions/api/daily-question")
-    print("\n⚠️  서버를 중지하려면 Ctrl+C를 누르세요")
-    
+    print(f"📍 URL: {url}")
+    print(f"🔗 Questions Daily: {url}/questions/daily")
+    print(f"🔗 Questions API: {url}/questions/api/daily-question")
+    print("\n⚠️  서버를 중지하려면 Ctrl+C를 누르세요", flush=True)
+
     try:
-        app.run(host='127.0.0.1', port=5003, debug=True, use_reloader=False)
+        socketio.run(app, host=args.host, port=args.port, debug=not args.no_debug, use_reloader=False,
+                     log_output=not args.no_debug, allow_unsafe_werkzeug=True)
     except KeyboardInterrupt:
-        print("\n🛑 서버가 중지되었습니다.")
\ No newline at end of file
+        print("\n🛑 서버가 중지되었습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,19 @@ class NotificationManager {
         this.notificationList = null;
         this.partnerStatus = null;
         
+        // 증분 동기화 상태 (마지막으로 받은 알림 ID와 읽음 상태 버전)
+        this.notifications = [];
+        this.latestId = 0;
+        this.readVersion = null;
+        
         this.init();
     }
     
     init() {
-        // SocketIO 연결
-        this.socket = io();
+        // SocketIO 연결 (재연결할 때마다 가진 알림 상태를 보내 변경분만 받음)
+        this.socket = io({
+            auth: (cb) => cb({ since_id: this.latestId, version: this.readVersion })
+        });
         
         // DOM 요소 찾기
         this.notificationContainer = document.getElementById('notification-container');
@@ -38,12 +45,13 @@ class NotificationManager {
             console.log('SocketIO 연결됨');
             this.isConnected = true;
             this.updateConnectionStatus(true);
-            
-            // 커플 룸 참여
-            this.socket.emit('join_couple_room');
-            
-            // 알림 목록 요청
-            this.socket.emit('get_notifications');
+            // 룸 참여와 초기 상태는 서버가 연결 시 처리해 'bootstrap'으로 보냄
+        });
+        
+        // 연결 직후 초기 상태 (파트너 상태, 알림 개수, 끊긴 동안의 알림 변경분)
+        this.socket.on('bootstrap', (data) => {
+            if (data.partner) this.updatePartnerStatus(data.partner);
+            this.applySync(data.notifications);
         });
         
         // 연결 해제
@@ -53,9 +61,9 @@ class NotificationManager {
             this.updateConnectionStatus(false);
         });
         
-        // 새 알림 수신
-        this.socket.on('new_notification', (data) => {
-            this.handleNewNotification(data);
+        // 새 알림 수신 (수신자별로 묶어서 전송됨)
+        this.socket.on('notifications_batch', (data) => {
+            this.handleNotificationBatch(data);
         });
         
         // 알림 개수 업데이트
@@ -68,15 +76,33 @@ class NotificationManager {
             this.updateNotificationList(data.notifications);
         });
         
+        // 알림 증분 동기화 결과 수신
+        this.socket.on('notifications_sync', (data) => {
+            this.applySync(data);
+        });
+        
         // 파트너 상태 업데이트
         this.socket.on('partner_status', (data) => {
             this.updatePartnerStatus(data);
         });
         
+        // 추억 사진 처리 완료
+        this.socket.on('memory_image_status', (data) => {
+            this.updateMemoryImage(data);
+        });
+        
         // 알림 읽음 처리 완료
         this.socket.on('notification_marked_read', (data) => {
-            if (data.success) {
-                this.markNotificationAsRead(data.notification_id);
+            if (!data.success) return;
+            if (data.up_to_id || (!data.notification_ids && !data.notification_id)) {
+                // 범위/전체 읽음 처리: 화면의 해당 알림 모두 갱신
+                document.querySelectorAll('.notification-item[data-notification-id]').forEach((item) => {
+                    if (!data.up_to_id || parseInt(item.dataset.notificationId) <= data.up_to_id) {
+                        this.markNotificationAsRead(item.dataset.notificationId);
+                    }
+                });
+            } else {
+                (data.notification_ids || [data.notification_id]).forEach((id) => this.markNotificationAsRead(id));
             }
         });
     }
@@ -165,17 +191,59 @@ class NotificationManager {
         }
     }
     
-    handleNewNotification(data) {
-        console.log('새 알림 수신:', data);
+    handleNotificationBatch(data) {
+        console.log('새 알림 수신:', data.notifications);
         
-        // 브라우저 알림 표시
-        this.showBrowserNotification(data);
+        // 묶음에서 가장 최근 알림만 브라우저/토스트 알림으로 표시
+        const latest = data.notifications[data.notifications.length - 1];
+        if (latest) {
+            this.showBrowserNotification(latest);
+            this.showToastNotification(latest);
+        }
         
-        // 토스트 알림 표시
-        this.showToastNotification(data);
+        this.updateNotificationBadge(data.count);
         
-        // 알림 목록 새로고침
-        this.socket.emit('get_notifications');
+        // 받은 알림을 목록에 바로 반영 (목록을 다시 요청하지 않음)
+        this.mergeNotifications(data.notifications);
+        this.updateNotificationList(this.notifications);
+    }
+    
+    syncNotifications() {
+        this.socket.emit('sync_notifications', {
+            since_id: this.latestId,
+            version: this.readVersion
+        });
+    }
+    
+    applySync(data) {
+        if (data.reset) {
+            this.notifications = [];
+        }
+        this.mergeNotifications(data.notifications);
+        
+        const readIds = new Set(data.read_ids);
+        this.notifications.forEach((notification) => {
+            if (readIds.has(notification.id)) notification.is_read = true;
+        });
+        
+        this.latestId = Math.max(data.reset ? 0 : this.latestId, data.latest_id || 0);
+        this.readVersion = data.version;
+        this.updateNotificationBadge(data.count);
+        this.updateNotificationList(this.notifications);
+    }
+    
+    mergeNotifications(notifications) {
+        // 새 알림이 합친 이전 알림(같은 타입과 대상)은 목록에서 제거
+        notifications.forEach((notification) => {
+            this.notifications = this.notifications.filter((item) =>
+                item.id !== notification.id && item.id !== notification.replaces &&
+                !(notification.subject && !item.is_read && item.type === notification.type &&
+                  item.subject === notification.subject && item.id < notification.id));
+            this.notifications.push(notification);
+            this.latestId = Math.max(this.latestId, notification.id);
+        });
+        this.notifications.sort((a, b) => b.id - a.id);
+        this.notifications = this.notifications.slice(0, 10);
     }
     
     showBrowserNotification(data) {
@@ -268,7 +336,10 @@ class NotificationManager {
                     ${notification.icon}
                 </div>
                 <div class="notification-content">
-                    <div class="notification-title">${notification.title}</div>
+                    <div class="notification-title">
+                        ${notification.title}
+                        ${notification.count > 1 ? `<span class="notification-count">${notification.count}</span>` : ''}
+                    </div>
                     <div class="notification-message">${notification.content}</div>
                     <div class="notification-time">${notification.formatted_time}</div>
                 </div>
@@ -279,6 +350,36 @@ class NotificationManager {
         this.notificationList.innerHTML = notificationHTML;
     }
     
+    updateMemoryImage(data) {
+        // 백그라운드 처리가 끝난 추억 사진을 화면에서 교체
+        document.querySelectorAll(`img[data-memory-id="${data.memory_id}"]`).forEach(img => {
+            if (data.status === 'ready' && data.image_url) {
+                // 목록 카드(<picture>)는 작은 파생 이미지를 사용
+                const url = img.closest('picture') && data.thumbnail_url ? data.thumbnail_url : data.image_url;
+                img.src = `${url}?v=${Date.now()}`;
+                img.classList.remove('image-processing');
+            } else if (data.status === 'failed') {
+                img.remove();
+            }
+        });
+        
+        document.querySelectorAll(`.image-processing-text[data-memory-id="${data.memory_id}"]`).forEach(text => {
+            text.textContent = data.status === 'ready'
+                ? '클릭하면 크게 볼 수 있습니다'
+                : '사진 처리에 실패했습니다. 다시 업로드해주세요.';
+        });
+        
+        // 이미 비슷한 사진의 추억이 있으면 알려줌 (제목은 저장할 때 이스케이프됨)
+        if (data.similar && data.similar.length) {
+            const titles = data.similar.map(memory => `'${memory.title}'`).join(', ');
+            this.showToastNotification({
+                icon: '📷',
+                title: '비슷한 사진의 추억이 이미 있어요',
+                content: `${titles}. 메모리 북의 중복 사진 정리에서 확인할 수 있어요.`
+            });
+        }
+    }
+    
     updatePartnerStatus(data) {
         if (!this.partnerStatus) return;
         
@@ -315,8 +416,8 @@ class NotificationManager {
             this.notificationContainer.style.display = isVisible ? 'none' : 'block';
             
             if (!isVisible) {
-                // 패널을 열 때 알림 목록 새로고침
-                this.socket.emit('get_notifications');
+                // 패널을 열 때 변경분만 동기화
+                this.syncNotifications();
             }
         }
     }
@@ -334,6 +435,9 @@ class NotificationManager {
     }
     
     markNotificationAsRead(notificationId) {
+        const cached = this.notifications.find((item) => item.id === parseInt(notificationId));
+        if (cached) cached.is_read = true;
+        
         const notificationItem = document.querySelector(`[data-notification-id="${notificationId}"]`);
         if (notificationItem) {
             notificationItem.classList.remove('unread');
@@ -3,9 +3,12 @@
 import pytest
 import tempfile
 import os
+import itertools
 from datetime import datetime, date
+from flask import g
+from config import TestingConfig
 from app.create_app import create_app
-from app.extensions import db
+from app.extensions import db, socketio
 from app.models.user import User
 from app.models.couple import CoupleConnection
 from app.models.dday import DDay
@@ -21,7 +24,9 @@ def app():
     # 임시 데이터베이스 파일 생성
     db_fd, db_path = tempfile.mkstemp()
     
-    app = create_app({
+    # TestingConfig를 기준으로 테스트별 값만 덮어씀
+    settings = {key: getattr(TestingConfig, key) for key in dir(TestingConfig) if key.isupper()}
+    settings.update({
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
         'WTF_CSRF_ENABLED': False,
@@ -30,6 +35,7 @@ def app():
         'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,  # 16MB
         'ALLOWED_EXTENSIONS': {'png', 'jpg', 'jpeg', 'gif'}
     })
+    app = create_app(settings)
     
     with app.app_context():
         db.create_all()
@@ -49,6 +55,90 @@ def runner(app):
     """CLI 러너"""
     return app.test_cli_runner()
 
+@pytest.fixture
+def make_user():
+    """테스트용 사용자 생성 함수
+
+    make_user(email, name)은 비밀번호가 'testpassword'인 사용자를 저장해 반환합니다.
+    """
+    def make(email='user@example.com', name='테스트 사용자'):
+        user = User(email=email, name=name)
+        user.set_password('testpassword')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+@pytest.fixture
+def make_couple(make_user):
+    """테스트용 커플 생성 함수
+
+    make_couple(key, name)은 <key>@example.com('<name> 테스트')과
+    <key>-partner@example.com('<name> 파트너')을 연결하고
+    (사용자, 파트너, 커플 연결)을 반환합니다.
+    """
+    invite_codes = itertools.count(1)
+
+    def make(key='couple', name='커플'):
+        user = make_user(f'{key}@example.com', f'{name} 테스트')
+        partner = make_user(f'{key}-partner@example.com', f'{name} 파트너')
+        connection = CoupleConnection(user1_id=user.id, user2_id=partner.id,
+                                      invite_code=f'TEST{next(invite_codes):04d}')
+        db.session.add(connection)
+        db.session.commit()
+        return user, partner, connection
+    return make
+
+@pytest.fixture
+def login():
+    """테스트 클라이언트 세션에 사용자 로그인 정보를 설정하는 함수"""
+    def do_login(client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+        return user
+    return do_login
+
+@pytest.fixture
+def connect_socket(app, login):
+    """Socket.IO 테스트 클라이언트로 연결하는 함수
+
+    connect_socket(client, auth)는 client의 세션으로, connect_socket(user=user)는
+    user로 로그인한 새 테스트 클라이언트로 연결합니다. 같은 앱 컨텍스트에서
+    다른 사용자로 연결할 수 있도록 Flask-Login이 g에 둔 사용자를 먼저 지웁니다.
+    """
+    def connect(client=None, auth=None, user=None):
+        if client is None:
+            client = app.test_client()
+        if user is not None:
+            login(client, user)
+        g.pop('_login_user', None)
+        return socketio.test_client(app, flask_test_client=client, auth=auth)
+    return connect
+
+@pytest.fixture(autouse=True)
+def dashboard_tasks(monkeypatch):
+    """대시보드 전송 태스크를 시작하지 않고 기록하는 픽스처
+
+    커밋마다 실제 스레드가 돌면 다른 테스트의 소켓에 변경분이 섞이므로, 테스트는
+    dashboard_publisher.drain()으로 직접 보내거나 기록된 태스크를 실행합니다.
+    """
+    from app.services.dashboard_state import dashboard_publisher
+
+    tasks = []
+    start_background_task = socketio.start_background_task
+
+    def start(target, *args, **kwargs):
+        if getattr(target, '__self__', None) is dashboard_publisher:
+            tasks.append(target)
+            return None
+        return start_background_task(target, *args, **kwargs)
+
+    monkeypatch.setattr(socketio, 'start_background_task', start)
+    yield tasks
+    dashboard_publisher.clear()
+    dashboard_publisher._running = False
+
 @pytest.fixture
 def test_user():
     """테스트용 사용자 ID 반환"""
@@ -0,0 +1,88 @@
+"""캘린더 구독 피드 테스트"""
+
+import json
+from datetime import datetime, date
+from app.models.event import Event
+from app.models.dday import DDay
+from app.models.calendar_feed import CalendarFeed
+from app.services.ical_feed import escape_text, fold_line
+from app.extensions import db
+
+class TestICalFormatting:
+    """iCalendar 포맷 유틸리티 테스트"""
+
+    def test_escape_text(self):
+        """특수 문자 이스케이프 테스트"""
+        assert escape_text('a,b;c\\d\ne') == 'a\\,b\\;c\\\\d\\ne'
+        assert escape_text(None) == ''
+
+    def test_fold_line_multibyte(self):
+        """멀티바이트 문자 줄 접기 테스트"""
+        folded = fold_line('SUMMARY:' + '가' * 60)
+        for part in folded.rstrip('\r\n').split('\r\n'):
+            assert len(part.encode('utf-8')) <= 75
+        assert folded.replace('\r\n ', '') == 'SUMMARY:' + '가' * 60 + '\r\n'
+
+class TestCalendarFeed:
+    """캘린더 구독 피드 엔드포인트 테스트"""
+
+    def test_feed_streams_events_and_ddays(self, client, app, make_couple, login):
+        """피드에 일정과 D-Day가 포함되는지 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('feed', '피드')
+            db.session.add(Event(
+                couple_id=connection.id, title='저녁 데이트',
+                start_datetime=datetime(2024, 5, 1, 19, 0),
+                end_datetime=datetime(2024, 5, 1, 21, 0),
+                participant_type='both', created_by=user.id
+            ))
+            db.session.add(DDay(
+                couple_id=connection.id, title='100일',
+                target_date=date(2024, 6, 1), created_by=user.id
+            ))
+            db.session.commit()
+
+            login(client, user)
+
+            data = json.loads(client.get('/calendar/api/feed-url').data)
+            assert data['success'] is True
+            feed_path = data['url'].split('localhost', 1)[1]
+
+            response = client.get(feed_path)
+            assert response.status_code == 200
+            assert response.mimetype == 'text/calendar'
+            body = response.get_data(as_text=True)
+            assert body.startswith('BEGIN:VCALENDAR\r\n')
+            assert 'DTSTART:20240501T190000' in body
+            assert 'DTSTART;VALUE=DATE:20240601' in body
+            assert body.endswith('END:VCALENDAR\r\n')
+
+    def test_feed_not_modified_until_calendar_write(self, client, app, make_couple):
+        """캘린더 변경 전까지 304를 반환하는지 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('feed', '피드')
+            feed = CalendarFeed.get_or_create(connection.id)
+
+            first = client.get(f'/calendar/feed/{feed.token}.ics')
+            first.get_data()
+            etag = first.headers['ETag']
+
+            cached = client.get(f'/calendar/feed/{feed.token}.ics',
+                                headers={'If-None-Match': etag})
+            assert cached.status_code == 304
+
+            CalendarFeed.touch(connection.id)
+            db.session.commit()
+            assert CalendarFeed.query.filter_by(couple_id=connection.id).one().token == feed.token
+
+            changed = client.get(f'/calendar/feed/{feed.token}.ics',
+                                 headers={'If-None-Match': etag})
+            assert changed.status_code == 200
+            assert changed.headers['ETag'] != etag
+            changed.get_data()
+
+    def test_feed_invalid_token(self, client, app):
+        """잘못된 토큰은 404를 반환하는지 테스트"""
+        with app.app_context():
+            response = client.get('/calendar/feed/invalid-token.ics')
+            assert response.status_code == 404
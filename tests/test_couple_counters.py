@@ -0,0 +1,115 @@
+"""커플 콘텐츠 카운터 테스트"""
+
+from datetime import date, datetime
+from app.models.couple_counter import CoupleCounter
+from app.models.memory import Memory
+from app.models.event import Event
+from app.models.dday import DDay
+from app.models.mood import MoodEntry
+from app.models.question import Question, Answer
+from app.extensions import db
+
+class TestCoupleCounters:
+    """커플 카운터 테스트"""
+
+    def test_triggers_track_writes(self, client, app, make_couple, login):
+        """추가/수정/삭제가 같은 트랜잭션에서 카운터에 반영되는지 테스트"""
+        with app.app_context():
+            user, partner, connection = make_couple('counter', '카운터')
+            login(client, user)
+            today = date.today()
+
+            memory = Memory(couple_id=connection.id, title='사진 추억', content='내용',
+                            memory_date=today, image_path='photo.jpg', created_by=user.id)
+            old_memory = Memory(couple_id=connection.id, title='옛 추억', content='내용',
+                                memory_date=date(2020, 1, 1), created_by=user.id)
+            question = Question(text='질문', category='daily')
+            db.session.add_all([memory, old_memory, question])
+            db.session.commit()
+
+            db.session.add_all([
+                Event(couple_id=connection.id, title='일정', start_datetime=datetime(2024, 1, 1, 10),
+                      end_datetime=datetime(2024, 1, 1, 11), participant_type='both', created_by=user.id),
+                DDay(couple_id=connection.id, title='기념일', target_date=date(2030, 1, 1), created_by=user.id),
+                Answer(question_id=question.id, user_id=partner.id, answer_text='답변'),
+                MoodEntry(user_id=user.id, mood_level=4, date=today)
+            ])
+            db.session.commit()
+
+            counter = CoupleCounter.get_for_couple(connection.id)
+            assert (counter.memories, counter.memories_with_images, counter.month_memories) == (2, 1, 1)
+            assert (counter.events, counter.ddays) == (1, 1)
+            assert (counter.user1_answers, counter.user2_answers) == (0, 1)
+            assert (counter.user1_moods, counter.user2_moods) == (1, 0)
+
+            memory.image_path = None
+            memory.memory_date = date(2020, 2, 1)
+            db.session.delete(old_memory)
+            db.session.commit()
+            db.session.refresh(counter)
+            assert (counter.memories, counter.memories_with_images, counter.month_memories) == (1, 0, 0)
+            assert CoupleCounter.verify() == []
+
+    def test_verify_and_fix(self, client, app, make_couple, login):
+        """어긋난 카운터를 찾아 다시 계산하는지 테스트"""
+        with app.app_context():
+            user, partner, connection = make_couple('counter', '카운터')
+            login(client, user)
+            db.session.add(Memory(couple_id=connection.id, title='추억', content='내용',
+                                  memory_date=date(2024, 1, 1), created_by=user.id))
+            db.session.commit()
+
+            db.session.execute(db.text("UPDATE couple_counters SET memories = 7, events = 3"))
+            db.session.commit()
+
+            mismatches = CoupleCounter.verify(fix=True)
+            assert {(column, stored, actual) for _, column, stored, actual in mismatches} == {
+                ('memories', 7, 1), ('events', 3, 0)
+            }
+            assert CoupleCounter.verify() == []
+
+            # 카운터 행이 없는 커플은 조회할 때 계산하되 저장하지 않고, verify --fix가 만듦
+            db.session.execute(db.text("DELETE FROM couple_counters"))
+            db.session.commit()
+            assert CoupleCounter.get_for_couple(connection.id).memories == 1
+            db.session.rollback()
+            assert db.session.get(CoupleCounter, connection.id) is None
+            CoupleCounter.verify(fix=True)
+            assert db.session.get(CoupleCounter, connection.id).memories == 1
+
+    def test_month_rollover_without_write(self, client, app, make_couple):
+        """달이 바뀐 카운터를 조회에서는 계산만 하고 유지보수 작업이 저장하는지 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('counter', '카운터')
+            db.session.add(Memory(couple_id=connection.id, title='추억', content='내용',
+                                  memory_date=date.today(), created_by=user.id))
+            db.session.execute(db.text(
+                "UPDATE couple_counters SET month_key = '2000-01', month_memories = 5"
+            ))
+            db.session.commit()
+
+            counter = CoupleCounter.get_for_couple(connection.id)
+            assert (counter.month_key, counter.month_memories) == (date.today().strftime('%Y-%m'), 1)
+            assert not db.session.dirty and not db.session.new
+            assert db.session.execute(db.text("SELECT month_memories FROM couple_counters")).scalar() == 5
+
+            assert CoupleCounter.refresh_month() == 1
+            stored = db.session.get(CoupleCounter, connection.id)
+            assert (stored.month_key, stored.month_memories) == (date.today().strftime('%Y-%m'), 1)
+            assert CoupleCounter.refresh_month() == 0
+
+    def test_stats_endpoints_use_counters(self, client, app, make_couple, login):
+        """통계 API가 카운터 값을 반환하는지 테스트"""
+        with app.app_context():
+            user, partner, connection = make_couple('counter', '카운터')
+            login(client, user)
+            db.session.add(Memory(couple_id=connection.id, title='추억', content='내용',
+                                  memory_date=date.today(), image_path='photo.jpg', created_by=user.id))
+            db.session.commit()
+
+            stats = client.get('/memories/api/stats').get_json()
+            assert stats == {'total_memories': 1, 'this_month_memories': 1, 'memories_with_images': 1}
+
+            counters = client.get('/api/dashboard-data').get_json()['counters']
+            assert counters['memories'] == 1
+            assert counters['my_answers'] == 0
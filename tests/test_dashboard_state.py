@@ -0,0 +1,141 @@
+"""커플 대시보드 상태 채널 테스트"""
+
+from datetime import date, timedelta
+from app.models.mood import MoodEntry
+from app.models.dday import DDay
+from app.models.dashboard_state import DashboardState
+from app.services.dashboard_state import get_dashboard_state, publish_dashboard_change, dashboard_publisher
+from app.utils.json_patch import make_patch, apply_patch
+from app.extensions import db
+
+def dashboard_events(socket_client, name):
+    return [event['args'][0] for event in socket_client.get_received() if event['name'] == name]
+
+class TestDashboardState:
+    """커플 대시보드 상태 채널 테스트"""
+
+    def test_writes_publish_patch_deltas(self, client, app, make_couple, login, connect_socket):
+        """기분, D-Day 저장이 커플 룸에 적용 가능한 변경분과 다음 버전을 보내는지 테스트"""
+        with app.app_context():
+            dashboard_publisher.clear()
+            user, partner, connection = make_couple('dashboard', '대시보드')
+            login(client, user)
+            socket_client = connect_socket(client)
+            socket_client.get_received()
+
+            # 처음 조회는 저장하거나 보내지 않고 계산한 스냅샷을 버전 0으로 반환
+            initial = client.get('/api/dashboard-state').get_json()
+            assert initial['version'] == 0
+            assert initial['state']['moods'] == {}
+            assert initial['state']['answered_today'] == {str(user.id): False, str(partner.id): False}
+            assert db.session.get(DashboardState, connection.id) is None
+            assert dashboard_events(socket_client, 'dashboard_delta') == []
+
+            # 전송 태스크가 저장하며 보내는 첫 변경분은 전체 교체
+            assert dashboard_publisher.drain(app) == 1
+            deltas = dashboard_events(socket_client, 'dashboard_delta')
+            assert [(delta['base_version'], delta['version']) for delta in deltas] == [(0, 1)]
+            initial['state'] = apply_patch(initial['state'], deltas[0]['ops'])
+            assert client.get('/api/dashboard-state').get_json() == dict(initial, version=1)
+
+            db.session.add(MoodEntry(user_id=partner.id, mood_level=5, date=date.today()))
+            db.session.commit()
+
+            # 커밋은 변경만 넘기고 재계산과 전송은 요청 밖(전송 태스크)에서
+            assert dashboard_events(socket_client, 'dashboard_delta') == []
+            assert db.session.get(DashboardState, connection.id).version == 1
+            assert dashboard_publisher.drain(app) == 1
+            deltas = dashboard_events(socket_client, 'dashboard_delta')
+            assert [(delta['base_version'], delta['version']) for delta in deltas] == [(1, 2)]
+            paths = sorted(op['path'] for op in deltas[0]['ops'])
+            assert paths == [f'/counters/moods/{partner.id}', f'/moods/{partner.id}']
+
+            current = client.get('/api/dashboard-state').get_json()
+            assert current['version'] == 2
+            assert apply_patch(initial['state'], deltas[0]['ops']) == current['state']
+            assert current['state']['moods'][str(partner.id)]['level'] == 5
+
+            db.session.add(DDay(couple_id=connection.id, title='기념일', target_date=date.today() + timedelta(days=3),
+                                created_by=user.id))
+            db.session.commit()
+            assert dashboard_publisher.drain(app) == 1
+            deltas = dashboard_events(socket_client, 'dashboard_delta')
+            assert [(delta['base_version'], delta['version']) for delta in deltas] == [(2, 3)]
+            state = apply_patch(current['state'], deltas[0]['ops'])
+            assert [dday['title'] for dday in state['ddays']] == ['기념일']
+
+            # 대시보드와 관계없는 커밋이나 바뀐 것이 없는 재계산은 버전을 올리지 않음
+            user.name = '이름 변경'
+            db.session.commit()
+            assert dashboard_publisher.drain(app) == 0
+            assert publish_dashboard_change(connection.id) is None
+            assert dashboard_events(socket_client, 'dashboard_delta') == []
+            assert db.session.get(DashboardState, connection.id).version == 3
+            socket_client.disconnect()
+
+    def test_resync_and_day_rollover(self, client, app, make_couple, login, connect_socket):
+        """버전이 다른 클라이언트에만 전체 상태를 보내고, 날짜가 바뀌면 다시 계산하는지 테스트"""
+        with app.app_context():
+            user, partner, connection = make_couple('dashboard', '대시보드')
+            login(client, user)
+            get_dashboard_state(connection)
+            dashboard_publisher.drain(app)
+            version, state = get_dashboard_state(connection)
+
+            socket_client = connect_socket(client)
+            socket_client.get_received()
+
+            socket_client.emit('dashboard_sync', {'version': version})
+            assert dashboard_events(socket_client, 'dashboard_state') == []
+            socket_client.emit('dashboard_sync', {'version': version - 1})
+            assert dashboard_events(socket_client, 'dashboard_state') == [{'version': version, 'state': state}]
+
+            # 날짜가 바뀌면 조회는 새 날짜로 계산만 하고, 전송 태스크가 전체 교체로 보냄
+            tomorrow = date.today() + timedelta(days=1)
+            next_version, next_state = get_dashboard_state(connection, today=tomorrow)
+            assert next_version == version
+            assert next_state['day'] == tomorrow.isoformat()
+            assert dashboard_events(socket_client, 'dashboard_delta') == []
+
+            assert publish_dashboard_change(connection.id, today=tomorrow) is not None
+            deltas = dashboard_events(socket_client, 'dashboard_delta')
+            assert deltas == [{'version': version + 1, 'base_version': version,
+                               'ops': [{'op': 'replace', 'path': '', 'value': next_state}]}]
+            socket_client.disconnect()
+
+    def test_background_task_publishes(self, client, app, make_couple, login, connect_socket, dashboard_tasks):
+        """커밋 후 시작된 백그라운드 태스크가 모인 변경분을 보내는지 테스트"""
+        app.config['DASHBOARD_PUSH_DELAY'] = 0
+        with app.app_context():
+            dashboard_publisher.clear()
+            user, partner, connection = make_couple('dashboard', '대시보드')
+            login(client, user)
+            # 처음 조회가 맡긴 저장도 태스크에서 처리
+            get_dashboard_state(connection)
+            assert len(dashboard_tasks) == 1
+            dashboard_tasks.pop()()
+            assert db.session.get(DashboardState, connection.id).version == 1
+            socket_client = connect_socket(client)
+            socket_client.get_received()
+
+            db.session.add(MoodEntry(user_id=user.id, mood_level=2, date=date.today()))
+            db.session.commit()
+            db.session.add(MoodEntry(user_id=partner.id, mood_level=4, date=date.today()))
+            db.session.commit()
+            # 태스크가 도는 동안의 커밋은 새 태스크를 만들지 않고 함께 보냄
+            assert len(dashboard_tasks) == 1
+            dashboard_tasks[0]()
+            deltas = dashboard_events(socket_client, 'dashboard_delta')
+            assert [(delta['base_version'], delta['version']) for delta in deltas] == [(1, 2)]
+            socket_client.disconnect()
+
+    def test_json_patch_round_trip(self):
+        """객체 키 추가/삭제/변경과 배열 교체, 경로 이스케이프 테스트"""
+        old = {'a': 1, 'b/c': {'x': [1, 2]}, 'gone': True}
+        new = {'a': 2, 'b/c': {'x': [1, 2, 3], 'y': None}, 'new~key': 'v'}
+        ops = make_patch(old, new)
+        assert {'op': 'remove', 'path': '/gone'} in ops
+        assert {'op': 'replace', 'path': '/b~1c/x', 'value': [1, 2, 3]} in ops
+        assert {'op': 'add', 'path': '/new~0key', 'value': 'v'} in ops
+        assert apply_patch(old, ops) == new
+        assert make_patch(new, new) == []
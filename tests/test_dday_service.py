@@ -0,0 +1,64 @@
+"""D-Day 마일스톤 및 상태 캐시 테스트"""
+
+from datetime import date, datetime
+from itertools import islice
+from app.models.dday import DDay
+from app.models.calendar_feed import CalendarFeed
+from app.services.dday_service import iter_milestones, get_upcoming_milestones, DDayStatusCache
+from app.extensions import db
+
+class TestMilestones:
+    """기념일 마일스톤 생성 테스트"""
+
+    def test_milestones_in_date_order(self):
+        """100일 단위와 주년 기념일이 날짜순으로 섞이는지 테스트"""
+        start = date(2024, 1, 1)
+        milestones = list(islice(iter_milestones(start), 5))
+
+        assert [m['title'] for m in milestones] == ['100일', '200일', '300일', '1주년', '400일']
+        # 사귄 날을 1일로 계산
+        assert milestones[0]['date'] == date(2024, 4, 9)
+        assert milestones[3]['date'] == date(2025, 1, 1)
+
+    def test_milestones_skip_past(self):
+        """지난 기념일은 건너뛰는지 테스트"""
+        start = date(2024, 1, 1)
+        upcoming = get_upcoming_milestones(start, today=date(2024, 4, 9), limit=2)
+
+        assert upcoming[0]['title'] == '100일'
+        assert upcoming[0]['status_text'] == 'D-Day'
+        assert upcoming[1]['title'] == '200일'
+
+    def test_leap_day_anniversary(self):
+        """2월 29일 시작 주년 기념일 테스트"""
+        start = date(2024, 2, 29)
+        anniversaries = [m for m in islice(iter_milestones(start), 6) if m['type'] == 'anniversary']
+        assert anniversaries[0]['date'] == date(2025, 2, 28)
+
+class TestDDayStatusCache:
+    """D-Day 상태 캐시 테스트"""
+
+    def test_cache_recomputes_on_new_day_and_write(self, app, make_couple):
+        """날짜 변경과 캘린더 변경 시 다시 계산하는지 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('cache', '캐시')
+            connection.connected_at = datetime(2024, 1, 1)
+            db.session.add(DDay(couple_id=connection.id, title='여행', target_date=date(2024, 3, 1),
+                                created_by=user.id))
+            db.session.commit()
+
+            cache = DDayStatusCache()
+            first = cache.get(connection, today=date(2024, 2, 1))
+            assert first['ddays'][0]['status_text'] == 'D-29'
+            assert cache.get(connection, today=date(2024, 2, 1)) is first
+
+            next_day = cache.get(connection, today=date(2024, 2, 2))
+            assert next_day is not first
+            assert next_day['ddays'][0]['status_text'] == 'D-28'
+
+            db.session.add(DDay(couple_id=connection.id, title='생일', target_date=date(2024, 2, 2), created_by=user.id))
+            CalendarFeed.touch(connection.id)
+            db.session.commit()
+
+            updated = cache.get(connection, today=date(2024, 2, 2))
+            assert [d['status_text'] for d in updated['ddays']] == ['D-Day', 'D-28']
@@ -0,0 +1,79 @@
+"""비슷한 사진 검출 테스트"""
+
+import io
+from datetime import date
+from PIL import Image, ImageDraw
+from app.models.memory import Memory
+from app.services import image_hash
+from app.services.image_hash import compute_dhash, hamming_distance, find_similar_memories, to_signed
+from app.extensions import db
+
+def photo(flip=False):
+    """밝기 변화가 있는 테스트 사진 (flip이면 좌우 반전한 다른 사진)"""
+    image = Image.linear_gradient('L').resize((400, 300)).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((60, 40, 220, 200), fill=(250, 200, 40))
+    draw.rectangle((260, 150, 380, 280), fill=(20, 60, 160))
+    return image.transpose(Image.Transpose.FLIP_LEFT_RIGHT) if flip else image
+
+def jpeg_bytes(image, quality=90):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+def post_memory(client, data, title):
+    """이미지가 포함된 추억 등록 요청"""
+    return client.post('/memories/add', data={
+        'title': title,
+        'content': '사진 추억',
+        'memory_date': date.today().isoformat(),
+        'image': (io.BytesIO(data), 'photo.jpg')
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+class TestImageHash:
+    """비슷한 사진 검출 테스트"""
+
+    def test_dhash_distance(self, monkeypatch):
+        """재압축, 축소한 사진은 가깝고 다른 사진은 먼지 테스트"""
+        original = compute_dhash(photo())
+        recompressed = compute_dhash(Image.open(io.BytesIO(jpeg_bytes(photo().resize((200, 150)), quality=40))))
+        different = compute_dhash(photo(flip=True))
+
+        assert hamming_distance(original, recompressed) <= 6
+        assert hamming_distance(original, different) > 6
+
+        # NumPy 유무와 관계없이 같은 해시
+        monkeypatch.setattr(image_hash, 'HAS_NUMPY', False)
+        assert compute_dhash(photo()) == original
+
+    def test_processing_reports_duplicate(self, client, app, tmp_path, make_couple, login, connect_socket):
+        """비슷한 사진을 다시 올리면 처리 완료 이벤트로 알리고 정리 페이지에 묶이는지 테스트"""
+        app.config.update(UPLOAD_FOLDER=str(tmp_path), IMAGE_PROCESSING_MODE='sync')
+        with app.app_context():
+            login(client, make_couple('hash', '해시')[0])
+            socket_client = connect_socket(client)
+            socket_client.get_received()
+
+            def similar_titles(response):
+                # 요청 중에는 해시를 계산하거나 경고하지 않음
+                assert '비슷한 사진의 추억이 이미 있어요' not in response.get_data(as_text=True)
+                events = [event for event in socket_client.get_received() if event['name'] == 'memory_image_status']
+                return [match['title'] for match in events[-1]['args'][0]['similar']]
+
+            assert similar_titles(post_memory(client, jpeg_bytes(photo()), '원본')) == []
+            assert similar_titles(post_memory(client, jpeg_bytes(photo(flip=True)), '다른 사진')) == []
+            assert similar_titles(post_memory(client, jpeg_bytes(photo().resize((300, 225)), quality=50), '사본')) == ['원본']
+            socket_client.disconnect()
+
+            original, other, copy = Memory.query.order_by(Memory.id).all()
+            assert copy.image_hash is not None
+            assert find_similar_memories(original.couple_id, to_signed(compute_dhash(photo())))[0][0].id in (original.id, copy.id)
+
+            page = client.get('/memories/duplicates').get_data(as_text=True)
+            assert '비슷한 사진 2장' in page
+            assert '사본' in page and '다른 사진' not in page
+
+            # 이미 처리된 같은 파일을 다시 올리면 해시를 그대로 이어받음
+            post_memory(client, jpeg_bytes(photo()), '같은 파일')
+            same = Memory.query.filter_by(title='같은 파일').one()
+            assert (same.image_status, same.image_hash) == ('ready', original.image_hash)
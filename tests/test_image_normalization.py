@@ -0,0 +1,96 @@
+"""이미지 정규화(단일 디코딩) 테스트"""
+
+import io
+import zlib
+import struct
+import pytest
+from PIL import Image, ImageFile
+from app.services.image_pipeline import open_image, process_image, ImageRejected
+from app.utils.security import FileUploadValidator
+from app.utils.static_optimization import optimize_images
+
+def png_header(width, height):
+    """픽셀 데이터 없이 IHDR만 있는 PNG (압축 폭탄 흉내)"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IEND', b''))
+
+def rotated_jpeg(size=(3000, 1000)):
+    """EXIF 방향이 90도 회전(6)이고 촬영 정보가 든 JPEG"""
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = 'TestCamera'
+    buffer = io.BytesIO()
+    Image.linear_gradient('L').resize(size).convert('RGB').save(buffer, 'JPEG', exif=exif)
+    buffer.seek(0)
+    return buffer
+
+class FakeUpload(io.BytesIO):
+    """파일명이 있는 업로드 파일"""
+
+    def __init__(self, data, filename):
+        super().__init__(data)
+        self.filename = filename
+
+class TestImageNormalization:
+    """이미지 정규화 테스트"""
+
+    def test_single_decode_for_all_outputs(self, tmp_path, monkeypatch):
+        """한 번 디코딩으로 방향 보정, EXIF 제거, 리사이즈, 파생 이미지를 만드는지 테스트"""
+        decodes = []
+        original_load = ImageFile.ImageFile.load
+
+        def counting_load(image):
+            if image.tile:
+                decodes.append(image.format)
+            return original_load(image)
+
+        monkeypatch.setattr(ImageFile.ImageFile, 'load', counting_load)
+
+        target = tmp_path / 'photo.jpg'
+        with open_image(rotated_jpeg()) as image:
+            result = process_image(image, str(target), str(tmp_path), 'photo.jpg',
+                                   max_dimension=2048, widths=(320, 640))
+        assert decodes == ['JPEG']
+
+        assert (result['width'], result['height']) == (683, 2048)
+        assert [variant['width'] for variant in result['variants']] == [320, 640]
+        assert result['image_hash'] is not None
+
+        monkeypatch.setattr(ImageFile.ImageFile, 'load', original_load)
+        with Image.open(target) as saved:
+            assert saved.size == (683, 2048)
+            assert not saved.getexif()
+        with Image.open(tmp_path / 'photo_w320.webp') as variant:
+            assert variant.size == (320, 960)
+
+    def test_bombs_rejected_from_header(self):
+        """해상도가 너무 큰 이미지를 디코딩 전에 거부하는지 테스트"""
+        with pytest.raises(ImageRejected):
+            open_image(io.BytesIO(png_header(100000, 100000)))
+        with pytest.raises(ImageRejected):
+            open_image(io.BytesIO(png_header(8000, 6000)))
+        with pytest.raises(ImageRejected):
+            open_image(io.BytesIO(b'not an image'))
+        open_image(io.BytesIO(png_header(4000, 3000))).close()
+
+        errors = FileUploadValidator.validate_file(FakeUpload(png_header(8000, 6000), 'bomb.png'))
+        assert errors == ['이미지 해상도가 너무 큽니다.']
+
+    def test_static_optimization_skips_up_to_date_files(self, app, tmp_path):
+        """할 일이 있는 원본만 한 번 처리하고 파생 이미지와 임시 파일은 건너뛰는지 테스트"""
+        app.config.update(UPLOAD_FOLDER=str(tmp_path), IMAGE_MAX_DIMENSION=1000)
+        (tmp_path / 'large.jpg').write_bytes(rotated_jpeg().getvalue())
+        Image.new('RGB', (1600, 100)).save(tmp_path / 'large_w1600.jpg')
+        (tmp_path / '.upload-abc.tmp').write_bytes(b'partial')
+
+        with app.app_context():
+            assert optimize_images() == (1, 1)
+            assert optimize_images() == (0, 0)
+
+        with Image.open(tmp_path / 'large.jpg') as image:
+            assert image.size == (333, 1000)
+        with Image.open(tmp_path / 'large_w1600.jpg') as image:
+            assert image.size == (1600, 100)
+        assert not (tmp_path / 'large_w1600.webp').exists()
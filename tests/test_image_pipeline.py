@@ -0,0 +1,153 @@
+"""메모리 이미지 처리 파이프라인 테스트"""
+
+import io
+import os
+import time
+from datetime import date
+from PIL import Image
+from app.models.memory import Memory
+from app.services.image_pipeline import image_pipeline, recover_stuck_images, backfill_image_variants
+from app.extensions import db
+
+def make_image_bytes(size=(64, 48), image_format='PNG'):
+    """테스트용 이미지 바이트 생성"""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 100, 50)).save(buffer, image_format)
+    buffer.seek(0)
+    return buffer
+
+def post_memory(client, image):
+    """이미지가 포함된 추억 등록 요청"""
+    return client.post('/memories/add', data={
+        'title': '바다 여행',
+        'content': '함께 본 바다',
+        'memory_date': date.today().isoformat(),
+        'image': (image, 'sea.png')
+    }, content_type='multipart/form-data')
+
+class TestImagePipeline:
+    """이미지 처리 파이프라인 테스트"""
+
+    def test_sync_mode_marks_image_ready(self, client, app, make_couple, login):
+        """동기 모드에서 업로드 직후 처리 완료 상태가 되는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        with app.app_context():
+            login(client, make_couple('pipeline', '파이프라인')[0])
+            response = post_memory(client, make_image_bytes())
+            assert response.status_code == 302
+
+            memory = Memory.query.first()
+            assert memory.image_path is not None
+            assert memory.image_status == 'ready'
+            os.remove(memory.get_image_full_path())
+
+    def test_background_mode_returns_processing(self, client, app, make_couple, login):
+        """백그라운드 모드에서 처리 중 상태로 응답한 뒤 완료되는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'thread'
+        with app.app_context():
+            login(client, make_couple('pipeline', '파이프라인')[0])
+            response = post_memory(client, make_image_bytes())
+            assert response.status_code == 302
+
+            memory = Memory.query.first()
+            assert memory.image_status in ('processing', 'ready')
+
+            deadline = time.time() + 10
+            while image_pipeline.pending_count() and time.time() < deadline:
+                time.sleep(0.05)
+            time.sleep(0.5)
+
+            db.session.expire_all()
+            memory = Memory.query.first()
+            assert memory.image_status == 'ready'
+            os.remove(memory.get_image_full_path())
+
+    def test_busy_queue_rejects_upload(self, client, app, make_couple, login):
+        """대기열이 가득 차면 업로드를 거절하는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'thread'
+        app.config['IMAGE_QUEUE_SIZE'] = 0
+        with app.app_context():
+            login(client, make_couple('pipeline', '파이프라인')[0])
+            response = post_memory(client, make_image_bytes())
+            assert response.status_code == 200
+            assert Memory.query.count() == 0
+
+    def test_variants_generated_below_original_width(self, client, app, make_couple, login):
+        """원본보다 작은 너비의 WebP/JPEG 파생 이미지가 생성되는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        app.config['IMAGE_VARIANT_WIDTHS'] = (320, 640, 1280)
+        with app.app_context():
+            login(client, make_couple('pipeline', '파이프라인')[0])
+            response = post_memory(client, make_image_bytes(size=(800, 600)))
+            assert response.status_code == 302
+
+            memory = Memory.query.first()
+            variants = memory.get_variants()
+            assert [variant['width'] for variant in variants] == [320, 640]
+            assert variants[0]['height'] == 240
+
+            upload_folder = app.config['UPLOAD_FOLDER']
+            for variant in variants:
+                assert os.path.exists(os.path.join(upload_folder, variant['webp']))
+                assert os.path.exists(os.path.join(upload_folder, variant['jpeg']))
+            assert memory.get_srcset('webp').endswith('640w')
+            assert memory.get_thumbnail_url() == f"/uploads/{variants[1]['jpeg']}"
+
+            # 파일은 참조 해제가 커밋된 뒤 삭제
+            memory.delete_image()
+            assert os.path.exists(os.path.join(upload_folder, variants[0]['webp']))
+            db.session.commit()
+            for variant in variants:
+                assert not os.path.exists(os.path.join(upload_folder, variant['webp']))
+
+    def test_recover_stuck_images(self, app, tmp_path, make_couple):
+        """재시작으로 작업이 사라져 처리 중으로 남은 이미지를 다시 처리하거나 실패 처리하는지 테스트"""
+        app.config.update(UPLOAD_FOLDER=str(tmp_path), IMAGE_VARIANT_WIDTHS=(320,))
+        with app.app_context():
+            user, _, connection = make_couple('pipeline', '파이프라인')
+            old = time.time() - 31 * 60
+            for name, age in (('stuck.png', old), ('recent.png', None)):
+                (tmp_path / name).write_bytes(make_image_bytes(size=(640, 480)).getvalue())
+                if age:
+                    os.utime(tmp_path / name, (age, age))
+            for title, path in (('멈춤', 'stuck.png'), ('최근', 'recent.png'), ('사라짐', 'missing.png')):
+                db.session.add(Memory(couple_id=connection.id, title=title, content='', memory_date=date.today(),
+                                      image_path=path, image_status='processing', created_by=user.id))
+            db.session.commit()
+            os.utime(tmp_path / 'stuck.png', (old, old))
+
+            assert recover_stuck_images(app, stale_minutes=30) == (1, 1)
+            db.session.expire_all()
+            memories = {memory.title: memory for memory in Memory.query}
+            assert memories['멈춤'].image_status == 'ready'
+            assert [variant['width'] for variant in memories['멈춤'].get_variants()] == [320]
+            assert memories['멈춤'].image_hash is not None
+            assert memories['최근'].image_status == 'processing'
+            assert (memories['사라짐'].image_status, memories['사라짐'].image_path) == ('failed', None)
+
+    def test_backfill_reprocesses_unprocessed_originals(self, app, tmp_path, make_couple):
+        """파생본 백필이 정규화되지 않은 원본을 준비 완료로 표시하지 않고 파이프라인으로 처리하는지 테스트"""
+        app.config.update(UPLOAD_FOLDER=str(tmp_path), IMAGE_VARIANT_WIDTHS=(320,), IMAGE_MAX_DIMENSION=800)
+        with app.app_context():
+            user, _, connection = make_couple('backfill', '백필')
+            old = time.time() - 31 * 60
+            for name in ('ready.png', 'stuck.png', 'recent.png'):
+                (tmp_path / name).write_bytes(make_image_bytes(size=(1600, 1200)).getvalue())
+            for title, path, status in (('완료', 'ready.png', 'ready'), ('멈춤', 'stuck.png', 'processing'),
+                                        ('최근', 'recent.png', 'processing')):
+                db.session.add(Memory(couple_id=connection.id, title=title, content='', memory_date=date.today(),
+                                      image_path=path, image_status=status, created_by=user.id))
+            db.session.commit()
+            os.utime(tmp_path / 'stuck.png', (old, old))
+
+            assert backfill_image_variants(app, workers=1) == (2, 0)
+            db.session.expire_all()
+            memories = {memory.title: memory for memory in Memory.query}
+            assert memories['완료'].image_status == 'ready'
+            assert [variant['width'] for variant in memories['완료'].get_variants()] == [320]
+            assert memories['멈춤'].image_status == 'ready'
+            assert memories['멈춤'].image_hash is not None
+            with Image.open(tmp_path / 'stuck.png') as image:
+                assert image.size == (800, 600)
+            assert memories['최근'].image_status == 'processing'
+            assert memories['최근'].image_variants is None
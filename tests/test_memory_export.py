@@ -0,0 +1,125 @@
+"""메모리 북 내보내기 테스트"""
+
+import io
+import os
+import json
+import time
+import uuid
+import hashlib
+import zipfile
+from datetime import date
+from PIL import Image
+from app.models.memory import Memory
+from app.services.memory_export import get_export_folder, get_export_job, find_running_job, cleanup_exports
+from app.extensions import db
+
+def create_memories(app, user, connection):
+    """사진 있는 추억 1개와 사진 없는 추억 2개 생성"""
+    filename = f'export-{uuid.uuid4().hex}.jpg'
+    Image.new('RGB', (32, 32), (200, 100, 50)).save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+    db.session.add_all([
+        Memory(couple_id=connection.id, title='바다 <여행>', content='첫 줄\n둘째 줄', memory_date=date(2024, 3, 1),
+               image_path=filename, image_status='ready', created_by=user.id),
+        Memory(couple_id=connection.id, title='카페', content='커피', memory_date=date(2024, 2, 1), created_by=user.id),
+        Memory(couple_id=connection.id, title='산책', content='공원', memory_date=date(2024, 1, 1), created_by=user.id)
+    ])
+    db.session.commit()
+    return filename
+
+class TestMemoryExport:
+    """메모리 북 내보내기 테스트"""
+
+    def test_streamed_archive(self, client, app, make_couple, login):
+        """스트리밍 ZIP의 구성, 압축 방식, 매니페스트 해시 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('export', '내보내기')
+            login(client, user)
+            filename = create_memories(app, user, connection)
+
+            response = client.get('/memories/export.zip')
+            assert response.status_code == 200
+            assert response.is_streamed
+            assert response.mimetype == 'application/zip'
+
+            archive = zipfile.ZipFile(io.BytesIO(response.data))
+            assert archive.testzip() is None
+            image_name = 'images/2024-03-01_1.jpg'
+            assert archive.namelist() == [image_name, 'memories.json', 'index.html', 'manifest.json']
+            assert archive.getinfo(image_name).compress_type == zipfile.ZIP_STORED
+            assert archive.getinfo('memories.json').compress_type == zipfile.ZIP_DEFLATED
+
+            with open(os.path.join(app.config['UPLOAD_FOLDER'], filename), 'rb') as f:
+                assert archive.read(image_name) == f.read()
+
+            memories = json.loads(archive.read('memories.json'))['memories']
+            assert [memory['title'] for memory in memories] == ['바다 <여행>', '카페', '산책']
+            assert memories[0]['image'] == image_name
+            assert memories[0]['creator_name'] == '내보내기 테스트'
+
+            html = archive.read('index.html').decode()
+            assert '바다 &lt;여행&gt;' in html
+            assert f'src="{image_name}"' in html
+
+            manifest = json.loads(archive.read('manifest.json'))
+            assert manifest['memory_count'] == 3
+            for entry in manifest['files']:
+                data = archive.read(entry['path'])
+                assert entry['size'] == len(data)
+                assert entry['sha256'] == hashlib.sha256(data).hexdigest()
+
+            # 매니페스트의 커서로 이후(더 오래된) 추억만 이어서 내보내기
+            cursor = manifest['files'][0]['cursor']
+            resumed = zipfile.ZipFile(io.BytesIO(client.get(f'/memories/export.zip?after={cursor}').data))
+            assert [memory['title'] for memory in json.loads(resumed.read('memories.json'))['memories']] == ['카페', '산책']
+
+            assert client.get('/memories/export.zip?after=bad').status_code == 400
+
+    def test_background_export_job(self, client, app, tmp_path, make_couple, login):
+        """백그라운드 작업 완료 후 다운로드와 Range 이어받기 테스트"""
+        app.config['EXPORT_FOLDER'] = str(tmp_path)
+        with app.app_context():
+            user, _, connection = make_couple('export', '내보내기')
+            login(client, user)
+            create_memories(app, user, connection)
+
+            response = client.post('/memories/api/export')
+            assert response.status_code == 202
+            status_url = response.get_json()['status_url']
+
+            deadline = time.time() + 10
+            status = client.get(status_url).get_json()
+            while status['status'] == 'processing' and time.time() < deadline:
+                time.sleep(0.05)
+                status = client.get(status_url).get_json()
+            assert status['status'] == 'ready'
+
+            full = client.get(status['download_url'])
+            assert full.status_code == 200
+            assert zipfile.ZipFile(io.BytesIO(full.data)).namelist()[-1] == 'manifest.json'
+
+            partial = client.get(status['download_url'], headers={'Range': 'bytes=10-'})
+            assert partial.status_code == 206
+            assert partial.data == full.data[10:]
+
+            assert client.get('/memories/api/export/' + 'f' * 32).status_code == 404
+            assert client.get('/memories/api/export/../../etc').status_code == 404
+
+    def test_stale_part_file_does_not_block(self, app, tmp_path):
+        """죽은 작업이 남긴 .zip.part는 진행 중으로 보지 않고 실패로 처리하는지 테스트"""
+        app.config.update(EXPORT_FOLDER=str(tmp_path), EXPORT_STALE_SECONDS=300)
+        folder = get_export_folder(app, 1)
+        os.makedirs(folder)
+        running, crashed = 'a' * 32, 'b' * 32
+        for job_id in (running, crashed):
+            open(os.path.join(folder, job_id + '.zip.part'), 'wb').close()
+        old = time.time() - 301
+        os.utime(os.path.join(folder, crashed + '.zip.part'), (old, old))
+
+        assert find_running_job(app, 1) == running
+        assert get_export_job(app, 1, crashed) == {'status': 'failed'}
+        assert get_export_job(app, 1, running) == {'status': 'processing'}
+
+        cleanup_exports(app, 1)
+        assert sorted(os.listdir(folder)) == [running + '.zip.part', crashed + '.failed']
+        os.remove(os.path.join(folder, running + '.zip.part'))
+        assert find_running_job(app, 1) is None
@@ -0,0 +1,64 @@
+"""메모리 북 피드 API 테스트"""
+
+from datetime import date
+from app.models.memory import Memory
+from app.extensions import db
+
+class TestMemoryFeed:
+    """메모리 북 피드 테스트"""
+
+    def test_keyset_pages_cover_all_memories(self, client, app, make_couple, login):
+        """커서를 따라가면 같은 날짜의 추억도 빠짐없이 한 번씩 나오는지 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('feed', '피드')
+            login(client, user)
+            for index in range(30):
+                db.session.add(Memory(couple_id=connection.id, title=f'추억 {index}', content='내용 ' * 40,
+                                      memory_date=date(2024, 1, 1 + index // 3), created_by=user.id))
+            db.session.commit()
+
+            seen = []
+            cursor = None
+            while True:
+                url = '/memories/api/feed' + (f'?cursor={cursor}' if cursor else '')
+                data = client.get(url).get_json()
+                assert data['success']
+                seen.extend(item['id'] for item in data['memories'])
+                cursor = data['next_cursor']
+                if not cursor:
+                    break
+
+            assert len(seen) == 30
+            assert len(set(seen)) == 30
+
+            first = client.get('/memories/api/feed').get_json()['memories'][0]
+            assert first['memory_date'] == '2024-01-10'
+            assert first['creator_name'] == '피드 테스트'
+            assert first['truncated'] is True
+            assert len(first['preview']) == 100
+
+    def test_first_page_etag(self, client, app, make_couple, login):
+        """첫 페이지 ETag가 변경 전에는 304, 변경 후에는 200인지 테스트"""
+        with app.app_context():
+            user, _, connection = make_couple('feed', '피드')
+            login(client, user)
+            db.session.add(Memory(couple_id=connection.id, title='첫 추억', content='내용',
+                                  memory_date=date(2024, 1, 1), created_by=user.id))
+            db.session.commit()
+
+            response = client.get('/memories/api/feed')
+            etag = response.headers['ETag']
+            assert client.get('/memories/api/feed', headers={'If-None-Match': etag}).status_code == 304
+
+            db.session.add(Memory(couple_id=connection.id, title='두 번째 추억', content='내용',
+                                  memory_date=date(2024, 2, 1), created_by=user.id))
+            db.session.commit()
+            assert client.get('/memories/api/feed', headers={'If-None-Match': etag}).status_code == 200
+
+    def test_invalid_cursor(self, client, app, make_couple, login):
+        """잘못된 커서는 400인지 테스트"""
+        with app.app_context():
+            login(client, make_couple('feed', '피드')[0])
+            response = client.get('/memories/api/feed?cursor=not-a-cursor')
+            assert response.status_code == 400
+            assert response.get_json()['success'] is False
@@ -0,0 +1,136 @@
+"""추억 일괄 가져오기 테스트"""
+
+import io
+import json
+import time
+import zipfile
+from datetime import date
+from PIL import Image
+from app.models.memory import Memory
+from app.models.upload_blob import UploadBlob
+from app.services.memory_import import import_memories_from_zip
+from app.extensions import db
+
+def image_bytes(color, size=(800, 600), taken=None):
+    """테스트용 JPEG (taken이 있으면 EXIF 촬영일 포함)"""
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if taken:
+        exif[0x8769] = {0x9003: taken}
+    Image.new('RGB', size, color).save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+def build_zip(path):
+    """사진 3장(중복 1장), 손상된 파일, 메타데이터가 든 ZIP 생성"""
+    beach = image_bytes((0, 120, 200), taken='2021:07:15 14:30:00')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('photos/beach.jpg', beach)
+        archive.writestr('photos/beach-copy.jpg', beach)
+        archive.writestr('photos/park.jpg', image_bytes((20, 160, 40)))
+        archive.writestr('photos/broken.jpg', b'not an image')
+        archive.writestr('__MACOSX/photos/._beach.jpg', b'')
+        archive.writestr('memories.json', json.dumps({'memories': [
+            {'image': 'photos/park.jpg', 'title': '공원 산책', 'content': '날씨 좋은 날', 'memory_date': '2022-04-01'},
+            {'title': '사진 없는 추억', 'content': '편지', 'memory_date': '2020-01-01'}
+        ]}, ensure_ascii=False))
+
+class TestMemoryImport:
+    """추억 일괄 가져오기 테스트"""
+
+    def test_import_zip(self, client, app, tmp_path, make_couple, login):
+        """EXIF 날짜, 메타데이터, 중복 공유, 손상 파일 처리 테스트"""
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        zip_path = tmp_path / 'import.zip'
+        build_zip(zip_path)
+
+        with app.app_context():
+            user, _, connection = make_couple('import', '가져오기')
+            login(client, user)
+            progress = []
+            stats = import_memories_from_zip(app, connection.id, user.id, str(zip_path),
+                                             progress=lambda stats: progress.append(stats['processed']),
+                                             batch_size=2)
+
+            assert stats['total'] == 5
+            assert stats['imported'] == 4
+            assert stats['failed'] == 1
+            assert stats['errors'][0]['file'] == 'photos/broken.jpg'
+            assert progress == [2, 4, 5]
+
+            memories = {memory.title: memory for memory in Memory.query.filter_by(couple_id=connection.id)}
+            assert set(memories) == {'beach', 'beach-copy', '공원 산책', '사진 없는 추억'}
+            assert memories['beach'].memory_date == date(2021, 7, 15)
+            assert memories['공원 산책'].memory_date == date(2022, 4, 1)
+            assert memories['공원 산책'].content == '날씨 좋은 날'
+            assert memories['사진 없는 추억'].image_path is None
+
+            beach = memories['beach']
+            assert beach.image_path == memories['beach-copy'].image_path
+            assert beach.image_status == 'ready'
+            assert [variant['width'] for variant in beach.get_variants()] == [320, 640]
+            assert UploadBlob.query.filter_by(path=beach.image_path).one().ref_count == 2
+            assert (tmp_path / beach.image_path).exists()
+            assert not list(tmp_path.glob('.upload-*'))
+
+    def test_import_in_worker_pool(self, client, app, tmp_path, make_couple, login):
+        """작업 풀에서 처리해도 모든 사진이 순서대로 추가되는지 테스트"""
+        app.config.update(UPLOAD_FOLDER=str(tmp_path), IMAGE_PROCESSING_MODE='thread')
+        zip_path = tmp_path / 'many.zip'
+        with zipfile.ZipFile(zip_path, 'w') as archive:
+            for index in range(12):
+                archive.writestr(f'{index:02d}.jpg', image_bytes((index * 20, 0, 0), size=(64, 64)))
+
+        with app.app_context():
+            user, _, connection = make_couple('import', '가져오기')
+            login(client, user)
+            stats = import_memories_from_zip(app, connection.id, user.id, str(zip_path), workers=2)
+            assert stats['imported'] == 12
+            titles = [memory.title for memory in Memory.query.order_by(Memory.id)]
+            assert titles == [f'{index:02d}' for index in range(12)]
+
+    def test_import_sanitizes_metadata(self, app, tmp_path, make_couple):
+        """메타데이터의 HTML은 직접 등록할 때처럼 제거/이스케이프되고 길이가 제한되는지 테스트"""
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        zip_path = tmp_path / 'xss.zip'
+        with zipfile.ZipFile(zip_path, 'w') as archive:
+            archive.writestr('memories.json', json.dumps({'memories': [
+                {'title': '<script>alert(1)</script>제목', 'content': '<img src=x onerror=alert(1)>"본문" & ' + '가' * 3000},
+                {'title': '<b></b>', 'content': '<script>'},
+                # 내보내기 파일에 담긴 저장된 값은 다시 이스케이프하지 않음
+                {'title': 'Tom &amp; Jerry', 'content': '&lt;script&gt;alert(1)&lt;/script&gt;&quot;안녕&quot;'}
+            ]}, ensure_ascii=False))
+
+        with app.app_context():
+            user, _, connection = make_couple('import', '가져오기')
+            stats = import_memories_from_zip(app, connection.id, user.id, str(zip_path))
+            assert stats['imported'] == 3
+
+            first, second, exported = Memory.query.order_by(Memory.id).all()
+            assert first.title == 'alert(1)제목'
+            assert first.content.startswith('&quot;본문&quot; &amp; 가')
+            assert len(first.content) == 2000
+            assert (second.title, second.content) == ('가져온 추억', '')
+            assert (exported.title, exported.content) == ('Tom &amp; Jerry', 'alert(1)&quot;안녕&quot;')
+            assert '<' not in first.content + second.content + exported.content
+
+    def test_import_endpoint(self, client, app, tmp_path, make_couple, login):
+        """ZIP 본문 업로드 후 백그라운드로 가져오는지 테스트"""
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        zip_path = tmp_path / 'import.zip'
+        build_zip(zip_path)
+
+        with app.app_context():
+            login(client, make_couple('import', '가져오기')[0])
+            response = client.post('/memories/api/import', data=zip_path.read_bytes(),
+                                   content_type='application/zip')
+            assert response.status_code == 202
+            assert response.get_json()['job_id']
+
+            deadline = time.time() + 10
+            while Memory.query.count() < 4 and time.time() < deadline:
+                time.sleep(0.05)
+                db.session.remove()
+            assert Memory.query.count() == 4
+
+            response = client.post('/memories/api/import', data=b'not a zip', content_type='application/zip')
+            assert response.status_code == 400
@@ -0,0 +1,77 @@
+"""추억 전문 검색 테스트"""
+
+from datetime import date
+from app.models.memory import Memory
+from app.services.memory_search import search_memories, rebuild_search_index
+from app.utils.filters import highlight_search
+from app.extensions import db
+
+def add_memory(user, title, content, couple_id=1):
+    """테스트용 추억 생성"""
+    memory = Memory(couple_id=couple_id, title=title, content=content,
+                    memory_date=date(2024, 5, 1), created_by=user.id)
+    db.session.add(memory)
+    db.session.commit()
+    return memory
+
+class TestMemorySearch:
+    """추억 전문 검색 테스트"""
+
+    def test_index_follows_add_edit_delete(self, app, make_user):
+        """추가/수정/삭제가 검색 인덱스에 반영되는지 테스트"""
+        with app.app_context():
+            user = make_user('search@example.com', '검색 테스트')
+            memory = add_memory(user, '제주도 여행', '성산일출봉에서 해돋이를 봤다')
+            assert search_memories(1, '해돋이').total == 1
+
+            memory.content = '한라산 등반'
+            db.session.commit()
+            assert search_memories(1, '해돋이').total == 0
+            assert search_memories(1, '한라산').total == 1
+
+            db.session.delete(memory)
+            db.session.commit()
+            assert search_memories(1, '한라산').total == 0
+
+    def test_ranked_with_snippet_and_scoped_to_couple(self, app, make_user):
+        """제목 일치가 먼저 오고, 스니펫이 하이라이트되며, 다른 커플은 제외되는지 테스트"""
+        with app.app_context():
+            user = make_user('search@example.com', '검색 테스트')
+            add_memory(user, '카페 데이트', '바닷가 불꽃놀이를 보고 돌아왔다')
+            add_memory(user, '불꽃놀이 축제', '여의도에서 만났다')
+            add_memory(user, '불꽃놀이', '다른 커플의 추억', couple_id=2)
+
+            results = search_memories(1, '불꽃놀이')
+            assert results.total == 2
+            assert [memory.title for memory in results.items] == ['불꽃놀이 축제', '카페 데이트']
+
+            snippet = str(highlight_search(results.items[1].search_snippet, '불꽃놀이'))
+            assert '<span class="highlight">불꽃놀이</span>' in snippet
+
+    def test_query_ignores_couple_key(self, app, make_user):
+        """커플 키에 들어 있는 숫자로 검색해도 제목과 내용에서만 찾는지 테스트"""
+        with app.app_context():
+            user = make_user('search@example.com', '검색 테스트')
+            add_memory(user, '제주도 여행', '성산일출봉')
+            add_memory(user, '영수증 000001', '카페')
+            assert [memory.title for memory in search_memories(1, '000001').items] == ['영수증 000001']
+            assert search_memories(1, '#000001#').total == 0
+
+    def test_short_query_falls_back_to_like(self, app, make_user):
+        """두 글자 검색어는 LIKE 검색으로 처리되는지 테스트"""
+        with app.app_context():
+            user = make_user('search@example.com', '검색 테스트')
+            add_memory(user, '바다', '파도 소리')
+            assert search_memories(1, '바다').total == 1
+
+    def test_rebuild_search_index(self, app, make_user):
+        """인덱스를 비운 뒤 재생성하면 다시 검색되는지 테스트"""
+        with app.app_context():
+            user = make_user('search@example.com', '검색 테스트')
+            add_memory(user, '캠핑', '별이 쏟아지는 밤하늘')
+            db.session.execute(db.text("INSERT INTO memories_fts(memories_fts) VALUES ('delete-all')"))
+            db.session.commit()
+            assert search_memories(1, '밤하늘').total == 0
+
+            assert rebuild_search_index() == 1
+            assert search_memories(1, '밤하늘').total == 1
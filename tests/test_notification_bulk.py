@@ -0,0 +1,66 @@
+"""알림 일괄 읽음/삭제 테스트"""
+
+from app.models.notification import Notification
+from app.extensions import db, socketio
+
+def add_notifications(user, other, count=5):
+    """테스트용 읽지 않은 알림 생성 (다른 사용자에게도 하나)"""
+    db.session.add_all([Notification(user_id=user.id, type='new_memory', title=f'알림 {i}', content='내용')
+                        for i in range(count)])
+    db.session.add(Notification(user_id=other.id, type='new_memory', title='남의 알림', content='내용'))
+    db.session.commit()
+
+def unread_ids(user_id):
+    return [row.id for row in Notification.query.filter_by(user_id=user_id, is_read=False).order_by(Notification.id)]
+
+class TestNotificationBulk:
+    """알림 일괄 처리 테스트"""
+
+    def test_http_bulk_operations(self, client, app, make_user, login):
+        """ID 목록, ID 범위, 전체 읽음 처리와 묶음 삭제 테스트"""
+        with app.app_context():
+            user = login(client, make_user('bulk@example.com', '일괄 테스트'))
+            other = make_user('bulk-other@example.com', '다른 사용자')
+            add_notifications(user, other)
+            ids = unread_ids(user.id)
+            other_id = unread_ids(other.id)[0]
+
+            response = client.post('/notifications/mark-read', json={'ids': [ids[0], other_id]})
+            assert response.get_json() == {'success': True, 'count': 1, 'unread_count': 4}
+            assert unread_ids(other.id) == [other_id]
+
+            response = client.post('/notifications/mark-all-read', json={'up_to_id': ids[2]})
+            assert response.get_json()['count'] == 2
+            assert unread_ids(user.id) == ids[3:]
+
+            assert client.post('/notifications/mark-read', json={'ids': ['x']}).status_code == 400
+            assert client.post('/notifications/mark-read', json={}).status_code == 400
+
+            response = client.post('/notifications/mark-all-read')
+            assert response.get_json()['unread_count'] == 0
+
+            assert Notification.delete_read_bulk(user.id, chunk_size=2) == 5
+            assert Notification.query.filter_by(user_id=user.id).count() == 0
+            assert Notification.get_unread_count(other.id) == 1
+
+    def test_socketio_mark_read(self, client, app, make_user, login):
+        """Socket.IO로 ID 목록과 범위를 읽음 처리하고 개수를 받는지 테스트"""
+        with app.app_context():
+            user = login(client, make_user('bulk@example.com', '일괄 테스트'))
+            add_notifications(user, make_user('bulk-other@example.com', '다른 사용자'))
+            ids = unread_ids(user.id)
+
+            socket_client = socketio.test_client(app, flask_test_client=client)
+            assert socket_client.is_connected()
+            socket_client.get_received()
+
+            socket_client.emit('mark_notification_read', {'notification_ids': ids[:2]})
+            received = {event['name']: event['args'][0] for event in socket_client.get_received()}
+            assert received['notification_count'] == {'count': 3}
+            assert received['notification_marked_read']['count'] == 2
+
+            socket_client.emit('mark_notification_read', {'up_to_id': ids[3]})
+            received = {event['name']: event['args'][0] for event in socket_client.get_received()}
+            assert received['notification_count'] == {'count': 1}
+            assert unread_ids(user.id) == ids[4:]
+            socket_client.disconnect()
@@ -0,0 +1,107 @@
+"""알림 합치기와 묶음 전송 테스트"""
+
+from datetime import datetime, timedelta
+from app.models.notification import Notification
+from app.models.notification_outbox import NotificationOutbox
+from app.services.notification_delivery import notification_worker
+from app.socketio_events import notify_mood_update, notify_new_answer, notify_new_memory, send_notification_to_user
+from app.extensions import db, socketio
+
+def partner_notifications(partner_id):
+    return Notification.query.filter_by(user_id=partner_id).order_by(Notification.id).all()
+
+class TestNotificationCoalescing:
+    """알림 합치기 테스트"""
+
+    def test_same_subject_merged_within_window(self, app, make_couple):
+        """시간 안의 같은 대상 알림은 한 행으로 합치고, 읽었거나 시간이 지나면 새로 만드는지 테스트"""
+        app.config.update(NOTIFICATION_COALESCE_WINDOW=300, NOTIFICATION_PUSH_DELAY=0)
+        with app.app_context():
+            user, partner, _ = make_couple('coalesce', '합치기')
+            before = notification_worker.get_stats()
+
+            for level, emoji in ((3, '😐'), (4, '🙂'), (5, '😄')):
+                notify_mood_update(user.id, level, emoji, f'기분 {level}')
+                db.session.commit()
+
+            notifications = partner_notifications(partner.id)
+            assert len(notifications) == 1
+            assert notifications[0].merge_count == 3
+            assert notifications[0].content == '오늘의 기분: 😄 기분 5'
+            assert Notification.get_unread_count(partner.id) == 1
+
+            stats = notification_worker.get_stats()
+            assert stats['created'] - before['created'] == 1
+            assert stats['coalesced'] - before['coalesced'] == 2
+
+            # 대상이 없는 알림은 합치지 않음
+            send_notification_to_user(partner.id, 'mood_update', '제목', '내용')
+            db.session.commit()
+            assert len(partner_notifications(partner.id)) == 2
+
+            # 읽은 알림과 시간이 지난 알림은 합치지 않음
+            Notification.mark_read_bulk(partner.id)
+            notify_mood_update(user.id, 1, '😢', '기분 1')
+            db.session.commit()
+            latest = partner_notifications(partner.id)[-1]
+            assert latest.merge_count == 1
+
+            latest.created_at = datetime.utcnow() - timedelta(seconds=301)
+            db.session.commit()
+            notify_mood_update(user.id, 2, '😕', '기분 2')
+            db.session.commit()
+            assert [n.merge_count for n in partner_notifications(partner.id)] == [3, 1, 1, 1]
+            assert Notification.get_unread_count(partner.id) == 2
+
+    def test_distinct_events_not_merged(self, app, make_couple):
+        """다른 질문의 답변과 다른 추억 알림은 합치지 않고, 같은 대상만 합치는지 테스트"""
+        app.config.update(NOTIFICATION_COALESCE_WINDOW=300, NOTIFICATION_PUSH_DELAY=0)
+        with app.app_context():
+            user, partner, _ = make_couple('coalesce', '합치기')
+
+            notify_new_answer(user.id, 1, '첫 번째 질문')
+            notify_new_answer(user.id, 2, '두 번째 질문')
+            notify_new_memory(user.id, 10, '바다 여행')
+            notify_new_memory(user.id, 11, '생일 파티')
+            db.session.commit()
+            assert [n.content for n in partner_notifications(partner.id)] == [
+                '질문: 첫 번째 질문', '질문: 두 번째 질문', '추억: 바다 여행', '추억: 생일 파티'
+            ]
+
+            notify_new_answer(user.id, 1, '첫 번째 질문')
+            db.session.commit()
+            answers = [n for n in partner_notifications(partner.id) if n.type == 'new_answer']
+            assert [(n.content, n.merge_count) for n in answers] == [('질문: 두 번째 질문', 1), ('질문: 첫 번째 질문', 2)]
+
+    def test_pushes_batched_per_recipient(self, client, app, make_couple, login):
+        """대기 중에 대체된 알림은 보내지 않고 수신자별 이벤트 하나로 보내는지 테스트"""
+        app.config.update(NOTIFICATION_COALESCE_WINDOW=300, NOTIFICATION_PUSH_DELAY=60)
+        with app.app_context():
+            user, partner, _ = make_couple('coalesce', '합치기')
+            login(client, partner)
+            socket_client = socketio.test_client(app, flask_test_client=client)
+            socket_client.get_received()
+            before = notification_worker.get_stats()
+
+            for level in (3, 4, 5):
+                notify_mood_update(user.id, level, '🙂', f'기분 {level}')
+                db.session.commit()
+            assert NotificationOutbox.query.count() == 3
+            assert socket_client.get_received() == []
+
+            assert notification_worker.drain(app) == 1
+            assert NotificationOutbox.query.count() == 0
+            events = socket_client.get_received()
+            assert [event['name'] for event in events] == ['notifications_batch']
+
+            batch = events[0]['args'][0]
+            assert batch['count'] == 1
+            assert len(batch['notifications']) == 1
+            assert batch['notifications'][0]['count'] == 3
+            assert batch['notifications'][0]['mood_level'] == 5
+
+            stats = notification_worker.get_stats()
+            assert stats['superseded'] - before['superseded'] == 2
+            assert stats['delivered'] - before['delivered'] == 1
+            assert stats['batches'] - before['batches'] == 1
+            socket_client.disconnect()
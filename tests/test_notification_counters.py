@@ -0,0 +1,70 @@
+"""읽지 않은 알림 카운터 테스트"""
+
+from app.models.user import User
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.extensions import db
+
+def stored_unread(user_id):
+    return db.session.execute(
+        db.select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+    ).scalar()
+
+class TestNotificationCounters:
+    """읽지 않은 알림 카운터 테스트"""
+
+    def test_triggers_track_read_state(self, client, app, make_user, login):
+        """추가, 읽음 처리, 일괄 변경, 삭제가 카운터에 반영되는지 테스트"""
+        with app.app_context():
+            user = login(client, make_user('unread@example.com', '알림 테스트'))
+            assert stored_unread(user.id) == 0
+
+            notifications = [Notification.create_notification(user.id, 'new_memory', f'알림 {i}', '내용')
+                             for i in range(3)]
+            assert Notification.get_unread_count(user.id) == 3
+
+            notifications[0].mark_as_read()
+            assert Notification.get_unread_count(user.id) == 2
+
+            # 이미 읽은 알림을 다시 읽음 처리해도 변화 없음
+            notifications[0].mark_as_read()
+            assert Notification.get_unread_count(user.id) == 2
+
+            # 일괄 UPDATE와 DELETE도 트리거로 반영
+            Notification.query.filter_by(id=notifications[1].id).update({Notification.is_read: True})
+            db.session.commit()
+            assert Notification.get_unread_count(user.id) == 1
+
+            Notification.query.filter_by(user_id=user.id).delete()
+            db.session.commit()
+            assert Notification.get_unread_count(user.id) == 0
+
+            response = client.get('/notifications/api/unread-count')
+            assert response.get_json()['count'] == 0
+
+    def test_missing_row_computed_and_verify(self, app):
+        """행이 없는 기존 사용자는 조회할 때 계산만 하고, 빠지거나 어긋난 행을 검증기가 고치는지 테스트"""
+        with app.app_context():
+            user = User(email='legacy@example.com', name='기존 사용자')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            for i in range(2):
+                Notification.create_notification(user.id, 'new_answer', f'알림 {i}', '내용')
+
+            NotificationCounter.query.filter_by(user_id=user.id).delete()
+            db.session.commit()
+            assert Notification.get_unread_count(user.id) == 2
+            assert NotificationCounter.get_state(user.id) == (2, 0, Notification.get_latest_id(user.id))
+            # 조회 경로에서는 행을 만들지 않고, 검증기가 만듦
+            assert not db.session.new and not db.session.dirty
+            assert db.session.get(NotificationCounter, user.id) is None
+            assert NotificationCounter.verify(fix=True) == [(user.id, None, 2)]
+            assert db.session.get(NotificationCounter, user.id).unread == 2
+
+            db.session.execute(db.text("UPDATE notification_counters SET unread = 7"))
+            db.session.commit()
+            assert NotificationCounter.verify() == [(user.id, 7, 2)]
+            NotificationCounter.verify(fix=True)
+            assert NotificationCounter.verify() == []
+            assert Notification.get_unread_count(user.id) == 2
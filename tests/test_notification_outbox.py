@@ -0,0 +1,73 @@
+"""알림 전송 대기열(아웃박스) 테스트"""
+
+from datetime import datetime, timedelta
+from app.models.notification import Notification
+from app.models.notification_outbox import NotificationOutbox
+from app.services.notification_delivery import notification_worker
+from app.socketio_events import notify_mood_update
+from app.extensions import db, socketio
+
+class TestNotificationOutbox:
+    """알림 전송 대기열 테스트"""
+
+    def test_written_with_domain_change(self, client, app, make_couple, login):
+        """알림이 기록과 함께 커밋된 뒤 전송되고, 롤백되면 함께 사라지는지 테스트"""
+        app.config.update(NOTIFICATION_PUSH_DELAY=0)
+        with app.app_context():
+            user, partner, _ = make_couple('outbox', '아웃박스')
+            login(client, user)
+
+            response = client.post('/mood/api/record', json={'mood_level': 4, 'note': '좋아요'})
+            assert response.get_json()['success'] is True
+            assert Notification.query.filter_by(user_id=partner.id).count() == 1
+            assert NotificationOutbox.query.count() == 0
+
+            notify_mood_update(user.id, 2, '😕', '기분 2')
+            db.session.rollback()
+            assert Notification.query.filter_by(user_id=partner.id).count() == 1
+            assert NotificationOutbox.query.count() == 0
+
+    def test_retry_then_redeliver_after_lease(self, client, app, monkeypatch, make_couple, login):
+        """전송 실패는 백오프 후 재시도하고, 전송 도중 멈춘 요청은 임대가 끝나면 다시 보내는지 테스트"""
+        app.config.update(NOTIFICATION_PUSH_DELAY=60, NOTIFICATION_OUTBOX_MAX_ATTEMPTS=2)
+        with app.app_context():
+            user, partner, _ = make_couple('outbox', '아웃박스')
+            login(client, user)
+            notify_mood_update(user.id, 4, '🙂', '기분 4')
+            db.session.commit()
+            before = notification_worker.get_stats()
+
+            def failing_emit(*args, **kwargs):
+                raise ConnectionError('message queue unavailable')
+
+            monkeypatch.setattr(socketio, 'emit', failing_emit)
+            assert notification_worker.drain(app) == 0
+            entry = NotificationOutbox.query.one()
+            assert entry.attempts == 1
+            assert entry.next_attempt_at > datetime.utcnow()
+            assert entry.last_error == 'message queue unavailable'
+
+            # 재시도 시각 전에는 가져가지 않음
+            assert notification_worker.drain(app) == 0
+            assert NotificationOutbox.query.one().attempts == 1
+
+            entry.next_attempt_at = datetime.utcnow()
+            db.session.commit()
+            notification_worker.drain(app)
+            assert NotificationOutbox.query.one().next_attempt_at is None
+
+            stats = notification_worker.get_stats()
+            assert (stats['retried'] - before['retried'], stats['failed'] - before['failed']) == (1, 1)
+
+            # 워커가 임대 후 멈춘 경우: 임대가 끝나면 다시 전송
+            monkeypatch.undo()
+            NotificationOutbox.query.update({NotificationOutbox.next_attempt_at: datetime.utcnow(),
+                                             NotificationOutbox.attempts: 0})
+            db.session.commit()
+            assert len(NotificationOutbox.claim(10, lease_seconds=60)) == 1
+            assert notification_worker.drain(app) == 0
+
+            NotificationOutbox.query.update({NotificationOutbox.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+            db.session.commit()
+            assert notification_worker.drain(app) == 1
+            assert NotificationOutbox.query.count() == 0
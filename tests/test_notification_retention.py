@@ -0,0 +1,91 @@
+"""알림 보존 정책 테스트"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from app.models.user import User
+from app.models.notification import Notification
+from app.services.notification_retention import apply_notification_retention, incremental_vacuum
+from app.services.query_optimization import OptimizedQueryService
+from app.extensions import db
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+def create_user():
+    user = User(email='retention@example.com', name='보존 테스트')
+    user.set_password('testpassword')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def add_notification(user_id, notification_type, days_old, is_read):
+    notification = Notification(user_id=user_id, type=notification_type, title=f'{notification_type} {days_old}',
+                                content='내용', is_read=is_read, created_at=NOW - timedelta(days=days_old))
+    db.session.add(notification)
+    return notification
+
+class TestNotificationRetention:
+    """알림 보존 정책 테스트"""
+
+    def test_policies_archive_and_counters(self, app, tmp_path):
+        """타입별 기간이 지난 알림만 묶음으로 보관 후 삭제하고 카운터를 맞추는지 테스트"""
+        archive_path = str(tmp_path / 'archive' / 'notifications.db')
+        policies = {'mood_update': {'read_days': 7, 'unread_days': 30, 'archive': False}}
+        default = {'read_days': 30, 'unread_days': None}
+
+        with app.app_context():
+            user = create_user()
+            for days in (1, 8, 9, 40):
+                add_notification(user.id, 'mood_update', days, is_read=True)
+            add_notification(user.id, 'mood_update', 31, is_read=False)
+            add_notification(user.id, 'mood_update', 20, is_read=False)
+            for days in (10, 31, 32, 33, 34):
+                add_notification(user.id, 'new_memory', days, is_read=True)
+            add_notification(user.id, 'new_memory', 400, is_read=False)
+            db.session.commit()
+            assert Notification.get_unread_count(user.id) == 3
+
+            stats = apply_notification_retention(app, policies=policies, default=default,
+                                                 archive_path=archive_path, now=NOW,
+                                                 chunk_size=2, pause=0, vacuum_pages=0)
+
+            assert stats['by_type'] == {'mood_update': 4, 'new_memory': 4}
+            assert stats['deleted'] == 8
+            assert stats['archived'] == 4
+            assert stats['chunks'] == 5
+
+            remaining = sorted(n.title for n in Notification.query.filter_by(user_id=user.id))
+            assert remaining == ['mood_update 1', 'mood_update 20', 'new_memory 10', 'new_memory 400']
+            assert Notification.get_unread_count(user.id) == 2
+
+            with sqlite3.connect(archive_path) as archive:
+                archived = sorted(row[0] for row in archive.execute("SELECT title FROM notifications"))
+            assert archived == ['new_memory 31', 'new_memory 32', 'new_memory 33', 'new_memory 34']
+
+            # 기존 정리 함수는 타입과 관계없이 오래된 읽은 알림만 지움
+            assert OptimizedQueryService.cleanup_old_notifications(30) == 2
+            assert Notification.get_unread_count(user.id) == 2
+            assert Notification.query.filter_by(user_id=user.id).count() == 2
+
+    def test_incremental_vacuum_in_steps(self, tmp_path):
+        """auto_vacuum이 INCREMENTAL인 DB에서만 빈 페이지를 나누어 반환하는지 테스트"""
+        for mode, expected_free in (('INCREMENTAL', 0), ('NONE', None)):
+            engine = create_engine(f'sqlite:///{tmp_path}/{mode}.db')
+            with engine.connect() as conn:
+                conn.exec_driver_sql(f"PRAGMA auto_vacuum = {mode}")
+                conn.exec_driver_sql("CREATE TABLE items (data TEXT)")
+                conn.exec_driver_sql("INSERT INTO items SELECT hex(randomblob(500)) FROM "
+                                     "(WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 500) "
+                                     "SELECT i FROM n)")
+                conn.exec_driver_sql("DELETE FROM items")
+                conn.commit()
+                free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                assert free_pages > 100
+
+                freed = incremental_vacuum(conn, max_pages=free_pages, step=50, pause=0)
+                remaining = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                if expected_free is None:
+                    assert (freed, remaining) == (0, free_pages)
+                else:
+                    assert (freed, remaining) == (free_pages, expected_free)
+            engine.dispose()
@@ -0,0 +1,133 @@
+"""알림 증분 동기화 테스트"""
+
+from datetime import datetime, timedelta
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.services import notification_sync
+from app.services.notification_sync import build_sync, notification_type_cache, recent_notification_cache
+from app.extensions import db, socketio
+
+def add_notifications(user, count=3):
+    """테스트용 알림 생성"""
+    for i in range(count):
+        Notification.create_notification(user.id, 'new_memory', f'알림 {i}', '내용')
+
+def notification_ids(user_id):
+    return [row.id for row in Notification.query.filter_by(user_id=user_id).order_by(Notification.id)]
+
+class TestNotificationSync:
+    """알림 증분 동기화 테스트"""
+
+    def test_since_id_and_read_version(self, client, app, make_user, login):
+        """처음에는 전체, 이후에는 새 알림과 읽음 처리된 알림 ID만 받는지 테스트"""
+        with app.app_context():
+            user = login(client, make_user('sync@example.com', '동기화 테스트'))
+            add_notifications(user)
+            ids = notification_ids(user.id)
+
+            first = build_sync(user.id)
+            assert first['reset'] is True
+            assert [n['id'] for n in first['notifications']] == ids[::-1]
+            assert (first['latest_id'], first['count']) == (ids[-1], 3)
+
+            Notification.create_notification(user.id, 'new_answer', '새 알림', '내용')
+            Notification.mark_read_bulk(user.id, notification_ids=ids[:2])
+
+            delta = build_sync(user.id, first['latest_id'], first['version'])
+            assert delta['reset'] is False
+            assert [n['title'] for n in delta['notifications']] == ['새 알림']
+            assert delta['read_ids'] == ids[:2]
+            assert delta['version'] == first['version'] + 2
+            assert delta['count'] == 2
+
+            # 변경이 없으면 빈 변경분
+            empty = build_sync(user.id, delta['latest_id'], delta['version'])
+            assert (empty['notifications'], empty['read_ids'], empty['reset']) == ([], [], False)
+
+            # 카운터를 다시 계산해도 버전은 유지되고, 서버보다 앞선 버전은 전체 동기화
+            NotificationCounter.rebuild()
+            assert build_sync(user.id, delta['latest_id'], delta['version'])['reset'] is False
+            assert build_sync(user.id, delta['latest_id'], delta['version'] + 5)['reset'] is True
+
+    def test_http_socket_and_type_cache(self, client, app, make_user, login):
+        """HTTP와 Socket.IO 동기화, 알림 목록 페이지의 타입 캐시 테스트"""
+        with app.app_context():
+            user = login(client, make_user('sync@example.com', '동기화 테스트'))
+            add_notifications(user)
+            ids = notification_ids(user.id)
+            notification_type_cache.clear()
+
+            response = client.get(f'/notifications/api/sync?since_id={ids[0]}&version=0')
+            data = response.get_json()
+            assert [n['id'] for n in data['notifications']] == ids[:0:-1]
+            assert data['reset'] is False
+
+            socket_client = socketio.test_client(app, flask_test_client=client)
+            socket_client.get_received()
+            socket_client.emit('sync_notifications', {'since_id': ids[-1], 'version': 'bad'})
+            received = socket_client.get_received()
+            assert received[0]['name'] == 'notifications_sync'
+            assert received[0]['args'][0]['reset'] is True
+            socket_client.disconnect()
+
+            assert client.get('/notifications/').status_code == 200
+            cached = notification_type_cache.get(user.id, ids[-1])
+            assert cached == ['new_memory']
+            assert notification_type_cache.get(user.id, ids[-1]) is cached
+
+            Notification.create_notification(user.id, 'mood_update', '기분', '내용')
+            response = client.get('/notifications/')
+            assert 'mood_update' in response.get_data(as_text=True)
+            assert notification_type_cache.get(user.id, Notification.get_latest_id(user.id)) == \
+                ['mood_update', 'new_memory']
+
+    def test_deletions_force_full_sync(self, client, app, make_user, login):
+        """클라이언트 버전 이후에 알림이 합쳐지거나 지워지면 전체 동기화하는지 테스트"""
+        with app.app_context():
+            user = login(client, make_user('sync@example.com', '동기화 테스트'))
+            add_notifications(user)
+            ids = notification_ids(user.id)
+            first = build_sync(user.id)
+
+            # 읽은 알림 삭제
+            Notification.mark_read_bulk(user.id, notification_ids=ids[:1])
+            before_delete = build_sync(user.id, first['latest_id'], first['version'])
+            assert (before_delete['reset'], before_delete['read_ids']) == (False, ids[:1])
+            Notification.delete_read_bulk(user.id)
+
+            synced = build_sync(user.id, before_delete['latest_id'], before_delete['version'])
+            assert synced['reset'] is True
+            assert [n['id'] for n in synced['notifications']] == ids[:0:-1]
+
+            # 삭제 이후 버전에서는 다시 증분 동기화
+            after = build_sync(user.id, synced['latest_id'], synced['version'])
+            assert (after['reset'], after['notifications']) == (False, [])
+
+            # 알림 합치기도 이전 알림을 지우므로 전체 동기화
+            Notification.create_or_coalesce(user.id, 'new_answer', '답변', '내용', subject='q1', window=60)
+            db.session.commit()
+            delta = build_sync(user.id, after['latest_id'], after['version'])
+            assert delta['reset'] is False
+            Notification.create_or_coalesce(user.id, 'new_answer', '답변', '내용', subject='q1', window=60)
+            db.session.commit()
+            coalesced = build_sync(user.id, delta['latest_id'], delta['version'])
+            assert coalesced['reset'] is True
+            assert [n['count'] for n in coalesced['notifications'] if n['type'] == 'new_answer'] == [2]
+
+    def test_cached_recent_list_formats_time_on_read(self, app, make_user, monkeypatch):
+        """캐시된 최근 알림도 상대 시간은 꺼낼 때 다시 계산하는지 테스트"""
+        with app.app_context():
+            user = make_user('sync@example.com', '동기화 테스트')
+            add_notifications(user, count=1)
+            recent_notification_cache.clear()
+            assert build_sync(user.id)['notifications'][0]['formatted_time'] == '방금 전'
+
+            later = datetime.utcnow() + timedelta(minutes=10)
+
+            class LaterDateTime(datetime):
+                @classmethod
+                def utcnow(cls):
+                    return later
+
+            monkeypatch.setattr(notification_sync, 'datetime', LaterDateTime)
+            assert build_sync(user.id)['notifications'][0]['formatted_time'] == '10분 전'
@@ -0,0 +1,80 @@
+"""접속 상태(프레즌스) 테스트"""
+
+from datetime import datetime, timedelta
+from app.models.socket_presence import SocketPresence
+from app.services.presence import presence_registry
+from app.extensions import db
+
+def partner_statuses(socket_client):
+    """받은 파트너 상태 목록 (연결 시 상태는 bootstrap 이벤트에 포함)"""
+    statuses = []
+    for event in socket_client.get_received():
+        if event['name'] == 'partner_status':
+            statuses.append(event['args'][0]['status'])
+        elif event['name'] == 'bootstrap':
+            statuses.append(event['args'][0]['partner']['status'])
+    return statuses
+
+class TestPresence:
+    """접속 상태 테스트"""
+
+    def test_transitions_only_on_first_and_last_connection(self, app, make_couple, connect_socket):
+        """탭을 여러 개 열고 닫아도 파트너에게 온라인/오프라인이 한 번씩만 가는지 테스트"""
+        with app.app_context():
+            presence_registry.clear()
+            user, partner, _ = make_couple('presence', '접속')
+
+            watcher = connect_socket(user=user)
+            assert partner_statuses(watcher) == ['offline']
+
+            tabs = [connect_socket(user=partner) for _ in range(3)]
+            assert partner_statuses(tabs[0]) == ['online']
+            assert partner_statuses(watcher) == ['online']
+            assert len(presence_registry.local_sids(partner.id)) == 3
+            # 연결과 해제는 DB에 쓰지 않고 하트비트가 한 번에 반영
+            assert SocketPresence.query.count() == 0
+            assert presence_registry.heartbeat(app) == []
+            assert SocketPresence.query.filter_by(user_id=partner.id).count() == 3
+
+            tabs[0].disconnect()
+            tabs[1].disconnect()
+            assert partner_statuses(watcher) == []
+            assert presence_registry.is_online(app, partner.id)
+
+            tabs[2].disconnect()
+            assert partner_statuses(watcher) == ['offline']
+            assert not presence_registry.is_online(app, partner.id)
+            assert SocketPresence.query.count() == 4
+            watcher.disconnect()
+            presence_registry.heartbeat(app)
+            assert SocketPresence.query.count() == 0
+
+    def test_other_worker_connections_and_expiry(self, app, make_couple, connect_socket):
+        """다른 워커의 연결을 온라인으로 보고, 갱신이 멈춘 연결은 정리되는지 테스트"""
+        with app.app_context():
+            presence_registry.clear()
+            user, partner, _ = make_couple('presence', '접속')
+
+            # 다른 워커에 연결된 파트너
+            db.session.add(SocketPresence(sid='other-sid', user_id=partner.id, worker_id='other-worker'))
+            db.session.commit()
+
+            watcher = connect_socket(user=user)
+            assert partner_statuses(watcher) == ['online']
+            assert presence_registry.heartbeat(app) == []
+
+            # 다른 워커가 죽어 갱신이 멈춤
+            SocketPresence.query.filter_by(worker_id='other-worker').update(
+                {SocketPresence.heartbeat_at: datetime.utcnow() - timedelta(seconds=app.config.get('PRESENCE_TTL', 90) + 1)})
+            db.session.commit()
+            assert not presence_registry.is_online(app, partner.id)
+
+            assert presence_registry.heartbeat(app) == [partner.id]
+            assert [row.user_id for row in SocketPresence.query] == [user.id]
+            assert presence_registry.is_online(app, user.id)
+
+            # 다른 워커에 남은 연결이 있으면 이 워커의 마지막 연결 해제는 오프라인 전환이 아님
+            db.session.add(SocketPresence(sid='other-sid', user_id=user.id, worker_id='other-worker'))
+            db.session.commit()
+            watcher.disconnect()
+            assert presence_registry.is_online(app, user.id)
@@ -0,0 +1,120 @@
+"""Socket.IO 연결 핸드셰이크 테스트"""
+
+import time
+from sqlalchemy import event
+from app.models.notification import Notification
+from app.services.notification_sync import recent_notification_cache
+from app.services.presence import presence_registry
+from app.services.socket_handshake import SNAPSHOT_KEY
+from app.extensions import db, socketio
+
+def add_notifications(user, count=3):
+    """테스트용 알림 생성"""
+    for i in range(count):
+        Notification.create_notification(user.id, 'new_memory', f'알림 {i}', '내용')
+
+def record_queries():
+    """실행되는 SQL 목록을 기록하는 리스너 등록 후 (목록, 해제 함수) 반환"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+class TestSocketHandshake:
+    """Socket.IO 연결 핸드셰이크 테스트"""
+
+    def test_bootstrap_from_session_snapshot(self, app, make_couple, connect_socket):
+        """로그인 때 저장한 스냅샷으로 사용자/커플 조회 없이 룸 참여와 bootstrap을 보내는지 테스트"""
+        with app.app_context():
+            presence_registry.clear()
+            recent_notification_cache.clear()
+            client = app.test_client()
+            user, partner, connection = make_couple('handshake', '핸드셰이크')
+            add_notifications(user)
+
+            response = client.post('/auth/login', json={'email': 'handshake@example.com', 'password': 'testpassword'})
+            assert response.get_json()['success'] is True
+            with client.session_transaction() as sess:
+                assert sess[SNAPSHOT_KEY]['couple_id'] == connection.id
+                assert sess[SNAPSHOT_KEY]['partner_name'] == '핸드셰이크 파트너'
+
+            statements, stop = record_queries()
+            try:
+                socket_client = connect_socket(client)
+            finally:
+                stop()
+
+            received = socket_client.get_received()
+            assert [event['name'] for event in received] == ['bootstrap']
+            data = received[0]['args'][0]
+            assert data['couple_room'] == f'couple_{connection.id}'
+            assert data['partner'] == {'partner_id': partner.id, 'partner_name': '핸드셰이크 파트너',
+                                       'status': 'offline'}
+            assert data['notifications']['count'] == 3
+            assert [n['title'] for n in data['notifications']['notifications']] == ['알림 2', '알림 1', '알림 0']
+
+            # 사용자, 커플 테이블은 읽지 않음
+            assert not [sql for sql in statements if 'FROM users' in sql or 'FROM couple_connections' in sql]
+            rooms = socketio.server.manager.rooms['/']
+            assert f'couple_{connection.id}' in rooms and f'user_{user.id}' in rooms
+            socket_client.disconnect()
+
+    def test_reconnect_uses_caches(self, app, make_couple, login, connect_socket):
+        """재연결 시 알림은 카운터 조회만으로 변경분을 판단하고 최근 알림은 캐시에서 꺼내는지 테스트"""
+        with app.app_context():
+            presence_registry.clear()
+            recent_notification_cache.clear()
+            client = app.test_client()
+            user, partner, connection = make_couple('handshake', '핸드셰이크')
+            add_notifications(user)
+            login(client, user)
+            client.get('/notifications/api/sync')
+
+            first = connect_socket(client).get_received()[0]['args'][0]['notifications']
+
+            statements, stop = record_queries()
+            try:
+                # 가진 상태가 최신인 클라이언트의 재연결
+                up_to_date = connect_socket(client, auth={'since_id': first['latest_id'], 'version': first['version']})
+                # 목록이 없는 새 탭 (최근 알림 캐시 사용)
+                new_tab = connect_socket(client)
+            finally:
+                stop()
+
+            delta = up_to_date.get_received()[0]['args'][0]['notifications']
+            assert (delta['reset'], delta['notifications'], delta['read_ids']) == (False, [], [])
+            full = new_tab.get_received()[0]['args'][0]['notifications']
+            assert full['reset'] is True and len(full['notifications']) == 3
+            selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+            assert not [sql for sql in selects if 'FROM notifications' in sql or 'FROM users' in sql]
+
+            # 새 알림이 생기면 카운터의 최신 알림 ID가 바뀌어 캐시를 다시 읽음
+            Notification.create_notification(user.id, 'new_answer', '새 알림', '내용')
+            latest = connect_socket(client).get_received()[0]['args'][0]['notifications']
+            assert [n['title'] for n in latest['notifications']][:2] == ['새 알림', '알림 2']
+
+    def test_stale_snapshot_rereads_couple(self, app, make_couple, login, connect_socket):
+        """파트너가 연결을 해제한 뒤 오래된 스냅샷으로 재연결하면 예전 커플 룸에 들어가지 않는지 테스트"""
+        with app.app_context():
+            presence_registry.clear()
+            user, partner, connection = make_couple('handshake', '핸드셰이크')
+            client = app.test_client()
+            client.post('/auth/login', json={'email': 'handshake@example.com', 'password': 'testpassword'})
+            partner_client = app.test_client()
+            login(partner_client, partner)
+            assert partner_client.post('/couple/disconnect').get_json()['success'] is True
+
+            # HTTP 요청 없이 재연결만 하는 탭: 스냅샷이 오래되면 DB에서 다시 읽음
+            for stale in ({'at': int(time.time()) - app.config.get('SOCKET_IDENTITY_REFRESH', 300) - 1},
+                          {'at': None}):
+                with client.session_transaction() as sess:
+                    sess[SNAPSHOT_KEY] = dict(sess[SNAPSHOT_KEY], couple_id=connection.id,
+                                              partner_id=partner.id, **stale)
+                socket_client = connect_socket(client)
+                data = socket_client.get_received()[0]['args'][0]
+                assert (data['couple_room'], data['partner']) == (None, None)
+                assert f'couple_{connection.id}' not in socketio.server.manager.rooms['/']
+                socket_client.disconnect()
@@ -0,0 +1,78 @@
+"""Socket.IO 메시지 큐 테스트"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import socketio as python_socketio
+from app.create_app import create_app
+from app.extensions import socketio
+from app.utils.message_queue import SQLiteManager, get_message_queue_options
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 다른 워커 프로세스 역할: 같은 큐를 쓰는 앱을 만들고 사용자 방으로 이벤트 전송
+WORKER_SCRIPT = """
+import sys
+import tempfile
+from app.create_app import create_app
+from app.extensions import socketio
+
+app = create_app({'TESTING': True, 'SECRET_KEY': 'worker', 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                  'UPLOAD_FOLDER': tempfile.gettempdir(), 'SOCKETIO_MESSAGE_QUEUE': sys.argv[1]})
+with app.app_context():
+    socketio.emit('new_notification', {'title': 'from worker'}, room=sys.argv[2])
+"""
+
+def create_test_app(**config):
+    return create_app(dict({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'test',
+                            'UPLOAD_FOLDER': tempfile.gettempdir()}, **config))
+
+class TestSocketIOMessageQueue:
+    """Socket.IO 메시지 큐 테스트"""
+
+    def test_event_from_other_process_reaches_client(self, tmp_path):
+        """다른 프로세스에서 보낸 이벤트가 이 프로세스에 연결된 클라이언트에 전달되는지 테스트"""
+        queue_url = f'sqlite:///{tmp_path}/socketio-queue.db'
+
+        # 이 프로세스의 워커: user_7 방에 들어간 클라이언트 하나 (전송 패킷을 기록)
+        server = python_socketio.Server(client_manager=SQLiteManager(queue_url, channel='couple-app',
+                                                                     poll_interval=0.01),
+                                        async_mode='threading')
+        sent = []
+        server._send_eio_packet = lambda eio_sid, eio_packet: sent.append(
+            (eio_sid, server.packet_class(encoded_packet=eio_packet.data).data))
+        server.manager.initialize()
+        sid = server.manager.connect('eio-1', '/')
+        server.enter_room(sid, 'user_7')
+
+        subprocess.run([sys.executable, '-c', WORKER_SCRIPT, queue_url, 'user_7'],
+                       cwd=PROJECT_ROOT, check=True, timeout=60)
+        subprocess.run([sys.executable, '-c', WORKER_SCRIPT, queue_url, 'user_8'],
+                       cwd=PROJECT_ROOT, check=True, timeout=60)
+
+        deadline = time.time() + 10
+        while not sent and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.2)
+        assert sent == [('eio-1', ['new_notification', {'title': 'from worker'}])]
+
+    def test_queue_options(self, app):
+        """설정에 따라 init_app 인수를 고르고, 큐 설정이 다음 앱에 남지 않는지 테스트"""
+        assert get_message_queue_options(app) == {}
+
+        app.config['SOCKETIO_MESSAGE_QUEUE'] = 'redis://localhost:6379/0'
+        assert get_message_queue_options(app) == {'message_queue': 'redis://localhost:6379/0',
+                                                  'channel': 'couple-app'}
+
+        app.config['SOCKETIO_MESSAGE_QUEUE'] = 'sqlite:///instance/queue.db'
+        manager = get_message_queue_options(app, write_only=True)['client_manager']
+        assert (manager.path, manager.channel, manager.write_only) == ('instance/queue.db', 'couple-app', True)
+
+        create_test_app(SOCKETIO_MESSAGE_QUEUE='sqlite:///instance/queue.db', SOCKETIO_CHANNEL='other')
+        assert isinstance(socketio.server.manager, SQLiteManager)
+        assert socketio.server.manager.channel == 'other'
+
+        create_test_app()
+        assert not isinstance(socketio.server.manager, python_socketio.PubSubManager)
@@ -0,0 +1,115 @@
+"""참조되지 않는 업로드 파일 정리 테스트"""
+
+import os
+import time
+import hashlib
+from datetime import date
+from app.models.memory import Memory
+from app.models.upload_blob import UploadBlob
+from app.services.upload_storage import collect_orphan_uploads, shard_path, ReferencedUploads
+from app.extensions import db
+
+DAY = 86400
+
+def write_file(folder, relative_path, data=b'x' * 100, age_days=2):
+    """업로드 폴더에 파일을 만들고 수정 시각을 과거로 설정"""
+    path = os.path.join(folder, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    mtime = time.time() - age_days * DAY
+    os.utime(path, (mtime, mtime))
+    return path
+
+def content_path(name):
+    return shard_path(hashlib.sha256(name.encode()).hexdigest(), 'jpg')
+
+def add_memory(user, connection, image_path):
+    memory = Memory(couple_id=connection.id, title='사진', content='내용', memory_date=date(2024, 1, 1),
+                    image_path=image_path, image_status='ready', created_by=user.id)
+    db.session.add(memory)
+    db.session.commit()
+    return memory
+
+class TestUploadGC:
+    """업로드 파일 정리 테스트"""
+
+    def test_referenced_set(self):
+        """콘텐츠 주소 키와 기존 파일 이름, 파생 이미지 접미사 판별 테스트"""
+        live = content_path('live')
+        referenced = ReferencedUploads()
+        for path in sorted([live, content_path('other'), 'legacy_photo.png']):
+            referenced.add(path)
+        referenced.finish()
+
+        base = os.path.splitext(live)[0]
+        assert live in referenced
+        assert f'{base}_w320.webp' in referenced
+        assert f'{base}.webp' in referenced
+        assert 'legacy_photo_w640.jpg' in referenced
+        assert content_path('orphan') not in referenced
+        assert 'legacy_other.png' not in referenced
+        assert len(referenced.keys) == 2
+
+    def test_quarantine_then_delete(self, app, tmp_path, make_couple):
+        """참조 없는 오래된 파일만 격리 후 보관 기간이 지나면 삭제하는지 테스트"""
+        upload_folder = str(tmp_path / 'uploads')
+        live, orphan, recent = content_path('live'), content_path('orphan'), content_path('recent')
+        orphan_base = os.path.splitext(orphan)[0]
+
+        with app.app_context():
+            user, _, connection = make_couple('gc', '정리')
+            add_memory(user, connection, live)
+            add_memory(user, connection, 'legacy.png')
+
+            for path in (live, os.path.splitext(live)[0] + '_w320.webp', 'legacy.png', orphan,
+                         orphan_base + '_w320.jpg', 'legacy_orphan.png', '.upload-abc.tmp',
+                         live + '.123-456.tmp'):
+                write_file(upload_folder, path)
+            write_file(upload_folder, recent, age_days=0)
+
+            stats = collect_orphan_uploads(upload_folder, grace_hours=24, retention_days=7)
+            assert stats['scanned'] == 7
+            assert stats['referenced'] == 3
+            assert stats['recent'] == 1
+            assert stats['quarantined'] == 3
+            assert stats['quarantined_bytes'] == 300
+            assert stats['deleted'] == 0
+
+            quarantine = os.path.join(upload_folder, '.quarantine')
+            assert os.path.exists(os.path.join(quarantine, orphan))
+            assert not os.path.exists(os.path.join(upload_folder, orphan))
+            assert os.path.exists(os.path.join(upload_folder, live))
+            assert os.path.exists(os.path.join(upload_folder, '.upload-abc.tmp'))
+
+            # 격리 중 같은 사진이 다시 참조되면 되돌림
+            add_memory(user, connection, orphan)
+            old = time.time() - 8 * DAY
+            for root, _, files in os.walk(quarantine):
+                for name in files:
+                    os.utime(os.path.join(root, name), (old, old))
+
+            dry = collect_orphan_uploads(upload_folder, dry_run=True)
+            assert (dry['restored'], dry['deleted']) == (2, 1)
+            assert os.path.exists(os.path.join(quarantine, 'legacy_orphan.png'))
+
+            stats = collect_orphan_uploads(upload_folder)
+            assert stats['restored'] == 2
+            assert stats['deleted'] == 1
+            assert stats['reclaimed_bytes'] == 100
+            assert os.path.exists(os.path.join(upload_folder, orphan))
+            assert os.path.exists(os.path.join(upload_folder, orphan_base + '_w320.jpg'))
+            assert not os.path.exists(os.path.join(quarantine, 'legacy_orphan.png'))
+
+    def test_blob_reference_protects_file(self, app, tmp_path):
+        """추억이 없어도 업로드 파일 참조가 남아 있으면 지우지 않는지 테스트"""
+        upload_folder = str(tmp_path)
+        path = content_path('pending')
+        with app.app_context():
+            UploadBlob.acquire(path.rsplit('/', 1)[1][:64], path, 100)
+            db.session.commit()
+            write_file(upload_folder, path)
+
+            stats = collect_orphan_uploads(upload_folder)
+            assert stats['referenced'] == 1
+            assert stats['quarantined'] == 0
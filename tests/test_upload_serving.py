@@ -0,0 +1,97 @@
+"""업로드 파일 제공 테스트"""
+
+import io
+from datetime import date
+from PIL import Image
+from app.models.user import User
+from app.models.memory import Memory
+from app.extensions import db
+
+def upload_memory(client):
+    """이미지가 포함된 추억 등록 후 추억 반환"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (700, 500), (30, 60, 90)).save(buffer, 'PNG')
+    buffer.seek(0)
+    client.post('/memories/add', data={
+        'title': '사진',
+        'content': '내용',
+        'memory_date': date.today().isoformat(),
+        'image': (buffer, 'photo.png')
+    }, content_type='multipart/form-data')
+    return Memory.query.order_by(Memory.id.desc()).first()
+
+class TestUploadServing:
+    """업로드 파일 제공 테스트"""
+
+    def test_immutable_etag_and_not_modified(self, client, app, make_couple, login):
+        """immutable 캐시 헤더와 If-None-Match 304 응답 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        with app.app_context():
+            login(client, make_couple('serveA', '제공 A')[0])
+            memory = upload_memory(client)
+
+            response = client.get(memory.get_image_url())
+            assert response.status_code == 200
+            assert 'immutable' in response.headers['Cache-Control']
+            assert 'private' in response.headers['Cache-Control']
+            etag = response.headers['ETag']
+            assert memory.image_path.rsplit('/', 1)[1].split('.')[0] in etag
+            response.close()
+
+            response = client.get(memory.get_image_url(), headers={'If-None-Match': etag})
+            assert response.status_code == 304
+
+            variant_url = memory.get_thumbnail_url()
+            assert variant_url != memory.get_image_url()
+            response = client.get(variant_url)
+            assert response.status_code == 200
+            response.close()
+            memory.delete_image()
+
+    def test_range_request(self, client, app, make_couple, login):
+        """Range 요청에 206 부분 응답을 보내는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        with app.app_context():
+            login(client, make_couple('serveB', '제공 B')[0])
+            memory = upload_memory(client)
+
+            response = client.get(memory.get_image_url(), headers={'Range': 'bytes=0-9'})
+            assert response.status_code == 206
+            assert len(response.get_data()) == 10
+            assert response.headers['Content-Range'].startswith('bytes 0-9/')
+            memory.delete_image()
+
+    def test_other_couple_cannot_access(self, client, app, make_couple, login):
+        """다른 커플의 사진은 404인지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        with app.app_context():
+            login(client, make_couple('serveC', '제공 C')[0])
+            memory = upload_memory(client)
+            image_url, thumbnail_url = memory.get_image_url(), memory.get_thumbnail_url()
+            other_id = make_couple('serveD', '제공 D')[0].id
+
+        # 로그인 사용자는 앱 컨텍스트(g)에 캐시되므로 새 컨텍스트에서 요청
+        with app.app_context():
+            login(client, db.session.get(User, other_id))
+            assert client.get(image_url).status_code == 404
+            assert client.get(thumbnail_url).status_code == 404
+            Memory.query.first().delete_image()
+
+    def test_x_accel_redirect_mode(self, client, app, make_couple, login):
+        """x-accel 모드에서 nginx 내부 경로로 넘기는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        app.config['UPLOAD_SERVE_MODE'] = 'x-accel'
+        with app.app_context():
+            login(client, make_couple('serveE', '제공 E')[0])
+            memory = upload_memory(client)
+
+            response = client.get(memory.get_image_url())
+            assert response.status_code == 200
+            assert response.headers['X-Accel-Redirect'] == f'/_uploads/{memory.image_path}'
+            assert response.headers['Content-Type'] == 'image/png'
+            assert response.get_data() == b''
+
+            response = client.get(memory.get_image_url(), headers={'If-None-Match': response.headers['ETag']})
+            assert response.status_code == 304
+            assert 'X-Accel-Redirect' not in response.headers
+            memory.delete_image()
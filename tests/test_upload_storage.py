@@ -0,0 +1,114 @@
+"""콘텐츠 주소 업로드 저장소 테스트"""
+
+import io
+import os
+from datetime import date
+from PIL import Image
+from app.models.user import User
+from app.models.memory import Memory
+from app.models.upload_blob import UploadBlob
+from app.services.upload_storage import is_content_addressed, migrate_legacy_uploads
+from app.extensions import db
+
+def image_bytes(color=(10, 120, 200)):
+    """테스트용 PNG 이미지 바이트"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def post_memory(client, data, filename='photo.png'):
+    """이미지가 포함된 추억 등록 요청"""
+    return client.post('/memories/add', data={
+        'title': '같은 사진',
+        'content': '두 번 올린 사진',
+        'memory_date': date.today().isoformat(),
+        'image': (io.BytesIO(data), filename)
+    }, content_type='multipart/form-data')
+
+class TestUploadStorage:
+    """업로드 저장소 테스트"""
+
+    def test_identical_uploads_share_one_file(self, client, app, make_couple, login):
+        """같은 사진은 한 번만 저장되고 참조 수로 공유되는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        with app.app_context():
+            login(client, make_couple('storage', '저장소')[0])
+            data = image_bytes()
+            post_memory(client, data)
+            post_memory(client, data, filename='copy.png')
+
+            first, second = Memory.query.order_by(Memory.id).all()
+            assert is_content_addressed(first.image_path)
+            assert first.image_path == second.image_path
+            assert second.image_status == 'ready'
+
+            blob = UploadBlob.query.one()
+            assert blob.ref_count == 2
+            full_path = first.get_image_full_path()
+
+            # 첫 번째 추억을 지워도 파일은 남아 있음
+            response = client.post(f'/memories/{first.id}/delete')
+            assert response.status_code == 302
+            assert os.path.exists(full_path)
+            assert db.session.get(UploadBlob, blob.sha256).ref_count == 1
+
+            # 참조 해제가 롤백되면 파일과 참조 수가 그대로 남음
+            db.session.get(Memory, second.id).delete_image()
+            db.session.rollback()
+            assert os.path.exists(full_path)
+            assert db.session.get(UploadBlob, blob.sha256).ref_count == 1
+
+            # 마지막 참조가 사라지면 커밋 후 파일도 삭제
+            client.post(f'/memories/{second.id}/delete')
+            assert not os.path.exists(full_path)
+            assert UploadBlob.query.count() == 0
+
+    def test_uploaded_file_served_from_shard(self, client, app, make_couple, login):
+        """샤드 경로의 파일이 /uploads/로 제공되는지 테스트"""
+        app.config['IMAGE_PROCESSING_MODE'] = 'sync'
+        with app.app_context():
+            login(client, make_couple('storage', '저장소')[0])
+            post_memory(client, image_bytes((1, 2, 3)))
+            memory = Memory.query.one()
+
+            response = client.get(memory.get_image_url())
+            assert response.status_code == 200
+            response.close()
+            memory.delete_image()
+
+    def test_migrate_legacy_uploads(self, app):
+        """평면 구조 파일을 샤드 경로로 옮기고 중복을 합치는지 테스트"""
+        with app.app_context():
+            user = User(email='legacy@example.com', name='이전 테스트')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+
+            upload_folder = app.config['UPLOAD_FOLDER']
+            data = image_bytes((5, 5, 5))
+            for index, name in enumerate(['legacy.png', 'legacy_1.png']):
+                with open(os.path.join(upload_folder, name), 'wb') as f:
+                    f.write(data)
+                db.session.add(Memory(couple_id=1, title=f'추억 {index}', content='내용',
+                                      memory_date=date.today(), image_path=name, created_by=user.id))
+            db.session.commit()
+
+            stats = migrate_legacy_uploads(upload_folder)
+            assert stats['migrated'] == 2
+            assert stats['deduplicated'] == 1
+
+            paths = {memory.image_path for memory in Memory.query.all()}
+            assert len(paths) == 1
+            path = paths.pop()
+            assert is_content_addressed(path)
+            assert os.path.exists(os.path.join(upload_folder, path))
+            assert not os.path.exists(os.path.join(upload_folder, 'legacy.png'))
+            assert UploadBlob.query.one().ref_count == 2
+
+            # 다시 실행해도 변화 없음
+            assert migrate_legacy_uploads(upload_folder)['skipped'] == 2
+
+            for memory in Memory.query.all():
+                memory.delete_image()
+            db.session.commit()
+            assert not os.path.exists(os.path.join(upload_folder, path))